@@ -1,9 +1,25 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.openapi.utils import get_openapi
 from routers import query, ingestion
+from mmct.video_pipeline.utils.resource_pool import get_resource_pool
+from services.ingestion_jobs import IngestionJobManager
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Create the shared resource pool and ingestion workers at startup; stop them on shutdown."""
+    app.state.resource_pool = get_resource_pool()
+    app.state.ingestion_jobs = IngestionJobManager.from_env()
+    await app.state.ingestion_jobs.start()
+    yield
+    await app.state.ingestion_jobs.stop()
+    await app.state.resource_pool.close()
+
 
 app = FastAPI(
+    lifespan=lifespan,
     title="MMCT Agent API",
     description="Multi-modal Critical Thinking Agent Framework for image and video analysis",
     version="1.0.0",
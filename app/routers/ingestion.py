@@ -1,6 +1,9 @@
-from fastapi import APIRouter, Depends, UploadFile, File
-from schemas.ingestion import IngestionRequest
-from services.ingestion_services import ingest_direct, ingest_queue
+import json
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Request
+from fastapi.responses import StreamingResponse
+from schemas.ingestion import IngestionRequest, IngestionJobStatus
+from services.ingestion_services import ingest_direct, ingest_queue, create_ingestion_job
+from utilities.streaming_upload import iter_upload_file
 
 router = APIRouter()
 
@@ -11,3 +14,56 @@ async def ingest_video(file: UploadFile = File(...), data: IngestionRequest = De
 @router.post("/ingest-video-queue")
 async def ingest_video_queue(file: UploadFile = File(...), data: IngestionRequest = Depends()):
     return await ingest_queue(file, data.model_dump())
+
+@router.post(
+    "/ingestion-jobs",
+    status_code=202,
+    response_model=IngestionJobStatus,
+    summary="Upload a video and ingest it in the background",
+)
+async def create_job(request: Request, file: UploadFile = File(...), data: IngestionRequest = Depends()):
+    job = await create_ingestion_job(
+        request.app.state.ingestion_jobs, iter_upload_file(file), file.filename, data.model_dump()
+    )
+    return job.to_dict()
+
+@router.post(
+    "/ingestion-jobs/stream",
+    status_code=202,
+    response_model=IngestionJobStatus,
+    summary="Stream a raw video body and ingest it in the background",
+    description="The request body is the video file itself (no multipart encoding), written to disk as it arrives.",
+)
+async def create_job_from_stream(request: Request, filename: str, data: IngestionRequest = Depends()):
+    job = await create_ingestion_job(
+        request.app.state.ingestion_jobs, request.stream(), filename, data.model_dump()
+    )
+    return job.to_dict()
+
+@router.get("/ingestion-jobs/{job_id}", response_model=IngestionJobStatus)
+async def get_job(request: Request, job_id: str):
+    job = request.app.state.ingestion_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(404, f"Unknown ingestion job {job_id}")
+    return job.to_dict()
+
+@router.get("/ingestion-jobs/{job_id}/events", summary="Server-sent events with stage progress of a job")
+async def stream_job_events(request: Request, job_id: str):
+    manager = request.app.state.ingestion_jobs
+    if manager.get(job_id) is None:
+        raise HTTPException(404, f"Unknown ingestion job {job_id}")
+
+    async def event_stream():
+        async for event in manager.subscribe(job_id):
+            if await request.is_disconnected():
+                break
+            if event is None:
+                yield ": keep-alive\n\n"
+                continue
+            yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,6 +1,13 @@
-from fastapi import APIRouter, Depends, UploadFile, File
-from schemas.query import ImageQueryRequest, VideoQueryRequest
-from services.query_services import process_image_query, process_video_query
+import json
+from fastapi import APIRouter, Depends, UploadFile, File, Request
+from fastapi.responses import StreamingResponse
+from schemas.query import ImageQueryRequest, VideoQueryRequest, BatchVideoQueryRequest
+from services.query_services import (
+    process_image_query,
+    process_video_query,
+    process_batch_video_query,
+    stream_batch_video_query,
+)
 
 router = APIRouter()
 
@@ -13,5 +20,32 @@ async def query_images(file: UploadFile = File(...), data: ImageQueryRequest = D
     return {"result": await process_image_query(file, data.model_dump())}
 
 @router.post("/query-on-videos")
-async def query_videos(data: VideoQueryRequest = Depends()):
-    return {"result": await process_video_query(data.model_dump())}
+async def query_videos(request: Request, data: VideoQueryRequest = Depends()):
+    return {
+        "result": await process_video_query(
+            data.model_dump(), resource_pool=request.app.state.resource_pool
+        )
+    }
+
+@router.post(
+    "/query-on-videos/batch",
+    summary="Answer many (query, video) pairs over one index",
+    description="Runs the queries concurrently with shared retrieval. With stream=true, results are sent as "
+    "server-sent events in completion order; otherwise they are returned in input order.",
+)
+async def query_videos_batch(request: Request, data: BatchVideoQueryRequest):
+    body = data.model_dump()
+    resource_pool = request.app.state.resource_pool
+    if not data.stream:
+        return {"results": await process_batch_video_query(body, resource_pool=resource_pool)}
+
+    async def event_stream():
+        async for result in stream_batch_video_query(body, resource_pool=resource_pool):
+            yield f"event: result\ndata: {json.dumps(result)}\n\n"
+        yield "event: done\ndata: {}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,3 +1,4 @@
+from typing import Any, Dict, Optional
 from pydantic import BaseModel
 from mmct.video_pipeline import TranscriptionServices, Languages
 
@@ -5,4 +6,18 @@ class IngestionRequest(BaseModel):
     index_name: str
     transcription_service: TranscriptionServices
     language: Languages
-    use_computer_vision_tool: bool
\ No newline at end of file
+    use_computer_vision_tool: bool
+
+class IngestionJobStatus(BaseModel):
+    job_id: str
+    video_id: str
+    index_name: str
+    filename: str
+    size_bytes: int
+    status: str
+    progress: float
+    error: Optional[str] = None
+    created_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    stages: Dict[str, Dict[str, Dict[str, Any]]] = {}
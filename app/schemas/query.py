@@ -1,3 +1,4 @@
+from typing import Optional
 from pydantic import BaseModel, Field, field_validator
 from mmct.image_pipeline import ImageQnaTools
 
@@ -52,4 +53,16 @@ class VideoQueryRequest(BaseModel):
     top_n: int = Field(..., ge=1)
     use_computer_vision_tool: bool
     use_critic_agent: bool
-    stream: bool
\ No newline at end of file
+    stream: bool
+
+class BatchVideoQueryItem(BaseModel):
+    query: str = Field(..., min_length=1)
+    video_id: Optional[str] = None
+    url: Optional[str] = None
+
+class BatchVideoQueryRequest(BaseModel):
+    index_name: str
+    items: list[BatchVideoQueryItem] = Field(..., min_length=1)
+    use_critic_agent: bool = True
+    max_concurrency: Optional[int] = Field(None, ge=1)
+    stream: bool = False
@@ -0,0 +1,253 @@
+"""
+Background ingestion jobs.
+
+Uploads are streamed to disk and hashed by the API, then handed to a bounded pool of local
+workers. Each worker is a task on the API's event loop, so at most max_concurrent_jobs
+ingestions run at once and a long ingestion never holds an HTTP request. Jobs run on the API
+loop rather than on private loops in threads because the process-wide resource pool's async
+clients are bound to the loop that first used them. Stage transitions are recorded on the job
+and fanned out to SSE subscribers.
+"""
+
+import asyncio
+import os
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from loguru import logger
+from mmct.video_pipeline import IngestionPipeline
+from mmct.video_pipeline.utils.helper import remove_file
+
+TERMINAL_STATUSES = ("completed", "skipped", "failed")
+
+
+@dataclass
+class IngestionJob:
+    """State of one ingestion job as reported by the status endpoints."""
+
+    job_id: str
+    video_id: str
+    index_name: str
+    filename: str
+    video_path: str
+    size_bytes: int
+    params: Dict[str, Any]
+    status: str = "queued"
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    # part hash id -> stage name -> {"status", "duration"}
+    stages: Dict[str, Dict[str, Dict[str, Any]]] = field(default_factory=dict)
+    # part hash id -> number of stages in that part's stage graph
+    stages_total: Dict[str, int] = field(default_factory=dict)
+    events: List[Dict[str, Any]] = field(default_factory=list)
+    subscribers: List[asyncio.Queue] = field(default_factory=list, repr=False)
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status in TERMINAL_STATUSES
+
+    def progress(self) -> float:
+        """Fraction of the stages of parts seen so far that have finished."""
+        if self.is_finished:
+            return 1.0
+        total = sum(self.stages_total.values())
+        if not total:
+            return 0.0
+        done = sum(
+            1
+            for part in self.stages.values()
+            for stage in part.values()
+            if stage["status"] not in ("pending", "waiting", "running")
+        )
+        return done / total
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.job_id,
+            "video_id": self.video_id,
+            "index_name": self.index_name,
+            "filename": self.filename,
+            "size_bytes": self.size_bytes,
+            "status": self.status,
+            "progress": round(self.progress(), 3),
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "stages": self.stages,
+        }
+
+    def publish(self, event: Dict[str, Any]) -> None:
+        """Record an event and deliver it to every SSE subscriber."""
+        event = {"job_id": self.job_id, "time": time.time(), **event}
+        self.events.append(event)
+        for queue in self.subscribers:
+            queue.put_nowait(event)
+
+
+class IngestionJobManager:
+    """
+    Bounded local worker pool for ingestion jobs.
+
+    Args:
+        max_concurrent_jobs: Number of ingestions running at once; the rest wait in the queue
+        max_finished_jobs: Finished jobs kept for status queries before the oldest are forgotten
+
+    Example:
+        >>> manager = IngestionJobManager(max_concurrent_jobs=2)
+        >>> await manager.start()
+        >>> job = manager.submit(video_id, path, filename, size, body)
+        >>> manager.get(job.job_id).to_dict()
+        >>> await manager.stop()
+    """
+
+    def __init__(self, max_concurrent_jobs: int = 2, max_finished_jobs: int = 1000):
+        self.max_concurrent_jobs = max_concurrent_jobs
+        self.max_finished_jobs = max_finished_jobs
+        self.jobs: "OrderedDict[str, IngestionJob]" = OrderedDict()
+        self._queue: "asyncio.Queue[IngestionJob]" = asyncio.Queue()
+        self._workers: List[asyncio.Task] = []
+
+    @classmethod
+    def from_env(cls) -> "IngestionJobManager":
+        return cls(
+            max_concurrent_jobs=int(os.getenv("INGESTION_MAX_CONCURRENT_JOBS", "2")),
+            max_finished_jobs=int(os.getenv("INGESTION_MAX_FINISHED_JOBS", "1000")),
+        )
+
+    async def start(self) -> None:
+        self._workers = [
+            asyncio.create_task(self._worker(), name=f"ingestion-worker-{i}")
+            for i in range(self.max_concurrent_jobs)
+        ]
+        logger.info(f"Started {self.max_concurrent_jobs} ingestion workers")
+
+    async def stop(self) -> None:
+        """Stop the workers; running ingestions are cancelled and they and queued jobs are marked failed."""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        while not self._queue.empty():
+            self._finish(self._queue.get_nowait(), "failed", error="Server shut down before the job started")
+
+    def submit(
+        self, video_id: str, video_path: str, filename: str, size_bytes: int, params: Dict[str, Any]
+    ) -> IngestionJob:
+        """
+        Queue an uploaded video for ingestion.
+
+        A video already queued or running for the same index returns the existing job, and the
+        duplicate upload is removed.
+        """
+        for job in self.jobs.values():
+            if job.video_id == video_id and job.index_name == params["index_name"] and not job.is_finished:
+                if video_path != job.video_path and os.path.exists(video_path):
+                    os.remove(video_path)
+                return job
+
+        job = IngestionJob(
+            job_id=uuid.uuid4().hex,
+            video_id=video_id,
+            index_name=params["index_name"],
+            filename=filename,
+            video_path=video_path,
+            size_bytes=size_bytes,
+            params=params,
+        )
+        self.jobs[job.job_id] = job
+        self._queue.put_nowait(job)
+        job.publish({"type": "status", "status": job.status})
+        self._forget_finished_jobs()
+        return job
+
+    def get(self, job_id: str) -> Optional[IngestionJob]:
+        return self.jobs.get(job_id)
+
+    async def subscribe(self, job_id: str, heartbeat_seconds: float = 15.0) -> AsyncIterator[Optional[Dict[str, Any]]]:
+        """
+        Yield past and live events of a job until it finishes.
+
+        Yields None after heartbeat_seconds without events so the caller can keep the
+        connection alive through proxies.
+        """
+        job = self.jobs[job_id]
+        queue: asyncio.Queue = asyncio.Queue()
+        # Replay and subscribe without an await in between so no event is missed or duplicated
+        for event in job.events:
+            queue.put_nowait(event)
+        job.subscribers.append(queue)
+        try:
+            while True:
+                if job.is_finished and queue.empty():
+                    return
+                try:
+                    yield await asyncio.wait_for(queue.get(), timeout=heartbeat_seconds)
+                except asyncio.TimeoutError:
+                    yield None
+        finally:
+            job.subscribers.remove(queue)
+
+    # Workers
+
+    async def _worker(self) -> None:
+        while True:
+            job = await self._queue.get()
+            try:
+                job.status = "running"
+                job.started_at = time.time()
+                job.publish({"type": "status", "status": job.status})
+                ingested = await self._run_job(job)
+                self._finish(job, "completed" if ingested else "skipped")
+            except asyncio.CancelledError:
+                self._finish(job, "failed", error="Server shut down during the ingestion")
+                raise
+            except Exception as e:
+                logger.exception(f"Ingestion job {job.job_id} failed: {e}")
+                self._finish(job, "failed", error=str(e))
+            finally:
+                self._queue.task_done()
+
+    async def _run_job(self, job: IngestionJob) -> bool:
+        """Run the pipeline; returns False if the video was already ingested."""
+        pipeline = IngestionPipeline(
+            video_path=job.video_path,
+            index_name=job.index_name,
+            transcription_service=job.params["transcription_service"],
+            language=job.params["language"],
+            hash_video_id=job.video_id,
+            on_stage_event=lambda event: self._record_stage_event(job, event),
+            disable_console_log=True,
+        )
+        try:
+            await pipeline.run()
+        finally:
+            await remove_file(video_id=job.video_id)
+            if os.path.exists(job.video_path):
+                os.remove(job.video_path)
+        # run() returns early without any stage when the video is already in the index
+        return bool(pipeline.stage_timings)
+
+    def _record_stage_event(self, job: IngestionJob, event: Dict[str, Any]) -> None:
+        job.stages_total[event["part"]] = event["stages_total"]
+        job.stages.setdefault(event["part"], {})[event["stage"]] = {
+            "status": event["status"],
+            "duration": event["duration"],
+        }
+        job.publish({"type": "stage", **event, "progress": round(job.progress(), 3)})
+
+    def _finish(self, job: IngestionJob, status: str, error: Optional[str] = None) -> None:
+        job.status = status
+        job.error = error
+        job.finished_at = time.time()
+        job.publish({"type": "status", "status": status, "error": error})
+
+    def _forget_finished_jobs(self) -> None:
+        finished = [job_id for job_id, job in self.jobs.items() if job.is_finished]
+        for job_id in finished[: max(0, len(finished) - self.max_finished_jobs)]:
+            self.jobs.pop(job_id, None)
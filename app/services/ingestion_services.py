@@ -1,40 +1,58 @@
-import tempfile, os
+import tempfile, os, uuid
+from typing import AsyncIterator
 from fastapi import HTTPException, UploadFile
 from loguru import logger
 from mmct.video_pipeline import IngestionPipeline
-from mmct.video_pipeline.utils.helper import get_file_hash, remove_file
-from utilities.event_hub_handler import EventHubHandler
+from mmct.video_pipeline.utils.helper import remove_file
+from utilities.ingestion_queue import create_ingestion_queue
+from utilities.streaming_upload import iter_upload_file, stream_to_file
+from services.ingestion_jobs import IngestionJob, IngestionJobManager
 from mmct.providers.factory import provider_factory
 from dotenv import load_dotenv
 load_dotenv(override=True)
 
 try:
-    logger.info("Creating an instance of event hub handler for ingestion")
-    ingestion_event_hub_handler = EventHubHandler(
-        hub_name=os.getenv("INGESTION_EVENT_HUB_NAME")
-    )
-    logger.info(f"Successfully created Event Hub handler for: {os.getenv('INGESTION_EVENT_HUB_NAME')}")
+    logger.info("Creating the ingestion queue")
+    ingestion_queue = create_ingestion_queue()
+    logger.info(f"Successfully created ingestion queue: {type(ingestion_queue).__name__}")
 except Exception as e:
-    logger.exception(f"Exception occurred while instantiating the Event Hub class: {e}")
-    ingestion_event_hub_handler = None
+    logger.exception(f"Exception occurred while creating the ingestion queue: {e}")
+    ingestion_queue = None
 
 blob_storage_manager = provider_factory.create_storage_provider()
 
+UPLOAD_DIR = os.getenv("INGESTION_UPLOAD_DIR", os.path.join(tempfile.gettempdir(), "mmct_uploads"))
+
+
+async def save_upload(chunks: AsyncIterator[bytes], filename: str):
+    """Stream an upload to UPLOAD_DIR, hashing it on the way; returns (path, video_id, size)."""
+    os.makedirs(UPLOAD_DIR, exist_ok=True)
+    suffix = os.path.splitext(filename or "")[1]
+    path = os.path.join(UPLOAD_DIR, f"{uuid.uuid4().hex}{suffix}")
+    vid, size = await stream_to_file(chunks, path)
+    logger.info(f"Received upload {filename} ({size} bytes), hash id {vid}")
+    return path, vid, size
+
+
+async def create_ingestion_job(
+    manager: IngestionJobManager, chunks: AsyncIterator[bytes], filename: str, body: dict
+) -> IngestionJob:
+    """Save an upload and queue it for background ingestion; returns without waiting for it."""
+    path, vid, size = await save_upload(chunks, filename)
+    return manager.submit(video_id=vid, video_path=path, filename=filename, size_bytes=size, params=body)
+
+
 async def ingest_direct(file: UploadFile, body: dict):
-    suffix = os.path.splitext(file.filename)[1]
-    tmp = tempfile.NamedTemporaryFile(delete=False, suffix=suffix)
-    tmp.write(await file.read()); tmp.close()
-    path = tmp.name
-    vid = await get_file_hash(path)
+    path, vid, _ = await save_upload(iter_upload_file(file), file.filename)
     try:
         pipeline = IngestionPipeline(
             video_path=path,
             index_name=body["index_name"],
             transcription_service=body["transcription_service"],
             language=body["language"],
-            use_computer_vision_tool=body["use_computer_vision_tool"]
+            hash_video_id=vid,
         )
-        await pipeline()
+        await pipeline.run()
     except Exception as e:
         logger.error(e); raise HTTPException(500, "Ingestion failed")
     finally:
@@ -44,14 +62,10 @@ async def ingest_direct(file: UploadFile, body: dict):
     return {"message": "success"}
 
 async def ingest_queue(file: UploadFile, body: dict):
-    if ingestion_event_hub_handler is None:
-        raise HTTPException(500, "Event Hub handler failed to initialize. Check Event Hub configuration and credentials.")
+    if ingestion_queue is None:
+        raise HTTPException(500, "Ingestion queue failed to initialize. Check INGESTION_QUEUE_BACKEND and its configuration/credentials.")
     
-    suffix = os.path.splitext(file.filename)[1]
-    tmp = tempfile.NamedTemporaryFile(delete=False, suffix=suffix)
-    tmp.write(await file.read()); tmp.close()
-    path = tmp.name
-    vid = await get_file_hash(path)
+    path, vid, _ = await save_upload(iter_upload_file(file), file.filename)
     ext = os.path.splitext(file.filename)[1]
     try:
         container_name = os.getenv("VIDEO_CONTAINER_NAME")
@@ -72,13 +86,14 @@ async def ingest_queue(file: UploadFile, body: dict):
             "video_blob_url": blob_url
         }
         
-        logger.info(f"Sending event to Event Hub with payload: {payload}")
-        message = await ingestion_event_hub_handler.produce_event(payload=payload)
-        logger.info(f"Event Hub response: {message}")
-        
-        if message.get("success"):
-            return {"message": "produced event"}
-        return {"message": f"fail: {message.get('message')}"}
+        logger.info(f"Sending message to the ingestion queue with payload: {payload}")
+        try:
+            message_id = await ingestion_queue.send(payload)
+        except Exception as e:
+            logger.error(f"Ingestion queue send failed: {e}")
+            return {"message": f"fail: {e}"}
+        logger.info(f"Ingestion queue accepted message {message_id}")
+        return {"message": "produced event"}
     except Exception as e:
         logger.exception(f"Queue ingestion failed: {e}")
         raise HTTPException(500, f"Queue ingestion failed: {str(e)}")
@@ -1,7 +1,7 @@
 import tempfile, os
 from fastapi import HTTPException, UploadFile
 from mmct.image_pipeline import ImageAgent, ImageQnaTools
-from mmct.video_pipeline import VideoAgent
+from mmct.video_pipeline import VideoAgent, BatchVideoAgent, BatchQueryItem
 from loguru import logger
 
 async def process_image_query(file: UploadFile, body: dict):
@@ -32,10 +32,47 @@ async def process_image_query(file: UploadFile, body: dict):
         os.remove(tmp_path)
 
 
-async def process_video_query(body: dict):
-    agent = VideoAgent(**body)
+async def process_video_query(body: dict, resource_pool=None):
+    agent = VideoAgent(**body, resource_pool=resource_pool)
     try:
         return await agent()
     except Exception as e:
         logger.error(e)
         raise HTTPException(500, "Video processing failed")
+
+
+def _create_batch_agent(body: dict, resource_pool=None) -> BatchVideoAgent:
+    return BatchVideoAgent(
+        items=[BatchQueryItem(**item) for item in body["items"]],
+        index_name=body["index_name"],
+        use_critic_agent=body["use_critic_agent"],
+        max_concurrency=body.get("max_concurrency"),
+        resource_pool=resource_pool,
+    )
+
+
+def _batch_result_to_dict(result) -> dict:
+    return {
+        "index": result.index,
+        "query": result.item.query,
+        "video_id": result.item.video_id,
+        "url": result.item.url,
+        "result": result.response.model_dump(mode="json"),
+    }
+
+
+async def process_batch_video_query(body: dict, resource_pool=None) -> list:
+    """Answer every item of the batch; results are returned in input order."""
+    agent = _create_batch_agent(body, resource_pool)
+    try:
+        return [_batch_result_to_dict(result) for result in await agent()]
+    except Exception as e:
+        logger.error(e)
+        raise HTTPException(500, "Batch video processing failed")
+
+
+async def stream_batch_video_query(body: dict, resource_pool=None):
+    """Yield each item's result as soon as it is answered."""
+    agent = _create_batch_agent(body, resource_pool)
+    async for result in agent.run_stream():
+        yield _batch_result_to_dict(result)
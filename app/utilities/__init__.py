@@ -6,5 +6,6 @@ This package contains utility modules for various application services.
 
 from .event_hub_handler import EventHubHandler
 from .execution_timer import ExecutionTimer
+from .streaming_upload import iter_upload_file, stream_to_file
 
-__all__ = ["EventHubHandler", "ExecutionTimer"]
\ No newline at end of file
+__all__ = ["EventHubHandler", "ExecutionTimer", "iter_upload_file", "stream_to_file"]
\ No newline at end of file
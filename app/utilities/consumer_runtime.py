@@ -0,0 +1,104 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+
+from loguru import logger
+from utilities.ingestion_queue import IngestionQueue, QueueMessage
+
+
+class ConsumerRuntime:
+    """
+    Runs queue messages through a handler with bounded concurrency.
+
+    Up to max_concurrent messages are processed at once. While a message is being processed
+    its visibility timeout is extended periodically, so long ingestions are not redelivered
+    to another consumer. Each message is acked when the handler returns and nacked (retried
+    or dead-lettered by the queue) when it raises.
+
+    Args:
+        queue: Ingestion queue to consume
+        handler: Async callable processing one message payload
+        max_concurrent: Messages processed concurrently
+        visibility_timeout: Seconds a received message stays invisible between extensions
+        poll_interval: Seconds to wait before polling again when the queue is empty
+
+    Example:
+        >>> runtime = ConsumerRuntime(queue, process_ingestion_message, max_concurrent=4)
+        >>> await runtime.run()
+    """
+
+    def __init__(
+        self,
+        queue: IngestionQueue,
+        handler: Callable[[Dict[str, Any]], Awaitable[None]],
+        max_concurrent: int = 4,
+        visibility_timeout: float = 300.0,
+        poll_interval: float = 2.0,
+    ):
+        self.queue = queue
+        self.handler = handler
+        self.max_concurrent = max_concurrent
+        self.visibility_timeout = visibility_timeout
+        self.poll_interval = poll_interval
+        self._active: Set[asyncio.Task] = set()
+        self._stopping: Optional[asyncio.Event] = None
+
+    async def run(self) -> None:
+        """Consume until stop() is called, then wait for in-flight messages to finish."""
+        self._stopping = asyncio.Event()
+        logger.info(f"Consumer runtime started with {self.max_concurrent} concurrent ingestions")
+        try:
+            while not self._stopping.is_set():
+                free = self.max_concurrent - len(self._active)
+                if free <= 0:
+                    await asyncio.wait(self._active, return_when=asyncio.FIRST_COMPLETED)
+                    continue
+
+                try:
+                    messages = await self.queue.receive(free, self.visibility_timeout)
+                except Exception as e:
+                    logger.exception(f"Failed to receive messages: {e}")
+                    messages = []
+
+                if not messages:
+                    try:
+                        await asyncio.wait_for(self._stopping.wait(), timeout=self.poll_interval)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+
+                for message in messages:
+                    task = asyncio.create_task(self._process(message), name=f"ingest:{message.message_id}")
+                    self._active.add(task)
+                    task.add_done_callback(self._active.discard)
+        finally:
+            if self._active:
+                logger.info(f"Waiting for {len(self._active)} in-flight ingestions to finish")
+                await asyncio.gather(*self._active, return_exceptions=True)
+            await self.queue.close()
+
+    def stop(self) -> None:
+        """Stop receiving new messages; run() returns once in-flight messages finish."""
+        if self._stopping is not None:
+            self._stopping.set()
+
+    async def _keep_invisible(self, message: QueueMessage) -> None:
+        while True:
+            await asyncio.sleep(self.visibility_timeout / 2)
+            try:
+                await self.queue.extend_visibility(message, self.visibility_timeout)
+            except Exception as e:
+                logger.warning(f"Failed to extend visibility of message {message.message_id}: {e}")
+
+    async def _process(self, message: QueueMessage) -> None:
+        heartbeat = asyncio.create_task(self._keep_invisible(message))
+        try:
+            logger.info(f"Processing message {message.message_id} (attempt {message.attempts})")
+            await self.handler(message.payload)
+        except Exception as e:
+            logger.exception(f"Message {message.message_id} failed: {e}")
+            heartbeat.cancel()
+            await self.queue.nack(message, str(e))
+        else:
+            heartbeat.cancel()
+            await self.queue.ack(message)
+            logger.info(f"Message {message.message_id} processed")
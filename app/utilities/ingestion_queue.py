@@ -0,0 +1,371 @@
+"""
+Queue abstraction for ingestion requests.
+
+Producers (the /ingest-video-queue endpoint) send JSON payloads; the consumer runtime
+receives several messages at once, acknowledges each one when its ingestion succeeds and
+negatively acknowledges it on failure. Two implementations:
+
+- SQLiteIngestionQueue: local, dependency-free queue with visibility timeouts, retries with
+  backoff and a dead-letter state. Useful on a single node and for load-testing the
+  pipeline without Azure.
+- EventHubIngestionQueue: adapter over Event Hub. Event Hub is a partitioned log rather than
+  a queue, so the adapter buffers events, retries failures locally and only moves a
+  partition's checkpoint past events whose processing has finished.
+"""
+
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from loguru import logger
+
+
+@dataclass
+class QueueMessage:
+    """A received message; pass it back to ack()/nack()."""
+
+    message_id: str
+    payload: Dict[str, Any]
+    attempts: int
+    receipt: str = ""
+    # Backend-specific handle (e.g. the Event Hub partition context and event)
+    handle: Any = field(default=None, repr=False)
+
+
+class IngestionQueue(ABC):
+    """Interface shared by the ingestion queue backends."""
+
+    @abstractmethod
+    async def send(self, payload: Dict[str, Any]) -> str:
+        """Enqueue a payload; returns the message id."""
+
+    @abstractmethod
+    async def receive(self, max_messages: int, visibility_timeout: float) -> List[QueueMessage]:
+        """
+        Receive up to max_messages.
+
+        Received messages stay invisible to other consumers for visibility_timeout seconds
+        unless extended; if neither ack() nor nack() is called by then they are delivered again.
+        """
+
+    @abstractmethod
+    async def ack(self, message: QueueMessage) -> None:
+        """Mark a message as processed."""
+
+    @abstractmethod
+    async def nack(self, message: QueueMessage, error: str) -> None:
+        """Report a failed attempt; the message is retried or dead-lettered."""
+
+    async def extend_visibility(self, message: QueueMessage, visibility_timeout: float) -> None:
+        """Keep a message invisible while it is still being processed."""
+
+    async def close(self) -> None:
+        pass
+
+
+class SQLiteIngestionQueue(IngestionQueue):
+    """
+    SQLite-backed queue with visibility timeouts, retries and dead-lettering.
+
+    Args:
+        db_path: SQLite database file; shared by every process using the queue
+        max_attempts: Deliveries before a message is moved to the dead-letter state
+        retry_backoff_seconds: Delay before the first retry; doubles with every attempt
+
+    Example:
+        >>> queue = SQLiteIngestionQueue("ingestion_queue.db")
+        >>> await queue.send({"video_id": "..."})
+        >>> [message] = await queue.receive(max_messages=1, visibility_timeout=600)
+        >>> await queue.ack(message)
+    """
+
+    def __init__(self, db_path: str, max_attempts: int = 3, retry_backoff_seconds: float = 30.0):
+        self.db_path = db_path
+        self.max_attempts = max_attempts
+        self.retry_backoff_seconds = retry_backoff_seconds
+        self._lock = threading.Lock()
+        directory = os.path.dirname(os.path.abspath(db_path))
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS messages (
+                id TEXT PRIMARY KEY,
+                payload TEXT NOT NULL,
+                state TEXT NOT NULL DEFAULT 'ready',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                visible_at REAL NOT NULL,
+                receipt TEXT,
+                last_error TEXT,
+                created_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_messages_ready ON messages (state, visible_at)")
+
+    def _send_sync(self, payload: Dict[str, Any]) -> str:
+        message_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO messages (id, payload, visible_at, created_at) VALUES (?, ?, ?, ?)",
+                (message_id, json.dumps(payload), now, now),
+            )
+        return message_id
+
+    def _receive_sync(self, max_messages: int, visibility_timeout: float) -> List[QueueMessage]:
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                # Messages whose consumer died on their last allowed attempt are never retried
+                self._conn.execute(
+                    "UPDATE messages SET state = 'dead', last_error = COALESCE(last_error, 'visibility timeout expired') "
+                    "WHERE state = 'ready' AND visible_at <= ? AND attempts >= ?",
+                    (now, self.max_attempts),
+                )
+                rows = self._conn.execute(
+                    "SELECT id, payload, attempts FROM messages WHERE state = 'ready' AND visible_at <= ? "
+                    "ORDER BY visible_at LIMIT ?",
+                    (now, max_messages),
+                ).fetchall()
+                messages = []
+                for message_id, payload, attempts in rows:
+                    receipt = uuid.uuid4().hex
+                    self._conn.execute(
+                        "UPDATE messages SET attempts = attempts + 1, visible_at = ?, receipt = ? WHERE id = ?",
+                        (now + visibility_timeout, receipt, message_id),
+                    )
+                    messages.append(
+                        QueueMessage(
+                            message_id=message_id,
+                            payload=json.loads(payload),
+                            attempts=attempts + 1,
+                            receipt=receipt,
+                        )
+                    )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return messages
+
+    def _ack_sync(self, message: QueueMessage) -> None:
+        with self._lock:
+            deleted = self._conn.execute(
+                "DELETE FROM messages WHERE id = ? AND receipt = ?", (message.message_id, message.receipt)
+            ).rowcount
+        if not deleted:
+            logger.warning(f"Ack for message {message.message_id} ignored: it was redelivered after its visibility timeout")
+
+    def _nack_sync(self, message: QueueMessage, error: str) -> None:
+        with self._lock:
+            if message.attempts >= self.max_attempts:
+                self._conn.execute(
+                    "UPDATE messages SET state = 'dead', last_error = ? WHERE id = ? AND receipt = ?",
+                    (error, message.message_id, message.receipt),
+                )
+                logger.error(f"Message {message.message_id} dead-lettered after {message.attempts} attempts: {error}")
+                return
+            delay = self.retry_backoff_seconds * (2 ** (message.attempts - 1))
+            self._conn.execute(
+                "UPDATE messages SET visible_at = ?, last_error = ? WHERE id = ? AND receipt = ?",
+                (time.time() + delay, error, message.message_id, message.receipt),
+            )
+
+    def _extend_sync(self, message: QueueMessage, visibility_timeout: float) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE messages SET visible_at = ? WHERE id = ? AND receipt = ? AND state = 'ready'",
+                (time.time() + visibility_timeout, message.message_id, message.receipt),
+            )
+
+    async def send(self, payload):
+        return await asyncio.to_thread(self._send_sync, payload)
+
+    async def receive(self, max_messages, visibility_timeout):
+        return await asyncio.to_thread(self._receive_sync, max_messages, visibility_timeout)
+
+    async def ack(self, message):
+        await asyncio.to_thread(self._ack_sync, message)
+
+    async def nack(self, message, error):
+        await asyncio.to_thread(self._nack_sync, message, error)
+
+    async def extend_visibility(self, message, visibility_timeout):
+        await asyncio.to_thread(self._extend_sync, message, visibility_timeout)
+
+    def dead_letters(self) -> List[Dict[str, Any]]:
+        """Dead-lettered messages with their last error, oldest first."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, payload, attempts, last_error FROM messages WHERE state = 'dead' ORDER BY created_at"
+            ).fetchall()
+        return [
+            {"message_id": row[0], "payload": json.loads(row[1]), "attempts": row[2], "error": row[3]}
+            for row in rows
+        ]
+
+    def requeue_dead_letter(self, message_id: str) -> bool:
+        """Move a dead-lettered message back to the queue with a fresh attempt count."""
+        with self._lock:
+            return bool(
+                self._conn.execute(
+                    "UPDATE messages SET state = 'ready', attempts = 0, visible_at = ? WHERE id = ? AND state = 'dead'",
+                    (time.time(), message_id),
+                ).rowcount
+            )
+
+    async def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class EventHubIngestionQueue(IngestionQueue):
+    """
+    Event Hub adapter.
+
+    Events are received in the background into a bounded buffer, which applies backpressure
+    to the partitions. Failed events are retried locally up to max_attempts and then sent to
+    a dead-letter Event Hub when one is configured. Because events of a partition finish out
+    of order, the checkpoint only advances past the longest prefix of finished events, so a
+    crash redelivers every event that had not finished. Visibility timeouts do not apply.
+
+    Args:
+        handler: EventHubHandler for the ingestion hub (its consumer receives, its producer is unused)
+        dead_letter_handler: Optional EventHubHandler of a dead-letter hub
+        max_attempts: Local deliveries before an event is dead-lettered
+        buffer_size: Events buffered ahead of the consumer runtime
+        retry_backoff_seconds: Delay before a failed event is delivered again; doubles with every attempt
+    """
+
+    def __init__(
+        self,
+        handler,
+        dead_letter_handler=None,
+        max_attempts: int = 3,
+        buffer_size: int = 8,
+        retry_backoff_seconds: float = 30.0,
+    ):
+        self.handler = handler
+        self.dead_letter_handler = dead_letter_handler
+        self.max_attempts = max_attempts
+        self.retry_backoff_seconds = retry_backoff_seconds
+        self._buffer: "asyncio.Queue[QueueMessage]" = asyncio.Queue(maxsize=buffer_size)
+        # partition id -> [[sequence number, partition context, event, finished]] in arrival order
+        self._in_flight: Dict[str, List[list]] = {}
+        self._receiver: Optional[asyncio.Task] = None
+        self._retries: set = set()
+
+    async def send(self, payload):
+        result = await self.handler.produce_event(payload=payload)
+        if not result.get("success"):
+            raise RuntimeError(f"Failed to send event: {result.get('message')}")
+        return payload.get("video_id", "")
+
+    async def _on_event(self, partition_context, event) -> None:
+        if event is None:
+            return
+        entry = [event.sequence_number, partition_context, event, False]
+        self._in_flight.setdefault(partition_context.partition_id, []).append(entry)
+        message = QueueMessage(
+            message_id=f"{partition_context.partition_id}:{event.sequence_number}",
+            payload=json.loads(event.body_as_str(encoding="UTF-8")),
+            attempts=1,
+            handle=entry,
+        )
+        # Blocks this partition's receive loop while the buffer is full
+        await self._buffer.put(message)
+
+    async def _receive_forever(self) -> None:
+        async with self.handler.consumer:
+            await self.handler.consumer.receive(on_event=self._on_event)
+
+    async def receive(self, max_messages, visibility_timeout):
+        if self._receiver is None:
+            self._receiver = asyncio.create_task(self._receive_forever(), name="event-hub-receiver")
+        messages = []
+        try:
+            messages.append(await asyncio.wait_for(self._buffer.get(), timeout=1.0))
+        except asyncio.TimeoutError:
+            return messages
+        while len(messages) < max_messages and not self._buffer.empty():
+            messages.append(self._buffer.get_nowait())
+        return messages
+
+    async def _finish(self, message: QueueMessage) -> None:
+        entry = message.handle
+        entry[3] = True
+        partition_context = entry[1]
+        entries = self._in_flight[partition_context.partition_id]
+        last_finished = None
+        while entries and entries[0][3]:
+            last_finished = entries.pop(0)
+        if last_finished is not None:
+            await last_finished[1].update_checkpoint(last_finished[2])
+
+    async def ack(self, message):
+        await self._finish(message)
+
+    async def nack(self, message, error):
+        if message.attempts < self.max_attempts:
+            delay = self.retry_backoff_seconds * (2 ** (message.attempts - 1))
+            logger.warning(f"Event {message.message_id} failed (attempt {message.attempts}), retrying in {delay:.0f}s: {error}")
+
+            async def redeliver():
+                await asyncio.sleep(delay)
+                message.attempts += 1
+                await self._buffer.put(message)
+
+            task = asyncio.create_task(redeliver())
+            self._retries.add(task)
+            task.add_done_callback(self._retries.discard)
+            return
+
+        logger.error(f"Event {message.message_id} dead-lettered after {message.attempts} attempts: {error}")
+        if self.dead_letter_handler is not None:
+            await self.dead_letter_handler.produce_event(
+                payload={"payload": message.payload, "error": error, "attempts": message.attempts}
+            )
+        await self._finish(message)
+
+    async def close(self):
+        tasks = list(self._retries) + ([self._receiver] if self._receiver is not None else [])
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await self.handler.consumer.close()
+
+
+def create_ingestion_queue() -> IngestionQueue:
+    """
+    Create the ingestion queue selected by INGESTION_QUEUE_BACKEND.
+
+    "eventhub" (default) uses INGESTION_EVENT_HUB_NAME and the optional
+    INGESTION_DEAD_LETTER_EVENT_HUB_NAME; "sqlite" uses INGESTION_QUEUE_DB.
+    INGESTION_QUEUE_MAX_ATTEMPTS sets the deliveries before dead-lettering for both.
+    """
+    backend = os.getenv("INGESTION_QUEUE_BACKEND", "eventhub").lower()
+    max_attempts = int(os.getenv("INGESTION_QUEUE_MAX_ATTEMPTS", "3"))
+    if backend == "sqlite":
+        return SQLiteIngestionQueue(
+            db_path=os.getenv("INGESTION_QUEUE_DB", "./ingestion_queue.db"), max_attempts=max_attempts
+        )
+    if backend == "eventhub":
+        from utilities.event_hub_handler import EventHubHandler
+
+        dead_letter_hub = os.getenv("INGESTION_DEAD_LETTER_EVENT_HUB_NAME")
+        return EventHubIngestionQueue(
+            handler=EventHubHandler(hub_name=os.getenv("INGESTION_EVENT_HUB_NAME")),
+            dead_letter_handler=EventHubHandler(hub_name=dead_letter_hub) if dead_letter_hub else None,
+            max_attempts=max_attempts,
+        )
+    raise ValueError(f"Unsupported INGESTION_QUEUE_BACKEND '{backend}', expected 'eventhub' or 'sqlite'")
@@ -0,0 +1,48 @@
+import hashlib
+import os
+from typing import AsyncIterator, Tuple
+
+import aiofiles
+from fastapi import UploadFile
+
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+async def iter_upload_file(file: UploadFile, chunk_size: int = UPLOAD_CHUNK_SIZE) -> AsyncIterator[bytes]:
+    """Yield a multipart upload in chunks instead of reading it into memory."""
+    while True:
+        chunk = await file.read(chunk_size)
+        if not chunk:
+            break
+        yield chunk
+
+
+async def stream_to_file(chunks: AsyncIterator[bytes], dest_path: str) -> Tuple[str, int]:
+    """
+    Write an async stream of bytes to disk, hashing it on the fly.
+
+    The SHA-256 matches get_file_hash(), so the returned hash can be passed to
+    IngestionPipeline(hash_video_id=...) and the file is never read a second time.
+
+    Args:
+        chunks: Async iterator of byte chunks (UploadFile chunks or Request.stream())
+        dest_path: Destination file path; removed again if the stream fails
+
+    Returns:
+        Tuple of (sha256 hex digest, size in bytes)
+    """
+    hash_func = hashlib.sha256()
+    size = 0
+    try:
+        async with aiofiles.open(dest_path, "wb") as out:
+            async for chunk in chunks:
+                if not chunk:
+                    continue
+                hash_func.update(chunk)
+                size += len(chunk)
+                await out.write(chunk)
+    except BaseException:
+        if os.path.exists(dest_path):
+            os.remove(dest_path)
+        raise
+    return hash_func.hexdigest(), size
@@ -1,10 +1,23 @@
+from contextlib import asynccontextmanager
 from fastmcp import FastMCP
 from loguru import logger
 from starlette.responses import JSONResponse
+from mmct.video_pipeline.utils.resource_pool import get_resource_pool
+
+
+@asynccontextmanager
+async def lifespan(server):
+    """Share one resource pool across tool calls and close it on shutdown."""
+    resource_pool = get_resource_pool()
+    try:
+        yield {"resource_pool": resource_pool}
+    finally:
+        await resource_pool.close()
+
 
 try:
     logger.info("Instiating the FastMCP object")
-    mcp = FastMCP(name="MMCT Agent MCP Server")
+    mcp = FastMCP(name="MMCT Agent MCP Server", lifespan=lifespan)
     logger.info("Successfully created an instance of FastMCP server")
 except Exception as e:
     logger.exception(f"Exception occured while creating an instance of FastMCP Server: {e}")
@@ -1,18 +1,10 @@
 from mcp_server.tools.schemas.kb_tool_schemas import SearchRequest, get_filter_string
-from mmct.providers.factory import provider_factory
+from mmct.video_pipeline.utils.resource_pool import get_resource_pool
 from typing import Annotated, List, Dict
 from mcp_server.server import mcp
 from loguru import logger
 
 
-try:
-    logger.info("Instantiating the embedding and search providers")
-    search_provider = provider_factory.create_search_provider()
-    embed_provider = provider_factory.create_embedding_provider()
-    logger.info("Successfully instantiated the search and embedding providers")
-except Exception as e:
-    logger.exception(f"Exception occurred while instantiating providers: {e}")
-
 
 @mcp.tool(
     name="kb_tool",
@@ -56,6 +48,9 @@ async def kb_tool(
     returning top-k results with optional semantic answer.
     """
     embedding = None
+    resource_pool = get_resource_pool()
+    search_provider = resource_pool.search_provider()
+    embed_provider = resource_pool.embedding_provider()
 
     if (request.query and request.query in ["*"]) and (
         request.query_type and request.query_type in ["vector", "semantic"]
@@ -1,6 +1,7 @@
 from mcp_server.server import mcp
 from typing import Optional, Annotated
 from mmct.video_pipeline import VideoAgent
+from mmct.video_pipeline.utils.resource_pool import get_resource_pool
 
 @mcp.tool(
     name="video_agent_tool",
@@ -41,6 +42,7 @@ async def video_agent_tool(
         url=url,
         use_critic_agent=use_critic_agent,
         stream=True,  # Always enable streaming for log capture
+        resource_pool=get_resource_pool(),  # Warm clients shared across tool calls
     )
     
     # Run the agent
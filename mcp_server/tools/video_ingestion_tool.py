@@ -6,7 +6,7 @@ from mmct.video_pipeline.core.ingestion.ingestion_pipeline import (
 )
 import os
 import aiohttp
-import aiofiles
+from mmct.utils.streaming_download import fetch_url_to_file
 from loguru import logger
 
 
@@ -53,25 +53,14 @@ async def video_ingestion_tool(
     ] = 4,
 ):
     try:
+        # Stream to disk, hashing on the way (parallel range requests for large files)
         async with aiohttp.ClientSession() as session:
-            async with session.get(video_url) as response:
-                if response.status == 200:
-                    async with aiofiles.open(file_name, "wb") as f:
-                        await f.write(await response.read())
-                    logger.info(f"Video saved to {file_name}")
-                else:
-                    logger.warning(f"Failed to download video, status code: {response.status}")
-                    raise Exception(f"Failed to download video, status code: {response.status}")
+            video = await fetch_url_to_file(video_url, file_name, session=session)
+            logger.info(f"Video saved to {file_name}")
 
-        async with aiohttp.ClientSession() as session:
-            async with session.get(transcript_url) as response:
-                if response.status == 200:
-                    async with aiofiles.open(transcript_file_name, "wb") as f:
-                        await f.write(await response.read())
-                    logger.info(f"Transcript saved to {transcript_file_name}")
-                else:
-                    logger.warning(f"Failed to download transcript, status code: {response.status}")
-                    raise Exception(f"Failed to download transcript, status code: {response.status}")
+            if transcript_url and transcript_file_name:
+                await fetch_url_to_file(transcript_url, transcript_file_name, session=session)
+                logger.info(f"Transcript saved to {transcript_file_name}")
 
         ingestion_tool = IngestionPipeline(
             video_path=os.path.join(os.getcwd(), file_name),
@@ -80,9 +69,8 @@ async def video_ingestion_tool(
             transcription_service=transcription_service,
             url=url,
             transcript_path=os.path.join(os.getcwd(), transcript_file_name) if transcript_file_name else None,
-            use_computer_vision_tool=use_computer_vision_tool,
             disable_console_log=disable_console_log,
-            hash_video_id=hash_video_id,
+            hash_video_id=hash_video_id or video.digest,
             frame_stacking_grid_size=frame_stacking_grid_size,
         )
 
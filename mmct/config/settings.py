@@ -151,6 +151,8 @@ class ImageEmbeddingConfig(BaseSettings):
     device: str = Field(default="auto", env="IMAGE_EMBEDDING_DEVICE")
     max_image_size: int = Field(default=224, env="IMAGE_EMBEDDING_MAX_SIZE")
     batch_size: int = Field(default=8, env="IMAGE_EMBEDDING_BATCH_SIZE")
+    # torch, onnx, onnx-int8, openvino or openvino-int8 (see mmct.utils.inference_backend)
+    backend: str = Field(default="torch", env="IMAGE_EMBEDDING_BACKEND")
 
     model_config = SettingsConfigDict(
         env_file=DOTENV_PATH,
@@ -174,6 +176,7 @@ class ImageEmbeddingConfig(BaseSettings):
                 'device': os.getenv("IMAGE_EMBEDDING_DEVICE", "auto"),
                 'max_image_size': int(os.getenv("IMAGE_EMBEDDING_MAX_SIZE", "224")),
                 'batch_size': int(os.getenv("IMAGE_EMBEDDING_BATCH_SIZE", "8")),
+                'backend': os.getenv("IMAGE_EMBEDDING_BACKEND", "torch"),
             }
 
         super().__init__(**kwargs)
@@ -184,7 +187,8 @@ class ImageEmbeddingConfig(BaseSettings):
             "model_name": self.model_name,
             "device": self.device,
             "max_image_size": self.max_image_size,
-            "batch_size": self.batch_size
+            "batch_size": self.batch_size,
+            "backend": self.backend
         }
 
 
@@ -203,6 +207,18 @@ class TranscriptionConfig(BaseSettings):
     # Common settings
     use_managed_identity: bool = Field(default=True, env="SPEECH_USE_MANAGED_IDENTITY")
     timeout: int = Field(default=200, env="SPEECH_TIMEOUT")
+    # Windowed transcription settings
+    window_seconds: float = Field(default=300.0, env="TRANSCRIPTION_WINDOW_SECONDS")
+    window_overlap_seconds: float = Field(default=2.0, env="TRANSCRIPTION_WINDOW_OVERLAP_SECONDS")
+    max_concurrent_windows: int = Field(default=4, env="TRANSCRIPTION_MAX_CONCURRENT_WINDOWS")
+    requests_per_minute: Optional[int] = Field(default=None, env="TRANSCRIPTION_REQUESTS_PER_MINUTE")
+    # Local (offline) transcription settings
+    local_model: str = Field(default="small", env="LOCAL_TRANSCRIPTION_MODEL")
+    local_device: str = Field(default="cpu", env="LOCAL_TRANSCRIPTION_DEVICE")
+    local_compute_type: str = Field(default="int8", env="LOCAL_TRANSCRIPTION_COMPUTE_TYPE")
+    local_cpu_threads: int = Field(default=0, env="LOCAL_TRANSCRIPTION_CPU_THREADS")
+    local_num_workers: int = Field(default=1, env="LOCAL_TRANSCRIPTION_NUM_WORKERS")
+    local_batch_size: int = Field(default=8, env="LOCAL_TRANSCRIPTION_BATCH_SIZE")
 
     def __init__(self, **kwargs):
         # Force load environment variables before validation
@@ -220,6 +236,16 @@ class TranscriptionConfig(BaseSettings):
                 'resource_id': os.getenv("SPEECH_SERVICE_RESOURCE_ID"),
                 'use_managed_identity': os.getenv("SPEECH_USE_MANAGED_IDENTITY", "true").lower() == "true",
                 'timeout': int(os.getenv("SPEECH_TIMEOUT", "200")),
+                'window_seconds': float(os.getenv("TRANSCRIPTION_WINDOW_SECONDS", "300")),
+                'window_overlap_seconds': float(os.getenv("TRANSCRIPTION_WINDOW_OVERLAP_SECONDS", "2.0")),
+                'max_concurrent_windows': int(os.getenv("TRANSCRIPTION_MAX_CONCURRENT_WINDOWS", "4")),
+                'requests_per_minute': int(os.getenv("TRANSCRIPTION_REQUESTS_PER_MINUTE")) if os.getenv("TRANSCRIPTION_REQUESTS_PER_MINUTE") else None,
+                'local_model': os.getenv("LOCAL_TRANSCRIPTION_MODEL", "small"),
+                'local_device': os.getenv("LOCAL_TRANSCRIPTION_DEVICE", "cpu"),
+                'local_compute_type': os.getenv("LOCAL_TRANSCRIPTION_COMPUTE_TYPE", "int8"),
+                'local_cpu_threads': int(os.getenv("LOCAL_TRANSCRIPTION_CPU_THREADS", "0")),
+                'local_num_workers': int(os.getenv("LOCAL_TRANSCRIPTION_NUM_WORKERS", "1")),
+                'local_batch_size': int(os.getenv("LOCAL_TRANSCRIPTION_BATCH_SIZE", "8")),
             }
 
         super().__init__(**kwargs)
@@ -1,15 +1,22 @@
 from ultralytics import YOLO
+from mmct.utils.inference_backend import backend_from_env, export_yolo, parse_backend
 import torch
 from PIL import Image
 import asyncio
 import requests
 
 class YOLOs:
-    def __init__(self, device = None):
+    def __init__(self, device = None, backend = None):
         try:
             self.device = device or "cuda" if torch.cuda.is_available() else "cpu"
             self.device_map = device or "auto"
-            self.model = YOLO('yolov8s.pt')
+            # backend: torch, onnx, onnx-int8, openvino or openvino-int8; defaults to IMAGE_MODEL_BACKEND(S)
+            self.backend = parse_backend(backend) if backend else backend_from_env("yolov8s")
+            if self.backend.is_torch:
+                self.model = YOLO('yolov8s.pt')
+            else:
+                self.device = "cpu"
+                self.model = YOLO(export_yolo('yolov8s.pt', self.backend), task="detect")
         except Exception as e:
             raise Exception(e)
 
@@ -42,15 +49,25 @@ class YOLOs:
             results = self.model(image)
             boxes = {}
             for result in results:
-                bxcls = result.boxes.cls.detach().cpu().numpy()
-                bxxywh = result.boxes.xywh.detach().cpu().numpy()
-                for class_n, xywh in zip( bxcls, bxxywh  ):
-                    boxes[result.names[int(class_n.item())]] = xywh
+                boxes.update(self._boxes(result))
 
             return boxes
         except Exception as e:
             raise Exception(f"Exception occured while performing object detection: {e}")
 
+    @staticmethod
+    def _boxes(result):
+        boxes = {}
+        bxcls = result.boxes.cls.detach().cpu().numpy()
+        bxxywh = result.boxes.xywh.detach().cpu().numpy()
+        for class_n, xywh in zip(bxcls, bxxywh):
+            boxes[result.names[int(class_n.item())]] = xywh
+        return boxes
+
+    def predict_batch(self, images):
+        """Detect objects in several images with one forward pass; returns one {label: xywh} dict per image."""
+        return [self._boxes(result) for result in self.model(list(images))]
+
     def get_name(self):
         return """
                 Vision Expert: vit\n
@@ -1,16 +1,23 @@
 from transformers import TrOCRProcessor
 from transformers import VisionEncoderDecoderModel
+from mmct.utils.inference_backend import backend_from_env, load_vision2seq, parse_backend
 import torch
 from PIL import Image
 import requests
 import asyncio
 
 class TROCRBase:
-    def __init__(self, device = None):
+    def __init__(self, device = None, backend = None):
         try:
             self.device = device or "cuda" if torch.cuda.is_available() else "cpu"
             self.device_map = device or "auto"
-            self.model = VisionEncoderDecoderModel.from_pretrained("microsoft/trocr-base-printed").to(self.device) #, device_map = self.device_map)
+            # backend: torch, onnx, onnx-int8, openvino or openvino-int8; defaults to IMAGE_MODEL_BACKEND(S)
+            self.backend = parse_backend(backend) if backend else backend_from_env("trocr-base")
+            if self.backend.is_torch:
+                self.model = VisionEncoderDecoderModel.from_pretrained("microsoft/trocr-base-printed").to(self.device) #, device_map = self.device_map)
+            else:
+                self.device = "cpu"
+                self.model = load_vision2seq("microsoft/trocr-base-printed", self.backend)
             self.processor = TrOCRProcessor.from_pretrained("microsoft/trocr-base-printed",use_fast=True)
         except Exception as e:
             raise Exception(f"Exception occured when loading TROCR Base model {e}")
@@ -52,6 +59,14 @@ class TROCRBase:
         except Exception as e:
             raise Exception(f"Exception occured when performing OCR with TROCR Base: {e}")
 
+    def predict_batch(self, images):
+        """Recognize text in several images with one generate() call; returns one list of strings per image."""
+        pixel_values = self.processor(images=list(images), return_tensors="pt").pixel_values
+        pixel_values = pixel_values.to(self.device)
+        with torch.no_grad():
+            outputs = self.model.generate(pixel_values, max_new_tokens=100)
+        return [[text] for text in self.processor.batch_decode(outputs, skip_special_tokens=True)]
+
     def get_name(self):
         return """
                 Vision Expert: vit\n
@@ -9,6 +9,10 @@ class BlipCap(BlipT5XXL):
     def __call__(self, image):
         return super().__call__(image, prompt="Describe the image, and elements in it with breif detail within 100 words.")
 
+    def predict_batch(self, images):
+        """Describe several images; returns one description per image."""
+        return [self(image) for image in images]
+
 
 if __name__ == "__main__":
     a = BlipCap()
@@ -50,6 +50,10 @@ class MPLUGLarge:
         # pred_str = self.processor.batch_decode(outputs, skip_special_tokens=True)
         # return pred_str
 
+    def predict_batch(self, images):
+        """Caption several images; returns one caption per image."""
+        return [self.pipeline_caption(image)["caption"] for image in images]
+
     def get_name(self):
         return """
                 Vision Expert: vit\n
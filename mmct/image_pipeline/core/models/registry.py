@@ -0,0 +1,264 @@
+"""
+Process-wide registry of warm image models.
+
+The image tools used to construct their model on every call, so each ocr/recog/object
+detection step paid a full from_pretrained() load. The registry loads each model once, on
+first use, and keeps it warm:
+
+- models are evicted least-recently-used first when the loaded models exceed the memory
+  budget (IMAGE_MODEL_MEMORY_BUDGET_MB, default 8192); a model serving a batch is never evicted
+- inference runs in a dedicated executor (IMAGE_MODEL_INFERENCE_WORKERS threads, default 1)
+  so the event loop stays responsive
+- requests for the same model arriving within IMAGE_MODEL_BATCH_WINDOW_MS (default 10) are
+  combined into one predict_batch() call of up to IMAGE_MODEL_MAX_BATCH (default 8) images
+
+Models implement a synchronous predict_batch(images) -> list of per-image results.
+"""
+
+import asyncio
+import concurrent.futures
+import gc
+import importlib
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from loguru import logger
+
+
+@dataclass(frozen=True)
+class ModelSpec:
+    """Where to find a model class, and its approximate size for models without torch parameters."""
+
+    module: str
+    class_name: str
+    approx_mb: int
+
+
+MODEL_SPECS: Dict[str, ModelSpec] = {
+    "trocr-small": ModelSpec("mmct.image_pipeline.core.models.ocr.trocr_small", "TROCRSmall", 250),
+    "trocr-base": ModelSpec("mmct.image_pipeline.core.models.ocr.trocr_base", "TROCRBase", 1400),
+    "trocr-large": ModelSpec("mmct.image_pipeline.core.models.ocr.trocr_large", "TROCRLarge", 2300),
+    "mplug-base": ModelSpec("mmct.image_pipeline.core.models.recog.mplug_base", "MPLUGBase", 1500),
+    "mplug-large": ModelSpec("mmct.image_pipeline.core.models.recog.mplug_large", "MPLUGLarge", 3500),
+    "blip-caption": ModelSpec("mmct.image_pipeline.core.models.recog.instructBlipCap", "BlipCap", 16000),
+    "yolov8s": ModelSpec("mmct.image_pipeline.core.models.object_detect.yolov8s", "YOLOs", 50),
+}
+
+
+def _measure_mb(model: Any, spec: ModelSpec) -> float:
+    """Size of the model's torch parameters and buffers, or the spec estimate."""
+    for attribute in ("model", "pipeline_caption"):
+        module = getattr(model, attribute, None)
+        module = getattr(module, "model", module)
+        if hasattr(module, "parameters"):
+            try:
+                size = sum(p.numel() * p.element_size() for p in module.parameters())
+                if hasattr(module, "buffers"):
+                    size += sum(b.numel() * b.element_size() for b in module.buffers())
+                if size:
+                    return size / (1024 * 1024)
+            except Exception:
+                pass
+    return float(spec.approx_mb)
+
+
+def _release_memory() -> None:
+    gc.collect()
+    try:
+        import torch
+
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
+    except ImportError:
+        pass
+
+
+class ModelRegistry:
+    """
+    Lazily loaded, LRU-evicted image models with micro-batched inference.
+
+    Args:
+        memory_budget_mb: Total size of loaded models before least-recently-used ones are evicted
+        inference_workers: Threads running model inference
+        batch_window_ms: How long a request waits for others to join its batch
+        max_batch_size: Maximum images per predict_batch() call
+
+    Example:
+        >>> registry = get_model_registry()
+        >>> text = await registry.infer("trocr-large", image)
+    """
+
+    def __init__(
+        self,
+        memory_budget_mb: float = 8192,
+        inference_workers: int = 1,
+        batch_window_ms: float = 10,
+        max_batch_size: int = 8,
+        specs: Optional[Dict[str, ModelSpec]] = None,
+    ):
+        self.memory_budget_mb = memory_budget_mb
+        self.batch_window = batch_window_ms / 1000
+        self.max_batch_size = max_batch_size
+        self.specs = dict(specs or MODEL_SPECS)
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=inference_workers, thread_name_prefix="image-model"
+        )
+        self._lock = threading.Lock()
+        self._models: "OrderedDict[str, Tuple[Any, float]]" = OrderedDict()
+        self._loading: Dict[str, concurrent.futures.Future] = {}
+        self._in_use: Dict[str, int] = {}
+        self._pending: Dict[Tuple[str, int], List[Tuple[Any, asyncio.Future]]] = {}
+        # asyncio keeps only weak references to tasks; running batches are held here until done
+        self._batches: set = set()
+
+    @classmethod
+    def from_env(cls) -> "ModelRegistry":
+        """Create a registry from the IMAGE_MODEL_* environment variables."""
+        return cls(
+            memory_budget_mb=float(os.getenv("IMAGE_MODEL_MEMORY_BUDGET_MB", "8192")),
+            inference_workers=int(os.getenv("IMAGE_MODEL_INFERENCE_WORKERS", "1")),
+            batch_window_ms=float(os.getenv("IMAGE_MODEL_BATCH_WINDOW_MS", "10")),
+            max_batch_size=int(os.getenv("IMAGE_MODEL_MAX_BATCH", "8")),
+        )
+
+    def _load(self, name: str) -> Any:
+        spec = self.specs[name]
+        logger.info(f"Loading image model {name}")
+        model = getattr(importlib.import_module(spec.module), spec.class_name)()
+        size_mb = _measure_mb(model, spec)
+        with self._lock:
+            self._models[name] = (model, size_mb)
+            self._loading.pop(name, None)
+            self._evict_locked(keep=name)
+        logger.info(f"Image model {name} loaded ({size_mb:.0f} MB)")
+        return model
+
+    def _evict_locked(self, keep: str) -> None:
+        total = sum(size for _, size in self._models.values())
+        evicted = False
+        for name in list(self._models):
+            if total <= self.memory_budget_mb:
+                break
+            if name == keep or self._in_use.get(name):
+                continue
+            _, size = self._models.pop(name)
+            total -= size
+            evicted = True
+            logger.info(f"Evicted image model {name} ({size:.0f} MB) to stay within {self.memory_budget_mb:.0f} MB")
+        if total > self.memory_budget_mb:
+            logger.warning(f"Loaded image models use {total:.0f} MB, above the {self.memory_budget_mb:.0f} MB budget")
+        if evicted:
+            _release_memory()
+
+    async def get(self, name: str) -> Any:
+        """Return the loaded model, loading it once in a worker thread if needed."""
+        if name not in self.specs:
+            raise ValueError(f"Unknown image model '{name}'")
+        with self._lock:
+            if name in self._models:
+                self._models.move_to_end(name)
+                return self._models[name][0]
+            future = self._loading.get(name)
+            if future is None:
+                future = concurrent.futures.Future()
+                self._loading[name] = future
+                owner = True
+            else:
+                owner = False
+
+        if owner:
+            try:
+                future.set_result(await asyncio.to_thread(self._load, name))
+            except BaseException as e:
+                with self._lock:
+                    self._loading.pop(name, None)
+                future.set_exception(e)
+        return await asyncio.wrap_future(future)
+
+    async def infer(self, name: str, image: Any) -> Any:
+        """
+        Run the model on one image, batched with concurrent requests for the same model.
+
+        Returns:
+            The model's result for this image
+        """
+        loop = asyncio.get_running_loop()
+        key = (name, id(loop))
+        result = loop.create_future()
+        pending = self._pending.setdefault(key, [])
+        pending.append((image, result))
+        if len(pending) >= self.max_batch_size:
+            self._start_batch(key, pending)
+        elif len(pending) == 1:
+            loop.call_later(self.batch_window, self._start_batch, key, pending)
+        return await result
+
+    async def infer_batch(self, name: str, images: List[Any]) -> List[Any]:
+        """
+        Run the model on several images of one request in a single predict_batch() call
+        (e.g. every text line cropped from a page), bypassing the micro-batching window.
+
+        Returns:
+            The model's results, in the order of images
+        """
+        if not images:
+            return []
+        with self._lock:
+            self._in_use[name] = self._in_use.get(name, 0) + 1
+        try:
+            model = await self.get(name)
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, model.predict_batch, list(images))
+        finally:
+            with self._lock:
+                self._in_use[name] -= 1
+
+    def _start_batch(self, key: Tuple[str, int], batch: List[Tuple[Any, asyncio.Future]]) -> None:
+        # The window timer of a batch that already filled up finds it gone and does nothing
+        if self._pending.get(key) is not batch:
+            return
+        del self._pending[key]
+        task = asyncio.ensure_future(self._run_batch(key[0], batch))
+        self._batches.add(task)
+        task.add_done_callback(self._batches.discard)
+
+    async def _run_batch(self, name: str, batch: List[Tuple[Any, asyncio.Future]]) -> None:
+        with self._lock:
+            self._in_use[name] = self._in_use.get(name, 0) + 1
+        try:
+            model = await self.get(name)
+            images = [image for image, _ in batch]
+            loop = asyncio.get_running_loop()
+            results = await loop.run_in_executor(self._executor, model.predict_batch, images)
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+        finally:
+            with self._lock:
+                self._in_use[name] -= 1
+
+    def loaded_models(self) -> Dict[str, float]:
+        """Names and sizes (MB) of the models currently loaded, least recently used first."""
+        with self._lock:
+            return {name: size for name, (_, size) in self._models.items()}
+
+
+_registry: Optional[ModelRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_model_registry() -> ModelRegistry:
+    """Return the process-wide model registry, creating it on first use."""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = ModelRegistry.from_env()
+    return _registry
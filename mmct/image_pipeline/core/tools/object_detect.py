@@ -2,7 +2,7 @@
 functionality of this tool is object detection
 """
 
-from mmct.image_pipeline.core.models.object_detect.yolov8s import YOLOs
+from mmct.image_pipeline.core.models.registry import get_model_registry
 from PIL import Image
 import numpy as np
 from typing_extensions import Annotated
@@ -13,8 +13,8 @@ async def object_detect_tool(img: Annotated[str, "local path of image"]) -> str:
     Object Detection tool
     """
     img = Image.open(img).convert("RGB")
-    model = YOLOs()
-    resp = await model(img)
+    # Warm model shared across calls; concurrent requests are batched
+    resp = await get_model_registry().infer("yolov8s", img)
 
     # Ensure all numpy arrays in the response are converted to lists
     def serialize_response(response):
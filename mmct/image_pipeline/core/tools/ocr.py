@@ -2,12 +2,47 @@
 functionality of this tool is optical character recognition
 """
 
-from mmct.image_pipeline.core.models.ocr.trocr_base import TROCRBase
-from mmct.image_pipeline.core.models.ocr.trocr_small import TROCRSmall
-from mmct.image_pipeline.core.models.ocr.trocr_large import TROCRLarge
+import asyncio
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import List, Tuple
+
+from mmct.image_pipeline.core.models.registry import get_model_registry
+from mmct.image_pipeline.utils.text_lines import detect_text_lines
 from PIL import Image
 from typing_extensions import Annotated
 
+# Recognized text per (image content hash, model), most recently used last
+_ocr_cache: "OrderedDict[Tuple[str, str], str]" = OrderedDict()
+_ocr_cache_lock = threading.Lock()
+
+
+def _image_digest(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+async def _recognize_lines(model_name: str, img: Image.Image) -> List[str]:
+    """Crop every detected text line and recognize the crops in batched forward passes."""
+    boxes = await asyncio.to_thread(detect_text_lines, img)
+    if not boxes:
+        # No line structure found (e.g. a single word on a busy photo): read the whole image
+        boxes = [(0, 0, img.width, img.height)]
+    crops = [img.crop(box) for box in boxes]
+
+    batch_size = int(os.getenv("OCR_LINE_BATCH_SIZE", "32"))
+    registry = get_model_registry()
+    lines: List[str] = []
+    for start in range(0, len(crops), batch_size):
+        results = await registry.infer_batch(model_name, crops[start:start + batch_size])
+        lines.extend(" ".join(texts).strip() for texts in results)
+    return [line for line in lines if line]
+
 
 async def ocr_tool(
         img: Annotated[str, "Path to the input image file."],
@@ -20,12 +55,21 @@ async def ocr_tool(
     OCR Tool
 
     This function performs Optical Character Recognition (OCR) on the given image using a selected model size.
+    Text lines are detected and recognized one line per crop, and returned one per line in reading order.
     """
-    img = Image.open(img).convert("RGB")
-    model = (
-        TROCRSmall()
-        if priority == "1"
-        else TROCRBase() if priority == "2" else TROCRLarge()
-    )
-    resp = await model(img)
-    return resp
+    model_name = {"1": "trocr-small", "2": "trocr-base"}.get(priority, "trocr-large")
+    key = (await asyncio.to_thread(_image_digest, img), model_name)
+    with _ocr_cache_lock:
+        if key in _ocr_cache:
+            _ocr_cache.move_to_end(key)
+            return _ocr_cache[key]
+
+    image = Image.open(img).convert("RGB")
+    # Warm model shared across calls; all lines of the page go through predict_batch together
+    text = "\n".join(await _recognize_lines(model_name, image))
+
+    with _ocr_cache_lock:
+        _ocr_cache[key] = text
+        while len(_ocr_cache) > int(os.getenv("OCR_CACHE_SIZE", "256")):
+            _ocr_cache.popitem(last=False)
+    return text
@@ -1,9 +1,7 @@
 """
 functionality of this tool is optical character recognition
 """
-from mmct.image_pipeline.core.models.recog.mplug_base import MPLUGBase
-from mmct.image_pipeline.core.models.recog.mplug_large import MPLUGLarge
-from mmct.image_pipeline.core.models.recog.instructBlipCap import BlipCap
+from mmct.image_pipeline.core.models.registry import get_model_registry
 from PIL import Image
 from typing_extensions import Annotated
 
@@ -23,6 +21,7 @@ async def recog_tool(img: Annotated[str, "path of image"],priority: Annotated[st
         The output is a string containing the description.
     """
     img = Image.open(img).convert("RGB")
-    a = MPLUGBase() if priority == 1 else MPLUGLarge() if priority == 2 else BlipCap()
-    resp = a(img)
+    model_name = {"1": "mplug-base", "2": "mplug-large"}.get(str(priority), "blip-caption")
+    # Warm model shared across calls; concurrent requests are batched
+    resp = await get_model_registry().infer(model_name, img)
     return resp
\ No newline at end of file
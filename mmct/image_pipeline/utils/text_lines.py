@@ -0,0 +1,90 @@
+"""
+Text line detection for line-level OCR.
+
+TrOCR recognizes a single line of text per image. detect_text_lines() finds the lines on a page
+so each can be cropped and recognized separately:
+
+1. MSER finds character-like regions, on the image and its inverse (dark and light text)
+2. Regions too small, too large or too elongated to be characters are dropped
+3. The remaining regions are painted into a mask and closed with a wide, flat kernel sized
+   from the median character height, merging the characters of a line into one blob
+4. Each blob's bounding box (with a small margin) is a line, returned in reading order
+"""
+
+from typing import List, Tuple
+
+import cv2
+import numpy as np
+from PIL import Image
+
+Box = Tuple[int, int, int, int]
+
+
+def _character_boxes(gray: np.ndarray) -> List[Box]:
+    height, width = gray.shape
+    mser = cv2.MSER_create()
+    mser.setMinArea(8)
+    mser.setMaxArea(max(64, int(0.05 * height * width)))
+    boxes = []
+    for image in (gray, 255 - gray):
+        _, bboxes = mser.detectRegions(image)
+        for x, y, w, h in bboxes:
+            # Characters are not much wider than tall, and not taller than a third of the page
+            if h < 6 or h > height / 3 or w > 3 * h:
+                continue
+            boxes.append((int(x), int(y), int(x + w), int(y + h)))
+    return boxes
+
+
+def reading_order(boxes: List[Box]) -> List[Box]:
+    """Sort line boxes top to bottom, and left to right among boxes sharing a row."""
+    rows: List[List[Box]] = []
+    for box in sorted(boxes, key=lambda b: (b[1] + b[3]) / 2):
+        center = (box[1] + box[3]) / 2
+        if rows:
+            last = rows[-1]
+            top = min(b[1] for b in last)
+            bottom = max(b[3] for b in last)
+            if top <= center <= bottom:
+                last.append(box)
+                continue
+        rows.append([box])
+    return [box for row in rows for box in sorted(row, key=lambda b: b[0])]
+
+
+def detect_text_lines(image: Image.Image, margin: float = 0.2, min_line_height: int = 8) -> List[Box]:
+    """
+    Find text lines in an image.
+
+    Args:
+        image: Page, slide or photo
+        margin: Padding added around each line, as a fraction of the line height
+        min_line_height: Lines shorter than this many pixels are dropped as noise
+
+    Returns:
+        (left, top, right, bottom) line boxes in reading order; empty when no text-like regions were found
+    """
+    gray = cv2.cvtColor(np.asarray(image.convert("RGB")), cv2.COLOR_RGB2GRAY)
+    height, width = gray.shape
+    characters = _character_boxes(gray)
+    if not characters:
+        return []
+
+    char_height = int(np.median([bottom - top for _, top, _, bottom in characters]))
+    mask = np.zeros_like(gray)
+    for left, top, right, bottom in characters:
+        mask[top:bottom, left:right] = 255
+
+    # Join characters and words horizontally, but not neighbouring lines
+    kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (max(3, int(1.5 * char_height)), max(1, char_height // 4)))
+    mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, kernel)
+    contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+
+    lines = []
+    for contour in contours:
+        x, y, w, h = cv2.boundingRect(contour)
+        if h < min_line_height or w < h // 2:
+            continue
+        pad = int(margin * h)
+        lines.append((max(0, x - pad), max(0, y - pad), min(width, x + w + pad), min(height, y + h + pad)))
+    return reading_order(lines)
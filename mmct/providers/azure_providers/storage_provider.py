@@ -3,13 +3,18 @@ import base64
 from pathlib import Path
 import aiofiles
 from urllib.parse import urlparse
+from azure.core import MatchConditions
+from azure.core.exceptions import ResourceNotFoundError
 from azure.storage.blob.aio import BlobServiceClient
 from loguru import logger
-from typing import Dict, Any
-from mmct.providers.base import StorageProvider
+from typing import Dict, Any, Optional, Sequence
+from mmct.providers.base import PackIndex, StorageProvider, UploadItem, UploadReport
+from mmct.providers.base.packed_files import PACK_INDEX_NAME
+from mmct.providers.base.storage_provider import upload_window, upload_window_size
 from mmct.providers.credentials import AzureCredentials
 from mmct.utils.error_handler import handle_exceptions, convert_exceptions
 from mmct.utils.error_handler import ProviderException, ConfigurationException
+from mmct.utils.streaming_download import ordered_part_chunks, stream_to_file
 
 
 class AzureStorageProvider(StorageProvider):
@@ -64,6 +69,11 @@ class AzureStorageProvider(StorageProvider):
 
         client = None
         try:
+            # Files of a packed directory are a ranged read of their shard
+            packed = await self.load_packed_file(folder, file_name)
+            if packed is not None:
+                return packed
+
             logger.info(f"Loading file {file_name} from container {folder} into memory")
             client = self.service_client.get_blob_client(container=folder, blob=file_name)
             stream = await client.download_blob()
@@ -77,6 +87,23 @@ class AzureStorageProvider(StorageProvider):
             if client:
                 await client.close()
 
+    async def load_file_range(self, folder: str, file_name: str, offset: int, length: int) -> bytes:
+        """Load length bytes at offset of a blob with a single ranged GET."""
+        self._ensure_initialized()
+
+        async with self.service_client.get_blob_client(container=folder, blob=file_name) as client:
+            stream = await client.download_blob(offset=offset, length=length)
+            return await stream.readall()
+
+    async def _load_pack_index(self, folder: str, directory: str) -> Optional[PackIndex]:
+        """Read a directory's pack index; only a missing index (not a failed request) means unpacked."""
+        async with self.service_client.get_blob_client(container=folder, blob=f"{directory}/{PACK_INDEX_NAME}") as client:
+            try:
+                stream = await client.download_blob()
+            except ResourceNotFoundError:
+                return None
+            return PackIndex(await stream.readall())
+
     async def get_file_url(self, file_name: str, **kwargs) -> str:
         """
         Generate a URL for a file that doesn't yet exist in storage.
@@ -173,6 +200,48 @@ class AzureStorageProvider(StorageProvider):
             if client:
                 await client.close()
 
+    async def save_files(
+        self,
+        items: Sequence[UploadItem],
+        folder_name: str,
+        max_in_flight: Optional[int] = None,
+        raise_on_error: bool = True,
+    ) -> UploadReport:
+        """
+        Upload many files through one container client, so every upload reuses the service
+        client's HTTP session instead of opening and closing a blob client per file.
+
+        Items given as bytes are uploaded as-is. Files up to BLOB_SMALL_UPLOAD_BYTES (default 4 MB)
+        are read and sent in a single put; larger files are streamed from disk in blocks uploaded
+        BLOB_UPLOAD_CONCURRENCY (default 4) at a time.
+        """
+        self._ensure_initialized()
+        container = self.service_client.get_container_client(folder_name)
+        small_upload_bytes = int(os.getenv("BLOB_SMALL_UPLOAD_BYTES", str(4 * 1024 * 1024)))
+        block_concurrency = int(os.getenv("BLOB_UPLOAD_CONCURRENCY", "4"))
+
+        @handle_exceptions(retries=3, exceptions=(Exception,))
+        async def upload_one(item: UploadItem) -> str:
+            if item.data is not None:
+                await container.upload_blob(item.file_name, item.data, overwrite=True)
+            elif item.size <= small_upload_bytes:
+                async with aiofiles.open(item.src_file_path, "rb") as f:
+                    data = await f.read()
+                await container.upload_blob(item.file_name, data, overwrite=True)
+            else:
+                with open(item.src_file_path, "rb") as stream:
+                    await container.upload_blob(
+                        item.file_name,
+                        stream,
+                        length=item.size,
+                        overwrite=True,
+                        max_concurrency=block_concurrency,
+                    )
+            return f"{self.service_client.url}/{folder_name}/{item.file_name}"
+
+        report = await upload_window(items, upload_one, max_in_flight or upload_window_size())
+        return self._finish_upload(report, raise_on_error)
+
     @handle_exceptions(retries=3, exceptions=(Exception,))
     @convert_exceptions({Exception: ProviderException})
     async def save_to_file(self, file_name: str, download_path: str, **kwargs) -> str:
@@ -186,11 +255,37 @@ class AzureStorageProvider(StorageProvider):
             Path(download_path).parent.mkdir(parents=True, exist_ok=True)
 
             client = self.service_client.get_blob_client(container=folder_name, blob=file_name)
-            stream = await client.download_blob()
-            data = await stream.readall()
+            properties = await client.get_blob_properties()
+
+            # Fetch the blob as parallel ranged reads reassembled in order, hashing while writing;
+            # an interrupted download of an unchanged blob resumes from the partial file. Every
+            # range is conditional on the ETag, so a blob overwritten mid-download (or since the
+            # partial file was written) fails instead of mixing two versions.
+            etag = properties.etag
+
+            async def fetch_part(part_start: int, part_end: int) -> bytes:
+                stream = await client.download_blob(
+                    offset=part_start,
+                    length=part_end - part_start,
+                    etag=etag,
+                    match_condition=MatchConditions.IfNotModified,
+                )
+                return await stream.readall()
+
+            async def open_stream(offset: int):
+                return ordered_part_chunks(
+                    fetch_part,
+                    offset,
+                    properties.size,
+                    max_parallel=int(os.getenv("BLOB_DOWNLOAD_CONCURRENCY", "4")),
+                )
 
-            async with aiofiles.open(download_path, "wb") as f:
-                await f.write(data)
+            await stream_to_file(
+                open_stream,
+                download_path,
+                validator=f"{etag}|{properties.size}",
+                total_size=properties.size,
+            )
 
             logger.info(f"Successfully downloaded file to {download_path}")
             return download_path
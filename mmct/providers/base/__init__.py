@@ -4,7 +4,8 @@ from .image_embedding_provider import ImageEmbeddingProvider
 from .search_provider import SearchProvider
 from .transcription_provider import TranscriptionProvider
 from .vision_provider import VisionProvider
-from .storage_provider import StorageProvider
+from .storage_provider import StorageProvider, UploadItem, UploadReport
+from .packed_files import PackIndex, pack_directory_files, packing_enabled
 
 __all__ = [
     'LLMProvider',
@@ -14,4 +15,9 @@ __all__ = [
     'VisionProvider',
     'TranscriptionProvider',
     'StorageProvider',
+    'UploadItem',
+    'UploadReport',
+    'PackIndex',
+    'pack_directory_files',
+    'packing_enabled',
 ]
\ No newline at end of file
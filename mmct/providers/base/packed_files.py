@@ -0,0 +1,125 @@
+"""
+Packed layout for folders of many small files (keyframes).
+
+A long video produces thousands of keyframes; stored one object per frame, per-object request
+overhead dominates both the upload and every query_frame read. In the packed layout the files
+of a directory are appended into a few uncompressed tar shards next to an offset index:
+
+    <folder>/<directory>/pack-00000.tar
+    <folder>/<directory>/pack-00001.tar
+    <folder>/<directory>/pack-index.json   {"shards": [...], "files": {name: [shard, offset, size]}}
+
+A file is then served with one ranged read of its shard. The shards are plain tar archives, so
+`tar -xf` still recovers the individual files.
+"""
+
+import json
+import os
+import tarfile
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+PACK_INDEX_NAME = "pack-index.json"
+PACK_SHARD_BYTES = 64 * 1024 * 1024
+
+
+def packing_enabled() -> bool:
+    """Whether ingestion stores keyframes in the packed layout (KEYFRAME_PACKING, default false)."""
+    return os.getenv("KEYFRAME_PACKING", "false").lower() == "true"
+
+
+def pack_directory_files(
+    files: Sequence[Tuple[str, str]],
+    output_dir: str,
+    shard_bytes: Optional[int] = None,
+) -> List[Tuple[str, str]]:
+    """
+    Append files into tar shards of about shard_bytes each and write their offset index.
+
+    Args:
+        files: (name within the directory, local path) pairs
+        output_dir: Local directory the shards and index are written to
+        shard_bytes: Shard size target (default: KEYFRAME_PACK_SHARD_MB, 64 MB)
+
+    Returns:
+        (name within the directory, local path) of every shard followed by the index
+    """
+    if shard_bytes is None:
+        shard_bytes = int(os.getenv("KEYFRAME_PACK_SHARD_MB", str(PACK_SHARD_BYTES // (1024 * 1024)))) * 1024 * 1024
+    os.makedirs(output_dir, exist_ok=True)
+
+    shards: List[str] = []
+    entries: Dict[str, List[int]] = {}
+    archive = None
+    try:
+        for name, path in sorted(files):
+            if archive is None or archive.offset >= shard_bytes:
+                if archive is not None:
+                    archive.close()
+                shards.append(f"pack-{len(shards):05d}.tar")
+                archive = tarfile.open(os.path.join(output_dir, shards[-1]), "w", format=tarfile.USTAR_FORMAT)
+            # A USTAR member is one 512-byte header block followed by the file data
+            header_offset = archive.offset
+            archive.add(path, arcname=name, recursive=False)
+            member = archive.members[-1]
+            entries[name] = [len(shards) - 1, header_offset + tarfile.BLOCKSIZE, member.size]
+            # Members are only needed for their offsets; don't keep thousands of them around
+            archive.members.clear()
+    finally:
+        if archive is not None:
+            archive.close()
+
+    index_path = os.path.join(output_dir, PACK_INDEX_NAME)
+    with open(index_path, "w", encoding="utf-8") as f:
+        json.dump({"version": 1, "shards": shards, "files": entries}, f)
+    return [(shard, os.path.join(output_dir, shard)) for shard in shards] + [(PACK_INDEX_NAME, index_path)]
+
+
+class PackIndex:
+    """Offset index of one packed directory."""
+
+    def __init__(self, data: bytes):
+        index = json.loads(data)
+        self.shards: List[str] = index["shards"]
+        self.files: Dict[str, List[int]] = index["files"]
+
+    def locate(self, name: str) -> Optional[Tuple[str, int, int]]:
+        """(shard name, offset, size) of a file, or None when it is not in the pack."""
+        entry = self.files.get(name)
+        if entry is None:
+            return None
+        shard, offset, size = entry
+        return self.shards[shard], offset, size
+
+
+class PackIndexCache:
+    """
+    Pack indexes by (folder, directory), so a warm packed read costs a single ranged read.
+
+    Directories found not to be packed are remembered for missing_ttl seconds, so unpacked
+    videos don't pay an index lookup on every frame while a later pack is still picked up.
+    """
+
+    def __init__(self, max_entries: int = 256, missing_ttl: float = 300.0):
+        self.max_entries = max_entries
+        self.missing_ttl = missing_ttl
+        self._indexes: Dict[Tuple[str, str], Optional[PackIndex]] = {}
+        self._checked_at: Dict[Tuple[str, str], float] = {}
+
+    def get(self, key: Tuple[str, str]) -> Tuple[bool, Optional[PackIndex]]:
+        """(known, index); index is None for a directory known not to be packed."""
+        if key not in self._indexes:
+            return False, None
+        index = self._indexes[key]
+        if index is None and time.monotonic() - self._checked_at[key] > self.missing_ttl:
+            return False, None
+        return True, index
+
+    def put(self, key: Tuple[str, str], index: Optional[PackIndex]) -> None:
+        self._indexes.pop(key, None)
+        self._indexes[key] = index
+        self._checked_at[key] = time.monotonic()
+        while len(self._indexes) > self.max_entries:
+            oldest = next(iter(self._indexes))
+            del self._indexes[oldest]
+            del self._checked_at[oldest]
@@ -1,8 +1,125 @@
+import asyncio
+import base64
+import os
+import time
 from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, List, Optional, Sequence, Tuple
+
+from loguru import logger
+
+from mmct.providers.base.packed_files import PACK_INDEX_NAME, PackIndex, PackIndexCache
+from mmct.utils.error_handler import ProviderException
+
+
+@dataclass
+class UploadItem:
+    """One file for save_files: a local path, or bytes already in memory."""
+
+    file_name: str
+    src_file_path: Optional[str] = None
+    data: Optional[bytes] = None
+
+    @property
+    def size(self) -> int:
+        if self.data is not None:
+            return len(self.data)
+        return os.path.getsize(self.src_file_path)
+
+
+@dataclass
+class UploadReport:
+    """Outcome of a save_files call."""
+
+    urls: List[Optional[str]]
+    bytes_uploaded: int
+    seconds: float
+    failures: List[Tuple[str, str]] = field(default_factory=list)
+
+    @property
+    def throughput_mbps(self) -> float:
+        """Uploaded megabytes per second of wall time."""
+        return self.bytes_uploaded / (1024 * 1024) / self.seconds if self.seconds else 0.0
+
+    @property
+    def files_per_second(self) -> float:
+        uploaded = len(self.urls) - len(self.failures)
+        return uploaded / self.seconds if self.seconds else 0.0
+
+
+def upload_window_size() -> int:
+    """Uploads kept in flight by save_files (STORAGE_UPLOAD_WINDOW, default 32)."""
+    return int(os.getenv("STORAGE_UPLOAD_WINDOW", "32"))
+
+
+async def upload_window(
+    items: Sequence[UploadItem],
+    upload_one: Callable[[UploadItem], Awaitable[str]],
+    max_in_flight: int,
+) -> UploadReport:
+    """
+    Upload items with at most max_in_flight uploads running; each finished upload immediately
+    starts the next one, so a slow file holds up one slot rather than a whole wave.
+    """
+    urls: List[Optional[str]] = [None] * len(items)
+    failures: List[Tuple[str, str]] = []
+    uploaded = 0
+    started = time.perf_counter()
+    pending = {}
+    queue = iter(enumerate(items))
+
+    def start_next() -> None:
+        for index, item in queue:
+            pending[asyncio.ensure_future(upload_one(item))] = (index, item)
+            return
+
+    for _ in range(max(1, max_in_flight)):
+        start_next()
+    try:
+        while pending:
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                index, item = pending.pop(task)
+                # exception() raises on a cancelled task, so cancellation is checked first
+                if task.cancelled():
+                    failures.append((item.file_name, "upload cancelled"))
+                elif task.exception() is not None:
+                    failures.append((item.file_name, str(task.exception())))
+                else:
+                    urls[index] = task.result()
+                    uploaded += item.size
+                start_next()
+    finally:
+        for task in pending:
+            task.cancel()
+
+    report = UploadReport(urls=urls, bytes_uploaded=uploaded, seconds=time.perf_counter() - started, failures=failures)
+    logger.info(
+        f"Uploaded {len(items) - len(failures)}/{len(items)} files "
+        f"({uploaded / (1024 * 1024):.1f} MB) in {report.seconds:.2f}s: "
+        f"{report.throughput_mbps:.1f} MB/s, {report.files_per_second:.1f} files/s"
+    )
+    return report
+
+
+def _is_not_found(error: BaseException) -> bool:
+    """Whether an error, or one it was raised from or converted from, is a FileNotFoundError."""
+    while error is not None:
+        if isinstance(error, FileNotFoundError):
+            return True
+        details = getattr(error, "details", None)
+        if isinstance(details, dict) and details.get("original_exception") == "FileNotFoundError":
+            return True
+        error = error.__cause__ or error.__context__
+    return False
+
 
 class StorageProvider(ABC):
     """Abstract base class for storage providers."""
 
+    # Pack indexes of packed directories, created on first packed read
+    _pack_indexes: Optional[PackIndexCache] = None
+
     @abstractmethod
     async def get_file_url(self, file_name: str, **kwargs) -> str:
         """Generate a URL for a file."""
@@ -23,6 +140,47 @@ class StorageProvider(ABC):
         """Save a string directly to storage."""
         pass
 
+    async def save_files(
+        self,
+        items: Sequence[UploadItem],
+        folder_name: str,
+        max_in_flight: Optional[int] = None,
+        raise_on_error: bool = True,
+    ) -> UploadReport:
+        """
+        Save many files, keeping a sliding window of uploads in flight.
+
+        Providers override this to share one client/session across the uploads; the default
+        goes through save_file/save_base64.
+
+        Args:
+            items: Files to save
+            folder_name: Container/folder to save into
+            max_in_flight: Concurrent uploads (default: STORAGE_UPLOAD_WINDOW, 32)
+            raise_on_error: Raise ProviderException after the window drains if any upload failed
+
+        Returns:
+            UploadReport with one URL per item (None for failed items) and throughput
+        """
+
+        async def upload_one(item: UploadItem) -> str:
+            if item.data is not None:
+                return await self.save_base64(
+                    file_name=item.file_name, b64_str=base64.b64encode(item.data).decode("ascii"), folder_name=folder_name
+                )
+            return await self.save_file(file_name=item.file_name, src_file_path=item.src_file_path, folder_name=folder_name)
+
+        return self._finish_upload(
+            await upload_window(items, upload_one, max_in_flight or upload_window_size()), raise_on_error
+        )
+
+    @staticmethod
+    def _finish_upload(report: UploadReport, raise_on_error: bool) -> UploadReport:
+        if report.failures and raise_on_error:
+            name, error = report.failures[0]
+            raise ProviderException(f"{len(report.failures)} uploads failed, e.g. {name}: {error}")
+        return report
+
     @abstractmethod
     async def save_to_file(self, file_name: str, download_path: str, **kwargs) -> str:
         """Download a file to a local file path."""
@@ -38,6 +196,50 @@ class StorageProvider(ABC):
         """Load a file into memory as bytes."""
         pass
 
+    async def load_file_range(self, folder: str, file_name: str, offset: int, length: int) -> bytes:
+        """Load length bytes at offset of a file. Providers override this with a ranged read."""
+        data = await self.load_file_to_memory(folder, file_name)
+        return data[offset:offset + length]
+
+    async def load_packed_file(self, folder: str, file_name: str) -> Optional[bytes]:
+        """
+        Serve "<directory>/<name>" from the directory's pack shards (see packed_files).
+
+        Returns:
+            The file's bytes, or None when the directory is not packed or the file is not in the pack
+        """
+        directory, _, name = file_name.rpartition("/")
+        if not directory or name == PACK_INDEX_NAME or name.startswith("pack-"):
+            return None
+        if self._pack_indexes is None:
+            self._pack_indexes = PackIndexCache()
+
+        key = (folder, directory)
+        known, index = self._pack_indexes.get(key)
+        if not known:
+            index = await self._load_pack_index(folder, directory)
+            self._pack_indexes.put(key, index)
+        location = index.locate(name) if index is not None else None
+        if location is None:
+            return None
+        shard, offset, size = location
+        return await self.load_file_range(folder, f"{directory}/{shard}", offset, size)
+
+    async def _load_pack_index(self, folder: str, directory: str) -> Optional[PackIndex]:
+        """
+        Read a directory's pack index; None when the directory is not packed.
+
+        Only a missing index means "not packed" (which is cached); other read errors propagate,
+        so a failed request is retried on the next read. Providers override this with a check
+        on their own not-found error.
+        """
+        try:
+            return PackIndex(await self.load_file_to_memory(folder, f"{directory}/{PACK_INDEX_NAME}"))
+        except Exception as e:
+            if _is_not_found(e):
+                return None
+            raise
+
     @abstractmethod
     async def close(self):
         """Close the underlying client and cleanup."""
@@ -2,10 +2,12 @@ from .search_provider import CustomSearchProvider
 from .local_faiss_search_provider import LocalFaissSearchProvider
 from .image_embedding_provider import CustomImageEmbeddingProvider
 from .storage_provider import LocalStorageProvider
+from .local_transcription_provider import LocalWhisperTranscriptionProvider
 
 __all__ = [
     'CustomSearchProvider',
     'LocalFaissSearchProvider',
     'CustomImageEmbeddingProvider',
-    'LocalStorageProvider'
+    'LocalStorageProvider',
+    'LocalWhisperTranscriptionProvider'
 ]
\ No newline at end of file
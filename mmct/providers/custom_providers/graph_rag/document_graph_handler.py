@@ -1,37 +1,94 @@
 import os
-import networkx as nx
 import pickle
+import threading
 from loguru import logger
 import numpy as np
 from mmct.providers.custom_providers.graph_rag.faiss_index_handler import FaissIndexManager
-from typing import List
-from sklearn.metrics.pairwise import cosine_similarity
+from mmct.providers.custom_providers.graph_rag.graph_store import open_store
+from mmct.providers.custom_providers.graph_rag.related_index import EmbeddingNorms, RelatedChapterIndex, cosine_scores
+from typing import List, Optional
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
+# Chapter fields stored as chapter text; every other non-empty field becomes an attribute edge
+TEXT_FIELDS = ["embeddings", "detailed_summary", "chapter_transcript", "text_from_scene", "action_taken"]
+
+_shared_graph: Optional["DocumentGraph"] = None
+_shared_graph_lock = threading.Lock()
+
+
+def get_document_graph() -> "DocumentGraph":
+    """The process-wide DocumentGraph, so every search provider shares one FAISS index and store."""
+    global _shared_graph
+    with _shared_graph_lock:
+        if _shared_graph is None:
+            _shared_graph = DocumentGraph()
+        return _shared_graph
+
 
 class DocumentGraph:
-    def __init__(self, graph_filename="document_graph.pkl"):
+    def __init__(self, graph_filename="document_graph.pkl", store_dirname="document_graph"):
         self.directory = BASE_DIR
+        # Legacy whole-graph pickle, imported into the store once
         self.graph_filename = graph_filename
-        self.graph = self._load_graph()
-        self.chapter_embeddings = {
-                node_id: self.graph.nodes[node_id]['embeddings']
-                for node_id in self.graph.nodes
-                if self.graph.nodes[node_id].get('type') == 'chapter'
-            }
-        
+        self.store = open_store(os.path.join(self.directory, store_dirname))
+        self._lock = threading.RLock()
+        # Rebuilt on the first search after the store changes
+        self._related: Optional[RelatedChapterIndex] = None
+        self._norms = EmbeddingNorms()
+        self._migrate_pickle()
+
         self.faiss_index_manager = FaissIndexManager(dim=1536)
+        # The FAISS index is rewritten whole on save, so it is saved every few videos and on
+        # flush(); chapters added since the last save are re-added from the store on the next load
+        self.index_save_every = int(os.getenv("GRAPH_RAG_INDEX_SAVE_EVERY", "20"))
+        self._unsaved_videos = 0
+        self._sync_faiss_index()
         logger.info("FASS Indexer loaded")
-    def _load_graph(self):
-        """Load the graph from a pickle file if it exists, otherwise initialize a new DiGraph."""
+
+    def _migrate_pickle(self):
+        """Import the chapters of a legacy networkx pickle into an empty store."""
         graph_path = os.path.join(self.directory, self.graph_filename)
-        if os.path.exists(graph_path):
-            with open(graph_path, "rb") as f:
-                return pickle.load(f)
-        else:
-            return nx.DiGraph()
-        
+        with self.store.locked():
+            self.store.refresh()
+            if self.store.row_count or not os.path.exists(graph_path):
+                return
+            self._import_pickle(graph_path)
+
+    def _import_pickle(self, graph_path):
+        logger.info(f"Importing {graph_path} into the chapter graph store")
+        with open(graph_path, "rb") as f:
+            graph = pickle.load(f)
+        for video_id, data in graph.nodes(data=True):
+            if data.get("type") != "video":
+                continue
+            chapter_ids = sorted(
+                (n for n in graph.successors(video_id) if graph.nodes[n].get("type") == "chapter"),
+                key=lambda n: int(n.rpartition("_")[2]),
+            )
+            if not chapter_ids:
+                continue
+            chapters, embeddings, attributes = [], [], []
+            for chapter_id in chapter_ids:
+                node = graph.nodes[chapter_id]
+                chapters.append({k: v for k, v in node.items() if k not in ("type", "embeddings")})
+                embeddings.append(node["embeddings"])
+                attributes.append([str(n) for n in graph.successors(chapter_id)])
+            self.store.append_video(video_id, chapters, np.array(embeddings), attributes)
+
+    def _sync_faiss_index(self):
+        """Add chapters the FAISS index is missing (added after its last save, or by another process)."""
+        if len(self.faiss_index_manager.str_to_int_id) >= self.store.live_count:
+            return
+        missing = [
+            chapter_id for chapter_id in self.store.live_chapter_ids()
+            if chapter_id not in self.faiss_index_manager.str_to_int_id
+        ]
+        if missing:
+            logger.info(f"Adding {len(missing)} chapters missing from the FAISS index")
+            rows = [self.store.row_of(chapter_id) for chapter_id in missing]
+            self.faiss_index_manager.add_embeddings(embeddings=self.store.embeddings[rows], hash_ids=missing)
+
     def sort_video_documents(self, video_documents: List[dict]) -> List[dict]:
         try:
             if "chapter_transcript" in video_documents[0]:
@@ -45,15 +102,29 @@ class DocumentGraph:
             raise e
 
     def save_graph(self):
-        """Save the current graph to a pickle file."""
-        graph_path = os.path.join(self.directory, self.graph_filename)
-        with open(graph_path, "wb") as f:
-            pickle.dump(self.graph, f)
+        """Save the FAISS index and id mapping; the chapter store is already written on every add."""
+        with self._lock, self.store.locked():
+            self.faiss_index_manager.save_index_and_mapping()
+            self._unsaved_videos = 0
+
+    def flush(self):
+        """Save the FAISS index if videos were added since the last save."""
+        with self._lock:
+            if self._unsaved_videos:
+                self.save_graph()
+
+    def refresh(self):
+        """Pick up videos other processes added to the store since the last read."""
+        with self._lock:
+            if self.store.refresh():
+                self._related = None
+                self._sync_faiss_index()
 
     def fetch_chapter_details(self, node_id):
         try:
-         
-            node_data = self.graph.nodes[node_id]
+            node_data = self.store.chapter(node_id)
+            if node_data is None:
+                return None
             chapter_info = {
                 "chapter_id": node_id,
                 "detailed_summary": node_data.get('detailed_summary'),
@@ -68,73 +139,66 @@ class DocumentGraph:
             raise e
         
     def add_documents(self, video_documents: List[dict], video_id: str):
-        """Add a new video document to the graph, updating existing nodes and edges."""
-        self.graph.add_node(video_id, type="video")
+        """Append a video's chapters to the store and the FAISS index, in time proportional to the video."""
         video_documents = self.sort_video_documents(video_documents=video_documents)
-        node_ids, embeddings_log = list(), list()
-        for idx, chapter in enumerate(video_documents):
-            chapter_id = f"{video_id}_{idx+1}"
-            embeddings = chapter["embeddings"]
-            detailed_summary = chapter["detailed_summary"]
-            chapter_transcript = chapter["chapter_transcript"]
-            ocr_text_from_scene = chapter["text_from_scene"]
-            description = chapter['action_taken']
-            youtube_url = chapter['youtube_url']
-            node_ids.append(chapter_id)
-            embeddings_log.append(embeddings)
-
-            # Add chapter node
-            self.graph.add_node(
-                chapter_id,
-                type="chapter",
-                embeddings=embeddings,
-                detailed_summary=detailed_summary,
-                chapter_transcript=chapter_transcript,
-                ocr_text_from_scene=ocr_text_from_scene,
-                description=description,
-                youtube_url=youtube_url
-            )
+        chapters, embeddings_log, attributes = list(), list(), list()
+        for chapter in video_documents:
+            embeddings_log.append(chapter["embeddings"])
+            chapters.append({
+                "detailed_summary": chapter["detailed_summary"],
+                "chapter_transcript": chapter["chapter_transcript"],
+                "ocr_text_from_scene": chapter["text_from_scene"],
+                "description": chapter['action_taken'],
+                "youtube_url": chapter['youtube_url'],
+            })
+            # Chapters link to their video and to each metadata value, as attribute nodes did
+            values = [video_id]
+            for key, value in chapter.items():
+                if key not in TEXT_FIELDS and value and not isinstance(value, (list, dict)):
+                    values.append(str(value))
+            attributes.append(values)
 
-            # Add edge between video and chapter
-            self.graph.add_edge(video_id, chapter_id, relation="has_chapter")
-            self.graph.add_edge(chapter_id, video_id, relation="has_video_id")
+        embeddings_log = np.array(embeddings_log, dtype=np.float32)
+        with self._lock:
+            # Chapters other processes appended first are added to FAISS before ours
+            self.refresh()
+            node_ids = self.store.append_video(video_id, chapters, embeddings_log, attributes)
+            self._related = None
+            self.faiss_index_manager.add_embeddings(embeddings=embeddings_log, hash_ids=node_ids, save=False)
+            self._unsaved_videos += 1
+            if self._unsaved_videos >= self.index_save_every:
+                self.save_graph()
 
-            # Add attribute nodes and edges for chapter
-            for key, value in chapter.items():
-                if key not in ["embeddings", "detailed_summary", "chapter_transcript", "text_from_scene", "action_taken"]:
-                    if value:
-                        self.graph.add_node(value, type="attribute")
-                        self.graph.add_edge(chapter_id, value, relation=f"has_{key}")
-                        self.graph.add_edge(value, chapter_id, relation="has_chapter")
-
-        self.save_graph()
-        self.faiss_index_manager.add_embeddings(embeddings=np.array(embeddings_log),hash_ids=node_ids)
-        self.chapter_embeddings = {
-                node_id: self.graph.nodes[node_id]['embeddings']
-                for node_id in self.graph.nodes
-                if self.graph.nodes[node_id].get('type') == 'chapter'
-            }
-        
     def get_chapter_node(self, chapter_id):
         """Retrieve the chapter node and its attributes."""
-        if self.graph.has_node(chapter_id):
-            return self.graph.nodes[chapter_id]
-        else:
+        node_data = self.store.chapter(chapter_id)
+        if node_data is None:
             return None
+        node_data = dict(node_data, type="chapter")
+        node_data["embeddings"] = self.store.embeddings[self.store.row_of(chapter_id)].tolist()
+        return node_data
+
+    def _related_index(self) -> RelatedChapterIndex:
+        if self._related is None:
+            self._related = RelatedChapterIndex(
+                self.store,
+                max_related=int(os.getenv("GRAPH_RAG_MAX_RELATED", "32")),
+                hub_fraction=float(os.getenv("GRAPH_RAG_HUB_FRACTION", "0.05")),
+                hub_min_chapters=int(os.getenv("GRAPH_RAG_HUB_MIN_CHAPTERS", "64")),
+            )
+        return self._related
 
     def fetch_related_chapters(self,node_id, visited_nodes):
+        """Chapters sharing informative attributes with node_id (strongest link first), skipping visited ones."""
         neighbors = []
-
-        # Traverse 1st level neighbors (attributes)
-        for attribute_node in self.graph.neighbors(node_id):
-            # Traverse 2nd level neighbors (chapters related to the same attribute)
-            for related_chapter in self.graph.neighbors(attribute_node):
-                if (self.graph.nodes[related_chapter].get("type") == "chapter"
-                        and related_chapter != node_id
-                        and related_chapter not in visited_nodes):
-                    visited_nodes.add(related_chapter)
-                    neighbors.append(self.fetch_chapter_details(related_chapter))
-
+        row = self.store.row_of(node_id)
+        if row is None:
+            return neighbors
+        for related_row in self._related_index().related_rows(row).tolist():
+            related_chapter = self.store.chapter_id_of(related_row)
+            if related_chapter not in visited_nodes:
+                visited_nodes.add(related_chapter)
+                neighbors.append(self.fetch_chapter_details(related_chapter))
         return neighbors
     
     def format_results(self, documents: list) -> list:
@@ -156,49 +220,47 @@ class DocumentGraph:
         return result
     
     def search(self, query_embedding,top_k,top_n: int):
+        with self._lock:
+            return self._search(query_embedding, top_k, top_n)
+
+    def _search(self, query_embedding,top_k,top_n: int):
         try:
-            query_embedding = np.array([query_embedding]).reshape(1, -1)
-            top_k_hash_ids, distances = self.faiss_index_manager.search(query_embedding=query_embedding,k=top_k)
+            self.refresh()
+            query_embedding = np.asarray(query_embedding, dtype=np.float32).reshape(-1)
+            top_k_hash_ids, distances = self.faiss_index_manager.search(query_embedding=query_embedding.reshape(1, -1),k=top_k)
             top_k_hash_ids = [hid for hid in top_k_hash_ids[0]]
             logger.warning(top_k_hash_ids)
-            visited_nodes = set()
-            results = []
-            
+            visited_rows = set()
+            results, hit_rows = [], []
+
             for node_id in top_k_hash_ids:
-                # Add the top match chapter itself
-                if node_id in visited_nodes:
-                    continue
-                visited_nodes.add(node_id)
-
-                chapter_info = self.fetch_chapter_details(node_id=node_id)
-                if chapter_info:
-                    # Populate its neighbors (related chapters)
-                    results.append(chapter_info)
-                
-                            
-            for chapter_info in results:
-                neighbors = self.fetch_related_chapters(node_id=chapter_info['chapter_id'], visited_nodes=visited_nodes)
-                neighbor_ids = [n['chapter_id'] for n in neighbors if n['chapter_id'] in self.chapter_embeddings]
-                neighbor_embeddings = np.array([self.chapter_embeddings[nid] for nid in neighbor_ids])
-
-                if neighbor_embeddings.shape[0] == 0:
-                    chapter_info['neighbors'] = []
+                # Add the top match chapter itself (FAISS pads missing results with None)
+                row = self.store.row_of(node_id) if node_id else None
+                if row is None or row in visited_rows:
                     continue
+                visited_rows.add(row)
+                results.append(self.fetch_chapter_details(node_id=node_id))
+                hit_rows.append(row)
 
-                similarities = cosine_similarity(query_embedding,neighbor_embeddings)[0]
-                filtered = sorted(
-                    zip(neighbors, similarities),
-                    key=lambda x: x[1],
-                    reverse=True
-                )
-
-                chapter_info['neighbors'] = [n[0] for n in filtered[:top_n]]
-                if len(filtered)>top_n:
-                    for n in filtered[top_n:]:
-                        visited_nodes.remove(n[0]['chapter_id'])
-    
+            # Score every candidate neighbor of every hit against the query in one product
+            related = self._related_index()
+            candidates = [related.related_rows(row) for row in hit_rows]
+            candidate_rows = np.unique(np.concatenate(candidates)) if candidates else np.zeros(0, dtype=np.int64)
+            scores = dict(zip(
+                candidate_rows.tolist(),
+                cosine_scores(self.store, self._norms.get(self.store), candidate_rows, query_embedding).tolist(),
+            ))
+
+            # Earlier hits claim their best neighbors first; a chapter is returned at most once
+            for chapter_info, rows in zip(results, candidates):
+                fresh = [r for r in rows.tolist() if r not in visited_rows]
+                fresh.sort(key=lambda r: scores[r], reverse=True)
+                chosen = fresh[:top_n]
+                visited_rows.update(chosen)
+                chapter_info['neighbors'] = [
+                    self.fetch_chapter_details(self.store.chapter_id_of(r)) for r in chosen
+                ]
 
             return self.format_results(results)
         except Exception as e:
             logger.exception(f"{e}")
-    
\ No newline at end of file
@@ -58,7 +58,8 @@ class FaissIndexManager:
         except Exception as e:
             raise RuntimeError(f"Failed to save index or mapping: {e}")
 
-    def add_embeddings(self, embeddings: np.ndarray, hash_ids: list):
+    def add_embeddings(self, embeddings: np.ndarray, hash_ids: list, save: bool = True):
+        """Add embeddings under string ids; with save=False the caller persists later via save_index_and_mapping()."""
         try:
             int_ids = []
             for hash_id in hash_ids:
@@ -73,7 +74,8 @@ class FaissIndexManager:
 
             int_ids = np.array(int_ids, dtype=np.int64)
             self.index.add_with_ids(embeddings.astype('float32'), int_ids)
-            self.save_index_and_mapping()
+            if save:
+                self.save_index_and_mapping()
         except Exception as e:
             raise RuntimeError(f"Failed to add embeddings: {e}")
 
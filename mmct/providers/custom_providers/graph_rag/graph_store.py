@@ -0,0 +1,443 @@
+"""
+Append-only, memory-mapped storage for the chapter graph.
+
+DocumentGraph used to keep every chapter (with its embedding) as a networkx node and pickle
+the whole graph after each video, so adding a video and loading the graph both cost
+O(library). ChapterGraphStore keeps the same information in flat files that only grow:
+
+- embeddings.f32     float32 chapter embeddings, one row per chapter (memory-mapped)
+- edges.i32          attribute ids of each chapter, chapter-major (the CSR column indices)
+- chapters.jsonl     chapter text fields, one JSON line per chapter
+- attributes.jsonl   attribute vocabulary, {"id", "value"} per line
+- segments.jsonl     one line per added video: its row range, per-chapter edge counts (the
+                     CSR row pointers), the byte range of its text and the committed end
+                     of attributes.jsonl
+
+Adding a video appends one segment to each file and then commits it by appending its line to
+segments.jsonl, so the cost is O(video). Loading reads segments.jsonl and maps the binary files;
+chapter text is read from disk only when a chapter is returned. Re-adding a video appends a
+new segment that supersedes the old one; the old rows stay on disk but are no longer live.
+
+Several stores (ingestion parts, parallel ingestions, other processes) may append to one
+directory, so open_store() shares one store per directory within a process and appends hold an
+exclusive lock on the directory's lock file. Under that lock an append first reads the segments
+other writers committed, cuts off data after the last committed segment (an interrupted append),
+and only then takes its row and edge offsets from the committed sizes. Readers never truncate.
+"""
+
+import bisect
+import json
+import os
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+import numpy as np
+from loguru import logger
+
+EMBEDDINGS_FILE = "embeddings.f32"
+EDGES_FILE = "edges.i32"
+CHAPTERS_FILE = "chapters.jsonl"
+ATTRIBUTES_FILE = "attributes.jsonl"
+SEGMENTS_FILE = "segments.jsonl"
+META_FILE = "meta.json"
+LOCK_FILE = ".lock"
+
+_stores: Dict[str, "ChapterGraphStore"] = {}
+_stores_lock = threading.Lock()
+
+
+def open_store(directory: str, **kwargs) -> "ChapterGraphStore":
+    """The process-wide store of a directory, opened on first use."""
+    key = os.path.realpath(directory)
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = _stores[key] = ChapterGraphStore(directory, **kwargs)
+        return store
+
+
+def _read_jsonl(path: str, offset: int = 0, end: Optional[int] = None) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Read the complete JSON lines from offset on, stopping at end if given.
+
+    Returns:
+        (records, end offset of the last complete line); a torn last line is not consumed
+    """
+    if not os.path.exists(path):
+        return [], offset
+    records = []
+    with open(path, "rb") as f:
+        f.seek(offset)
+        for line in f:
+            if not line.endswith(b"\n") or (end is not None and offset + len(line) > end):
+                break
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                break
+            offset += len(line)
+    return records, offset
+
+
+def _truncate(path: str, size: int) -> None:
+    if os.path.exists(path) and os.path.getsize(path) > size:
+        logger.warning(f"Discarding uncommitted data at the end of {path}")
+        with open(path, "r+b") as f:
+            f.truncate(size)
+
+
+@contextmanager
+def _locked_file(path: str) -> Iterator[None]:
+    """Hold an exclusive lock on path across processes."""
+    with open(path, "a+b") as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class ChapterGraphStore:
+    """
+    Chapters of all indexed videos with their embeddings and attribute edges.
+
+    Rows are numbered globally in insertion order; chapter ids are "<video_id>_<n>" as before.
+    Use open_store() rather than the constructor, so a process has one store per directory.
+
+    Args:
+        directory: Directory holding the store files; created if missing
+        text_cache_segments: Videos whose chapter text is kept in memory
+    """
+
+    def __init__(self, directory: str, text_cache_segments: int = 256):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.RLock()
+        # locked() nesting of the thread holding _lock; the file lock is taken once
+        self._lock_depth = 0
+        self._text_cache: "OrderedDict[int, List[Dict[str, Any]]]" = OrderedDict()
+        self._text_cache_segments = text_cache_segments
+
+        self.dim: Optional[int] = None
+        self._segments: List[Dict[str, Any]] = []
+        self._segments_end = 0
+        self._attribute_ids: Dict[str, int] = {}
+        self._attribute_values: Dict[int, str] = {}
+        self._attributes_end = 0
+        self._next_attribute_id = 0
+
+        self._video_segment: Dict[str, int] = {}
+        self._row_starts: List[int] = []
+        self.row_count = 0
+        self._indptr_buffer = np.zeros(1024, dtype=np.int64)
+        self._live_buffer = np.zeros(1024, dtype=bool)
+        self._embeddings: Optional[np.ndarray] = None
+        self._edges: Optional[np.ndarray] = None
+        self.refresh()
+        logger.info(f"Chapter graph store opened with {self.live_count} chapters from {len(self._video_segment)} videos")
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    @contextmanager
+    def locked(self) -> Iterator[None]:
+        """Exclusive access to the directory, against other threads and other processes. Reentrant."""
+        with self._lock:
+            if self._lock_depth:
+                self._lock_depth += 1
+                try:
+                    yield
+                finally:
+                    self._lock_depth -= 1
+                return
+            with _locked_file(self._path(LOCK_FILE)):
+                self._lock_depth = 1
+                try:
+                    yield
+                finally:
+                    self._lock_depth = 0
+
+    def refresh(self) -> bool:
+        """
+        Pick up segments committed by other writers since the last read.
+
+        Returns:
+            Whether new segments were found
+        """
+        with self._lock:
+            segments, end = _read_jsonl(self._path(SEGMENTS_FILE), self._segments_end)
+            if not segments:
+                return False
+            # Attributes are written before the segments that use them, so read them second, and
+            # only up to what the last segment committed (segments written before that was recorded
+            # read to the end of the file)
+            attributes, self._attributes_end = _read_jsonl(
+                self._path(ATTRIBUTES_FILE), self._attributes_end, segments[-1].get("attributes_end")
+            )
+            for record in attributes:
+                self._attribute_ids[record["value"]] = record["id"]
+                self._attribute_values[record["id"]] = record["value"]
+            self._next_attribute_id = max(self._attribute_values, default=-1) + 1
+            if self.dim is None:
+                with open(self._path(META_FILE), "r") as f:
+                    self.dim = json.load(f)["dim"]
+            for segment in segments:
+                self._segments.append(segment)
+                self._index_segment(len(self._segments) - 1, segment)
+            self._segments_end = end
+            # Re-map the grown files on next access
+            self._embeddings = None
+            self._edges = None
+            return True
+
+    def _index_segment(self, position: int, segment: Dict[str, Any]) -> None:
+        """Add a committed segment to the in-memory row index, in amortized O(segment)."""
+        needed = self.row_count + segment["rows"] + 1
+        if needed > len(self._indptr_buffer):
+            capacity = max(needed, 2 * len(self._indptr_buffer))
+            self._indptr_buffer = np.resize(self._indptr_buffer, capacity)
+            live = np.zeros(capacity, dtype=bool)
+            live[: len(self._live_buffer)] = self._live_buffer
+            self._live_buffer = live
+
+        start = self.row_count
+        end = start + segment["rows"]
+        self._indptr_buffer[start + 1:end + 1] = self._indptr_buffer[start] + np.cumsum(segment["edge_counts"])
+        # Latest segment of each video wins
+        previous = self._video_segment.get(segment["video_id"])
+        if previous is not None:
+            old = self._segments[previous]
+            self._live_buffer[old["row_start"]:old["row_start"] + old["rows"]] = False
+        self._live_buffer[start:end] = True
+        self._video_segment[segment["video_id"]] = position
+        self._row_starts.append(start)
+        self.row_count = end
+
+    @property
+    def _indptr(self) -> np.ndarray:
+        return self._indptr_buffer[: self.row_count + 1]
+
+    @property
+    def _live(self) -> np.ndarray:
+        return self._live_buffer[: self.row_count]
+
+    def _truncate_uncommitted(self) -> None:
+        """Cut every file back to its last committed segment. Only safe under locked()."""
+        if self._segments:
+            last = self._segments[-1]
+            text_end = last["text_offset"] + last["text_length"]
+        else:
+            text_end = 0
+        _truncate(self._path(SEGMENTS_FILE), self._segments_end)
+        _truncate(self._path(ATTRIBUTES_FILE), self._attributes_end)
+        _truncate(self._path(EMBEDDINGS_FILE), self.row_count * (self.dim or 0) * 4)
+        _truncate(self._path(EDGES_FILE), int(self._indptr[-1]) * 4)
+        _truncate(self._path(CHAPTERS_FILE), text_end)
+
+    @property
+    def live_count(self) -> int:
+        return int(self._live.sum())
+
+    def __len__(self) -> int:
+        return self.live_count
+
+    # ------------------------- WRITE ------------------------- #
+    def _attribute_id(self, value: str, new_attributes: Dict[str, int]) -> int:
+        attribute_id = self._attribute_ids.get(value)
+        if attribute_id is None:
+            attribute_id = new_attributes.get(value)
+        if attribute_id is None:
+            attribute_id = new_attributes[value] = self._next_attribute_id + len(new_attributes)
+        return attribute_id
+
+    def _file_size(self, name: str) -> int:
+        path = self._path(name)
+        return os.path.getsize(path) if os.path.exists(path) else 0
+
+    def append_video(
+        self,
+        video_id: str,
+        chapters: Sequence[Dict[str, Any]],
+        embeddings: np.ndarray,
+        attributes: Sequence[Sequence[str]],
+    ) -> List[str]:
+        """
+        Append the chapters of one video.
+
+        Args:
+            video_id: Video the chapters belong to; replaces earlier chapters of the same video
+            chapters: Text fields of each chapter
+            embeddings: (chapters, dim) chapter embeddings
+            attributes: Attribute values each chapter links to
+
+        Returns:
+            Chapter ids, "<video_id>_<n>" with n starting at 1
+        """
+        embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+        if embeddings.ndim != 2 or embeddings.shape[0] != len(chapters):
+            raise ValueError("Expected one embedding row per chapter")
+        with self.locked():
+            # Offsets come from what is committed on disk, whoever committed it
+            self.refresh()
+            self._truncate_uncommitted()
+            if self.dim is None:
+                self.dim = int(embeddings.shape[1])
+                with open(self._path(META_FILE), "w") as f:
+                    json.dump({"dim": self.dim}, f)
+            elif embeddings.shape[1] != self.dim:
+                raise ValueError(f"Embedding dimension {embeddings.shape[1]} does not match the store ({self.dim})")
+            row_start = self._file_size(EMBEDDINGS_FILE) // (self.dim * 4)
+            edge_start = self._file_size(EDGES_FILE) // 4
+            if row_start != self.row_count or edge_start != int(self._indptr[-1]):
+                raise RuntimeError(f"Chapter graph store {self.directory} is inconsistent with its committed segments")
+
+            chapter_ids = [f"{video_id}_{i + 1}" for i in range(len(chapters))]
+            new_attributes: Dict[str, int] = {}
+            edge_lists = [
+                sorted({self._attribute_id(value, new_attributes) for value in values}) for values in attributes
+            ]
+            lines = b"".join(
+                json.dumps(dict(chapter, id=chapter_id), ensure_ascii=False, default=str).encode("utf-8") + b"\n"
+                for chapter_id, chapter in zip(chapter_ids, chapters)
+            )
+
+            # Data first; the segment line below is the commit point
+            if new_attributes:
+                with open(self._path(ATTRIBUTES_FILE), "ab") as f:
+                    f.write(b"".join(
+                        json.dumps({"id": i, "value": v}, ensure_ascii=False).encode("utf-8") + b"\n"
+                        for v, i in new_attributes.items()
+                    ))
+            with open(self._path(EMBEDDINGS_FILE), "ab") as f:
+                f.write(embeddings.tobytes())
+            with open(self._path(EDGES_FILE), "ab") as f:
+                for edges in edge_lists:
+                    f.write(np.asarray(edges, dtype=np.int32).tobytes())
+            text_offset = self._file_size(CHAPTERS_FILE)
+            with open(self._path(CHAPTERS_FILE), "ab") as f:
+                f.write(lines)
+
+            segment = {
+                "video_id": video_id,
+                "row_start": row_start,
+                "rows": len(chapters),
+                "edge_start": edge_start,
+                "edge_counts": [len(edges) for edges in edge_lists],
+                "text_offset": text_offset,
+                "text_length": len(lines),
+                "attributes_end": self._file_size(ATTRIBUTES_FILE),
+            }
+            with open(self._path(SEGMENTS_FILE), "ab") as f:
+                f.write(json.dumps(segment).encode("utf-8") + b"\n")
+                f.flush()
+                os.fsync(f.fileno())
+
+            # Read back our own commit (and the attributes it introduced) like any other writer's
+            self.refresh()
+            return chapter_ids
+
+    # ------------------------- READ ------------------------- #
+    def _map(self, name: str, dtype, width: int) -> np.ndarray:
+        path = self._path(name)
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            return np.zeros((0, width) if width > 1 else 0, dtype=dtype)
+        array = np.memmap(path, dtype=dtype, mode="r")
+        return array.reshape(-1, width) if width > 1 else array
+
+    @property
+    def embeddings(self) -> np.ndarray:
+        """(rows, dim) memory-mapped embedding matrix, including superseded rows."""
+        with self._lock:
+            if self._embeddings is None:
+                self._embeddings = self._map(EMBEDDINGS_FILE, np.float32, self.dim or 1)[: self.row_count]
+            return self._embeddings
+
+    def csr(self) -> Tuple[np.ndarray, np.ndarray]:
+        """(indptr, indices) of the chapter-to-attribute adjacency, one CSR row per store row."""
+        with self._lock:
+            if self._edges is None:
+                self._edges = self._map(EDGES_FILE, np.int32, 1)[: int(self._indptr[-1])]
+            return self._indptr, self._edges
+
+    @property
+    def live_rows(self) -> np.ndarray:
+        """Boolean mask of rows belonging to the latest segment of their video."""
+        return self._live
+
+    def row_of(self, chapter_id: str) -> Optional[int]:
+        """Global row of a live chapter, or None."""
+        video_id, _, number = chapter_id.rpartition("_")
+        position = self._video_segment.get(video_id)
+        if position is None or not number.isdigit():
+            return None
+        segment = self._segments[position]
+        index = int(number) - 1
+        if not 0 <= index < segment["rows"]:
+            return None
+        return segment["row_start"] + index
+
+    def chapter_id_of(self, row: int) -> str:
+        position = self._segment_of_row(row)
+        segment = self._segments[position]
+        return f"{segment['video_id']}_{row - segment['row_start'] + 1}"
+
+    def _segment_of_row(self, row: int) -> int:
+        return bisect.bisect_right(self._row_starts, row) - 1
+
+    def _segment_text(self, position: int) -> List[Dict[str, Any]]:
+        with self._lock:
+            cached = self._text_cache.get(position)
+            if cached is not None:
+                self._text_cache.move_to_end(position)
+                return cached
+        segment = self._segments[position]
+        with open(self._path(CHAPTERS_FILE), "rb") as f:
+            f.seek(segment["text_offset"])
+            block = f.read(segment["text_length"])
+        chapters = [json.loads(line) for line in block.splitlines() if line]
+        with self._lock:
+            self._text_cache[position] = chapters
+            while len(self._text_cache) > self._text_cache_segments:
+                self._text_cache.popitem(last=False)
+        return chapters
+
+    def chapter(self, chapter_id: str) -> Optional[Dict[str, Any]]:
+        """Stored text fields of a live chapter (with its "id"), or None."""
+        row = self.row_of(chapter_id)
+        if row is None:
+            return None
+        position = self._video_segment[chapter_id.rpartition("_")[0]]
+        return self._segment_text(position)[row - self._segments[position]["row_start"]]
+
+    def attribute_values(self) -> List[Tuple[int, str]]:
+        """(id, value) of every attribute."""
+        return list(self._attribute_values.items())
+
+    def attribute_count(self) -> int:
+        return self._next_attribute_id
+
+    def live_chapter_ids(self) -> List[str]:
+        ids = []
+        for position in self._video_segment.values():
+            segment = self._segments[position]
+            ids.extend(f"{segment['video_id']}_{i + 1}" for i in range(segment["rows"]))
+        return ids
+
+    def has_video(self, video_id: str) -> bool:
+        return video_id in self._video_segment
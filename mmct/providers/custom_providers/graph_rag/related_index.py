@@ -0,0 +1,127 @@
+"""
+Precomputed chapter -> related chapter index for graph-expanded retrieval.
+
+Two chapters are related when they share attributes (their video, metadata values). Sharing a
+rare attribute says much more than sharing a common one, and some values (the same url on
+every chapter, "None", a category used by half the library) link nearly everything; walking
+those made neighbor sets explode. The index therefore:
+
+- weights each attribute by its IDF, 1 + log(chapters / chapters with the attribute)
+- ignores hub attributes, linked to more than max(hub_min_chapters, hub_fraction * chapters)
+  chapters, and null-like values
+- scores chapter pairs by the summed squared IDF of their shared attributes (one sparse
+  product A·Aᵀ) and keeps each chapter's max_related best-scoring related chapters
+
+Re-ranking related chapters against a query is then a gather of their embedding rows and one
+matrix-vector product with precomputed row norms.
+"""
+
+import numpy as np
+from loguru import logger
+from scipy import sparse
+
+from mmct.providers.custom_providers.graph_rag.graph_store import ChapterGraphStore
+
+# Attribute values that carry no information
+NULL_VALUES = frozenset({"none", "null", "nan", "n/a", "unknown", "[]", "{}"})
+
+
+class RelatedChapterIndex:
+    """
+    Related chapters of every live chapter in a ChapterGraphStore, as CSR arrays over store rows.
+
+    Args:
+        store: Chapter store to index
+        max_related: Related chapters kept per chapter
+        hub_fraction: Attributes shared by more than this fraction of chapters are ignored
+        hub_min_chapters: ...unless shared by at most this many chapters (small libraries)
+    """
+
+    def __init__(
+        self,
+        store: ChapterGraphStore,
+        max_related: int = 32,
+        hub_fraction: float = 0.05,
+        hub_min_chapters: int = 64,
+    ):
+        self.max_related = max_related
+        indptr, indices = store.csr()
+        indices = np.asarray(indices, dtype=np.int64)
+        live = store.live_rows
+        rows = store.row_count
+        attribute_count = store.attribute_count()
+        chapters = max(1, int(live.sum()))
+
+        edge_rows = np.repeat(np.arange(rows), np.diff(indptr))
+        keep = live[edge_rows]
+        edge_rows, edge_attributes = edge_rows[keep], indices[keep]
+
+        frequency = np.bincount(edge_attributes, minlength=attribute_count)
+        hub_limit = max(hub_min_chapters, hub_fraction * chapters)
+        usable = (frequency > 0) & (frequency <= hub_limit)
+        for attribute_id, value in store.attribute_values():
+            if value.strip().lower() in NULL_VALUES:
+                usable[attribute_id] = False
+        self.hub_attributes = int((frequency > hub_limit).sum())
+
+        idf = np.zeros(attribute_count, dtype=np.float32)
+        idf[usable] = np.log(chapters / frequency[usable]) + 1.0
+
+        keep = usable[edge_attributes]
+        adjacency = sparse.csr_matrix(
+            (idf[edge_attributes[keep]], (edge_rows[keep], edge_attributes[keep])),
+            shape=(rows, attribute_count),
+        )
+        scores = (adjacency @ adjacency.T).tocoo()
+        off_diagonal = scores.row != scores.col
+        pair_rows, pair_cols, pair_scores = scores.row[off_diagonal], scores.col[off_diagonal], scores.data[off_diagonal]
+
+        # Best-scoring related chapters first within each row, then keep max_related per row
+        order = np.lexsort((-pair_scores, pair_rows))
+        pair_rows, pair_cols, pair_scores = pair_rows[order], pair_cols[order], pair_scores[order]
+        counts = np.bincount(pair_rows, minlength=rows)
+        starts = np.zeros(rows + 1, dtype=np.int64)
+        np.cumsum(counts, out=starts[1:])
+        rank = np.arange(len(pair_rows)) - starts[pair_rows]
+        top = rank < max_related
+
+        self.indptr = np.zeros(rows + 1, dtype=np.int64)
+        np.cumsum(np.minimum(counts, max_related), out=self.indptr[1:])
+        self.related = pair_cols[top].astype(np.int64)
+        self.weights = pair_scores[top].astype(np.float32)
+        logger.info(
+            f"Related-chapter index built: {chapters} chapters, {len(self.related)} links, "
+            f"{self.hub_attributes} hub attributes ignored"
+        )
+
+    def related_rows(self, row: int) -> np.ndarray:
+        """Related chapter rows of a row, strongest link first."""
+        return self.related[self.indptr[row]:self.indptr[row + 1]]
+
+
+class EmbeddingNorms:
+    """L2 norms of the store's embedding rows, extended incrementally as rows are appended."""
+
+    def __init__(self):
+        self._norms = np.zeros(0, dtype=np.float32)
+
+    def get(self, store: ChapterGraphStore) -> np.ndarray:
+        if len(self._norms) < store.row_count:
+            new_rows = np.asarray(store.embeddings[len(self._norms):store.row_count], dtype=np.float32)
+            self._norms = np.concatenate([self._norms, np.linalg.norm(new_rows, axis=1)])
+        return self._norms
+
+
+def cosine_scores(
+    store: ChapterGraphStore, norms: np.ndarray, rows: np.ndarray, query: np.ndarray
+) -> np.ndarray:
+    """Cosine similarity of the query to each row's embedding, as one gathered matrix-vector product."""
+    if len(rows) == 0:
+        return np.zeros(0, dtype=np.float32)
+    # Sorted gathers read the memory-mapped matrix sequentially
+    sorted_rows = np.sort(rows)
+    block = np.asarray(store.embeddings[sorted_rows], dtype=np.float32)
+    scores = block @ query.astype(np.float32)
+    scores /= np.maximum(norms[sorted_rows], 1e-12) * max(float(np.linalg.norm(query)), 1e-12)
+    # Back to the caller's order
+    return scores[np.searchsorted(sorted_rows, rows)]
@@ -7,9 +7,32 @@ import torch
 from transformers import CLIPProcessor, CLIPModel
 from loguru import logger
 from mmct.utils.error_handler import handle_exceptions, convert_exceptions, ProviderException, ConfigurationException
+from mmct.utils.inference_backend import OnnxGraph, export_torch_module, parse_backend
 import asyncio
 
 
+class _ImageFeatures(torch.nn.Module):
+    """get_image_features as a module, for ONNX export."""
+
+    def __init__(self, model: CLIPModel):
+        super().__init__()
+        self.model = model
+
+    def forward(self, pixel_values):
+        return self.model.get_image_features(pixel_values=pixel_values)
+
+
+class _TextFeatures(torch.nn.Module):
+    """get_text_features as a module, for ONNX export."""
+
+    def __init__(self, model: CLIPModel):
+        super().__init__()
+        self.model = model
+
+    def forward(self, input_ids, attention_mask):
+        return self.model.get_text_features(input_ids=input_ids, attention_mask=attention_mask)
+
+
 class CustomImageEmbeddingProvider(ImageEmbeddingProvider):
     """CLIP-based image and text embedding provider implementation."""
 
@@ -23,6 +46,8 @@ class CustomImageEmbeddingProvider(ImageEmbeddingProvider):
                 - device: Device to use - "auto", "cpu", or "cuda" (default: "auto")
                 - max_image_size: Maximum image dimension (default: 224)
                 - batch_size: Batch size for processing (default: 8)
+                - backend: "torch", "onnx", "onnx-int8", "openvino" or "openvino-int8" (default: "torch");
+                  non-torch backends run on CPU
                 
         Note:
             Embeddings are always L2 normalized for optimal CLIP performance.
@@ -33,17 +58,23 @@ class CustomImageEmbeddingProvider(ImageEmbeddingProvider):
 
         self.config = config
         self.model_name = config.get("model_name", "openai/clip-vit-base-patch32")
+        self.backend = parse_backend(config.get("backend"))
         self.device = self._get_device()
         self.max_image_size = config.get("max_image_size", 224)
         self.batch_size = config.get("batch_size", 8)
 
         self.model: Optional[CLIPModel] = None
         self.processor: Optional[CLIPProcessor] = None
+        self._image_graph: Optional[OnnxGraph] = None
+        self._text_graph: Optional[OnnxGraph] = None
         self._initialize_model()
 
     def _get_device(self) -> str:
         """Determine the best device to use."""
         device_config = self.config.get("device", "auto")
+        if not self.backend.is_torch:
+            # ONNX Runtime and OpenVINO backends are CPU-only here
+            return "cpu"
 
         if device_config == "auto":
             return "cuda" if torch.cuda.is_available() else "cpu"
@@ -62,12 +93,43 @@ class CustomImageEmbeddingProvider(ImageEmbeddingProvider):
             self.model = self.model.to(self.device)
             self.model.eval()
 
-            logger.info("CLIP model initialized successfully")
+            if not self.backend.is_torch:
+                self._initialize_graphs()
+                # The exported graphs replace the eager model
+                self.model = None
+
+            logger.info(f"CLIP model initialized successfully ({self.backend} backend)")
 
         except Exception as e:
             logger.error(f"Failed to initialize CLIP model: {e}")
             raise ConfigurationException(f"Failed to initialize CLIP model: {e}")
 
+    def _initialize_graphs(self):
+        """Export the image and text towers for the configured ONNX Runtime/OpenVINO backend."""
+        image_size = getattr(getattr(self.model.config, "vision_config", None), "image_size", 224)
+        pixel_values = torch.zeros(1, 3, image_size, image_size)
+        self._image_graph = export_torch_module(
+            _ImageFeatures(self.model), (pixel_values,),
+            input_names=["pixel_values"], output_names=["image_embeds"],
+            dynamic_axes={"pixel_values": {0: "batch"}, "image_embeds": {0: "batch"}},
+            model_name=f"{self.model_name}/image", backend=self.backend,
+        )
+        text = self.processor(text=["a photo"], return_tensors="pt", padding=True)
+        self._text_graph = export_torch_module(
+            _TextFeatures(self.model), (text["input_ids"], text["attention_mask"]),
+            input_names=["input_ids", "attention_mask"], output_names=["text_embeds"],
+            dynamic_axes={
+                "input_ids": {0: "batch", 1: "sequence"},
+                "attention_mask": {0: "batch", 1: "sequence"},
+                "text_embeds": {0: "batch"},
+            },
+            model_name=f"{self.model_name}/text", backend=self.backend,
+        )
+
+    @staticmethod
+    def _normalize(features: np.ndarray) -> np.ndarray:
+        return features / np.linalg.norm(features, axis=-1, keepdims=True)
+
     def _load_and_preprocess_image(self, image: Union[str, Image.Image]) -> Optional[Image.Image]:
         """
         Load and preprocess an image.
@@ -106,6 +168,11 @@ class CustomImageEmbeddingProvider(ImageEmbeddingProvider):
             NumPy array of embeddings
         """
         try:
+            if self._image_graph is not None:
+                inputs = self.processor(images=images, return_tensors="np", padding=True)
+                (features,) = self._image_graph(pixel_values=inputs["pixel_values"].astype(np.float32))
+                return self._normalize(np.asarray(features))
+
             # Process images
             inputs = self.processor(images=images, return_tensors="pt", padding=True)
             inputs = {k: v.to(self.device) for k, v in inputs.items()}
@@ -207,6 +274,14 @@ class CustomImageEmbeddingProvider(ImageEmbeddingProvider):
             NumPy array of embeddings
         """
         try:
+            if self._text_graph is not None:
+                inputs = self.processor(text=texts, return_tensors="np", padding=True)
+                (features,) = self._text_graph(
+                    input_ids=inputs["input_ids"].astype(np.int64),
+                    attention_mask=inputs["attention_mask"].astype(np.int64),
+                )
+                return self._normalize(np.asarray(features))
+
             # Process texts
             inputs = self.processor(text=texts, return_tensors="pt", padding=True)
             inputs = {k: v.to(self.device) for k, v in inputs.items()}
@@ -290,6 +365,9 @@ class CustomImageEmbeddingProvider(ImageEmbeddingProvider):
                 del self.processor
                 self.processor = None
 
+            self._image_graph = None
+            self._text_graph = None
+
             if torch.cuda.is_available():
                 torch.cuda.empty_cache()
 
@@ -0,0 +1,166 @@
+from loguru import logger
+from typing import Dict, Any, List, Optional, Tuple
+import asyncio
+import io
+import os
+import threading
+from mmct.providers.base import TranscriptionProvider
+from mmct.utils.error_handler import ProviderException, ConfigurationException, handle_exceptions, convert_exceptions
+
+
+class LocalWhisperTranscriptionProvider(TranscriptionProvider):
+    """
+    Offline Whisper transcription provider running on the local CPU via faster-whisper (CTranslate2).
+
+    Nothing leaves the machine, so it works in air-gapped environments and in tests. Long audio is
+    split by the engine's VAD into speech windows which are decoded in batches.
+    """
+
+    # Loaded models are shared by all provider instances in the process, keyed by their settings
+    _models: Dict[Tuple, Any] = {}
+    _models_lock = threading.Lock()
+
+    def __init__(self, config: Dict[str, Any]):
+        """
+        Initialize the local transcription provider.
+
+        Args:
+            config: Dict with the following optional keys:
+                - local_model: Model size or path to a converted model directory (default: "small")
+                - local_device: "cpu", "cuda" or "auto" (default: "cpu")
+                - local_compute_type: CTranslate2 compute type (default: "int8")
+                - local_cpu_threads: Threads used per decoding worker, 0 lets the engine decide (default: 0)
+                - local_num_workers: Number of transcriptions that may run in parallel (default: 1)
+                - local_batch_size: Speech windows decoded per batch, 1 disables batching (default: 8)
+                - local_beam_size: Beam size used for decoding (default: 5)
+        """
+        self.config = config
+        self.model_name = config.get("local_model") or "small"
+        self.device = config.get("local_device") or "cpu"
+        self.compute_type = config.get("local_compute_type") or "int8"
+        self.cpu_threads = int(config.get("local_cpu_threads") or 0)
+        self.num_workers = max(1, int(config.get("local_num_workers") or 1))
+        self.batch_size = max(1, int(config.get("local_batch_size") or 8))
+        self.beam_size = int(config.get("local_beam_size") or 5)
+        self._slots = asyncio.Semaphore(self.num_workers)
+        self.model = self._initialize_model()
+
+    def _initialize_model(self):
+        """Load (or reuse) the faster-whisper model."""
+        try:
+            from faster_whisper import WhisperModel
+        except ImportError as e:
+            raise ConfigurationException(
+                "Local transcription requires the 'faster-whisper' package. "
+                "Install it with: pip install faster-whisper"
+            ) from e
+
+        key = (self.model_name, self.device, self.compute_type, self.cpu_threads, self.num_workers)
+        with self._models_lock:
+            if key not in self._models:
+                try:
+                    logger.info(
+                        f"Loading local Whisper model '{self.model_name}' on {self.device} "
+                        f"({self.compute_type}, cpu_threads={self.cpu_threads}, workers={self.num_workers})"
+                    )
+                    self._models[key] = WhisperModel(
+                        self.model_name,
+                        device=self.device,
+                        compute_type=self.compute_type,
+                        cpu_threads=self.cpu_threads,
+                        num_workers=self.num_workers,
+                    )
+                except Exception as e:
+                    raise ProviderException(f"Failed to load local Whisper model: {e}")
+            return self._models[key]
+
+    @staticmethod
+    def _language_code(language: Optional[str]) -> Optional[str]:
+        """Whisper expects ISO 639-1 codes; strip locale suffixes such as 'en-IN'."""
+        if not language:
+            return None
+        return language.split("-")[0].lower()
+
+    def _transcribe_sync(self, audio: Any, language: Optional[str], task: str) -> List[Any]:
+        """Run the blocking decode; segments are a lazy generator, so consume them here."""
+        options = {
+            "language": self._language_code(language),
+            "task": task,
+            "beam_size": self.beam_size,
+            "vad_filter": True,
+        }
+        if self.batch_size > 1:
+            from faster_whisper import BatchedInferencePipeline
+
+            pipeline = BatchedInferencePipeline(model=self.model)
+            segments, info = pipeline.transcribe(audio, batch_size=self.batch_size, **options)
+        else:
+            segments, info = self.model.transcribe(audio, **options)
+        segments = [segment for segment in segments if segment.text.strip()]
+        logger.info(
+            f"Local transcription finished: {len(segments)} segments, "
+            f"{info.duration:.1f}s audio, language={info.language}"
+        )
+        return segments
+
+    async def _run(self, audio: Any, language: Optional[str], response_format: str, task: str) -> str:
+        async with self._slots:
+            segments = await asyncio.to_thread(self._transcribe_sync, audio, language, task)
+        if response_format == "srt":
+            # Imported here: the video pipeline package imports the providers at load time
+            from mmct.video_pipeline.core.ingestion.transcription.windowed_transcription import (
+                TranscriptEntry,
+                format_srt,
+            )
+
+            return format_srt(
+                [TranscriptEntry(start=segment.start, end=segment.end, text=segment.text.strip()) for segment in segments]
+            )
+        return " ".join(segment.text.strip() for segment in segments)
+
+    @handle_exceptions(retries=1, exceptions=(Exception,))
+    @convert_exceptions({Exception: ProviderException})
+    async def transcribe(self, audio_data: bytes, language: str = None, **kwargs) -> str:
+        """Transcribe audio bytes locally."""
+        try:
+            return await self._run(
+                io.BytesIO(audio_data),
+                language,
+                kwargs.get("response_format", "text"),
+                kwargs.get("task", "transcribe"),
+            )
+        except Exception as e:
+            logger.error(f"Local transcription failed: {e}")
+            raise ProviderException(f"Local transcription failed: {e}")
+
+    @handle_exceptions(retries=1, exceptions=(Exception,))
+    @convert_exceptions({Exception: ProviderException})
+    async def transcribe_file(self, audio_path: str, language: str = None, **kwargs) -> str:
+        """
+        Transcribe an audio file locally.
+
+        Args:
+            audio_path: Path to the audio file
+            language: Optional language code; detected automatically when omitted
+            **kwargs: response_format ("srt" or "text", default "srt") and task
+                ("transcribe" or "translate", default "transcribe")
+
+        Returns:
+            Transcript in SRT format, or plain text when response_format is "text"
+        """
+        try:
+            if not os.path.exists(audio_path):
+                raise FileNotFoundError(f"Audio file not found: {audio_path}")
+            return await self._run(
+                audio_path,
+                language,
+                kwargs.get("response_format", "srt"),
+                kwargs.get("task", "transcribe"),
+            )
+        except Exception as e:
+            logger.error(f"Local file transcription failed: {e}")
+            raise ProviderException(f"Local file transcription failed: {e}")
+
+    async def close(self):
+        """Models are shared across instances and stay loaded; nothing to release per instance."""
+        logger.info("Closing local transcription provider")
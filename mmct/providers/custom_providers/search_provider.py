@@ -3,7 +3,7 @@ from typing import Dict, Any, List
 from mmct.utils.error_handler import ProviderException
 from mmct.utils.error_handler import handle_exceptions, convert_exceptions
 from loguru import logger
-from mmct.providers.custom_providers.graph_rag.document_graph_handler import DocumentGraph
+from mmct.providers.custom_providers.graph_rag.document_graph_handler import get_document_graph
 
 
 class CustomSearchProvider(SearchProvider):
@@ -15,7 +15,7 @@ class CustomSearchProvider(SearchProvider):
     def _initialize_client(self):
         """Initialize Custom Search client."""
         try:
-            self.client = DocumentGraph()
+            self.client = get_document_graph()
         except Exception as e:
             raise ProviderException(f"Failed to initialize Custom Search client: {e}")
 
@@ -105,4 +105,8 @@ class CustomSearchProvider(SearchProvider):
         Not implemented for CustomSearchProvider.
         """
         logger.warning("Document existence check not implemented for CustomSearchProvider (GraphRAG)")
-        return False
\ No newline at end of file
+        return False
+
+    async def close(self):
+        """Save the shared FAISS index if this process added videos since its last save."""
+        self.client.flush()
\ No newline at end of file
@@ -1,13 +1,21 @@
+import asyncio
+import mmap
 import os
 import base64
+import shutil
+import threading
+from collections import OrderedDict
 import aiofiles
 from pathlib import Path
 from urllib.parse import urlparse
 from loguru import logger
-from typing import Dict, Any
-from mmct.providers.base import StorageProvider
+from typing import Dict, Any, Optional, Sequence, Tuple
+from mmct.providers.base import PackIndex, StorageProvider, UploadItem, UploadReport
+from mmct.providers.base.packed_files import PACK_INDEX_NAME
+from mmct.providers.base.storage_provider import upload_window, upload_window_size
 from mmct.utils.error_handler import handle_exceptions, convert_exceptions
 from mmct.utils.error_handler import ProviderException
+from mmct.utils.streaming_download import copy_file_to_file
 
 
 class LocalStorageProvider(StorageProvider):
@@ -25,6 +33,9 @@ class LocalStorageProvider(StorageProvider):
         self.config = config
         self.base_path = Path("./local_storage").resolve()
         self.base_path.mkdir(parents=True, exist_ok=True)
+        # Open read-only maps of pack shards, keyed by path and validated against (size, mtime)
+        self._maps: "OrderedDict[str, Tuple[Tuple[int, int], mmap.mmap]]" = OrderedDict()
+        self._maps_lock = threading.Lock()
         logger.info(f"LocalStorageProvider initialized at {self.base_path}")
 
     def _get_file_path(self, folder: str, file_name: str) -> Path:
@@ -97,6 +108,32 @@ class LocalStorageProvider(StorageProvider):
             logger.error(f"Error uploading string content: {e}")
             raise ProviderException(str(e))
 
+    async def save_files(
+        self,
+        items: Sequence[UploadItem],
+        folder_name: str,
+        max_in_flight: Optional[int] = None,
+        raise_on_error: bool = True,
+    ) -> UploadReport:
+        """Copy or write many files into a folder through the same sliding window as remote providers."""
+
+        def write_one(item: UploadItem) -> None:
+            dest_path = self._get_file_path(folder=folder_name, file_name=item.file_name)
+            # Write beside and rename, so a reader never maps a half-written or truncated file
+            tmp_path = dest_path.with_name(f"{dest_path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            if item.data is not None:
+                tmp_path.write_bytes(item.data)
+            else:
+                shutil.copyfile(item.src_file_path, tmp_path)
+            os.replace(tmp_path, dest_path)
+
+        async def upload_one(item: UploadItem) -> str:
+            await asyncio.to_thread(write_one, item)
+            return await self.get_file_url(file_name=item.file_name, folder_name=folder_name)
+
+        report = await upload_window(items, upload_one, max_in_flight or upload_window_size())
+        return self._finish_upload(report, raise_on_error)
+
     @handle_exceptions(retries=3, exceptions=(Exception,))
     @convert_exceptions({Exception: ProviderException})
     async def save_to_file(self, file_name: str, download_path: str, **kwargs) -> str:
@@ -110,9 +147,7 @@ class LocalStorageProvider(StorageProvider):
             dst_path = Path(download_path)
             dst_path.parent.mkdir(parents=True, exist_ok=True)
 
-            async with aiofiles.open(src_path, "rb") as src, aiofiles.open(dst_path, "wb") as dst:
-                while chunk := await src.read(1024 * 1024):
-                    await dst.write(chunk)
+            await copy_file_to_file(str(src_path), str(dst_path))
 
             logger.info(f"Downloaded {src_path} to {dst_path}")
             return str(dst_path)
@@ -140,9 +175,7 @@ class LocalStorageProvider(StorageProvider):
             save_folder.mkdir(parents=True, exist_ok=True)
             local_path = save_folder / file_path.name
 
-            async with aiofiles.open(file_path, "rb") as src, aiofiles.open(local_path, "wb") as dst:
-                while chunk := await src.read(1024 * 1024):
-                    await dst.write(chunk)
+            await copy_file_to_file(str(file_path), str(local_path))
 
             logger.info(f"Copied from {file_path} to {local_path}")
             return str(local_path)
@@ -155,6 +188,11 @@ class LocalStorageProvider(StorageProvider):
     async def load_file_to_memory(self, folder: str, file_name: str) -> bytes:
         """Load a local file) into memory as bytes."""
         try:
+            # Files of a packed directory are a slice of their mapped shard
+            packed = await self.load_packed_file(folder, file_name)
+            if packed is not None:
+                return packed
+
             file_path = self._get_file_path(folder=folder, file_name=file_name)
             if not file_path.exists():
                 raise FileNotFoundError(f"File not found: {file_path}")
@@ -168,6 +206,32 @@ class LocalStorageProvider(StorageProvider):
             logger.error(f"Error loading file into memory: {e}")
             raise ProviderException(str(e))
 
+    async def load_file_range(self, folder: str, file_name: str, offset: int, length: int) -> bytes:
+        """Load length bytes at offset of a file through a cached memory map."""
+        return await asyncio.to_thread(self._read_mapped, str(self._get_file_path(folder, file_name)), offset, length)
+
+    def _read_mapped(self, path: str, offset: int, length: int) -> bytes:
+        stat = os.stat(path)
+        version = (stat.st_size, stat.st_mtime_ns)
+        with self._maps_lock:
+            cached = self._maps.get(path)
+            if cached is None or cached[0] != version:
+                with open(path, "rb") as f:
+                    cached = (version, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+                self._maps[path] = cached
+            self._maps.move_to_end(path)
+            # Evicted maps are not closed here; they unmap once no reader holds them
+            while len(self._maps) > int(os.getenv("LOCAL_STORAGE_MAX_MAPS", "64")):
+                self._maps.popitem(last=False)
+        return cached[1][offset:offset + length]
+
+    async def _load_pack_index(self, folder: str, directory: str) -> Optional[PackIndex]:
+        index_path = self.base_path / folder / directory / PACK_INDEX_NAME
+        if not index_path.exists():
+            return None
+        async with aiofiles.open(index_path, "rb") as f:
+            return PackIndex(await f.read())
+
     async def close(self):
         """No-op for local provider (for interface consistency)."""
         logger.debug("LocalStorageProvider closed (no-op).")
@@ -28,7 +28,8 @@ from ..utils.error_handler import ConfigurationException
 from .custom_providers import (
     CustomSearchProvider,
     LocalFaissSearchProvider,
-    LocalStorageProvider
+    LocalStorageProvider,
+    LocalWhisperTranscriptionProvider
 )
 from ..config.settings import MMCTConfig
 
@@ -332,4 +333,7 @@ class ProviderFactory:
 
 
 # Global provider factory instance
-provider_factory = ProviderFactory()
\ No newline at end of file
+provider_factory = ProviderFactory()
+
+# Offline CPU transcription (faster-whisper); the engine is only imported when the provider is created
+provider_factory.register_transcription_provider('local', LocalWhisperTranscriptionProvider)
\ No newline at end of file
@@ -0,0 +1 @@
+"""Application service test modules."""
@@ -0,0 +1,135 @@
+"""
+Tests for SQLiteIngestionQueue.
+Covers visibility timeouts, retry backoff, dead-lettering and stale receipts. The queue
+reads time.time(), which is replaced by a manual clock.
+"""
+
+import asyncio
+import types
+
+import pytest
+
+from app.utilities import ingestion_queue
+from app.utilities.ingestion_queue import SQLiteIngestionQueue
+
+
+class ManualClock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def time(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = ManualClock()
+    monkeypatch.setattr(ingestion_queue, "time", types.SimpleNamespace(time=clock.time))
+    return clock
+
+
+@pytest.fixture
+def queue(tmp_path, clock):
+    queue = SQLiteIngestionQueue(str(tmp_path / "queue.db"), max_attempts=3, retry_backoff_seconds=30)
+    yield queue
+    asyncio.run(queue.close())
+
+
+def _receive(queue, max_messages=10, visibility_timeout=60):
+    return asyncio.run(queue.receive(max_messages, visibility_timeout))
+
+
+def test_received_message_is_hidden_until_visibility_timeout(queue, clock):
+    message_id = asyncio.run(queue.send({"video_id": "v1"}))
+
+    [message] = _receive(queue)
+    assert (message.message_id, message.payload, message.attempts) == (message_id, {"video_id": "v1"}, 1)
+    assert _receive(queue) == []
+
+    clock.advance(59)
+    asyncio.run(queue.extend_visibility(message, 60))
+    clock.advance(30)
+    assert _receive(queue) == []
+
+    clock.advance(31)
+    [redelivered] = _receive(queue)
+    assert redelivered.attempts == 2
+    assert redelivered.receipt != message.receipt
+
+
+def test_stale_receipt_is_ignored(queue, clock):
+    asyncio.run(queue.send({"video_id": "v1"}))
+    [first] = _receive(queue)
+    clock.advance(61)
+    [second] = _receive(queue)
+
+    # The first consumer finishes late; its ack, nack and extension no longer apply
+    asyncio.run(queue.ack(first))
+    asyncio.run(queue.nack(first, "late failure"))
+    asyncio.run(queue.extend_visibility(first, 600))
+    clock.advance(61)
+    [third] = _receive(queue)
+    assert third.attempts == 3
+
+    asyncio.run(queue.ack(third))
+    clock.advance(3600)
+    assert _receive(queue) == []
+    assert queue.dead_letters() == []
+
+
+def test_nack_backs_off_exponentially_then_dead_letters(queue, clock):
+    message_id = asyncio.run(queue.send({"video_id": "v1"}))
+
+    [message] = _receive(queue)
+    asyncio.run(queue.nack(message, "first failure"))
+    clock.advance(29)
+    assert _receive(queue) == []
+    clock.advance(1)
+    [message] = _receive(queue)
+
+    asyncio.run(queue.nack(message, "second failure"))
+    clock.advance(59)
+    assert _receive(queue) == []
+    clock.advance(1)
+    [message] = _receive(queue)
+    assert message.attempts == 3
+
+    asyncio.run(queue.nack(message, "third failure"))
+    clock.advance(3600)
+    assert _receive(queue) == []
+    assert queue.dead_letters() == [
+        {"message_id": message_id, "payload": {"video_id": "v1"}, "attempts": 3, "error": "third failure"}
+    ]
+
+    assert queue.requeue_dead_letter(message_id)
+    assert not queue.requeue_dead_letter(message_id)
+    [message] = _receive(queue)
+    assert message.attempts == 1
+    assert queue.dead_letters() == []
+
+
+def test_expired_last_attempt_is_dead_lettered(tmp_path, clock):
+    queue = SQLiteIngestionQueue(str(tmp_path / "queue.db"), max_attempts=1)
+    try:
+        message_id = asyncio.run(queue.send({"video_id": "v1"}))
+        assert len(_receive(queue)) == 1
+
+        # The consumer died without acking its only allowed attempt
+        clock.advance(61)
+        assert _receive(queue) == []
+        [dead] = queue.dead_letters()
+        assert (dead["message_id"], dead["error"]) == (message_id, "visibility timeout expired")
+    finally:
+        asyncio.run(queue.close())
+
+
+def test_receive_respects_max_messages_in_order(queue, clock):
+    for idx in range(3):
+        asyncio.run(queue.send({"idx": idx}))
+        clock.advance(1)
+
+    assert [m.payload["idx"] for m in _receive(queue, max_messages=2)] == [0, 1]
+    assert [m.payload["idx"] for m in _receive(queue, max_messages=2)] == [2]
@@ -0,0 +1 @@
+"""Ingestion pipeline test modules."""
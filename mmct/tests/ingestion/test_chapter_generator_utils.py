@@ -0,0 +1,123 @@
+"""
+Tests for the tree-merge helpers in chapter_generator.utils.
+Covers grouping by fan-in and token budget, failed merges, and truncation.
+"""
+
+import asyncio
+
+import pytest
+
+from mmct.video_pipeline.core.ingestion.chapter_generator import utils
+from mmct.video_pipeline.core.ingestion.chapter_generator.utils import (
+    TreeReduceError,
+    group_by_token_budget,
+    tree_reduce,
+    truncate_to_tokens,
+)
+
+
+@pytest.fixture
+def char_tokens(monkeypatch):
+    # Use the ~4 characters/token estimate so results don't depend on tiktoken being installed
+    monkeypatch.setattr(utils, "_get_token_encoding", lambda: None)
+
+
+def _join(group):
+    return "(" + "+".join(group) + ")"
+
+
+def test_group_by_fan_in():
+    assert group_by_token_budget(list("abcdefg"), max_fan_in=3) == [["a", "b", "c"], ["d", "e", "f"], ["g"]]
+    # A fan-in below two would never shrink the input
+    assert group_by_token_budget(list("abc"), max_fan_in=1) == [["a", "b"], ["c"]]
+
+
+def test_group_by_token_budget():
+    sizes = {"a": 5, "b": 5, "c": 5, "d": 20, "e": 1}
+    groups = group_by_token_budget(list("abcde"), max_fan_in=10, token_budget=12, size_fn=sizes.get)
+    assert groups == [["a", "b"], ["c", "d"], ["e"]]
+    # Items over the budget on their own are still paired, so every level shrinks
+    assert group_by_token_budget(["d", "d", "d"], max_fan_in=10, token_budget=12, size_fn=sizes.get) == [
+        ["d", "d"],
+        ["d"],
+    ]
+
+
+def test_tree_reduce_preserves_order():
+    async def merge(group):
+        return _join(group)
+
+    result = asyncio.run(tree_reduce(list("abcde"), merge, max_fan_in=2))
+    assert result == "(((a+b)+(c+d))+e)"
+
+
+def test_tree_reduce_carries_inputs_of_failed_merge():
+    calls = []
+
+    async def merge(group):
+        calls.append(list(group))
+        if group == ["c", "d"]:
+            return None
+        return _join(group)
+
+    result = asyncio.run(tree_reduce(list("abcdef"), merge, max_fan_in=2))
+    # c and d reach the next level unmerged and are merged there with their neighbours
+    assert result == "(((a+b)+c)+(d+(e+f)))"
+    assert ["c", "d"] in calls
+
+
+def test_tree_reduce_limits_concurrency():
+    in_flight = {"now": 0, "peak": 0}
+
+    async def merge(group):
+        in_flight["now"] += 1
+        in_flight["peak"] = max(in_flight["peak"], in_flight["now"])
+        await asyncio.sleep(0.01)
+        in_flight["now"] -= 1
+        return _join(group)
+
+    asyncio.run(tree_reduce([str(i) for i in range(20)], merge, max_fan_in=2, max_concurrency=3))
+    assert in_flight["peak"] == 3
+
+
+def test_tree_reduce_raises_without_progress():
+    async def merge(group):
+        return None
+
+    with pytest.raises(TreeReduceError) as excinfo:
+        asyncio.run(tree_reduce(list("abcd"), merge, max_fan_in=2))
+    assert excinfo.value.items == list("abcd")
+
+
+def test_tree_reduce_partial_items_after_progress():
+    async def merge(group):
+        # Only the first level's merges succeed
+        return None if any(item.startswith("(") for item in group) else _join(group)
+
+    with pytest.raises(TreeReduceError) as excinfo:
+        asyncio.run(tree_reduce(list("abcd"), merge, max_fan_in=2))
+    assert excinfo.value.items == ["(a+b)", "(c+d)"]
+
+
+def test_tree_reduce_pass_through_result():
+    # An empty collection is a result, not a failure, so it replaces its group
+    async def merge(group):
+        return [] if group == [["x"], ["y"]] else [obj for item in group for obj in item]
+
+    result = asyncio.run(tree_reduce([["x"], ["y"], ["z"]], merge, max_fan_in=2))
+    assert result == ["z"]
+
+
+def test_tree_reduce_trivial_inputs():
+    async def merge(group):
+        raise AssertionError("nothing to merge")
+
+    assert asyncio.run(tree_reduce([], merge)) is None
+    assert asyncio.run(tree_reduce([None, "a", None], merge)) == "a"
+
+
+def test_truncate_to_tokens(char_tokens):
+    assert truncate_to_tokens("short", 10) == "short"
+    assert truncate_to_tokens("x" * 100, 5) == "x" * 20
+    assert truncate_to_tokens("anything", 0) == ""
+    assert truncate_to_tokens("", 5) == ""
@@ -0,0 +1,138 @@
+"""
+Tests for StageGraph.
+Covers dependency ordering, concurrency of independent stages, failure cancellation,
+graph validation and resource slots.
+"""
+
+import asyncio
+
+import pytest
+
+from mmct.video_pipeline.core.ingestion.utils.resource_slots import ResourceSlots
+from mmct.video_pipeline.core.ingestion.utils.stage_graph import StageGraph
+
+
+def test_dependencies_receive_results():
+    graph = StageGraph(name="test")
+
+    async def keyframes():
+        return ["frame_0"]
+
+    async def transcript():
+        return "hello"
+
+    async def chapters(keyframes, transcript):
+        return f"{transcript}: {len(keyframes)} frames"
+
+    # Registered out of order; run() orders by dependencies
+    graph.add_stage("chapters", chapters, depends_on=("keyframes", "transcript"))
+    graph.add_stage("keyframes", keyframes)
+    graph.add_stage("transcript", transcript)
+
+    results = asyncio.run(graph.run())
+
+    assert results == {"keyframes": ["frame_0"], "transcript": "hello", "chapters": "hello: 1 frames"}
+    assert {timing["status"] for timing in graph.get_timings().values()} == {"completed"}
+
+
+def test_independent_stages_overlap():
+    in_flight = {"now": 0, "peak": 0}
+
+    async def stage():
+        in_flight["now"] += 1
+        in_flight["peak"] = max(in_flight["peak"], in_flight["now"])
+        await asyncio.sleep(0.02)
+        in_flight["now"] -= 1
+
+    graph = StageGraph(name="test")
+    graph.add_stage("keyframes", stage)
+    graph.add_stage("transcript", stage)
+    asyncio.run(graph.run())
+
+    assert in_flight["peak"] == 2
+
+
+def test_failure_cancels_running_stages_and_raises():
+    events = []
+
+    async def slow():
+        await asyncio.sleep(10)
+
+    async def failing():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("transcription failed")
+
+    async def dependent(transcript):
+        raise AssertionError("must not start")
+
+    graph = StageGraph(name="test", on_stage_event=lambda name, status: events.append((name, status)))
+    graph.add_stage("keyframes", slow)
+    graph.add_stage("transcript", failing)
+    graph.add_stage("chapters", dependent, depends_on=("transcript",))
+
+    with pytest.raises(RuntimeError, match="transcription failed"):
+        asyncio.run(graph.run())
+
+    timings = graph.get_timings()
+    assert timings["transcript"]["status"] == "failed"
+    assert timings["keyframes"]["status"] == "cancelled"
+    assert ("chapters", "running") not in events
+
+
+def test_failing_event_callback_does_not_fail_the_graph():
+    def on_stage_event(name, status):
+        raise ValueError("listener broke")
+
+    async def stage():
+        return 1
+
+    graph = StageGraph(name="test", on_stage_event=on_stage_event)
+    graph.add_stage("only", stage)
+
+    assert asyncio.run(graph.run()) == {"only": 1}
+
+
+def test_graph_validation():
+    async def stage(**_):
+        return None
+
+    graph = StageGraph(name="test")
+    graph.add_stage("a", stage)
+    with pytest.raises(ValueError, match="already registered"):
+        graph.add_stage("a", stage)
+
+    graph.add_stage("b", stage, depends_on=("missing",))
+    with pytest.raises(ValueError, match="Unknown stage dependency"):
+        asyncio.run(graph.run())
+
+    cyclic = StageGraph(name="cyclic")
+    cyclic.add_stage("a", stage, depends_on=("b",))
+    cyclic.add_stage("b", stage, depends_on=("a",))
+    with pytest.raises(ValueError, match="Cycle"):
+        asyncio.run(cyclic.run())
+
+
+def test_resource_slots_limit_stages():
+    in_flight = {"now": 0, "peak": 0}
+    events = []
+
+    async def cpu_stage():
+        in_flight["now"] += 1
+        in_flight["peak"] = max(in_flight["peak"], in_flight["now"])
+        await asyncio.sleep(0.01)
+        in_flight["now"] -= 1
+
+    async def run():
+        graph = StageGraph(
+            name="test",
+            resource_slots=ResourceSlots({"cpu": 1}),
+            on_stage_event=lambda name, status: events.append((name, status)),
+        )
+        for idx in range(3):
+            graph.add_stage(f"cpu_{idx}", cpu_stage, resource="cpu")
+        await graph.run()
+
+    asyncio.run(run())
+
+    assert in_flight["peak"] == 1
+    assert ("cpu_0", "waiting") in events
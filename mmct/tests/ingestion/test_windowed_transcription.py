@@ -0,0 +1,165 @@
+"""
+Tests for WindowedTranscriber.
+Covers window planning, overlap stitching and de-duplication, ordered streaming,
+speaker ids across windows and failure cleanup. ffmpeg is not needed: duration,
+silence detection and cutting are replaced on a subclass.
+"""
+
+import asyncio
+import os
+
+import pytest
+
+from mmct.video_pipeline.core.ingestion.transcription.windowed_transcription import (
+    TranscriptEntry,
+    WindowedTranscriber,
+    format_srt,
+    parse_srt_entries,
+)
+
+
+class FakeAudioTranscriber(WindowedTranscriber):
+    """Transcriber over a fake audio file with a fixed duration and silences."""
+
+    def __init__(self, transcribe_window, duration, silences=(), **kwargs):
+        super().__init__(transcribe_window, **kwargs)
+        self.duration = duration
+        self.silences = list(silences)
+        self.work_dirs = set()
+
+    async def get_duration(self, audio_path):
+        return self.duration
+
+    async def detect_silences(self, audio_path):
+        return self.silences
+
+    async def _cut_window(self, audio_path, window, output_dir):
+        self.work_dirs.add(output_dir)
+        return f"window_{window.index}"
+
+
+def _window_index(path):
+    return int(path.rsplit("_", 1)[1])
+
+
+# Window-relative entries per window for 25s of audio cut at 10s and 20s with 1s overlap:
+# window 0 covers 0-11s, window 1 covers 9-21s, window 2 covers 19-25s
+WINDOW_ENTRIES = {
+    0: [
+        TranscriptEntry(start=2.0, end=4.0, text="alpha", speaker_id="Guest-1"),
+        TranscriptEntry(start=9.2, end=10.4, text="bravo", speaker_id="Guest-1"),
+    ],
+    1: [
+        # bravo again, from the leading overlap; its midpoint (9.8s) belongs to window 0
+        TranscriptEntry(start=0.2, end=1.4, text="bravo", speaker_id="Guest-1"),
+        TranscriptEntry(start=6.0, end=8.0, text="charlie", speaker_id="Guest-1"),
+        # Midpoint 19.95s: owned by window 1
+        TranscriptEntry(start=10.4, end=11.5, text="Delta  echo", speaker_id="Guest-2"),
+    ],
+    2: [
+        # The same words with slightly later timestamps: midpoint 20.15s is owned by window 2
+        TranscriptEntry(start=0.5, end=1.8, text="delta echo", speaker_id="Guest-1"),
+        TranscriptEntry(start=3.0, end=5.0, text="foxtrot", speaker_id="Guest-1"),
+    ],
+}
+
+
+def _transcriber(transcribe_window=None, **kwargs):
+    async def default_transcribe_window(path):
+        index = _window_index(path)
+        # Later windows finish first, so streaming has to hold them back
+        await asyncio.sleep(0.01 * (3 - index))
+        return [TranscriptEntry(**vars(entry)) for entry in WINDOW_ENTRIES[index]]
+
+    kwargs.setdefault("window_seconds", 10)
+    kwargs.setdefault("overlap_seconds", 1)
+    return FakeAudioTranscriber(transcribe_window or default_transcribe_window, duration=25.0, **kwargs)
+
+
+def test_plan_windows_prefers_silences():
+    transcriber = _transcriber(silences=[(11.0, 11.4), (30.0, 31.0)])
+    windows = transcriber.plan_windows(25.0, transcriber.silences)
+
+    # The first cut moves to the middle of the nearby silence, the second has none in reach
+    assert [(w.owned_start, w.owned_end) for w in windows] == [(0.0, 11.2), (11.2, 21.2), (21.2, float("inf"))]
+    assert windows[0].start == 0.0 and windows[0].end == pytest.approx(12.2)
+    assert windows[1].start == pytest.approx(10.2) and windows[-1].end == 25.0
+
+
+def test_stitching_drops_overlap_duplicates_and_streams_in_order():
+    batches = []
+
+    async def on_segments(batch):
+        batches.append([entry.text for entry in batch])
+
+    transcriber = _transcriber()
+    entries = asyncio.run(transcriber.transcribe("audio.wav", on_segments=on_segments))
+
+    assert [entry.text for entry in entries] == ["alpha", "bravo", "charlie", "Delta  echo", "foxtrot"]
+    assert [(entry.start, entry.end) for entry in entries][2:] == [(15.0, 17.0), (19.4, 20.5), (22.0, 24.0)]
+    assert batches == [["alpha", "bravo"], ["charlie", "Delta  echo"], ["foxtrot"]]
+    # Speaker labels are per window session, so they are dropped once audio spans windows
+    assert {entry.speaker_id for entry in entries} == {None}
+    assert not any(os.path.exists(path) for path in transcriber.work_dirs)
+
+
+def test_duplicates_matched_on_source_text():
+    async def transcribe_window(path):
+        index = _window_index(path)
+        if index == 1:
+            return [TranscriptEntry(start=10.4, end=11.5, text="Hello there", source_text="namaste ji")]
+        if index == 2:
+            # Translated differently, but the same source words at an overlapping time
+            return [TranscriptEntry(start=0.5, end=1.8, text="Hi there", source_text="Namaste  ji")]
+        return []
+
+    entries = asyncio.run(_transcriber(transcribe_window).transcribe("audio.wav"))
+
+    assert [entry.text for entry in entries] == ["Hello there"]
+
+
+def test_single_window_keeps_speaker_ids():
+    async def transcribe_window(path):
+        assert path == "audio.wav"
+        return [TranscriptEntry(start=1.0, end=2.0, text="hi", speaker_id="Guest-1")]
+
+    transcriber = _transcriber(transcribe_window, window_seconds=60)
+    entries = asyncio.run(transcriber.transcribe("audio.wav"))
+
+    assert [(entry.text, entry.speaker_id) for entry in entries] == [("hi", "Guest-1")]
+    assert transcriber.work_dirs == set()
+
+
+def test_failed_window_cancels_siblings_before_cleanup():
+    cancelled = []
+
+    async def transcribe_window(path):
+        index = _window_index(path)
+        if index == 1:
+            await asyncio.sleep(0.01)
+            raise RuntimeError("window 1 failed")
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(index)
+            raise
+        return []
+
+    transcriber = _transcriber(transcribe_window)
+    with pytest.raises(RuntimeError, match="window 1 failed"):
+        asyncio.run(transcriber.transcribe("audio.wav"))
+
+    assert sorted(cancelled) == [0, 2]
+    assert transcriber.work_dirs and not any(os.path.exists(path) for path in transcriber.work_dirs)
+
+
+def test_srt_round_trip():
+    entries = [
+        TranscriptEntry(start=0.0, end=1.5, text="first line"),
+        TranscriptEntry(start=3661.25, end=3662.0, text="second\nline"),
+    ]
+
+    srt = format_srt(entries)
+
+    assert "2\n01:01:01,250 --> 01:01:02,000\nsecond\nline\n" in srt
+    assert [(e.start, e.end, e.text) for e in parse_srt_entries(srt)] == [(e.start, e.end, e.text) for e in entries]
@@ -0,0 +1,145 @@
+"""
+Tests for ChapterGraphStore.
+Covers appends, superseding a video's chapters, picking up other writers' segments and
+cutting off data left by an interrupted append. Separate ChapterGraphStore instances on one
+directory stand in for separate processes.
+"""
+
+import json
+
+import numpy as np
+import pytest
+
+from mmct.providers.custom_providers.graph_rag import graph_store
+from mmct.providers.custom_providers.graph_rag.graph_store import ChapterGraphStore, open_store
+
+
+def _chapters(*texts):
+    return [{"summary": text} for text in texts]
+
+
+def _embeddings(rows, dim=4, value=1.0):
+    return np.full((rows, dim), value, dtype=np.float32)
+
+
+def _attribute_names(store, row):
+    values = dict(store.attribute_values())
+    indptr, indices = store.csr()
+    return sorted(values[i] for i in indices[indptr[row]:indptr[row + 1]])
+
+
+def test_append_and_read_back(tmp_path):
+    store = ChapterGraphStore(str(tmp_path))
+
+    ids = store.append_video(
+        "v1", _chapters("intro", "demo"), _embeddings(2), [["person:ann", "topic:ai"], ["topic:ai"]]
+    )
+    store.append_video("v2", _chapters("outro"), _embeddings(1, value=2.0), [["topic:ai", "topic:ml"]])
+
+    assert ids == ["v1_1", "v1_2"]
+    assert len(store) == 3 and store.row_count == 3
+    assert store.chapter("v1_2") == {"summary": "demo", "id": "v1_2"}
+    assert store.row_of("v2_1") == 2 and store.chapter_id_of(2) == "v2_1"
+    assert store.row_of("v2_2") is None and store.chapter("v3_1") is None
+    assert store.embeddings.shape == (3, 4) and store.embeddings[2, 0] == 2.0
+    # Attribute ids are shared across videos
+    assert store.attribute_count() == 3
+    assert _attribute_names(store, 0) == ["person:ann", "topic:ai"]
+    assert _attribute_names(store, 2) == ["topic:ai", "topic:ml"]
+
+    reopened = ChapterGraphStore(str(tmp_path))
+    assert sorted(reopened.live_chapter_ids()) == ["v1_1", "v1_2", "v2_1"]
+    assert _attribute_names(reopened, 2) == ["topic:ai", "topic:ml"]
+
+
+def test_reappending_a_video_supersedes_its_chapters(tmp_path):
+    store = ChapterGraphStore(str(tmp_path))
+    store.append_video("v1", _chapters("old 1", "old 2"), _embeddings(2), [["a"], ["b"]])
+    store.append_video("v2", _chapters("other"), _embeddings(1), [["a"]])
+
+    store.append_video("v1", _chapters("new 1"), _embeddings(1, value=3.0), [["c"]])
+
+    for current in (store, ChapterGraphStore(str(tmp_path))):
+        assert current.row_count == 4 and len(current) == 2
+        assert current.live_rows.tolist() == [False, False, True, True]
+        assert current.chapter("v1_1") == {"summary": "new 1", "id": "v1_1"}
+        assert current.chapter("v1_2") is None
+        assert current.row_of("v1_1") == 3
+        assert current.embeddings[current.row_of("v1_1"), 0] == 3.0
+        assert sorted(current.live_chapter_ids()) == ["v1_1", "v2_1"]
+
+
+def test_refresh_picks_up_other_writers(tmp_path):
+    first = ChapterGraphStore(str(tmp_path))
+    second = ChapterGraphStore(str(tmp_path))
+
+    first.append_video("v1", _chapters("one"), _embeddings(1), [["shared"]])
+    assert not second.has_video("v1")
+    assert second.refresh()
+    assert not second.refresh()
+    assert second.chapter("v1_1") == {"summary": "one", "id": "v1_1"}
+
+    # The second writer appends after the first without having refreshed since
+    first.append_video("v2", _chapters("two"), _embeddings(1), [["only-v2"]])
+    second.append_video("v3", _chapters("three"), _embeddings(1), [["shared", "only-v3"]])
+
+    first.refresh()
+    for store in (first, second):
+        assert [store.row_of(f"v{i}_1") for i in (1, 2, 3)] == [0, 1, 2]
+        assert _attribute_names(store, 1) == ["only-v2"]
+        assert _attribute_names(store, 2) == ["only-v3", "shared"]
+
+
+def test_interrupted_append_is_truncated_by_the_next_writer(tmp_path):
+    store = ChapterGraphStore(str(tmp_path))
+    store.append_video("v1", _chapters("kept"), _embeddings(1), [["a"]])
+    sizes = {name: (tmp_path / name).stat().st_size for name in (
+        graph_store.EMBEDDINGS_FILE, graph_store.EDGES_FILE, graph_store.CHAPTERS_FILE, graph_store.ATTRIBUTES_FILE,
+    )}
+
+    # A writer died after writing its data and half of its segment line
+    with open(tmp_path / graph_store.ATTRIBUTES_FILE, "ab") as f:
+        f.write(json.dumps({"id": 1, "value": "lost"}).encode() + b"\n")
+    with open(tmp_path / graph_store.EMBEDDINGS_FILE, "ab") as f:
+        f.write(_embeddings(2, value=9.0).tobytes())
+    with open(tmp_path / graph_store.EDGES_FILE, "ab") as f:
+        f.write(np.asarray([0, 1], dtype=np.int32).tobytes())
+    with open(tmp_path / graph_store.CHAPTERS_FILE, "ab") as f:
+        f.write(b'{"summary": "lost", "id": "v9_1"}\n')
+    with open(tmp_path / graph_store.SEGMENTS_FILE, "ab") as f:
+        f.write(b'{"video_id": "v9", "row_st')
+
+    # Readers ignore the torn segment and leave the files alone
+    reader = ChapterGraphStore(str(tmp_path))
+    assert reader.live_chapter_ids() == ["v1_1"] and reader.attribute_count() == 1
+    assert (tmp_path / graph_store.EMBEDDINGS_FILE).stat().st_size > sizes[graph_store.EMBEDDINGS_FILE]
+
+    reader.append_video("v2", _chapters("after"), _embeddings(1, value=5.0), [["a", "b"]])
+
+    reopened = ChapterGraphStore(str(tmp_path))
+    assert sorted(reopened.live_chapter_ids()) == ["v1_1", "v2_1"]
+    assert reopened.row_of("v2_1") == 1 and reopened.embeddings[1, 0] == 5.0
+    assert reopened.chapter("v2_1") == {"summary": "after", "id": "v2_1"}
+    assert dict(reopened.attribute_values()) == {0: "a", 1: "b"}
+    assert _attribute_names(reopened, 1) == ["a", "b"]
+    assert (tmp_path / graph_store.EMBEDDINGS_FILE).stat().st_size == sizes[graph_store.EMBEDDINGS_FILE] * 2
+
+
+def test_append_validates_embeddings(tmp_path):
+    store = ChapterGraphStore(str(tmp_path))
+    with pytest.raises(ValueError, match="one embedding row per chapter"):
+        store.append_video("v1", _chapters("a", "b"), _embeddings(1), [[], []])
+
+    store.append_video("v1", _chapters("a"), _embeddings(1), [[]])
+    with pytest.raises(ValueError, match="dimension"):
+        store.append_video("v2", _chapters("b"), _embeddings(1, dim=8), [[]])
+    assert store.live_chapter_ids() == ["v1_1"]
+
+
+def test_open_store_shares_one_store_per_directory(tmp_path, monkeypatch):
+    monkeypatch.setattr(graph_store, "_stores", {})
+
+    store = open_store(str(tmp_path / "graph"))
+
+    assert open_store(str(tmp_path / "graph" / ".." / "graph")) is store
+    assert open_store(str(tmp_path / "other")) is not store
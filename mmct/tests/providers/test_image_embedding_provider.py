@@ -7,6 +7,7 @@ import asyncio
 import json
 import os
 import numpy as np
+import pytest
 from PIL import Image
 from loguru import logger
 
@@ -217,5 +218,53 @@ async def main():
         logger.info("Provider closed and resources cleaned up")
 
 
+# Worst-image cosine similarity to the torch embeddings; int8 weights lose a little precision
+BACKEND_MIN_PARITY = {
+    "onnx": 0.99,
+    "onnx-int8": 0.95,
+    "openvino": 0.99,
+    "openvino-int8": 0.95,
+}
+
+
+def _parity_images(directory, count=6, size=224):
+    """Deterministic test images with some structure (gradients, noise, a bright square)."""
+    rng = np.random.default_rng(0)
+    ramp = np.linspace(0, 255, size, dtype=np.float32)
+    paths = []
+    for i in range(count):
+        pixels = np.stack([np.add.outer(ramp, ramp) / 2, np.tile(ramp, (size, 1)), np.tile(ramp[:, None], (1, size))], axis=-1)
+        pixels = np.roll(pixels, shift=i * 37, axis=i % 2) + rng.normal(0, 20, pixels.shape)
+        pixels[i * 20:i * 20 + 60, i * 25:i * 25 + 60] = 255
+        path = os.path.join(directory, f"parity_{i}.png")
+        Image.fromarray(np.clip(pixels, 0, 255).astype(np.uint8)).save(path)
+        paths.append(path)
+    return paths
+
+
+@pytest.mark.slow
+@pytest.mark.integration
+@pytest.mark.parametrize("backend", sorted(BACKEND_MIN_PARITY))
+def test_clip_backend_parity_with_torch(backend, tmp_path, monkeypatch):
+    """CLIP image embeddings on the ONNX Runtime/OpenVINO backends match eager PyTorch."""
+    pytest.importorskip("torch")
+    pytest.importorskip("transformers")
+    if backend.startswith("onnx"):
+        pytest.importorskip("onnxruntime")
+    else:
+        pytest.importorskip("openvino")
+        if backend.endswith("-int8"):
+            pytest.importorskip("nncf")
+    from mmct.utils.backend_benchmark import compare_backends
+
+    monkeypatch.setenv("MMCT_RUNTIME_CACHE_DIR", str(tmp_path / "runtime"))
+    images = _parity_images(str(tmp_path))
+    results = compare_backends("clip", images, [backend], batch_size=4, runs=1)
+
+    metrics = results[backend]
+    assert metrics is not None, f"The {backend} backend failed to load or run"
+    assert metrics["score"] >= BACKEND_MIN_PARITY[backend], metrics
+
+
 if __name__ == "__main__":
     asyncio.run(main())
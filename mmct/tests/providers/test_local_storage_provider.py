@@ -0,0 +1,91 @@
+"""
+Tests for LocalStorageProvider.save_files and the shared upload window.
+Covers the in-flight window, URL order, failure reporting and raise_on_error.
+"""
+
+import asyncio
+
+import pytest
+
+from mmct.providers.base import UploadItem
+from mmct.providers.base.storage_provider import upload_window
+from mmct.providers.custom_providers.storage_provider import LocalStorageProvider
+from mmct.utils.error_handler import ProviderException
+
+
+def _make_provider(tmp_path, monkeypatch):
+    # The provider stores under ./local_storage, so run each test in its own directory
+    monkeypatch.chdir(tmp_path)
+    provider = LocalStorageProvider({})
+    in_flight = {"now": 0, "peak": 0}
+    get_file_url = provider.get_file_url
+
+    async def tracked_get_file_url(file_name, **kwargs):
+        in_flight["now"] += 1
+        in_flight["peak"] = max(in_flight["peak"], in_flight["now"])
+        try:
+            await asyncio.sleep(0.01)
+            return await get_file_url(file_name, **kwargs)
+        finally:
+            in_flight["now"] -= 1
+
+    provider.get_file_url = tracked_get_file_url
+    return provider, in_flight
+
+
+def _items(tmp_path, count, missing_index):
+    items = []
+    for idx in range(count):
+        if idx == missing_index:
+            items.append(UploadItem(file_name=f"frame_{idx}.jpg", src_file_path=str(tmp_path / "missing.jpg")))
+        elif idx % 2:
+            items.append(UploadItem(file_name=f"frame_{idx}.jpg", data=f"bytes {idx}".encode()))
+        else:
+            src = tmp_path / f"src_{idx}.jpg"
+            src.write_bytes(f"file {idx}".encode())
+            items.append(UploadItem(file_name=f"frame_{idx}.jpg", src_file_path=str(src)))
+    return items
+
+
+def test_save_files_reports_failures_in_order(tmp_path, monkeypatch):
+    provider, in_flight = _make_provider(tmp_path, monkeypatch)
+    items = _items(tmp_path, count=12, missing_index=5)
+
+    report = asyncio.run(provider.save_files(items, folder_name="keyframes", max_in_flight=3, raise_on_error=False))
+
+    assert in_flight["peak"] == 3
+    assert len(report.urls) == len(items)
+    assert report.urls[5] is None
+    for idx, url in enumerate(report.urls):
+        if idx != 5:
+            assert url.endswith(f"/keyframes/frame_{idx}.jpg")
+    assert [name for name, _ in report.failures] == ["frame_5.jpg"]
+    assert (tmp_path / "local_storage" / "keyframes" / "frame_1.jpg").read_bytes() == b"bytes 1"
+    assert (tmp_path / "local_storage" / "keyframes" / "frame_2.jpg").read_bytes() == b"file 2"
+    assert report.bytes_uploaded == sum(item.size for idx, item in enumerate(items) if idx != 5)
+
+
+def test_save_files_raise_on_error(tmp_path, monkeypatch):
+    provider, _ = _make_provider(tmp_path, monkeypatch)
+    items = _items(tmp_path, count=4, missing_index=2)
+
+    with pytest.raises(ProviderException, match="frame_2.jpg"):
+        asyncio.run(provider.save_files(items, folder_name="keyframes", max_in_flight=2))
+
+    # The window drains before raising, so the other files are still written
+    for idx in (0, 1, 3):
+        assert (tmp_path / "local_storage" / "keyframes" / f"frame_{idx}.jpg").exists()
+
+
+def test_upload_window_reports_cancelled_uploads():
+    items = [UploadItem(file_name=f"frame_{idx}.jpg", data=b"x") for idx in range(3)]
+
+    async def upload_one(item):
+        if item.file_name == "frame_1.jpg":
+            raise asyncio.CancelledError()
+        return f"memory://{item.file_name}"
+
+    report = asyncio.run(upload_window(items, upload_one, max_in_flight=2))
+
+    assert report.urls == ["memory://frame_0.jpg", None, "memory://frame_2.jpg"]
+    assert report.failures == [("frame_1.jpg", "upload cancelled")]
@@ -0,0 +1,97 @@
+"""
+Tests for RelatedChapterIndex and the embedding helpers next to it.
+Covers hub and null-like attribute filtering, IDF ordering, max_related per row and
+superseded chapters.
+"""
+
+import numpy as np
+import pytest
+
+from mmct.providers.custom_providers.graph_rag.graph_store import ChapterGraphStore
+from mmct.providers.custom_providers.graph_rag.related_index import (
+    EmbeddingNorms,
+    RelatedChapterIndex,
+    cosine_scores,
+)
+
+
+def _store(tmp_path, attributes, video_id="v1"):
+    store = ChapterGraphStore(str(tmp_path))
+    _append(store, video_id, attributes)
+    return store
+
+
+def _append(store, video_id, attributes, embeddings=None):
+    if embeddings is None:
+        embeddings = np.eye(len(attributes), 4, dtype=np.float32)
+    store.append_video(video_id, [{"summary": str(i)} for i in range(len(attributes))], embeddings, attributes)
+
+
+def _related(index, row):
+    return index.related_rows(row).tolist()
+
+
+def test_hub_and_null_attributes_do_not_link(tmp_path):
+    store = _store(tmp_path, [
+        ["url:same", "None", "topic:a"],
+        ["url:same", "None", "topic:a"],
+        ["url:same", "None", "topic:b"],
+        ["url:same", "none ", "topic:b"],
+        ["url:same", "N/A"],
+    ])
+
+    # Attributes on more than two chapters are hubs
+    index = RelatedChapterIndex(store, hub_fraction=0.0, hub_min_chapters=2)
+
+    assert index.hub_attributes == 2
+    assert [_related(index, row) for row in range(5)] == [[1], [0], [3], [2], []]
+
+
+def test_rarer_shared_attributes_rank_first_and_rows_are_capped(tmp_path):
+    store = _store(tmp_path, [
+        ["common", "rare"],
+        ["common", "rare"],
+        ["common", "mid"],
+        ["common", "mid"],
+        ["common", "mid"],
+        ["common"],
+    ])
+
+    index = RelatedChapterIndex(store, max_related=2, hub_fraction=1.0, hub_min_chapters=0)
+
+    # Row 0 shares "common" with everyone and "rare" only with row 1
+    assert _related(index, 0)[0] == 1
+    assert _related(index, 2)[:2] in ([3, 4], [4, 3])
+    assert all(len(_related(index, row)) == 2 for row in range(6))
+    assert np.all(np.diff(index.indptr) == 2)
+    weights = index.weights[index.indptr[0]:index.indptr[1]]
+    assert weights[0] > weights[1]
+
+    unlimited = RelatedChapterIndex(store, max_related=32, hub_fraction=1.0, hub_min_chapters=0)
+    assert sorted(_related(unlimited, 5)) == [0, 1, 2, 3, 4]
+
+
+def test_superseded_chapters_are_not_related(tmp_path):
+    store = _store(tmp_path, [["topic:a"], ["topic:a"]])
+    _append(store, "v2", [["topic:a"]])
+    _append(store, "v1", [["topic:a"]])
+
+    index = RelatedChapterIndex(store)
+
+    # Rows 0 and 1 belong to the superseded segment of v1
+    assert [_related(index, row) for row in range(4)] == [[], [], [3], [2]]
+
+
+def test_embedding_norms_extend_and_cosine_scores_keep_order(tmp_path):
+    store = ChapterGraphStore(str(tmp_path))
+    _append(store, "v1", [[], []], np.array([[3, 4, 0, 0], [0, 0, 2, 0]], dtype=np.float32))
+    norms = EmbeddingNorms()
+    assert norms.get(store).tolist() == [5.0, 2.0]
+
+    _append(store, "v2", [[]], np.array([[1, 0, 0, 0]], dtype=np.float32))
+    assert norms.get(store).tolist() == [5.0, 2.0, 1.0]
+
+    query = np.array([1, 0, 0, 0], dtype=np.float32)
+    scores = cosine_scores(store, norms.get(store), np.array([2, 0, 1]), query)
+    assert scores.tolist() == pytest.approx([1.0, 0.6, 0.0])
+    assert cosine_scores(store, norms.get(store), np.array([], dtype=np.int64), query).shape == (0,)
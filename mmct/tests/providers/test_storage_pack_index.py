@@ -0,0 +1,90 @@
+"""
+Tests for the default StorageProvider pack index lookup.
+A missing index is cached as "not packed"; other read errors propagate and are not cached.
+"""
+
+import asyncio
+
+import pytest
+
+from mmct.providers.base.packed_files import PACK_INDEX_NAME
+from mmct.providers.base.storage_provider import StorageProvider
+from mmct.utils.error_handler import ProviderException
+
+
+class IndexReader(StorageProvider):
+    """Provider whose reads all fail with one error; records the paths it was asked for."""
+
+    def __init__(self, error):
+        self.error = error
+        self.calls = []
+
+    async def load_file_to_memory(self, folder, file_name):
+        self.calls.append(file_name)
+        raise self.error
+
+    async def get_file_url(self, file_name, **kwargs):
+        raise NotImplementedError
+
+    async def save_file(self, file_name, src_file_path, **kwargs):
+        raise NotImplementedError
+
+    async def save_base64(self, file_name, b64_str, **kwargs):
+        raise NotImplementedError
+
+    async def save_string(self, file_name, content, **kwargs):
+        raise NotImplementedError
+
+    async def save_to_file(self, file_name, download_path, **kwargs):
+        raise NotImplementedError
+
+    async def download_from_url(self, file_url, save_folder):
+        raise NotImplementedError
+
+    async def close(self):
+        pass
+
+
+def _load_packed_file(reader, file_name="video/frame_1.jpg"):
+    return asyncio.run(reader.load_packed_file("frames", file_name))
+
+
+def _raise_converted_not_found():
+    try:
+        raise FileNotFoundError("no such file")
+    except FileNotFoundError as e:
+        raise ProviderException(str(e))
+
+
+def _converted_not_found():
+    try:
+        _raise_converted_not_found()
+    except ProviderException as e:
+        return e
+
+
+@pytest.mark.parametrize(
+    "error",
+    [
+        FileNotFoundError("no such file"),
+        ProviderException("no such file", details={"original_exception": "FileNotFoundError"}),
+        _converted_not_found(),
+    ],
+)
+def test_missing_index_is_cached_as_not_packed(error):
+    reader = IndexReader(error)
+
+    assert _load_packed_file(reader) is None
+    assert _load_packed_file(reader, "video/frame_2.jpg") is None
+
+    assert reader.calls == [f"video/{PACK_INDEX_NAME}"]
+
+
+def test_failed_index_read_propagates_and_is_retried():
+    reader = IndexReader(ProviderException("connection reset"))
+
+    for _ in range(2):
+        with pytest.raises(ProviderException, match="connection reset"):
+            _load_packed_file(reader)
+
+    assert reader.calls == [f"video/{PACK_INDEX_NAME}"] * 2
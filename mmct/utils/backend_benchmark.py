@@ -0,0 +1,187 @@
+"""
+Accuracy parity and CPU throughput of the optional inference backends against PyTorch.
+
+Each model is run on the same images with the torch backend and with every requested backend:
+
+- clip: cosine similarity of image embeddings to the torch embeddings (mean and worst image)
+- trocr-*: fraction of images whose text matches torch exactly, and mean character error rate
+- yolov8s: fraction of torch detections found by the backend (same label, IoU >= 0.5)
+
+Throughput is images per second over the timed runs, after one warm-up run.
+
+Usage:
+    python -m mmct.utils.backend_benchmark clip frames/*.jpg --backends onnx onnx-int8 openvino-int8
+    python -m mmct.utils.backend_benchmark trocr-large crops/*.png --backends onnx-int8 --min-parity 0.95
+
+The exit status is 1 when any backend scores below --min-parity, so the command can gate a
+backend switch in CI.
+"""
+
+import argparse
+import importlib
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+from loguru import logger
+from PIL import Image
+
+from mmct.utils.inference_backend import parse_backend
+
+# Default minimum parity score per model family
+MIN_PARITY = {"clip": 0.99, "trocr": 0.9, "yolo": 0.9}
+
+
+def _family(model: str) -> str:
+    return "clip" if model == "clip" else "trocr" if model.startswith("trocr") else "yolo"
+
+
+def load_runner(model: str, backend: str, batch_size: int) -> Callable[[List[Image.Image]], List[Any]]:
+    """Load a model on a backend and return a function mapping a batch of images to per-image results."""
+    if model == "clip":
+        from mmct.config.settings import ImageEmbeddingConfig
+        from mmct.providers.custom_providers.image_embedding_provider import CustomImageEmbeddingProvider
+
+        config = ImageEmbeddingConfig().to_provider_config()
+        config.update(backend=backend, batch_size=batch_size, device="cpu")
+        provider = CustomImageEmbeddingProvider(config)
+        return lambda images: list(provider._generate_embeddings_sync(images))
+
+    from mmct.image_pipeline.core.models.registry import MODEL_SPECS
+
+    spec = MODEL_SPECS[model]
+    instance = getattr(importlib.import_module(spec.module), spec.class_name)(device="cpu", backend=backend)
+    return instance.predict_batch
+
+
+def _char_error_rate(reference: str, hypothesis: str) -> float:
+    if not reference:
+        return float(bool(hypothesis))
+    previous = list(range(len(hypothesis) + 1))
+    for i, ref_char in enumerate(reference, 1):
+        current = [i]
+        for j, hyp_char in enumerate(hypothesis, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ref_char != hyp_char)))
+        previous = current
+    return previous[-1] / len(reference)
+
+
+def _iou(a: Sequence[float], b: Sequence[float]) -> float:
+    # Boxes are (center x, center y, width, height)
+    ax0, ay0, ax1, ay1 = a[0] - a[2] / 2, a[1] - a[3] / 2, a[0] + a[2] / 2, a[1] + a[3] / 2
+    bx0, by0, bx1, by1 = b[0] - b[2] / 2, b[1] - b[3] / 2, b[0] + b[2] / 2, b[1] + b[3] / 2
+    inter = max(0.0, min(ax1, bx1) - max(ax0, bx0)) * max(0.0, min(ay1, by1) - max(ay0, by0))
+    union = a[2] * a[3] + b[2] * b[3] - inter
+    return inter / union if union > 0 else 0.0
+
+
+def parity(model: str, reference: List[Any], candidate: List[Any]) -> Dict[str, float]:
+    """
+    Compare a backend's per-image results to the torch results.
+
+    Returns:
+        Dict of metrics; "score" is the one checked against --min-parity
+    """
+    family = _family(model)
+    if family == "clip":
+        similarities = [
+            float(np.dot(r, c) / (np.linalg.norm(r) * np.linalg.norm(c))) for r, c in zip(reference, candidate)
+        ]
+        return {"score": min(similarities), "mean_cosine": float(np.mean(similarities))}
+
+    if family == "trocr":
+        texts = [(" ".join(r), " ".join(c)) for r, c in zip(reference, candidate)]
+        exact = sum(r == c for r, c in texts) / len(texts)
+        cer = float(np.mean([_char_error_rate(r, c) for r, c in texts]))
+        return {"score": exact, "exact_match": exact, "cer": cer}
+
+    found = total = 0
+    for ref_boxes, cand_boxes in zip(reference, candidate):
+        for label, box in ref_boxes.items():
+            total += 1
+            if label in cand_boxes and _iou(box, cand_boxes[label]) >= 0.5:
+                found += 1
+    recall = found / total if total else 1.0
+    return {"score": recall, "detection_recall": recall}
+
+
+def throughput(run: Callable[[List[Image.Image]], List[Any]], images: List[Image.Image], batch_size: int, runs: int) -> float:
+    """Images per second, best of `runs` passes over all images after a warm-up pass."""
+    batches = [images[i:i + batch_size] for i in range(0, len(images), batch_size)]
+    for batch in batches:
+        run(batch)
+    best = float("inf")
+    for _ in range(runs):
+        started = time.perf_counter()
+        for batch in batches:
+            run(batch)
+        best = min(best, time.perf_counter() - started)
+    return len(images) / best
+
+
+def compare_backends(
+    model: str, image_paths: Sequence[str], backends: Sequence[str], batch_size: int = 8, runs: int = 3
+) -> Dict[str, Optional[Dict[str, float]]]:
+    """
+    Measure parity and throughput of each backend against torch on the given images.
+
+    Returns:
+        Dict of backend spec to its metrics (None if the backend failed to load or run);
+        the torch entry holds throughput only
+    """
+    images = [Image.open(path).convert("RGB") for path in image_paths]
+    torch_run = load_runner(model, "torch", batch_size)
+    reference = [result for i in range(0, len(images), batch_size) for result in torch_run(images[i:i + batch_size])]
+    results: Dict[str, Optional[Dict[str, float]]] = {
+        "torch": {"images_per_second": throughput(torch_run, images, batch_size, runs)}
+    }
+    del torch_run
+
+    for backend in backends:
+        try:
+            run = load_runner(model, backend, batch_size)
+            candidate = [result for i in range(0, len(images), batch_size) for result in run(images[i:i + batch_size])]
+            metrics = parity(model, reference, candidate)
+            metrics["images_per_second"] = throughput(run, images, batch_size, runs)
+            results[str(parse_backend(backend))] = metrics
+        except Exception as e:
+            logger.error(f"Benchmark failed for {model} on backend '{backend}': {e}")
+            results[backend] = None
+    return results
+
+
+def main(model: str, image_paths: List[str], backends: List[str], batch_size: int, runs: int, min_parity: Optional[float]) -> int:
+    threshold = MIN_PARITY[_family(model)] if min_parity is None else min_parity
+    results = compare_backends(model, image_paths, backends, batch_size, runs)
+    baseline = results["torch"]["images_per_second"]
+
+    print(f"{'backend':<16}{'parity':>10}{'img/s':>10}{'speedup':>10}  details")
+    failed = False
+    for backend, metrics in results.items():
+        if metrics is None:
+            print(f"{backend:<16}{'failed':>10}")
+            failed = True
+            continue
+        score = metrics.pop("score", None)
+        rate = metrics.pop("images_per_second")
+        details = ", ".join(f"{name}={value:.4f}" for name, value in metrics.items())
+        score_text = "-" if score is None else f"{score:.4f}"
+        print(f"{backend:<16}{score_text:>10}{rate:>10.1f}{rate / baseline:>9.2f}x  {details}")
+        if score is not None and score < threshold:
+            failed = True
+    if failed:
+        print(f"At least one backend failed or scored below the parity threshold {threshold}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare CPU inference backends against PyTorch")
+    parser.add_argument("model", choices=["clip", "trocr-small", "trocr-base", "trocr-large", "yolov8s"])
+    parser.add_argument("images", nargs="+", help="Images to run the models on")
+    parser.add_argument("--backends", nargs="+", default=["onnx", "onnx-int8"], help="Backends to compare with torch")
+    parser.add_argument("--batch-size", type=int, default=8, help="Images per inference call")
+    parser.add_argument("--runs", type=int, default=3, help="Timed passes over the images")
+    parser.add_argument("--min-parity", type=float, default=None, help="Minimum parity score (default per model)")
+    args = parser.parse_args()
+    sys.exit(main(args.model, args.images, args.backends, args.batch_size, args.runs, args.min_parity))
@@ -0,0 +1,293 @@
+"""
+Optional CPU inference backends for the local vision models (CLIP, TrOCR, YOLOv8).
+
+Every model runs eager PyTorch by default. On CPU-only nodes a model can instead be exported
+once to ONNX and served by ONNX Runtime or OpenVINO, optionally with int8 weights. A backend is
+selected with a spec string:
+
+- ``torch`` – eager PyTorch (default)
+- ``onnx`` / ``onnx-int8`` – ONNX Runtime, fp32 or dynamically quantized to int8
+- ``openvino`` / ``openvino-int8`` – OpenVINO, fp32 or with int8-compressed weights
+
+Exports are cached under MMCT_RUNTIME_CACHE_DIR (default ~/.cache/mmct/runtime), keyed by the
+model and backend, so only the first load of a model pays for the export.
+
+The runtimes are optional dependencies (``pip install mmct[onnx]`` or ``mmct[openvino]``);
+they are imported only when a non-torch backend is requested. Accuracy and throughput against
+PyTorch can be checked with ``python -m mmct.utils.backend_benchmark``; CLIP parity is also covered
+by mmct/tests/providers/test_image_embedding_provider.py, which skips backends not installed.
+"""
+
+import os
+import re
+import shutil
+import tempfile
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+from loguru import logger
+
+from mmct.utils.error_handler import ConfigurationException
+
+BACKENDS = ("torch", "onnx", "openvino")
+
+
+@dataclass(frozen=True)
+class BackendSpec:
+    """A parsed backend spec string."""
+
+    name: str = "torch"
+    quantize: bool = False
+
+    @property
+    def is_torch(self) -> bool:
+        return self.name == "torch"
+
+    def __str__(self) -> str:
+        return f"{self.name}-int8" if self.quantize else self.name
+
+
+def parse_backend(spec: Optional[str]) -> BackendSpec:
+    """
+    Parse a backend spec such as "onnx-int8".
+
+    Raises:
+        ConfigurationException: If the backend is unknown, or int8 is requested for torch
+    """
+    value = (spec or "torch").strip().lower()
+    quantize = value.endswith("-int8")
+    name = value[: -len("-int8")] if quantize else value
+    if name not in BACKENDS:
+        raise ConfigurationException(
+            f"Unknown inference backend '{spec}'; expected one of torch, onnx, onnx-int8, openvino, openvino-int8"
+        )
+    if name == "torch" and quantize:
+        raise ConfigurationException("int8 quantization needs the onnx or openvino backend")
+    return BackendSpec(name=name, quantize=quantize)
+
+
+def backend_from_env(model_key: str, default: Optional[str] = None) -> BackendSpec:
+    """
+    Backend for one model from IMAGE_MODEL_BACKENDS ("trocr-large=onnx-int8,yolov8s=openvino"),
+    falling back to IMAGE_MODEL_BACKEND, then default, then torch.
+    """
+    for entry in os.getenv("IMAGE_MODEL_BACKENDS", "").split(","):
+        key, _, value = entry.partition("=")
+        if key.strip() == model_key and value.strip():
+            return parse_backend(value)
+    return parse_backend(os.getenv("IMAGE_MODEL_BACKEND") or default)
+
+
+def runtime_cache_dir(model_name: str, backend: BackendSpec) -> Path:
+    """Directory holding the export of a model for a backend."""
+    root = Path(os.getenv("MMCT_RUNTIME_CACHE_DIR", os.path.join(Path.home(), ".cache", "mmct", "runtime")))
+    return root / re.sub(r"[^A-Za-z0-9._-]+", "--", model_name) / str(backend)
+
+
+def _require(module: str, extra: str):
+    try:
+        return __import__(module, fromlist=["_"])
+    except ImportError as e:
+        raise ConfigurationException(
+            f"The {extra} backend needs '{module}'; install it with `pip install mmct[{extra}]`"
+        ) from e
+
+
+def quantize_onnx_dir(source_dir: Path, target_dir: Path) -> None:
+    """
+    Dynamically quantize every ONNX graph in source_dir to int8 weights, copying the other files
+    (configs, tokenizers) so target_dir loads the same way as source_dir.
+    """
+    quantization = _require("onnxruntime.quantization", "onnx")
+    target_dir.mkdir(parents=True, exist_ok=True)
+    for path in source_dir.iterdir():
+        if path.suffix == ".onnx":
+            logger.info(f"Quantizing {path.name} to int8")
+            quantization.quantize_dynamic(
+                str(path),
+                str(target_dir / path.name),
+                weight_type=quantization.QuantType.QInt8,
+                # Graphs of the large models exceed protobuf's 2 GB limit before quantization
+                use_external_data_format=any(source_dir.glob(f"{path.name}_data")),
+            )
+        elif path.is_file() and not path.name.endswith(".onnx_data"):
+            shutil.copy2(path, target_dir / path.name)
+
+
+def _export_dir(model_name: str, backend: BackendSpec, export) -> Path:
+    """
+    Run export(dir) once per (model, backend) and return the cached directory.
+
+    The export is written to a private temporary directory and renamed into place when complete,
+    so processes exporting the same model at once never see or delete each other's partial files.
+    """
+    target = runtime_cache_dir(model_name, backend)
+    marker = target / ".complete"
+    if marker.exists():
+        return target
+
+    target.parent.mkdir(parents=True, exist_ok=True)
+    staging = Path(tempfile.mkdtemp(prefix=f".{target.name}.", suffix=".tmp", dir=target.parent))
+    logger.info(f"Exporting {model_name} for the {backend} backend to {target}")
+    try:
+        export(staging)
+        (staging / ".complete").touch()
+        if target.exists() and not marker.exists():
+            # An export directory without the completion marker is incomplete; move it aside atomically first
+            stale = target.parent / f".{target.name}.{uuid.uuid4().hex}.stale"
+            try:
+                os.rename(target, stale)
+            except OSError:
+                pass
+            shutil.rmtree(stale, ignore_errors=True)
+        try:
+            os.rename(staging, target)
+        except OSError:
+            # Another process finished the same export first
+            if not marker.exists():
+                raise
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+    return target
+
+
+class OnnxGraph:
+    """
+    One exported ONNX graph served by ONNX Runtime or OpenVINO on CPU.
+
+    Call with numpy inputs by name; returns the graph outputs in order.
+    """
+
+    def __init__(self, path: Path, backend: BackendSpec, threads: Optional[int] = None):
+        self.backend = backend
+        threads = threads or int(os.getenv("MMCT_RUNTIME_THREADS", "0"))
+        if backend.name == "onnx":
+            ort = _require("onnxruntime", "onnx")
+            options = ort.SessionOptions()
+            options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+            if threads:
+                options.intra_op_num_threads = threads
+            self._session = ort.InferenceSession(str(path), options, providers=["CPUExecutionProvider"])
+            self.input_names = [i.name for i in self._session.get_inputs()]
+        else:
+            ov = _require("openvino", "openvino")
+            config = {"INFERENCE_NUM_THREADS": threads} if threads else {}
+            self._compiled = ov.Core().compile_model(str(path), "CPU", config)
+            self.input_names = [i.get_any_name() for i in self._compiled.inputs]
+
+    def __call__(self, **inputs: Any) -> List[Any]:
+        feeds = {name: inputs[name] for name in self.input_names}
+        if self.backend.name == "onnx":
+            return self._session.run(None, feeds)
+        results = self._compiled(feeds)
+        return [results[output] for output in self._compiled.outputs]
+
+
+def export_torch_module(
+    module: Any,
+    example_inputs: Sequence[Any],
+    input_names: Sequence[str],
+    output_names: Sequence[str],
+    dynamic_axes: Dict[str, Dict[int, str]],
+    model_name: str,
+    backend: BackendSpec,
+    opset: int = 17,
+) -> OnnxGraph:
+    """
+    Export a torch module to ONNX (once, cached) and load it on the requested backend.
+
+    For onnx-int8 the graph is dynamically quantized with ONNX Runtime; for openvino-int8 the
+    weights are compressed to int8 with NNCF when the graph is loaded.
+    """
+    import torch
+
+    def export_fp32(target: Path) -> None:
+        with torch.no_grad():
+            torch.onnx.export(
+                module,
+                tuple(example_inputs),
+                str(target / "model.onnx"),
+                input_names=list(input_names),
+                output_names=list(output_names),
+                dynamic_axes=dynamic_axes,
+                opset_version=opset,
+            )
+
+    fp32 = BackendSpec(name="onnx")
+    fp32_dir = _export_dir(model_name, fp32, export_fp32)
+    if backend.name == "onnx" and not backend.quantize:
+        return OnnxGraph(fp32_dir / "model.onnx", backend)
+
+    if backend.name == "onnx":
+        int8_dir = _export_dir(model_name, backend, lambda target: quantize_onnx_dir(fp32_dir, target))
+        return OnnxGraph(int8_dir / "model.onnx", backend)
+
+    def export_openvino(target: Path) -> None:
+        ov = _require("openvino", "openvino")
+        model = ov.convert_model(str(fp32_dir / "model.onnx"))
+        if backend.quantize:
+            model = _require("nncf", "openvino").compress_weights(model)
+        ov.save_model(model, str(target / "model.xml"))
+
+    return OnnxGraph(_export_dir(model_name, backend, export_openvino) / "model.xml", backend)
+
+
+def load_vision2seq(checkpoint: str, backend: BackendSpec) -> Any:
+    """
+    Encoder-decoder model (e.g. TrOCR) with generate() on the requested non-torch backend.
+
+    The model is exported through optimum, so the returned object is a drop-in replacement for
+    VisionEncoderDecoderModel in generate() calls.
+    """
+    if backend.name == "onnx":
+        modeling = _require("optimum.onnxruntime", "onnx")
+        fp32_dir = _export_dir(
+            checkpoint, BackendSpec(name="onnx"),
+            lambda target: modeling.ORTModelForVision2Seq.from_pretrained(checkpoint, export=True).save_pretrained(target),
+        )
+        model_dir = fp32_dir
+        if backend.quantize:
+            model_dir = _export_dir(checkpoint, backend, lambda target: quantize_onnx_dir(fp32_dir, target))
+        return modeling.ORTModelForVision2Seq.from_pretrained(model_dir, provider="CPUExecutionProvider")
+
+    modeling = _require("optimum.intel", "openvino")
+    model_dir = _export_dir(
+        checkpoint, backend,
+        lambda target: modeling.OVModelForVision2Seq.from_pretrained(
+            checkpoint, export=True, load_in_8bit=backend.quantize
+        ).save_pretrained(target),
+    )
+    return modeling.OVModelForVision2Seq.from_pretrained(model_dir, device="CPU")
+
+
+def export_yolo(weights: str, backend: BackendSpec) -> str:
+    """
+    Export ultralytics YOLO weights for the requested backend and return the path to load with YOLO().
+
+    ONNX exports use dynamic batch shapes so micro-batches run in one call; int8 ONNX graphs are
+    dynamically quantized, int8 OpenVINO models are calibrated by ultralytics' own NNCF export.
+    """
+    from ultralytics import YOLO
+
+    stem = Path(weights).stem
+
+    def export(target: Path) -> None:
+        if backend.name == "onnx":
+            exported = Path(YOLO(weights).export(format="onnx", dynamic=True, simplify=True))
+            shutil.move(str(exported), str(target / f"{stem}.onnx"))
+        else:
+            exported = Path(YOLO(weights).export(format="openvino", dynamic=True, int8=backend.quantize))
+            shutil.copytree(str(exported), str(target / exported.name))
+            shutil.rmtree(exported, ignore_errors=True)
+
+    if backend.name == "onnx":
+        fp32_dir = _export_dir(weights, BackendSpec(name="onnx"), export)
+        if not backend.quantize:
+            return str(fp32_dir / f"{stem}.onnx")
+        int8_dir = _export_dir(weights, backend, lambda target: quantize_onnx_dir(fp32_dir, target))
+        return str(int8_dir / f"{stem}.onnx")
+
+    model_dir = _export_dir(weights, backend, export)
+    return str(next(path for path in model_dir.iterdir() if path.is_dir()))
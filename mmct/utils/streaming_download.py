@@ -0,0 +1,339 @@
+"""
+Streaming, resumable downloads that hash while they write.
+
+Every download goes through stream_to_file(): chunks are written to "<dest>.part" and fed to
+the hash in the same worker-thread hop, so a multi-gigabyte video never sits in memory and is
+never read back just to be hashed. Progress is recorded in "<dest>.part.json" together with
+a validator (ETag or size/mtime); an interrupted download with an unchanged validator resumes
+from the bytes already on disk, re-hashing only that prefix.
+
+Sources:
+    fetch_url_to_file:  HTTP(S); large files supporting byte ranges are fetched as parallel
+                        range requests and reassembled in order
+    copy_file_to_file:  local files (file:// URLs)
+    stream_to_file:     any source that can open a chunk iterator at a byte offset (e.g. the
+                        Azure Blob SDK's ranged download); ordered_part_chunks turns any ranged
+                        fetch into parallel parts reassembled in order
+
+Hashes of completed downloads are remembered by (path, size, mtime), so get_file_hash() on
+the downloaded file returns immediately.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import threading
+from dataclasses import dataclass
+from typing import AsyncIterator, Awaitable, Callable, Dict, Optional, Tuple
+
+from loguru import logger
+
+DEFAULT_CHUNK_SIZE = 4 * 1024 * 1024
+DEFAULT_PART_SIZE = 16 * 1024 * 1024
+DEFAULT_PARALLEL_THRESHOLD = 64 * 1024 * 1024
+
+_known_hashes: Dict[Tuple[str, int, int, str], str] = {}
+_known_hashes_lock = threading.Lock()
+
+
+@dataclass
+class DownloadResult:
+    """A completed download."""
+
+    path: str
+    digest: str
+    size: int
+    resumed_bytes: int = 0
+
+
+def _file_identity(path: str) -> Tuple[str, int, int]:
+    stat = os.stat(path)
+    return os.path.abspath(path), stat.st_size, stat.st_mtime_ns
+
+
+def remember_file_hash(path: str, digest: str, hash_algorithm: str = "sha256") -> None:
+    """Record the hash of a file as it is now; any later modification invalidates it."""
+    with _known_hashes_lock:
+        _known_hashes[(*_file_identity(path), hash_algorithm)] = digest
+
+
+def lookup_file_hash(path: str, hash_algorithm: str = "sha256") -> Optional[str]:
+    """Return a remembered hash if the file is unchanged since it was recorded."""
+    try:
+        key = (*_file_identity(path), hash_algorithm)
+    except OSError:
+        return None
+    with _known_hashes_lock:
+        return _known_hashes.get(key)
+
+
+def _write_and_hash(file, hasher, data: bytes) -> None:
+    # hashlib releases the GIL for large buffers, so this runs truly in parallel with the loop
+    hasher.update(data)
+    file.write(data)
+
+
+def _hash_prefix(path: str, length: int, hasher, chunk_size: int) -> None:
+    with open(path, "rb") as f:
+        remaining = length
+        while remaining > 0:
+            data = f.read(min(chunk_size, remaining))
+            if not data:
+                raise IOError(f"{path} is shorter than its recorded progress")
+            hasher.update(data)
+            remaining -= len(data)
+
+
+def _load_state(state_path: str) -> Optional[dict]:
+    try:
+        with open(state_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _save_state(state_path: str, state: dict) -> None:
+    tmp_path = f"{state_path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f)
+    os.replace(tmp_path, state_path)
+
+
+async def stream_to_file(
+    open_stream: Callable[[int], Awaitable[AsyncIterator[bytes]]],
+    dest_path: str,
+    validator: Optional[str] = None,
+    total_size: Optional[int] = None,
+    resume: bool = True,
+    hash_algorithm: str = "sha256",
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> DownloadResult:
+    """
+    Write a chunk stream to dest_path, hashing it on the way, resuming a previous attempt if possible.
+
+    Args:
+        open_stream: Async callable returning an async iterator of the bytes from a given offset
+        dest_path: Final file path; data is written to dest_path + ".part" until complete
+        validator: Identifies the source version (e.g. ETag); a partial download is only resumed
+            when it matches. None disables resuming.
+        total_size: Expected size in bytes, checked at the end when known
+        resume: Resume from an existing partial download when the validator matches
+        hash_algorithm: hashlib algorithm name
+        chunk_size: Bytes buffered per disk write
+
+    Returns:
+        DownloadResult with the path, hex digest and size
+    """
+    part_path = f"{dest_path}.part"
+    state_path = f"{part_path}.json"
+    os.makedirs(os.path.dirname(os.path.abspath(dest_path)), exist_ok=True)
+    hasher = hashlib.new(hash_algorithm)
+
+    offset = 0
+    state = _load_state(state_path) if resume and validator else None
+    if (
+        state
+        and state.get("validator") == validator
+        and state.get("hash_algorithm") == hash_algorithm
+        and os.path.exists(part_path)
+    ):
+        offset = os.path.getsize(part_path)
+        if total_size is not None and offset > total_size:
+            offset = 0
+    if offset:
+        logger.info(f"Resuming download of {dest_path} at {offset} bytes")
+        await asyncio.to_thread(_hash_prefix, part_path, offset, hasher, chunk_size)
+    if validator and resume:
+        _save_state(state_path, {"validator": validator, "hash_algorithm": hash_algorithm, "total_size": total_size})
+
+    size = offset
+    file = await asyncio.to_thread(open, part_path, "ab" if offset else "wb")
+    try:
+        buffer = bytearray()
+        async for chunk in await open_stream(offset):
+            buffer += chunk
+            if len(buffer) >= chunk_size:
+                data, buffer = bytes(buffer), bytearray()
+                await asyncio.to_thread(_write_and_hash, file, hasher, data)
+                size += len(data)
+        if buffer:
+            await asyncio.to_thread(_write_and_hash, file, hasher, bytes(buffer))
+            size += len(buffer)
+    finally:
+        await asyncio.to_thread(file.close)
+
+    if total_size is not None and size != total_size:
+        raise IOError(f"Download of {dest_path} ended at {size} of {total_size} bytes")
+
+    os.replace(part_path, dest_path)
+    if os.path.exists(state_path):
+        os.remove(state_path)
+    digest = hasher.hexdigest()
+    remember_file_hash(dest_path, digest, hash_algorithm)
+    logger.info(f"Downloaded {size} bytes to {dest_path} ({offset} resumed)")
+    return DownloadResult(path=dest_path, digest=digest, size=size, resumed_bytes=offset)
+
+
+async def ordered_part_chunks(
+    fetch_part: Callable[[int, int], Awaitable[bytes]],
+    start: int,
+    end: int,
+    part_size: int = DEFAULT_PART_SIZE,
+    max_parallel: int = 4,
+) -> AsyncIterator[bytes]:
+    """
+    Fetch [start, end) as parallel parts of part_size bytes, yielding them in order.
+
+    At most max_parallel parts are downloaded or buffered at a time, so memory stays
+    bounded by max_parallel * part_size.
+
+    Args:
+        fetch_part: Async callable returning the bytes of [part_start, part_end)
+        start: First byte offset
+        end: End byte offset (exclusive)
+        part_size: Bytes per part
+        max_parallel: Concurrent part fetches
+    """
+    ranges = [(s, min(s + part_size, end)) for s in range(start, end, part_size)]
+    pending = []
+    next_range = 0
+    try:
+        while next_range < len(ranges) or pending:
+            while next_range < len(ranges) and len(pending) < max_parallel:
+                pending.append(asyncio.create_task(fetch_part(*ranges[next_range])))
+                next_range += 1
+            data = await pending.pop(0)
+            yield data
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+def _ordered_range_chunks(
+    session, url: str, start: int, end: int, part_size: int, max_parallel: int, headers: Optional[dict]
+) -> AsyncIterator[bytes]:
+    """Fetch [start, end) of an HTTP(S) URL as parallel range requests, yielding parts in order."""
+
+    async def fetch_part(part_start: int, part_end: int) -> bytes:
+        range_headers = dict(headers or {}, Range=f"bytes={part_start}-{part_end - 1}")
+        async with session.get(url, headers=range_headers) as response:
+            if response.status != 206:
+                raise IOError(f"Range request for {url} returned status {response.status}")
+            return await response.read()
+
+    return ordered_part_chunks(fetch_part, start, end, part_size, max_parallel)
+
+
+async def fetch_url_to_file(
+    url: str,
+    dest_path: str,
+    session=None,
+    headers: Optional[dict] = None,
+    resume: bool = True,
+    part_size: int = DEFAULT_PART_SIZE,
+    max_parallel: int = 4,
+    parallel_threshold: int = DEFAULT_PARALLEL_THRESHOLD,
+    hash_algorithm: str = "sha256",
+) -> DownloadResult:
+    """
+    Download an HTTP(S) URL to disk, hashing while writing.
+
+    Files of at least parallel_threshold bytes from servers that accept byte ranges are fetched
+    as up to max_parallel concurrent range requests of part_size bytes; smaller files or servers
+    without range support use one streaming GET. Interrupted downloads resume when the server
+    supports ranges and the ETag (or Last-Modified and size) is unchanged.
+
+    Args:
+        url: Source URL
+        dest_path: Destination file path
+        session: Optional aiohttp.ClientSession to reuse
+        headers: Extra request headers (e.g. authorization)
+        resume: Resume a previous partial download when possible
+        part_size: Bytes per range request
+        max_parallel: Concurrent range requests
+        parallel_threshold: Minimum size for parallel range requests
+        hash_algorithm: hashlib algorithm name
+
+    Returns:
+        DownloadResult with the path, hex digest and size
+    """
+    import aiohttp
+
+    owns_session = session is None
+    if owns_session:
+        session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=None, sock_read=300))
+    try:
+        async with session.head(url, headers=headers, allow_redirects=True) as response:
+            head_ok = response.status == 200
+            total_size = int(response.headers["Content-Length"]) if head_ok and "Content-Length" in response.headers else None
+            accepts_ranges = head_ok and response.headers.get("Accept-Ranges", "").lower() == "bytes"
+            etag = response.headers.get("ETag") or response.headers.get("Last-Modified")
+            final_url = str(response.url)
+
+        validator = f"{etag}|{total_size}" if (accepts_ranges and etag) else None
+        parallel = (
+            accepts_ranges and total_size is not None and total_size >= parallel_threshold and max_parallel > 1
+        )
+
+        async def open_stream(offset: int) -> AsyncIterator[bytes]:
+            if parallel:
+                return _ordered_range_chunks(
+                    session, final_url, offset, total_size, part_size, max_parallel, headers
+                )
+
+            async def sequential() -> AsyncIterator[bytes]:
+                request_headers = dict(headers or {})
+                if offset:
+                    request_headers["Range"] = f"bytes={offset}-"
+                async with session.get(final_url, headers=request_headers) as response:
+                    expected_status = 206 if offset else 200
+                    if response.status != expected_status:
+                        raise IOError(f"Failed to download {url}, status code: {response.status}")
+                    async for chunk in response.content.iter_chunked(1024 * 1024):
+                        yield chunk
+
+            return sequential()
+
+        return await stream_to_file(
+            open_stream,
+            dest_path,
+            validator=validator,
+            total_size=total_size,
+            resume=resume,
+            hash_algorithm=hash_algorithm,
+        )
+    finally:
+        if owns_session:
+            await session.close()
+
+
+async def copy_file_to_file(
+    src_path: str, dest_path: str, resume: bool = True, hash_algorithm: str = "sha256"
+) -> DownloadResult:
+    """Copy a local file in large chunks, hashing while writing."""
+    stat = os.stat(src_path)
+
+    async def open_stream(offset: int) -> AsyncIterator[bytes]:
+        async def chunks() -> AsyncIterator[bytes]:
+            src = await asyncio.to_thread(open, src_path, "rb")
+            try:
+                await asyncio.to_thread(src.seek, offset)
+                while True:
+                    data = await asyncio.to_thread(src.read, DEFAULT_CHUNK_SIZE)
+                    if not data:
+                        break
+                    yield data
+            finally:
+                await asyncio.to_thread(src.close)
+
+        return chunks()
+
+    return await stream_to_file(
+        open_stream,
+        dest_path,
+        validator=f"{stat.st_size}|{stat.st_mtime_ns}",
+        total_size=stat.st_size,
+        resume=resume,
+        hash_algorithm=hash_algorithm,
+    )
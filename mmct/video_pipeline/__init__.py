@@ -1,6 +1,7 @@
 from .agents.video_agent import VideoAgent
+from .agents.batch_video_agent import BatchVideoAgent, BatchQueryItem, BatchQueryResult
 from .core.ingestion.ingestion_pipeline import IngestionPipeline
 from .core.ingestion.languages import Languages
 from .core.ingestion.transcription.transcription_services import TranscriptionServices
 
-__all__ = ["VideoAgent","IngestionPipeline","Languages","TranscriptionServices"]
\ No newline at end of file
+__all__ = ["VideoAgent","BatchVideoAgent","BatchQueryItem","BatchQueryResult","IngestionPipeline","Languages","TranscriptionServices"]
\ No newline at end of file
@@ -0,0 +1,210 @@
+# Standard Library
+import asyncio
+import os
+from dataclasses import dataclass
+from typing import AsyncIterator, Callable, Dict, List, Optional, Sequence, Tuple
+from loguru import logger
+
+# Local Imports
+from mmct.video_pipeline.agents.video_agent import VideoAgent
+from mmct.video_pipeline.core.tools.get_context import search_context
+from mmct.video_pipeline.core.tools.get_video_analysis import get_video_analysis
+from mmct.video_pipeline.core.tools.utils.tool_prefetch import ToolPrefetchCache
+from mmct.video_pipeline.prompts_and_description import VideoAgentResponse
+from mmct.video_pipeline.utils.resource_pool import ResourcePool, get_resource_pool
+
+
+@dataclass
+class BatchQueryItem:
+    """One question about one video (or about the whole index when neither video_id nor url is set)."""
+
+    query: str
+    video_id: Optional[str] = None
+    url: Optional[str] = None
+
+
+@dataclass
+class BatchQueryResult:
+    """Answer to the item at position `index` of the batch."""
+
+    index: int
+    item: BatchQueryItem
+    response: VideoAgentResponse
+
+
+class BatchVideoAgent:
+    """
+    Answers many (query, video) pairs over one index, sharing retrieval work between them.
+
+    Compared to running one VideoAgent per pair, the batch:
+    1. Embeds all distinct queries in one batch_embedding call
+    2. Runs the planner's first retrievals (get_context, get_video_analysis) once per distinct
+       (query, video) pair, with per-video filters, and seeds every planner session with them.
+       Searches run once per pair with that pair's filter, not as one multi-filter batched
+       search; each starts when a session first needs it.
+    3. Runs up to max_concurrency agent loops at once on the pooled LLM clients
+
+    Args:
+        items (Sequence[BatchQueryItem]): Questions to answer, with their video_id or url.
+        index_name (str): Name of the search index for video retrieval.
+        use_critic_agent (bool): Whether to use the critic agent for validation. Defaults to True.
+        cache (bool): Whether to cache model responses. Defaults to False.
+        max_concurrency (Optional[int]): Agent loops run at once. Defaults to None (uses VIDEO_BATCH_MAX_CONCURRENCY, default 8).
+        max_concurrent_searches (int): Shared retrievals run at once. Defaults to 16.
+        resource_pool (Optional[ResourcePool]): Pool of long-lived clients shared across requests. Defaults to the process-wide pool.
+        semantic_cache (Optional[bool]): Passed to each VideoAgent. Defaults to None (uses ANSWER_CACHE_ENABLED).
+
+    Example:
+        ```python
+        batch = BatchVideoAgent(
+            items=[
+                BatchQueryItem(query="What crop is planted?", video_id="abc123"),
+                BatchQueryItem(query="What crop is planted?", video_id="def456"),
+            ],
+            index_name="farming-video-index",
+        )
+        async for result in batch.run_stream():
+            print(result.index, result.response.response)
+        ```
+    """
+
+    # Arguments the planner session prefetches with (see VideoQnA._start_prefetch)
+    PREFETCH_TOP = 3
+
+    def __init__(
+        self,
+        items: Sequence[BatchQueryItem],
+        index_name: str,
+        use_critic_agent: bool = True,
+        cache: bool = False,
+        max_concurrency: Optional[int] = None,
+        max_concurrent_searches: int = 16,
+        resource_pool: Optional[ResourcePool] = None,
+        semantic_cache: Optional[bool] = None,
+    ):
+        self.items = list(items)
+        self.index_name = index_name
+        self.use_critic_agent = use_critic_agent
+        self.cache = cache
+        self.max_concurrency = max_concurrency or int(os.getenv("VIDEO_BATCH_MAX_CONCURRENCY", "8"))
+        self.max_concurrent_searches = max_concurrent_searches
+        self.resource_pool = resource_pool or get_resource_pool()
+        self.semantic_cache = semantic_cache
+
+    async def _embed_queries(self) -> Dict[str, List[float]]:
+        """Embed every distinct query with one batch call."""
+        queries = list(dict.fromkeys(item.query for item in self.items))
+        if not queries:
+            return {}
+        embeddings = await self.resource_pool.embedding_provider().batch_embedding(queries)
+        return dict(zip(queries, embeddings))
+
+    def _shared_retrieval(self) -> Tuple[List[asyncio.Task], Callable]:
+        """
+        Prepare the shared first retrievals for every distinct (query, video) pair.
+
+        Each retrieval starts on the first seeded lookup of any session that needs it, so pairs
+        answered from the semantic cache never search.
+
+        Returns:
+            List of the tasks started so far (to cancel when the batch ends), and
+            start(tool_name, item) returning the shared task for that pair
+        """
+        searches = asyncio.Semaphore(self.max_concurrent_searches)
+        embeddings_task = None
+        tasks: Dict[Tuple[str, str, Optional[str], Optional[str]], asyncio.Task] = {}
+        started: List[asyncio.Task] = []
+
+        async def context_for(item: BatchQueryItem):
+            nonlocal embeddings_task
+            if embeddings_task is None:
+                # All distinct queries are embedded together on the first context retrieval
+                embeddings_task = asyncio.ensure_future(self._embed_queries())
+                started.append(embeddings_task)
+            embeddings = await asyncio.shield(embeddings_task)
+            async with searches:
+                return await search_context(
+                    query=item.query, index_name=self.index_name, video_id=item.video_id, url=item.url,
+                    top=self.PREFETCH_TOP, embedding=embeddings[item.query],
+                )
+
+        async def analysis_for(item: BatchQueryItem):
+            async with searches:
+                return await get_video_analysis(
+                    query=item.query, index_name=self.index_name, video_id=item.video_id, url=item.url,
+                    top=self.PREFETCH_TOP,
+                )
+
+        fetchers = {"get_context": context_for, "get_video_analysis": analysis_for}
+
+        def start(tool_name: str, item: BatchQueryItem) -> asyncio.Task:
+            key = (tool_name, item.query, item.video_id, item.url)
+            if key not in tasks:
+                task = asyncio.create_task(fetchers[tool_name](item), name=f"batch:{tool_name}")
+                # Sessions report failures through the prefetch cache; mark them retrieved here
+                task.add_done_callback(lambda t: t.cancelled() or t.exception())
+                tasks[key] = task
+                started.append(task)
+            return tasks[key]
+
+        return started, start
+
+    def _seeded_prefetch_cache(self, item: BatchQueryItem, start: Callable) -> ToolPrefetchCache:
+        """Planner session cache seeded with the shared retrievals for this item."""
+        prefetch_cache = ToolPrefetchCache()
+        prefetch_cache.seed(
+            "get_context", lambda: start("get_context", item),
+            query=item.query, index_name=self.index_name, video_id=item.video_id, url=item.url,
+            start_time=None, end_time=None, fields_to_retrieve=None, top=self.PREFETCH_TOP,
+        )
+        prefetch_cache.seed(
+            "get_video_analysis", lambda: start("get_video_analysis", item),
+            query=item.query, index_name=self.index_name, video_id=item.video_id, url=item.url,
+            top=self.PREFETCH_TOP, fields_to_retrieve=None,
+        )
+        return prefetch_cache
+
+    async def run_stream(self) -> AsyncIterator[BatchQueryResult]:
+        """
+        Answer all items, yielding each result as soon as it is ready (not in input order).
+        """
+        shared, start_shared = self._shared_retrieval()
+        agent_slots = asyncio.Semaphore(self.max_concurrency)
+
+        async def answer(index: int, item: BatchQueryItem) -> BatchQueryResult:
+            async with agent_slots:
+                agent = VideoAgent(
+                    query=item.query,
+                    index_name=self.index_name,
+                    video_id=item.video_id,
+                    url=item.url,
+                    use_critic_agent=self.use_critic_agent,
+                    cache=self.cache,
+                    resource_pool=self.resource_pool,
+                    semantic_cache=self.semantic_cache,
+                    prefetch_cache=self._seeded_prefetch_cache(item, start_shared),
+                )
+                # VideoAgent reports its own failures as error responses
+                return BatchQueryResult(index=index, item=item, response=await agent())
+
+        pending = [asyncio.create_task(answer(i, item)) for i, item in enumerate(self.items)]
+        logger.info(
+            f"Answering {len(pending)} queries over {self.index_name} with up to {self.max_concurrency} concurrent agents"
+        )
+        try:
+            for next_done in asyncio.as_completed(pending):
+                yield await next_done
+        finally:
+            for task in pending + shared:
+                if not task.done():
+                    task.cancel()
+
+    async def __call__(self) -> List[BatchQueryResult]:
+        """
+        Answer all items.
+
+        Returns:
+            List[BatchQueryResult]: Results in the order of the input items.
+        """
+        results = [result async for result in self.run_stream()]
+        return sorted(results, key=lambda result: result.index)
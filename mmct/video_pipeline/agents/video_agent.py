@@ -1,18 +1,20 @@
 # Standard Library
 import asyncio
+import os
 from typing import Optional
 from dotenv import load_dotenv
 from loguru import logger
 
 # Local Imports
 from mmct.video_pipeline.core.tools.video_qna import video_qna
+from mmct.video_pipeline.core.tools.utils.tool_prefetch import ToolPrefetchCache
 from mmct.video_pipeline.prompts_and_description import (
     VIDEO_AGENT_SYSTEM_PROMPT,
     VideoAgentResponse,
 )
 from autogen_agentchat.ui import Console
 from mmct.config.settings import MMCTConfig
-from mmct.providers.factory import provider_factory
+from mmct.video_pipeline.utils.resource_pool import ResourcePool, get_resource_pool
 
 # Load environment variables
 load_dotenv(override=True)
@@ -34,7 +36,12 @@ class VideoAgent:
         url (Optional[str]): URL to filter the search results for that particular video. Defaults to None.
         use_critic_agent (bool): Whether to use the critic agent for validation. Defaults to True.
         stream (bool): Whether to stream the response output. Defaults to False.
-        llm_provider (Optional[object]): LLM provider instance. Defaults to None (uses config).
+        llm_provider (Optional[object]): LLM provider instance. Defaults to None (uses the shared provider from the resource pool).
+        resource_pool (Optional[ResourcePool]): Pool of long-lived clients shared across requests. Defaults to the process-wide pool.
+        semantic_cache (Optional[bool]): Serve answers to semantically similar earlier queries on the same index and video
+            from the answer cache. Defaults to None (uses ANSWER_CACHE_ENABLED). Never used when streaming.
+        prefetch_cache (Optional[ToolPrefetchCache]): Planner session cache pre-seeded with retrieval results,
+            as done by BatchVideoAgent. Defaults to None (a fresh cache per run).
 
     Example:
         Basic usage with query and index:
@@ -78,7 +85,10 @@ class VideoAgent:
         use_critic_agent: Optional[bool] = True,
         stream: bool = False,
         llm_provider: Optional[object] = None,
-        cache: Optional[bool] = False
+        cache: Optional[bool] = False,
+        resource_pool: Optional[ResourcePool] = None,
+        semantic_cache: Optional[bool] = None,
+        prefetch_cache: Optional[ToolPrefetchCache] = None,
     ):
         # Store parameters
         self.query = query
@@ -88,15 +98,23 @@ class VideoAgent:
         self.use_critic_agent = use_critic_agent
         self.stream = stream
         self.cache = cache
+        self.prefetch_cache = prefetch_cache
         # Initialize configuration and logging
         self.config = MMCTConfig()
 
-        # Initialize LLM provider
+        self.resource_pool = resource_pool or get_resource_pool()
+
+        if semantic_cache is None:
+            semantic_cache = os.getenv("ANSWER_CACHE_ENABLED", "false").lower() == "true"
+        self.semantic_cache = semantic_cache and not stream
+
+        # Initialize LLM provider; pooled providers outlive the request and are not closed here
+        self._owns_llm_provider = llm_provider is not None
         self.llm_provider = llm_provider or self._create_llm_provider()
 
     def _create_llm_provider(self) -> object:
-        """Create LLM provider from configuration."""
-        return provider_factory.create_llm_provider()
+        """Get the shared LLM provider from the resource pool."""
+        return self.resource_pool.llm_provider()
 
     async def __call__(self) -> VideoAgentResponse:
         """
@@ -106,6 +124,13 @@ class VideoAgent:
             VideoAgentResponse: Structured response containing the answer to the query.
         """
         try:
+            # Serve a stored answer to a similar earlier query when possible
+            answer_cache, query_embedding = None, None
+            if self.semantic_cache:
+                answer_cache, query_embedding, cached_response = await self._lookup_cached_answer()
+                if cached_response is not None:
+                    return cached_response
+
             # Call the video_qna function (v2 with Swarm) with simplified parameters
             # Get response from video_qna with Swarm orchestration
             video_qna_response = await video_qna(
@@ -115,12 +140,17 @@ class VideoAgent:
                 use_critic_agent=self.use_critic_agent,
                 index_name=self.index_name,
                 stream=self.stream,
-                llm_provider=self.llm_provider,
-                cache = self.cache
+                llm_provider=self.llm_provider if self._owns_llm_provider else None,
+                cache = self.cache,
+                resource_pool=self.resource_pool,
+                prefetch_cache=self.prefetch_cache,
             )
 
             # Generate final formatted answer using LLM with video_qna response
             formatted_response = await self._generate_final_answer(video_qna_response)
+
+            if query_embedding is not None and formatted_response.answer_found:
+                await self._store_answer(answer_cache, query_embedding, formatted_response)
             return formatted_response
 
         except Exception as e:
@@ -129,6 +159,39 @@ class VideoAgent:
             # Clean up resources
             await self.cleanup()
 
+    async def _lookup_cached_answer(self):
+        """
+        Look up the semantic answer cache.
+
+        Returns:
+            Tuple of (cache, query embedding, cached VideoAgentResponse or None); the cache and
+            embedding are None when the lookup failed, so the answer is not stored either
+        """
+        try:
+            answer_cache = self.resource_pool.answer_cache()
+            query_embedding = await answer_cache.embed(self.query)
+            payload = await answer_cache.lookup(
+                query_embedding, self.index_name, video_id=self.video_id, url=self.url
+            )
+            cached_response = VideoAgentResponse.model_validate(payload) if payload else None
+            return answer_cache, query_embedding, cached_response
+        except Exception as e:
+            logger.warning(f"Answer cache lookup failed, answering without it: {e}")
+            return None, None, None
+
+    async def _store_answer(self, answer_cache, query_embedding, response: VideoAgentResponse) -> None:
+        """Store a found answer in the semantic answer cache."""
+        try:
+            await answer_cache.store(
+                query_embedding,
+                response.model_dump(mode="json"),
+                self.index_name,
+                video_id=self.video_id,
+                url=self.url,
+            )
+        except Exception as e:
+            logger.warning(f"Failed to store answer in the answer cache: {e}")
+
     async def _generate_final_answer(self, video_qna_response: dict) -> VideoAgentResponse:
         """
         Use LLM to generate a final consolidated and structured answer.
@@ -175,9 +238,9 @@ class VideoAgent:
         )
 
     async def cleanup(self):
-        """Clean up resources and close connections."""
+        """Clean up resources and close connections owned by this agent."""
         try:
-            if self.llm_provider and hasattr(self.llm_provider, 'close'):
+            if self._owns_llm_provider and self.llm_provider and hasattr(self.llm_provider, 'close'):
                 await self.llm_provider.close()
         except Exception as e:
             logger.error(f"Error during VideoAgent cleanup: {e}")
@@ -3,7 +3,7 @@ import re
 import base64
 import asyncio
 from datetime import time
-from typing import List, Dict, Tuple
+from typing import List, Dict, Optional, Tuple
 from mmct.config.settings import MMCTConfig
 from mmct.providers.factory import provider_factory
 from mmct.video_pipeline.core.ingestion.models import (
@@ -12,6 +12,13 @@ from mmct.video_pipeline.core.ingestion.models import (
 )
 from mmct.video_pipeline.utils.helper import get_media_folder
 from mmct.video_pipeline.utils.helper import create_stacked_frames_base64
+from mmct.video_pipeline.core.ingestion.chapter_generator.utils import (
+    MERGE_MAX_CONCURRENCY,
+    OBJECT_MERGE_TOKEN_BUDGET,
+    TreeReduceError,
+    estimate_tokens,
+    tree_reduce,
+)
 from loguru import logger
 from dotenv import load_dotenv, find_dotenv
 
@@ -20,13 +27,16 @@ load_dotenv(find_dotenv(), override=True)
 
 
 class ChapterGenerator:
-    def __init__(self, keyframe_index, frame_stacking_grid_size=4, max_concurrent_requests=3):
+    def __init__(self, keyframe_index, frame_stacking_grid_size=4, max_concurrent_requests=3, keyframe_timeline=None):
         self.config = MMCTConfig()
         self.llm_provider = provider_factory.create_llm_provider()
         self.frame_stacking_grid_size = frame_stacking_grid_size
         self.search_provider = provider_factory.create_search_provider()
         self.index_name = keyframe_index
         self.max_concurrent_requests = max_concurrent_requests
+        # Optional KeyframeTimeline: when set, frames are read from the in-memory extraction
+        # result (waiting for the chapter's time range) instead of querying the keyframe index
+        self.keyframe_timeline = keyframe_timeline
       
 
     async def _get_frames(self, transcript_seg:str, video_id: str) -> List[str]:
@@ -54,21 +64,27 @@ class ChapterGenerator:
         end_seconds = end_time.hour * 3600 + end_time.minute * 60 + end_time.second
         chapter_timestamps = [start_seconds, end_seconds]
 
-        time_filter = f"timestamp_seconds ge {start_seconds} and timestamp_seconds le {end_seconds}"
-        video_filter = f"video_id eq '{video_id}'"
-        combined_filter = f"{time_filter} and {video_filter}"
-        results = await self.search_provider.search(
-            query="*",
-            search_text="*",
-            filter=combined_filter,
-            index_name=self.index_name,
-            select = ['keyframe_filename','timestamp_seconds']
+        if self.keyframe_timeline is not None:
+            # Wait until keyframe extraction has covered this chapter's time range
+            await self.keyframe_timeline.wait_for_range(start_seconds, end_seconds)
+            for frame in self.keyframe_timeline.frames_in_range(start_seconds, end_seconds):
+                frames_metadata.append({'file_name': str(frame.frame_number), 'timestamp_seconds': frame.timestamp_seconds})
+        else:
+            time_filter = f"timestamp_seconds ge {start_seconds} and timestamp_seconds le {end_seconds}"
+            video_filter = f"video_id eq '{video_id}'"
+            combined_filter = f"{time_filter} and {video_filter}"
+            results = await self.search_provider.search(
+                query="*",
+                search_text="*",
+                filter=combined_filter,
+                index_name=self.index_name,
+                select = ['keyframe_filename','timestamp_seconds']
 
-        )
-        for result in results:
-            file_name = result['keyframe_filename'].split('_')[-1].split('.')[0]
-            timestamp_seconds = result['timestamp_seconds']
-            frames_metadata.append({'file_name':file_name,'timestamp_seconds':timestamp_seconds})
+            )
+            for result in results:
+                file_name = result['keyframe_filename'].split('_')[-1].split('.')[0]
+                timestamp_seconds = result['timestamp_seconds']
+                frames_metadata.append({'file_name':file_name,'timestamp_seconds':timestamp_seconds})
 
         # Sort frames_metadata by timestamp_seconds in ascending order
         frames_metadata.sort(key=lambda x: x['timestamp_seconds'])
@@ -124,6 +140,11 @@ class ChapterGenerator:
             Returns:
                 Tuple of (idx, chapter_response, seg_text, chapter_timestamps) or None on failure
             """
+            if self.keyframe_timeline is not None:
+                # Wait for this chunk's keyframes before taking a request slot, so chunks whose
+                # frames are already extracted are not blocked behind ones still in extraction
+                await self.keyframe_timeline.wait_for_range(segment.start_time, segment.end_time)
+
             async with semaphore:
                 attempts = 0
                 max_attempts = 3
@@ -304,7 +325,7 @@ class ChapterGenerator:
         final_result: ChapterCreationResponse,
         batch_results: List[ChapterCreationResponse],
         prev_merged_object_collection: ChapterCreationResponse = None
-    ) -> ChapterCreationResponse:
+    ) -> Optional[ChapterCreationResponse]:
         """
         Perform a dedicated LLM call to merge and enrich object collections
         from all batch results, ensuring exhaustive extraction of all objects with detailed attributes.
@@ -316,7 +337,8 @@ class ChapterGenerator:
             prev_merged_object_collection: Optional ChapterCreationResponse with previously merged objects from earlier batches
 
         Returns:
-            ChapterCreationResponse with enriched and merged object_collection
+            ChapterCreationResponse with enriched and merged object_collection, or None if the
+            merge call failed (tree_reduce then carries the batch results on unmerged)
         """
         logger.info(f"Performing dedicated object collection merge and enrichment for {len(batch_results)} batches...")
 
@@ -433,71 +455,67 @@ Return a complete ChapterCreationResponse with the merged object_collection and
             return result_with_merged_objects
 
         except Exception as e:
-            logger.error(f"Error during object merge: {e}. Returning result without merge")
-            return final_result
+            logger.error(f"Error during object merge: {e}. Returning None")
+            return None
 
 
     async def _merge_objects_in_batches(
         self,
         final_result: ChapterCreationResponse,
         batch_results: List[ChapterCreationResponse],
-        batch_size: int = 3
+        batch_size: int = 3,
+        token_budget: int = OBJECT_MERGE_TOKEN_BUDGET
     ) -> ChapterCreationResponse:
         """
-        Merge objects in batches of specified size, passing the result of the previous batch
-        to maintain cohesion across the entire merge process.
+        Merge objects as a tree: groups of batch results are merged concurrently,
+        then the group results are merged, until a single object collection remains.
 
         Args:
             final_result: The combined ChapterCreationResponse (without object_collection merged yet)
             batch_results: List of individual batch ChapterCreationResponse objects
-            batch_size: Number of batch_results to process at once (default: 3)
+            batch_size: Maximum number of batch_results merged by one LLM call (default: 3)
+            token_budget: Maximum estimated input tokens for one merge call
 
         Returns:
             ChapterCreationResponse with fully enriched and merged object_collection
         """
-        logger.info(f"Starting object merge in batches of {batch_size}...")
+        logger.info(f"Starting tree merge of objects with fan-in {batch_size}...")
 
         # If we have no results or only 1 result, process directly
         if len(batch_results) <= 1:
             if batch_results:
                 final_result.object_collection = batch_results[0].object_collection
             return final_result
-        
-        # Split batch_results into groups of batch_size
-        result_batches = [
-            batch_results[i:i + batch_size]
-            for i in range(0, len(batch_results), batch_size)
-        ]
-        
-        logger.info(f"Processing {len(batch_results)} results in {len(result_batches)} merge batches")
-        
-        # Track the accumulated merged result
-        accumulated_merged_result = None
-        
-        # Process each batch
-        for batch_idx, current_batch in enumerate(result_batches):
-            logger.info(f"Processing merge batch {batch_idx + 1}/{len(result_batches)} with {len(current_batch)} results")
-
-            # For the first batch, merge without prior context
-            if accumulated_merged_result is None:
-                accumulated_merged_result = await self._merge_and_enrich_objects(
-                    final_result,
-                    current_batch,
-                    prev_merged_object_collection=None
-                )
-            else:
-                # For subsequent batches, pass the accumulated result as previous context
-                # This ensures cohesion by passing context forward
-                accumulated_merged_result = await self._merge_and_enrich_objects(
-                    final_result,
-                    current_batch,
-                    prev_merged_object_collection=accumulated_merged_result
-                )
+
+        async def merge_group(group: List[ChapterCreationResponse]) -> Optional[ChapterCreationResponse]:
+            return await self._merge_and_enrich_objects(final_result, group)
+
+        def result_tokens(result: ChapterCreationResponse) -> int:
+            return estimate_tokens(str([obj.model_dump() for obj in result.object_collection or []]))
+
+        try:
+            merged_result = await tree_reduce(
+                batch_results,
+                merge_group,
+                max_fan_in=batch_size,
+                token_budget=token_budget,
+                size_fn=result_tokens,
+                max_concurrency=MERGE_MAX_CONCURRENCY,
+            )
+        except TreeReduceError as e:
+            # Keep the partial merges, unmerged, rather than losing the chapter's objects
+            logger.warning(f"{e}; concatenating the partially merged object collections")
+            merged_result = ChapterCreationResponse(
+                detailed_summary=final_result.detailed_summary,
+                action_taken=final_result.action_taken,
+                text_from_scene=final_result.text_from_scene,
+                object_collection=[obj for result in e.items for obj in result.object_collection or []],
+            )
 
         # Update final_result with the fully merged object collection
-        if accumulated_merged_result and accumulated_merged_result.object_collection:
-            logger.info(f"Final merged object collection contains {len(accumulated_merged_result.object_collection)} objects")
-            final_result.object_collection = accumulated_merged_result.object_collection
+        if merged_result and merged_result.object_collection:
+            logger.info(f"Final merged object collection contains {len(merged_result.object_collection)} objects")
+            final_result.object_collection = merged_result.object_collection
         else:
             logger.warning("No objects found after batch merging")
 
@@ -743,8 +761,8 @@ Return a complete ChapterCreationResponse with the merged object_collection and
                     logger.info(f"combined batch response (without objects):{combined_response}")
                     final_result: ChapterCreationResponse = combined_response['content']
 
-                    # Now perform object collection merge in batches of 3
-                    logger.info("Performing object collection merge in batches of 3...")
+                    # Now perform object collection merge as a tree with fan-in of 3
+                    logger.info("Performing object collection tree merge with fan-in of 3...")
                     final_result = await self._merge_objects_in_batches(final_result, results, batch_size=3)
 
                 else:
@@ -13,10 +13,14 @@ from typing import List, Optional, Tuple
 from loguru import logger
 
 from mmct.providers.search_document_models import ChapterIndexDocument
-from mmct.video_pipeline.core.ingestion.semantic_chunking.semantic_chunker import SemanticChunker
+from mmct.video_pipeline.core.ingestion.semantic_chunking.semantic_chunker import (
+    SemanticChunker,
+    SentenceEmbeddingCache,
+)
 from mmct.video_pipeline.core.ingestion.chapter_generator.chapter_generator import ChapterGenerator
 from mmct.video_pipeline.core.ingestion.chapter_generator.object_collection_processor import ObjectCollectionProcessor
 from mmct.video_pipeline.core.ingestion.chapter_generator.utils import create_embedding
+from mmct.video_pipeline.core.ingestion.key_frames_extractor.keyframe_timeline import KeyframeTimeline
 from mmct.providers.factory import provider_factory
 
 from dotenv import load_dotenv, find_dotenv
@@ -44,6 +48,8 @@ class ChapterIngestionPipeline:
         parent_id: Optional[str] = None,
         parent_duration: Optional[float] = None,
         video_duration: Optional[float] = None,
+        keyframe_timeline: Optional[KeyframeTimeline] = None,
+        embedding_cache: Optional[SentenceEmbeddingCache] = None,
     ) -> None:
         """
         Initialize ChapterIngestionPipeline.
@@ -57,6 +63,9 @@ class ChapterIngestionPipeline:
             parent_id: ID of parent video if this is a part
             parent_duration: Duration of parent video
             video_duration: Duration of current video
+            keyframe_timeline: Optional in-memory keyframe timeline; when provided, chapters read
+                their frames from it as extraction progresses instead of from the keyframe index
+            embedding_cache: Optional sentence embeddings prefetched during transcription
         """
         # Core attributes
         self.transcript = transcript
@@ -69,10 +78,11 @@ class ChapterIngestionPipeline:
         self.keyframe_blob_url = keyframe_blob_url
 
         # Initialize components
-        self.semantic_chunker = SemanticChunker(transcript=transcript)
+        self.semantic_chunker = SemanticChunker(transcript=transcript, embedding_cache=embedding_cache)
         self.chapter_generator = ChapterGenerator(
             frame_stacking_grid_size=frame_stacking_grid_size,
             keyframe_index=f"keyframes-{index_name}",
+            keyframe_timeline=keyframe_timeline,
         )
 
         # Initialize object collection processor
@@ -8,7 +8,19 @@ from mmct.providers.factory import provider_factory
 from mmct.providers.search_index_schema import create_object_collection_index_schema
 from mmct.video_pipeline.core.ingestion.models import ChapterCreationResponse, ObjectResponse
 from mmct.video_pipeline.core.ingestion.chapter_generator.video_summary import VideoSummary
-from mmct.video_pipeline.core.ingestion.chapter_generator.utils import create_embedding
+from mmct.video_pipeline.core.ingestion.chapter_generator.utils import (
+    MERGE_MAX_CONCURRENCY,
+    OBJECT_MERGE_TOKEN_BUDGET,
+    TreeReduceError,
+    create_embedding,
+    estimate_tokens,
+    tree_reduce,
+)
+
+
+def _registry_tokens(registry: List[ObjectResponse]) -> int:
+    """Estimate the prompt tokens an object collection contributes to a merge call."""
+    return estimate_tokens(json.dumps([obj.model_dump() for obj in registry]))
 
 
 class MergedObjectCollectionResponse(BaseModel):
@@ -138,56 +150,46 @@ class ObjectCollectionProcessor:
     async def _merge_registries_in_batches(
         self,
         registries: List[List[ObjectResponse]],
-        batch_size: int = 3
+        batch_size: int = 3,
+        token_budget: int = OBJECT_MERGE_TOKEN_BUDGET
     ) -> Optional[List[ObjectResponse]]:
         """
-        Merge object collections in batches, passing the result of the previous batch
-        to maintain cohesion across the entire merge process.
+        Merge object collections as a tree: groups of collections are merged concurrently,
+        then the group results are merged, until a single collection remains.
 
         Args:
             registries: List of object collection lists (List[ObjectResponse])
-            batch_size: Number of collections to process at once (default: 3)
+            batch_size: Maximum number of collections merged by one LLM call (default: 3)
+            token_budget: Maximum estimated input tokens for one merge call
 
         Returns:
             Merged object collection as a list of ObjectResponse objects
         """
-        logger.info(f"Starting registry merge in batches of {batch_size}...")
-        
-        # Split registries into groups of batch_size
-        registry_batches = [
-            registries[i:i + batch_size]
-            for i in range(0, len(registries), batch_size)
-        ]
-        
-        logger.info(f"Processing {len(registries)} registries in {len(registry_batches)} merge batches")
-        
-        # Track the accumulated merged result
-        accumulated_merged_registry = None
-        
-        # Process each batch
-        for batch_idx, current_batch in enumerate(registry_batches):
-            logger.info(f"Processing merge batch {batch_idx + 1}/{len(registry_batches)} with {len(current_batch)} registries")
-            
-            # For the first batch, merge without prior context
-            if accumulated_merged_registry is None:
-                accumulated_merged_registry = await self._merge_and_enrich_objects(
-                    current_batch,
-                    prev_merged_registry=None
-                )
-            else:
-                # For subsequent batches, pass the accumulated result as previous context
-                # This ensures cohesion by passing context forward
-                accumulated_merged_registry = await self._merge_and_enrich_objects(
-                    current_batch,
-                    prev_merged_registry=accumulated_merged_registry
-                )
-        
-        if accumulated_merged_registry:
-            logger.info(f"Final merged collection contains {len(accumulated_merged_registry)} objects")
+        logger.info(f"Starting tree merge of {len(registries)} registries with fan-in {batch_size}...")
+
+        async def merge_group(group: List[List[ObjectResponse]]) -> Optional[List[ObjectResponse]]:
+            return await self._merge_and_enrich_objects(group, prev_merged_registry=None)
+
+        try:
+            merged_registry = await tree_reduce(
+                registries,
+                merge_group,
+                max_fan_in=batch_size,
+                token_budget=token_budget,
+                size_fn=_registry_tokens,
+                max_concurrency=MERGE_MAX_CONCURRENCY,
+            )
+        except TreeReduceError as e:
+            # Keep the partial merges, unmerged, rather than losing the video's objects
+            logger.warning(f"{e}; concatenating the partially merged collections")
+            merged_registry = [obj for registry in e.items for obj in registry]
+
+        if merged_registry:
+            logger.info(f"Final merged collection contains {len(merged_registry)} objects")
         else:
             logger.warning("No objects found after batch merging")
 
-        return accumulated_merged_registry
+        return merged_registry
 
     async def _merge_and_enrich_objects(
         self,
@@ -4,10 +4,38 @@ Utility functions for chapter generation pipeline.
 Common helper functions used across chapter generation, subject registry, and video summary modules.
 """
 
-from typing import List
+import asyncio
+import functools
+import os
+from typing import Awaitable, Callable, List, Optional, Sequence, TypeVar
 from loguru import logger
 from mmct.providers.factory import provider_factory
 
+T = TypeVar("T")
+
+# Maximum estimated input tokens for a single object collection merge call
+OBJECT_MERGE_TOKEN_BUDGET = 24000
+
+# Maximum estimated input tokens for a single video summary merge call
+SUMMARY_MERGE_TOKEN_BUDGET = 32000
+
+# Maximum merge LLM calls of one tree reduction running at the same time
+MERGE_MAX_CONCURRENCY = int(os.getenv("MERGE_MAX_CONCURRENCY", "4"))
+
+
+class TreeReduceError(RuntimeError):
+    """
+    Raised by tree_reduce when a level makes no progress.
+
+    Attributes:
+        items: The partially merged items of the failed level, in order, so callers can fall
+            back to them instead of losing every input
+    """
+
+    def __init__(self, message: str, items: List):
+        super().__init__(message)
+        self.items = items
+
 
 async def create_embedding(text: str) -> List[float]:
     """
@@ -39,3 +67,175 @@ async def create_embedding(text: str) -> List[float]:
                 logger.debug("Embedding provider closed successfully")
             except Exception as close_error:
                 logger.warning(f"Error closing embedding provider: {close_error}")
+
+
+@functools.lru_cache(maxsize=1)
+def _get_token_encoding():
+    """Load the tiktoken encoding once; returns None when it is unavailable (e.g. offline)."""
+    try:
+        import tiktoken
+
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        logger.debug(f"tiktoken encoding unavailable, falling back to character estimate: {e}")
+        return None
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the number of LLM tokens in a piece of text.
+
+    Args:
+        text: Input text
+
+    Returns:
+        Token count from tiktoken, or a ~4 characters/token estimate if tiktoken is unavailable
+    """
+    if not text:
+        return 0
+    encoding = _get_token_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    return len(text) // 4 + 1
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """
+    Cut text to at most max_tokens estimated tokens.
+
+    Args:
+        text: Input text
+        max_tokens: Token limit
+
+    Returns:
+        The text unchanged if it fits, otherwise its longest prefix within the limit
+    """
+    if max_tokens <= 0 or not text:
+        return ""
+    encoding = _get_token_encoding()
+    if encoding is not None:
+        tokens = encoding.encode(text, disallowed_special=())
+        return text if len(tokens) <= max_tokens else encoding.decode(tokens[:max_tokens])
+    max_chars = max_tokens * 4
+    return text if len(text) <= max_chars else text[:max_chars]
+
+
+def group_by_token_budget(
+    items: Sequence[T],
+    max_fan_in: int,
+    token_budget: Optional[int] = None,
+    size_fn: Optional[Callable[[T], int]] = None,
+) -> List[List[T]]:
+    """
+    Split items into consecutive groups bounded by fan-in and token budget.
+
+    Order is preserved. Every group holds at least two items (when two remain) so that
+    each reduction level is guaranteed to shrink the input, even if single items
+    already exceed the budget.
+
+    Args:
+        items: Items to group
+        max_fan_in: Maximum number of items per group
+        token_budget: Optional maximum estimated tokens per group
+        size_fn: Function returning the estimated token size of an item
+
+    Returns:
+        List of item groups
+    """
+    max_fan_in = max(2, max_fan_in)
+    groups: List[List[T]] = []
+    current: List[T] = []
+    current_tokens = 0
+
+    for item in items:
+        item_tokens = size_fn(item) if (token_budget and size_fn) else 0
+        over_budget = bool(token_budget) and current_tokens + item_tokens > token_budget
+        if len(current) >= max_fan_in or (len(current) >= 2 and over_budget):
+            groups.append(current)
+            current, current_tokens = [], 0
+        current.append(item)
+        current_tokens += item_tokens
+
+    if current:
+        # A trailing singleton is carried unchanged to the next level by tree_reduce
+        groups.append(current)
+    return groups
+
+
+async def tree_reduce(
+    items: Sequence[T],
+    merge_fn: Callable[[List[T]], Awaitable[Optional[T]]],
+    max_fan_in: int = 3,
+    token_budget: Optional[int] = None,
+    size_fn: Optional[Callable[[T], int]] = None,
+    max_concurrency: Optional[int] = None,
+) -> Optional[T]:
+    """
+    Reduce items to a single result by merging them level by level as a tree.
+
+    All groups within a level are merged concurrently, so the number of sequential
+    merge calls is about log_{fan_in}(len(items)) instead of len(items) / fan_in.
+    Adjacent items are merged together, so chronological order is preserved.
+
+    A group whose merge returns None is carried unmerged to the next level, where it is merged
+    again with its neighbours, so a failed call never drops its inputs. If a whole level fails
+    (e.g. a deterministic over-budget prompt), retrying the same groups is pointless, so
+    TreeReduceError is raised carrying the partially merged items.
+
+    Args:
+        items: Leaf items to merge
+        merge_fn: Async function merging a group of items into one; must return None on failure
+        max_fan_in: Maximum number of items merged by a single call (default: 3)
+        token_budget: Optional estimated-token limit for a single merge call's inputs
+        size_fn: Function estimating the token size of an item (used with token_budget)
+        max_concurrency: Optional limit on merge calls running at the same time
+
+    Returns:
+        The fully merged result, or None if there was nothing to merge
+
+    Raises:
+        TreeReduceError: If every merge of a level fails, so the reduction can't make progress
+    """
+    level_items = [item for item in items if item is not None]
+    if not level_items:
+        return None
+
+    semaphore = asyncio.Semaphore(max_concurrency) if max_concurrency else None
+
+    async def merge_group(group: List[T]) -> Optional[T]:
+        if len(group) == 1:
+            return group[0]
+        if semaphore is None:
+            return await merge_fn(group)
+        async with semaphore:
+            return await merge_fn(group)
+
+    level = 0
+    while len(level_items) > 1:
+        level += 1
+        groups = group_by_token_budget(level_items, max_fan_in, token_budget, size_fn)
+        logger.info(
+            f"Tree-reduce level {level}: merging {len(level_items)} items in {len(groups)} parallel groups"
+        )
+        results = await asyncio.gather(*(merge_group(group) for group in groups))
+
+        next_items: List[T] = []
+        failed = 0
+        for group, result in zip(groups, results):
+            if result is None:
+                failed += 1
+                next_items.extend(group)
+            else:
+                next_items.append(result)
+        if failed:
+            logger.warning(
+                f"Tree-reduce level {level}: {failed} group merges returned no result; carrying their inputs unmerged"
+            )
+        if len(next_items) >= len(level_items):
+            raise TreeReduceError(
+                f"Tree-reduce level {level}: every merge failed, {len(level_items)} items left unmerged",
+                level_items,
+            )
+        level_items = next_items
+
+    return level_items[0] if level_items else None
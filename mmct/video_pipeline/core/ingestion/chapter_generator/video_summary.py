@@ -5,6 +5,12 @@ from pydantic import BaseModel, Field
 from mmct.config.settings import MMCTConfig
 from mmct.providers.factory import provider_factory
 from mmct.video_pipeline.core.ingestion.models import ChapterCreationResponse
+from mmct.video_pipeline.core.ingestion.chapter_generator.utils import (
+    MERGE_MAX_CONCURRENCY,
+    SUMMARY_MERGE_TOKEN_BUDGET,
+    estimate_tokens,
+    tree_reduce,
+)
 
 
 class MergedVideoSummaryResponse(BaseModel):
@@ -111,30 +117,26 @@ class VideoSummary:
                 logger.info(f"Processing {len(summaries)} summaries in a single batch")
                 return await self._process_summary_batch(summaries, None)
 
-            # Split into batches and process iteratively
-            logger.info(f"Processing {len(summaries)} summaries in multiple batches of {MAX_SUMMARIES_PER_BATCH}")
-
-            summary_batches = [
-                summaries[i:i + MAX_SUMMARIES_PER_BATCH]
-                for i in range(0, len(summaries), MAX_SUMMARIES_PER_BATCH)
-            ]
-
-            previous_analysis = None
-
-            for i, batch in enumerate(summary_batches):
-                logger.info(f"Processing batch {i + 1}/{len(summary_batches)} with {len(batch)} summaries")
-
-                batch_result = await self._process_summary_batch(batch, previous_analysis)
-
-                if not batch_result:
-                    logger.error(f"Failed to process batch {i + 1}")
-                    return None
-
-                previous_analysis = batch_result
-                logger.info(f"Completed batch {i + 1}/{len(summary_batches)}")
-
-            logger.info(f"Successfully merged all {len(summaries)} summaries into video summary")
-            return previous_analysis
+            # Merge groups of adjacent summaries concurrently, then merge the partial summaries
+            logger.info(
+                f"Tree-merging {len(summaries)} summaries with fan-in {MAX_SUMMARIES_PER_BATCH}"
+            )
+
+            async def merge_group(batch: List[str]) -> Optional[str]:
+                return await self._process_summary_batch(batch, None)
+
+            merged_summary = await tree_reduce(
+                summaries,
+                merge_group,
+                max_fan_in=MAX_SUMMARIES_PER_BATCH,
+                token_budget=SUMMARY_MERGE_TOKEN_BUDGET,
+                size_fn=estimate_tokens,
+                max_concurrency=MERGE_MAX_CONCURRENCY,
+            )
+
+            if merged_summary:
+                logger.info(f"Successfully merged all {len(summaries)} summaries into video summary")
+            return merged_summary
 
         except Exception as e:
             logger.error(f"Failed to merge chapter summaries: {e}")
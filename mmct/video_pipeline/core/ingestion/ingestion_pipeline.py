@@ -1,20 +1,24 @@
 import asyncio
 import aiofiles
-from typing import Optional, Annotated, Dict, List, Any
+from typing import Optional, Annotated, Awaitable, Callable, Dict, List, Any
 import os
 import shutil
+import uuid
 from loguru import logger
 import gc
 
 from mmct.providers.factory import provider_factory
+from mmct.providers.base import UploadItem, pack_directory_files, packing_enabled
 from mmct.config.settings import MMCTConfig
 from mmct.video_pipeline.core.ingestion.transcription.cloud_transcription import CloudTranscription
 from mmct.video_pipeline.core.ingestion.transcription.whisper_transcription import (
     WhisperTranscription,
 )
+from mmct.video_pipeline.core.ingestion.transcription.windowed_transcription import (
+    TranscriptEntry,
+)
 from mmct.video_pipeline.utils.helper import (
     get_file_hash,
-    chunked,
     remove_file,
     get_media_folder,
 )
@@ -40,11 +44,26 @@ from mmct.video_pipeline.core.ingestion.key_frames_extractor.keyframe_processor
 from mmct.video_pipeline.core.ingestion.key_frames_extractor.keyframe_search_index import (
     KeyframeSearchIndex,
 )
+from mmct.video_pipeline.core.ingestion.key_frames_extractor.keyframe_timeline import (
+    KeyframeTimeline,
+)
+from mmct.video_pipeline.core.ingestion.utils.stage_graph import StageGraph
+from mmct.video_pipeline.core.ingestion.utils.resource_slots import API, CPU, ResourceSlots
+from mmct.video_pipeline.core.ingestion.semantic_chunking.semantic_chunker import (
+    SentenceEmbeddingCache,
+)
 
 from mmct.video_pipeline.core.ingestion.chapter_generator.chapter_ingestion_pipeline import (
     ChapterIngestionPipeline,
 )
 from mmct.video_pipeline.core.ingestion.video_compression.video_compression import VideoCompressor
+from mmct.video_pipeline.core.ingestion.video_compression.proxy_policy import (
+    ProxyPolicy,
+    evict_proxies,
+)
+from mmct.video_pipeline.utils.media_tools import probe_media
+from mmct.video_pipeline.utils.resource_pool import get_resource_pool
+from mmct.video_pipeline.utils.fingerprint import sampled_fingerprint
 from dotenv import load_dotenv, find_dotenv
 from mmct.utils.logging_config import log_manager
 from dataclasses import dataclass
@@ -66,7 +85,7 @@ class ProcessingContext:
     timestamps: Optional[List] = None
     base64_frames: Optional[List] = None
     blob_urls: Optional[Dict[str, str]] = None
-    pending_upload_tasks: Optional[List] = None
+    pending_uploads: Optional[List[UploadItem]] = None
     local_resources: Optional[List[str]] = None
     video_url: Optional[str] = None
     chapter_responses: Optional[Any] = None
@@ -75,12 +94,13 @@ class ProcessingContext:
     parent_id: Optional[str] = None  # Original video ID (for both split and non-split cases)
     parent_duration: Optional[float] = None  # Original video duration in seconds
     video_duration: Optional[float] = None  # Duration of this specific video part in seconds
+    stage_timings: Optional[Dict[str, Dict[str, Any]]] = None  # Per-stage status and duration
 
     def __post_init__(self):
         if self.blob_urls is None:
             self.blob_urls = {}
-        if self.pending_upload_tasks is None:
-            self.pending_upload_tasks = []
+        if self.pending_uploads is None:
+            self.pending_uploads = []
         if self.local_resources is None:
             self.local_resources = []
 
@@ -100,7 +120,7 @@ class IngestionPipeline:
         index_name (str): Name of the Azure AI Search index where video data will be stored.
         language (Languages, optional): Language of the video (only Languages Enum), used for transcription.
             Required only when transcript_path is not provided. Defaults to None.
-        transcription_service (str, optional): Transcription service to use ("azure-stt" or "whisper"). Defaults to "azure-stt" from the TranscriptionServices.
+        transcription_service (str, optional): Transcription service to use ("azure-stt", "whisper" or "local" for offline CPU transcription). Defaults to "azure-stt" from the TranscriptionServices.
             Only used when transcript_path is not provided.
         url (str, optional): Optional URL associated with the video for video metadata.
         transcript_path (str, optional): Path to an existing transcript file (.srt format).
@@ -109,6 +129,13 @@ class IngestionPipeline:
             Boolean flag to disable console logs. Default set to False.
         frame_stacking_grid_size (int): Grid size for frame stacking optimization.
             Values >1 enable stacking (e.g., 4 = 2x2 grid), 1 disables stacking. Defaults to 4.
+        hash_video_id (str, optional): Precomputed hash of the video file (e.g. computed while uploading);
+            skips re-hashing the file. Defaults to None.
+        on_stage_event (Callable, optional): Called with {"part", "stage", "status", "duration", "stages_total"} whenever an
+            ingestion stage of a video part starts or ends. Defaults to None.
+        resource_slots (ResourceSlots, optional): Slots limiting CPU-bound stages (keyframe extraction and
+            embedding, local transcription) and API-bound stages (transcription, chapter generation) across
+            concurrent ingestions. Defaults to None (no limits).
     Example Usage:
     ---------------
     >>> from mmct.video_pipeline.ingestion import IngestionPipeline
@@ -143,7 +170,7 @@ class IngestionPipeline:
         ] = None,
         transcription_service: Annotated[
             Optional[str],
-            "Transcription service to use (values from TranscriptionServices: 'azure-stt' or 'whisper')",
+            "Transcription service to use (values from TranscriptionServices: 'azure-stt', 'whisper' or 'local')",
         ] = TranscriptionServices.AZURE_STT,
         url: Annotated[
             Optional[str], "Optional URL associated with the video for metadata enrichment"
@@ -165,6 +192,14 @@ class IngestionPipeline:
             Optional[Dict[str, float]],
             "Configuration for keyframe extraction thresholds (e.g., { 'motion_threshold': 1.5, 'sample_fps': 2})",
         ] = {"motion_threshold": 1.5, "sample_fps": 2},
+        on_stage_event: Annotated[
+            Optional[Callable[[Dict[str, Any]], None]],
+            "Callback receiving {'part', 'stage', 'status', 'duration', 'stages_total'} whenever an ingestion stage starts or ends",
+        ] = None,
+        resource_slots: Annotated[
+            Optional[ResourceSlots],
+            "CPU/API slots shared with other ingestions running in the same process",
+        ] = None,
     ):
         # loading the MMCT config
         try:
@@ -203,6 +238,13 @@ class IngestionPipeline:
         self.frame_stacking_grid_size = frame_stacking_grid_size
         self.keyframe_config = keyframe_config
         self.original_video_path = video_path
+        self.on_stage_event = on_stage_event
+        self.resource_slots = resource_slots
+        self._video_hash_task: Optional[asyncio.Future] = None
+        self._fingerprint: Optional[str] = None
+        self._deferred_ingestion_check = False
+        # Per-part stage timings (part hash id -> StageGraph.get_timings()), filled as parts finish
+        self.stage_timings: Dict[str, Dict[str, Dict[str, Any]]] = {}
 
     async def _get_blob_manager(self):
         """
@@ -211,96 +253,196 @@ class IngestionPipeline:
         """
         return provider_factory.create_storage_provider()
 
-    async def _check_and_compress_video(self, video_path: str) -> str:
+    async def _check_and_compress_video(
+        self,
+        video_path: str,
+        content_hash: str,
+        segments: Optional[asyncio.Queue] = None,
+        segment_dir: Optional[str] = None,
+    ) -> str:
         """
-        Check if video file size exceeds 500 MB and compress if needed.
-        Runs compression in a thread pool to avoid blocking the event loop.
+        Decide from an ffprobe of the video whether analysis should run on a proxy, and build or
+        reuse it without blocking the event loop.
+
+        Proxies are cached in the media folder by content hash and proxy shape, so re-ingesting
+        the same content reuses the proxy (VIDEO_PROXY_CACHE_GB bounds the cache, default 20).
+        Videos longer than two VIDEO_PROXY_SEGMENT_SECONDS (default 120) are transcoded in
+        segments in parallel; 0 disables segmenting.
 
         Args:
             video_path: Path to the video file to check and compress
+            content_hash: Hash id of the video content, used to name the proxy
+            segments: Optional queue that receives (segment_path, start_seconds, end_seconds) of each
+                transcoded proxy segment as it is ready, then None. None alone means no segments
+                were produced and the returned path should be used.
+            segment_dir: Directory for the transcoded segments when segments is given, from
+                _proxy_segment_dir(); the caller removes it once the segments are processed
 
         Returns:
-            str: Path to the video (compressed if needed, original otherwise)
+            str: Path to the analysis proxy if one is warranted, the original video otherwise
         """
-        try:
-            file_size_mb = os.path.getsize(video_path) / (1024 * 1024)
-            self.logger.info(f"Video file size for {os.path.basename(video_path)}: {file_size_mb:.2f} MB")
+        handed_over = []
+        partial_path = None
 
-            if file_size_mb > 500:
-                self.logger.info(
-                    f"Video file size ({file_size_mb:.2f} MB) exceeds 500 MB threshold. Starting compression..."
-                )
-
-                # Create compressed directory in media folder
-                media_folder = await get_media_folder()
-                compressed_dir = os.path.join(media_folder, "compressed")
-                os.makedirs(compressed_dir, exist_ok=True)
-
-                # Initialize video compressor
-                compressor = VideoCompressor(
-                    input_path=video_path, target_size_mb=500, output_dir=compressed_dir
-                )
+        async def hand_over(path: str, start_seconds: float, end_seconds: float):
+            handed_over.append(path)
+            await segments.put((path, start_seconds, end_seconds))
 
-                # Compress the video in a thread pool to avoid blocking the event loop
-                await asyncio.to_thread(compressor.compress)
+        try:
+            probe = await probe_media(video_path)
+            policy = ProxyPolicy.from_env(
+                sample_fps=self.keyframe_config["sample_fps"],
+                max_frame_width=KeyframeExtractionConfig.max_frame_width,
+            )
+            decision = policy.decide(probe)
+            if not decision.build:
+                self.logger.info(f"No proxy for {os.path.basename(video_path)}: {decision.reason}")
+                return video_path
+            self.logger.info(f"Building analysis proxy for {os.path.basename(video_path)}: {decision.reason}")
 
-                # Return compressed path if successful
-                compressed_path = compressor.output_path
-                if os.path.exists(compressed_path):
-                    compressed_size_mb = os.path.getsize(compressed_path) / (1024 * 1024)
-                    self.logger.info(
-                        f"Video compressed successfully. New size: {compressed_size_mb:.2f} MB"
-                    )
-                    self.logger.info(f"Using compressed video: {compressed_path}")
-                    return compressed_path
-                else:
-                    self.logger.warning("Compression failed, using original video")
-                    return video_path
+            media_folder = await get_media_folder()
+            proxy_dir = os.path.join(media_folder, "proxies")
+            os.makedirs(proxy_dir, exist_ok=True)
+            proxy_name = decision.proxy_name(content_hash)
+            proxy_path = os.path.join(proxy_dir, proxy_name)
+            if os.path.exists(proxy_path):
+                os.utime(proxy_path)
+                self.logger.info(f"Reusing cached proxy: {proxy_path}")
+                return proxy_path
+
+            # Written under a name unique to this build and promoted only once validated, so neither
+            # an interrupted transcode nor a concurrent ingest of the same content is ever reused
+            segment_seconds = float(os.getenv("VIDEO_PROXY_SEGMENT_SECONDS", "120"))
+            segmented = segment_seconds > 0 and probe.duration > 2 * segment_seconds
+            partial_name = f"{proxy_name[:-len('.mp4')]}.{os.getpid()}-{uuid.uuid4().hex[:8]}.partial.mp4"
+            partial_path = os.path.join(proxy_dir, partial_name)
+            compressor = await asyncio.to_thread(
+                VideoCompressor,
+                input_path=video_path,
+                output_dir=proxy_dir,
+                output_name=partial_name,
+                max_width=decision.width,
+                max_fps=decision.fps,
+                segment_seconds=segment_seconds if segmented else 0,
+                segment_dir=segment_dir if segments is not None else None,
+            )
+            # Both raise on an ffmpeg failure or an output that fails validation
+            if segmented:
+                await compressor.compress_segmented(on_segment=hand_over if segments is not None else None)
             else:
-                self.logger.info(
-                    "Video file size is within acceptable limits, no compression needed"
-                )
-                return video_path
+                await asyncio.to_thread(compressor.compress)
+            os.replace(compressor.output_path, proxy_path)
+            self.logger.info(
+                f"Proxy built: {os.path.getsize(proxy_path) / (1024 * 1024):.2f} MB "
+                f"(source {os.path.getsize(video_path) / (1024 * 1024):.2f} MB)"
+            )
+            await asyncio.to_thread(
+                evict_proxies, proxy_dir, int(float(os.getenv("VIDEO_PROXY_CACHE_GB", "20")) * 1024 ** 3)
+            )
+            return proxy_path
         except Exception as e:
+            if handed_over:
+                # Keyframes are already being extracted from proxy segments; the source can't stand in
+                raise
             self.logger.warning(f"Exception occurred during video compression check: {e}")
             return video_path
+        finally:
+            if partial_path is not None and os.path.exists(partial_path):
+                os.remove(partial_path)
+            if segments is not None:
+                segments.put_nowait(None)
+
+    async def _proxy_segment_dir(self, content_hash: str) -> str:
+        """
+        Directory that holds the transcoded proxy segments of a video part until it is processed.
+
+        Unique to this ingest (pid/uuid), like the partial proxy file, so concurrent ingests of
+        the same content never overwrite or delete each other's segments.
+        """
+        return os.path.join(
+            await get_media_folder(), "proxy_segments", f"{content_hash}.{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        )
 
     async def _perform_early_ingestion_check(self) -> bool:
         """
         Perform early ingestion check to avoid unnecessary processing.
 
+        Without a precomputed hash_video_id, the full file hash is started in the background and
+        a sampled fingerprint is looked up instead: a video ingested before is recognised within
+        milliseconds, while for an unknown fingerprint the check by full hash is deferred to
+        _resolve_parent_video_id() so hashing overlaps with the following steps.
+
         Returns:
             bool: True if should continue processing, False if already ingested
         """
         try:
             self.logger.info("Performing early ingestion check...")
 
-            # Generate hash ID for initial check
-            video_hash_id = await get_file_hash(self.video_path)
+            if self.hash_video_id:
+                return not await self._skip_if_ingested(self.hash_video_id)
 
-            # Check if video already exists in the index
-            is_already_ingested = await check_video_already_ingested(
-                hash_id=video_hash_id, index_name=self.index_name
-            )
+            self._video_hash_task = asyncio.ensure_future(get_file_hash(self.original_video_path))
 
-            if is_already_ingested:
+            if os.getenv("VIDEO_FINGERPRINT_MODE", "sampled").lower() == "full":
+                return not await self._skip_if_ingested(await self._video_hash_task)
 
-                self.logger.info(
-                    f"Video with hash_id {video_hash_id} already exists in index {self.index_name}. Skipping pipeline - no processing needed."
-                )
+            self._fingerprint = await sampled_fingerprint(self.original_video_path)
+            known_video_id = await get_resource_pool().fingerprint_registry().lookup(self._fingerprint)
+            if known_video_id and await self._skip_if_ingested(known_video_id):
+                self._video_hash_task.cancel()
                 return False
 
-            self.logger.info("Video not found in index. Proceeding with full ingestion pipeline...")
+            self.logger.info("Fingerprint not found in index. Proceeding while the video hash is computed...")
+            self._deferred_ingestion_check = True
             return True
 
         except Exception as e:
             self.logger.exception(f"Exception occurred during early ingestion check: {e}")
             raise
 
+    async def _skip_if_ingested(self, video_hash_id: str) -> bool:
+        """Return True (and log) if the video is already in the index."""
+        is_already_ingested = await check_video_already_ingested(
+            hash_id=video_hash_id, index_name=self.index_name
+        )
+        if is_already_ingested:
+            self.logger.info(
+                f"Video with hash_id {video_hash_id} already exists in index {self.index_name}. Skipping pipeline - no processing needed."
+            )
+            await self._remember_fingerprint(video_hash_id)
+            return True
+
+        self.logger.info("Video not found in index. Proceeding with full ingestion pipeline...")
+        return False
+
+    async def _resolve_parent_video_id(self) -> Optional[str]:
+        """
+        Return the hash id of the original video, or None if the deferred check finds it already ingested.
+        """
+        if self.hash_video_id:
+            return self.hash_video_id
+        if self._video_hash_task is None:
+            self._video_hash_task = asyncio.ensure_future(get_file_hash(self.original_video_path))
+        parent_video_id = await self._video_hash_task
+        if self._deferred_ingestion_check:
+            self._deferred_ingestion_check = False
+            if await self._skip_if_ingested(parent_video_id):
+                return None
+        return parent_video_id
+
+    async def _remember_fingerprint(self, video_hash_id: str) -> None:
+        """Map the sampled fingerprint of this video to its hash id for later dedup checks."""
+        if not self._fingerprint:
+            return
+        try:
+            await get_resource_pool().fingerprint_registry().record(self._fingerprint, video_hash_id)
+        except Exception as e:
+            self.logger.warning(f"Failed to record video fingerprint: {e}")
+
     async def _queue_keyframe_uploads(self, context: ProcessingContext, blob_manager):
         """
         Queue keyframe files for upload to blob storage.
-        Adds upload tasks to the context's pending upload queue.
+        Adds an UploadItem per keyframe to the context's pending uploads.
         """
         try:
             # Get media folder and keyframes directory
@@ -324,14 +466,17 @@ class IngestionPipeline:
 
             self.logger.info(f"Found {len(keyframe_files)} keyframes to upload")
 
-            # Add upload tasks for each keyframe
+            if packing_enabled():
+                # Packed layout: a few tar shards plus an offset index instead of one object per keyframe
+                pack_dir = os.path.join(media_folder, "keyframe_packs", context.hash_id)
+                keyframe_files = await asyncio.to_thread(pack_directory_files, keyframe_files, pack_dir)
+                context.local_resources.append(pack_dir)
+                self.logger.info(f"Packed keyframes into {len(keyframe_files) - 1} shards")
+
+            # Add an upload item for each keyframe (or shard)
             for filename, keyframe_path in keyframe_files:
-                context.pending_upload_tasks.append(
-                    blob_manager.save_file(
-                        folder_name=self.keyframe_container,
-                        file_name=f"{context.hash_id}/{filename}",
-                        src_file_path=keyframe_path,
-                    )
+                context.pending_uploads.append(
+                    UploadItem(file_name=f"{context.hash_id}/{filename}", src_file_path=keyframe_path)
                 )
 
             # Add keyframes directory to local resources for cleanup
@@ -371,8 +516,14 @@ class IngestionPipeline:
             self.logger.info(f"Starting processing of video part: {os.path.basename(video_path)}")
             self.logger.info(f"Part Hash ID: {part_hash_id}")
 
-            # Step 1: Compress video if needed
-            video_path = await self._check_and_compress_video(video_path)
+            # Step 1: Analyse a proxy if the source is expensive to decode. The proxy is built
+            # while the stages run: a proxy transcoded in segments feeds keyframe extraction
+            # segment by segment, and the other stages wait for the finished proxy.
+            proxy_segments: asyncio.Queue = asyncio.Queue()
+            segment_dir = await self._proxy_segment_dir(part_hash_id)
+            proxy_task = asyncio.ensure_future(
+                self._check_and_compress_video(video_path, part_hash_id, proxy_segments, segment_dir)
+            )
 
             # Create processing context for this video part
             _, video_extension = os.path.splitext(video_path)
@@ -387,6 +538,7 @@ class IngestionPipeline:
                 parent_duration=parent_duration,
                 video_duration=part_duration,
             )
+            context.local_resources.append(segment_dir)
 
             # Get blob manager
             blob_manager = await self._get_blob_manager()
@@ -396,7 +548,6 @@ class IngestionPipeline:
                 folder_name=self.keyframe_container, file_name=f"{context.hash_id}"
             )
 
-            # Step 2: Process keyframes (extract, generate embeddings, store to search index)
             keyframe_config = KeyframeExtractionConfig(
                 motion_threshold=self.keyframe_config["motion_threshold"],
                 sample_fps=self.keyframe_config["sample_fps"],
@@ -407,65 +558,117 @@ class IngestionPipeline:
                 keyframe_config=keyframe_config,
                 enable_vision_descriptions=True,  # Enable GPT-4o Vision descriptions
             )
-            await keyframe_processor.process_keyframes(
-                video_path=video_path,
-                video_hash_id=part_hash_id,
-                parent_id=parent_id,
-                parent_duration=parent_duration,
-                video_duration=part_duration,
-            )
-            self.logger.info(f"Keyframe processing completed for part {part_hash_id}")
-
-            # Close keyframe processor resources
-            await keyframe_processor.close()
-
-            # Queue keyframes for upload to blob storage
-            await self._queue_keyframe_uploads(context, blob_manager)
-            self.logger.info(f"Queued keyframes for upload for part {part_hash_id}")
-
-            # Step 3: Prepare transcript for this part
-            transcript_path = None
-            if self.transcript_path:
-                if video_split_time is not None:
-                    # Video was split - need to split transcript too
-                    self.logger.info(f"Splitting transcript for part {part_index}...")
-                    transcript_content = await load_srt(self.transcript_path)
-
-                    # Split transcript by time to match video split
-                    part_a_srt, part_b_srt = split_transcript_by_time(transcript_content, video_split_time)
-
-                    # Select the appropriate part based on part_index
-                    selected_transcript = part_a_srt if part_index == 0 else part_b_srt
-
-                    # Save transcript chunk to temporary file
-                    media_folder = await get_media_folder()
-                    transcript_path = os.path.join(media_folder, f"transcript_{part_hash_id}.srt")
-                    async with aiofiles.open(transcript_path, "w", encoding="utf-8") as f:
-                        await f.write(selected_transcript)
-                    self.logger.info(f"Created transcript chunk: {transcript_path}")
-                else:
-                    # Single video - use transcript as-is
-                    transcript_path = self.transcript_path
-                    self.logger.info(f"Using provided transcript: {transcript_path}")
-
-            # Update context with transcript path
-            context.transcript_path = transcript_path
+            # Keyframes are published here segment by segment, so chapter generation can start
+            # on a time range as soon as its frames exist
+            keyframe_timeline = KeyframeTimeline(video_id=part_hash_id)
+            # Sentence embeddings for semantic chunking are computed as transcription windows finish
+            embedding_cache = SentenceEmbeddingCache()
+
+            async def prefetch_sentence_embeddings(segments):
+                await embedding_cache.prefetch(segment.text for segment in segments)
+
+            # Stages run as a dataflow graph: transcription runs concurrently with keyframe
+            # extraction, and embedding/indexing/upload of keyframes overlaps chapter generation.
+            async def extract_keyframes_stage():
+                # Step 2: Extract keyframes, from proxy segments as they are transcoded if any
+                first_segment = await proxy_segments.get()
+                if first_segment is None:
+                    return await keyframe_processor.extract_keyframes(
+                        video_path=await proxy_task,
+                        video_hash_id=part_hash_id,
+                        timeline=keyframe_timeline,
+                    )
 
-            # Run functional pipeline methods
-            context = await self._get_transcription(context)
-            self.logger.info(f"Transcript generated for part {part_hash_id}")
+                async def proxy_segment_stream():
+                    segment = first_segment
+                    while segment is not None:
+                        yield segment
+                        segment = await proxy_segments.get()
+                    # Surfaces a transcode that failed after the first segments
+                    await proxy_task
+
+                return await keyframe_processor.extract_keyframes(
+                    video_path=video_path,
+                    video_hash_id=part_hash_id,
+                    timeline=keyframe_timeline,
+                    segments=proxy_segment_stream(),
+                )
 
-            # Generate semantic chapters from transcript
-            context = await self._generate_semantic_chapters(context, self.url)
+            async def index_keyframes_stage(keyframes):
+                # Step 2b: Generate embeddings, vision descriptions and store to search index
+                try:
+                    await keyframe_processor.index_keyframes(
+                        keyframe_metadata=keyframes,
+                        video_path=await proxy_task,
+                        video_hash_id=part_hash_id,
+                        parent_id=parent_id,
+                        parent_duration=parent_duration,
+                        video_duration=part_duration,
+                    )
+                    self.logger.info(f"Keyframe processing completed for part {part_hash_id}")
+                finally:
+                    # Close keyframe processor resources
+                    await keyframe_processor.close()
+
+            async def upload_keyframes_stage(keyframes):
+                # Queue keyframes for upload and upload them through a sliding window of in-flight uploads
+                await self._queue_keyframe_uploads(context, blob_manager)
+                self.logger.info(f"Queued keyframes for upload for part {part_hash_id}")
+                await blob_manager.save_files(context.pending_uploads, folder_name=self.keyframe_container)
+                context.pending_uploads.clear()
+
+            async def transcript_stage():
+                # Step 3: Prepare transcript for this part. Only the audio track is needed, so it
+                # reads the original video and never waits for the proxy; the stages that decode
+                # frames await proxy_task
+                context.transcript_path = await self._prepare_part_transcript(
+                    part_hash_id, part_index, video_split_time
+                )
+                await self._get_transcription(context, on_segments=prefetch_sentence_embeddings)
+                self.logger.info(f"Transcript generated for part {part_hash_id}")
+
+            async def chapters_stage(transcript):
+                # Generate semantic chapters from transcript; frames come from the keyframe timeline
+                await self._generate_semantic_chapters(
+                    context,
+                    self.url,
+                    keyframe_timeline=keyframe_timeline,
+                    embedding_cache=embedding_cache,
+                )
+                if not context.is_already_ingested:
+                    self.logger.info(f"Chapter generated for part {part_hash_id}")
+
+            stage_graph = StageGraph(
+                name=f"ingestion:{part_hash_id}",
+                on_stage_event=lambda stage_name, status: self._emit_stage_event(
+                    part_hash_id, stage_name, status, stage_graph
+                ),
+                resource_slots=self.resource_slots,
+            )
+            # Local transcription runs the model on this machine; other services are remote APIs
+            transcript_resource = (
+                CPU if self.transcription_service == TranscriptionServices.LOCAL else API
+            )
+            stage_graph.add_stage("keyframes", extract_keyframes_stage, resource=CPU)
+            stage_graph.add_stage(
+                "keyframe_index", index_keyframes_stage, depends_on=("keyframes",), resource=CPU
+            )
+            stage_graph.add_stage("keyframe_upload", upload_keyframes_stage, depends_on=("keyframes",))
+            stage_graph.add_stage("transcript", transcript_stage, resource=transcript_resource)
+            stage_graph.add_stage(
+                "chapters", chapters_stage, depends_on=("transcript",), resource=API
+            )
 
-            if not context.is_already_ingested:
-                self.logger.info(f"Chapter generated for part {part_hash_id}")
+            try:
+                await stage_graph.run()
+            finally:
+                if not proxy_task.done():
+                    proxy_task.cancel()
+                context.stage_timings = stage_graph.get_timings()
+                self.stage_timings[part_hash_id] = context.stage_timings
+                self.logger.info(f"Stage timings for part {part_hash_id}: {context.stage_timings}")
 
-            # Upload files in batches
-            for batch in chunked(context.pending_upload_tasks, 20):
-                upload_results = await asyncio.gather(*batch)
-                del upload_results
-                gc.collect()
+            transcript_path = context.transcript_path
 
             self.logger.info(f"Files uploaded for part {part_hash_id}")
 
@@ -508,10 +711,59 @@ class IngestionPipeline:
             )
             raise
 
+    async def _prepare_part_transcript(
+        self,
+        part_hash_id: str,
+        part_index: int,
+        video_split_time: Optional[float] = None,
+    ) -> Optional[str]:
+        """
+        Resolve the user-provided transcript for a video part, splitting it if the video was split.
+
+        Args:
+            part_hash_id: Hash ID for this specific video part
+            part_index: Index of this part (0 for Part A, 1 for Part B)
+            video_split_time: Time in seconds where video was split (required if split into 2 parts)
+
+        Returns:
+            Path to the transcript for this part, or None if no transcript was provided
+        """
+        if not self.transcript_path:
+            return None
+
+        if video_split_time is None:
+            # Single video - use transcript as-is
+            self.logger.info(f"Using provided transcript: {self.transcript_path}")
+            return self.transcript_path
+
+        # Video was split - need to split transcript too
+        self.logger.info(f"Splitting transcript for part {part_index}...")
+        transcript_content = await load_srt(self.transcript_path)
+
+        # Split transcript by time to match video split
+        part_a_srt, part_b_srt = split_transcript_by_time(transcript_content, video_split_time)
+
+        # Select the appropriate part based on part_index
+        selected_transcript = part_a_srt if part_index == 0 else part_b_srt
+
+        # Save transcript chunk to temporary file
+        media_folder = await get_media_folder()
+        transcript_path = os.path.join(media_folder, f"transcript_{part_hash_id}.srt")
+        async with aiofiles.open(transcript_path, "w", encoding="utf-8") as f:
+            await f.write(selected_transcript)
+        self.logger.info(f"Created transcript chunk: {transcript_path}")
+        return transcript_path
+
     async def _get_transcription(
-        self, context: ProcessingContext
+        self,
+        context: ProcessingContext,
+        on_segments: Optional[Callable[[List[TranscriptEntry]], Awaitable[None]]] = None,
     ) -> ProcessingContext:
-        """Generate transcription for video - functional version."""
+        """
+        Generate transcription for video - functional version.
+
+        on_segments, when provided, receives transcript segments as transcription windows finish.
+        """
         try:
             self.logger.info(
                 f"Using hash ID for video path: {context.video_path}\nHash Id: {context.hash_id}"
@@ -522,7 +774,8 @@ class IngestionPipeline:
             new_video_path = os.path.join(video_dir, f"{context.hash_id}{context.video_extension}")
 
             if context.video_path != new_video_path:
-                shutil.copy2(context.video_path, new_video_path)
+                # Copy off the event loop; keyframe extraction runs concurrently with this stage
+                await asyncio.to_thread(shutil.copy2, context.video_path, new_video_path)
                 context.video_path = new_video_path
                 context.local_resources.append(new_video_path)  # Track renamed copy for cleanup
                 self.logger.info(f"Video file copied to: {context.video_path}")
@@ -561,16 +814,27 @@ class IngestionPipeline:
                         video_path=context.video_path,
                         hash_id=context.hash_id,
                         language=self.language,
+                        on_segments=on_segments,
                     )
                 elif self.transcription_service is None:
                     transcriber = CloudTranscription(
                         video_path=context.video_path,
                         hash_id=context.hash_id,
                         language=self.language,
+                        on_segments=on_segments,
+                    )
+                elif self.transcription_service == TranscriptionServices.LOCAL:
+                    transcriber = WhisperTranscription(
+                        video_path=context.video_path,
+                        hash_id=context.hash_id,
+                        on_segments=on_segments,
+                        provider_name="local",
                     )
                 else:
                     transcriber = WhisperTranscription(
-                        video_path=context.video_path, hash_id=context.hash_id
+                        video_path=context.video_path,
+                        hash_id=context.hash_id,
+                        on_segments=on_segments,
                     )
 
                 self.logger.info("Initialized the transcriber instance")
@@ -586,11 +850,18 @@ class IngestionPipeline:
             raise
 
     async def _generate_semantic_chapters(
-        self, context: ProcessingContext, url: Optional[str] = None
+        self,
+        context: ProcessingContext,
+        url: Optional[str] = None,
+        keyframe_timeline: Optional[KeyframeTimeline] = None,
+        embedding_cache: Optional[SentenceEmbeddingCache] = None,
     ) -> ProcessingContext:
         """
         Generate semantic chapters from transcript using the chapter ingestion pipeline.
         Creates chapters and indexes them for search and retrieval.
+
+        When keyframe_timeline is provided, each chapter starts as soon as keyframes for its
+        time range are extracted, reading frames from memory instead of the keyframe index.
         """
         try:
             self.logger.info(
@@ -605,6 +876,8 @@ class IngestionPipeline:
                 parent_id=context.parent_id,
                 parent_duration=context.parent_duration,
                 video_duration=context.video_duration,
+                keyframe_timeline=keyframe_timeline,
+                embedding_cache=embedding_cache,
             )
             self.logger.info("Successfully created an instance of ChapterIngestionPipeline!")
 
@@ -630,23 +903,8 @@ class IngestionPipeline:
             bool: True if audio stream exists, False otherwise
         """
         try:
-            process = await asyncio.create_subprocess_exec(
-                "ffprobe",
-                "-v",
-                "error",
-                "-select_streams",
-                "a:0",
-                "-show_entries",
-                "stream=codec_type",
-                "-of",
-                "default=noprint_wrappers=1:nokey=1",
-                video_path,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE,
-            )
-
-            stdout, _ = await process.communicate()
-            return stdout and stdout.strip() == b"audio"
+            # Same cached probe that later serves the duration and the proxy decision
+            return (await probe_media(video_path)).has_audio
         except Exception as e:
             self.logger.warning(f"Could not check for audio stream: {e}")
             return False
@@ -681,6 +939,29 @@ class IngestionPipeline:
             )
             raise
 
+    def _emit_stage_event(
+        self, part_hash_id: str, stage_name: str, status: str, stage_graph: StageGraph
+    ) -> None:
+        """Forward a stage transition of one video part to the on_stage_event callback."""
+        if self.on_stage_event is None:
+            return
+        self.on_stage_event(
+            {
+                "part": part_hash_id,
+                "stage": stage_name,
+                "status": status,
+                "duration": stage_graph.timings[stage_name].duration,
+                "stages_total": len(stage_graph.stages),
+            }
+        )
+
+    async def _invalidate_cached_answers(self, video_ids: List[Optional[str]]) -> None:
+        """Invalidate semantic answer cache entries for this video and index."""
+        try:
+            await get_resource_pool().answer_cache().invalidate(self.index_name, video_ids)
+        except Exception as e:
+            self.logger.warning(f"Failed to invalidate cached answers for index {self.index_name}: {e}")
+
     async def run(self):
         """Main ingestion pipeline method - now supports video splitting and parallel processing."""
         try:
@@ -708,7 +989,9 @@ class IngestionPipeline:
                 self.logger.info("Video has audio stream - proceeding with transcription")
 
             # Calculate parent video metadata (original video before any splitting)
-            parent_video_id = await get_file_hash(file_path=self.original_video_path)
+            parent_video_id = await self._resolve_parent_video_id()
+            if parent_video_id is None:
+                return
             parent_video_duration = await get_video_duration(self.video_path)
             self.logger.info(
                 f"Parent video ID: {parent_video_id}, Duration: {parent_video_duration:.2f}s"
@@ -760,6 +1043,13 @@ class IngestionPipeline:
 
             self.logger.info("All video parts processed successfully!")
 
+            await self._remember_fingerprint(parent_video_id)
+
+            # Answers cached before this ingestion were computed without these documents
+            await self._invalidate_cached_answers(
+                [parent_video_id, self.url] + [base_hash_id + suffix for suffix in hash_suffixes]
+            )
+
             # Clean up split video files if any were created
             for split_video_path in split_video_cleanup_paths:
                 try:
@@ -4,7 +4,7 @@ import math
 import logging
 import numpy as np
 from dataclasses import dataclass
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Tuple, Callable, Awaitable, AsyncIterator
 from concurrent.futures import ThreadPoolExecutor
 import asyncio
 
@@ -116,11 +116,21 @@ def _process_segment(
     config: KeyframeExtractionConfig,
     video_hash_id: str,
     keyframes_dir: str,
+    time_offset: float = 0.0,
+    end_time: Optional[float] = None,
+    boundary: Optional[Dict[str, Any]] = None,
 ) -> List[FrameMetadata]:
     """
     Worker that processes a range of frames [start_frame, end_frame).
     Runs in a threadpool worker.
 
+    time_offset is the start time of video_path within the whole video, for files that are
+    one segment of it; frame numbers and timestamps are reported relative to the whole video.
+    Frames numbered at or past end_time belong to the next segment and are skipped, so
+    separately resampled segments never produce the same frame number twice. If boundary is
+    given, the first and last sampled grayscale frames are stored in it ("first_gray",
+    "last_gray") for comparison with the neighbouring segments.
+
     Each worker:
     - Opens its own VideoCapture
     - Seeks to start_frame
@@ -165,6 +175,8 @@ def _process_segment(
     prev_gray_small: Optional[np.ndarray] = None
 
     frame_idx = start - 1
+    frame_offset = int(round(time_offset * fps))
+    end_number = int(round(end_time * fps)) if end_time is not None else None
     write_jpeg = cv2.imwrite  # local binding == tiny perf improvement
 
     while True:
@@ -175,12 +187,14 @@ def _process_segment(
         frame_idx += 1
         if frame_idx >= stop:
             break
+        if end_number is not None and frame_offset + frame_idx >= end_number:
+            break
 
         # temporal downsampling: only process 1 out of `interval` frames
         if (frame_idx - start) % interval != 0:
             continue
 
-        ts_sec = frame_idx / fps
+        ts_sec = time_offset + frame_idx / fps
 
         # spatial downsampling to reduce optical flow cost
         if scale_factor < 1.0:
@@ -193,6 +207,8 @@ def _process_segment(
             small_bgr = frame_bgr
 
         curr_gray_small = cv2.cvtColor(small_bgr, cv2.COLOR_BGR2GRAY)
+        if boundary is not None and prev_gray_small is None:
+            boundary["first_gray"] = curr_gray_small
 
         # motion score vs prev frame
         if prev_gray_small is None:
@@ -202,7 +218,7 @@ def _process_segment(
 
         is_first = prev_gray_small is None
         if is_first or (motion_score >= threshold):
-            filename = f"{video_hash_id}_{frame_idx}.jpg"
+            filename = f"{video_hash_id}_{frame_offset + frame_idx}.jpg"
             abs_path = os.path.join(keyframes_dir, filename)
 
             # Synchronous write. If disk I/O becomes a bottleneck,
@@ -211,7 +227,7 @@ def _process_segment(
 
             results.append(
                 FrameMetadata(
-                    frame_number=frame_idx,
+                    frame_number=frame_offset + frame_idx,
                     timestamp_seconds=float(ts_sec),
                     motion_score=float(motion_score),
                 )
@@ -220,6 +236,8 @@ def _process_segment(
         prev_gray_small = curr_gray_small
 
     cap.release()
+    if boundary is not None:
+        boundary["last_gray"] = prev_gray_small
     return results
 
 # Main extractor class
@@ -244,6 +262,9 @@ class KeyframeExtractor:
         self,
         video_path: str,
         video_id: Optional[str] = None,
+        on_segment_complete: Optional[
+            Callable[[float, float, List[FrameMetadata]], Awaitable[None]]
+        ] = None,
     ) -> List[FrameMetadata]:
         """
         Extract keyframes from a (preferably pre-compressed / proxy) video.
@@ -254,6 +275,10 @@ class KeyframeExtractor:
         - Split total frame range into segments
         - Process segments in parallel with ThreadPoolExecutor
         - Merge + sort metadata
+
+        on_segment_complete, if given, is awaited with
+        (start_seconds, end_seconds, segment_keyframes) as each segment finishes,
+        so downstream stages can consume keyframes before the whole video is done.
         """
 
         # Stable ID for filenames
@@ -298,25 +323,31 @@ class KeyframeExtractor:
         loop = asyncio.get_running_loop()
         all_results: List[FrameMetadata] = []
 
+        async def run_segment(seg_start: int, seg_end: int, executor: ThreadPoolExecutor):
+            seg_meta = await loop.run_in_executor(
+                executor,
+                _process_segment,
+                video_path,
+                seg_start,
+                seg_end,
+                self.config,
+                video_hash_id,
+                keyframes_dir,
+            )
+            return seg_start, seg_end, seg_meta
+
         with ThreadPoolExecutor(max_workers=workers) as executor:
             futures = [
-                loop.run_in_executor(
-                    executor,
-                    _process_segment,
-                    video_path,
-                    seg_start,
-                    seg_end,
-                    self.config,
-                    video_hash_id,
-                    keyframes_dir,
-                )
+                run_segment(seg_start, seg_end, executor)
                 for (seg_start, seg_end) in segments
             ]
 
             # gather as they finish
             for fut in asyncio.as_completed(futures):
-                seg_meta = await fut
+                seg_start, seg_end, seg_meta = await fut
                 all_results.extend(seg_meta)
+                if on_segment_complete is not None:
+                    await on_segment_complete(seg_start / fps, seg_end / fps, seg_meta)
 
         # Order results by frame_number before returning
         all_results.sort(key=lambda m: m.frame_number)
@@ -327,6 +358,116 @@ class KeyframeExtractor:
 
         return all_results
 
+    async def extract_keyframes_from_segments(
+        self,
+        segments: AsyncIterator[Tuple[str, float, float]],
+        video_id: str,
+        on_segment_complete: Optional[
+            Callable[[float, float, List[FrameMetadata]], Awaitable[None]]
+        ] = None,
+    ) -> List[FrameMetadata]:
+        """
+        Extract keyframes from a video delivered as segment files, e.g. by a proxy that is
+        still being transcoded segment by segment.
+
+        segments yields (segment_path, start_seconds, end_seconds); each segment is processed
+        as soon as it arrives, up to num_workers at a time. Frame numbers and timestamps are
+        relative to the whole video, as with extract_keyframes.
+
+        Segments run in parallel, so each one starts without motion state and saves its first
+        frame. Once the previous segment is done, that first frame is compared with the previous
+        segment's last sampled frame and dropped unless the motion crosses the threshold, as it
+        would have been in one pass over the whole video. on_segment_complete is therefore
+        awaited only after the previous segment's boundary is known.
+        """
+        media_root = await get_media_folder()
+        keyframes_dir = os.path.join(media_root, "keyframes", video_id)
+        os.makedirs(keyframes_dir, exist_ok=True)
+
+        workers = max(1, min(self.config.num_workers, os.cpu_count() or 1))
+        loop = asyncio.get_running_loop()
+        all_results: List[FrameMetadata] = []
+        # Last sampled gray frame of each segment, keyed by its end time in milliseconds
+        last_grays: Dict[int, asyncio.Future] = {}
+        segment_ends: set = set()
+        all_arrived = False
+
+        def last_gray_of(end_seconds: float) -> asyncio.Future:
+            key = int(round(end_seconds * 1000))
+            future = last_grays.setdefault(key, loop.create_future())
+            if all_arrived and key not in segment_ends and not future.done():
+                # No segment ends here, so there is no previous frame to compare with
+                future.set_result(None)
+            return future
+
+        async def run_segment(path: str, start_seconds: float, end_seconds: float, executor):
+            boundary: Dict[str, Any] = {}
+            try:
+                seg_meta = await loop.run_in_executor(
+                    executor,
+                    _process_segment,
+                    path,
+                    0,
+                    2 ** 31,
+                    self.config,
+                    video_id,
+                    keyframes_dir,
+                    start_seconds,
+                    end_seconds,
+                    boundary,
+                )
+            finally:
+                done = last_gray_of(end_seconds)
+                if not done.done():
+                    done.set_result(boundary.get("last_gray"))
+
+            if start_seconds > 0 and seg_meta and boundary.get("first_gray") is not None:
+                previous_gray = await last_gray_of(start_seconds)
+                seg_meta = self._resolve_boundary(seg_meta, boundary["first_gray"], previous_gray, video_id, keyframes_dir)
+            all_results.extend(seg_meta)
+            if on_segment_complete is not None:
+                await on_segment_complete(start_seconds, end_seconds, seg_meta)
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            tasks = []
+            try:
+                async for path, start_seconds, end_seconds in segments:
+                    segment_ends.add(int(round(end_seconds * 1000)))
+                    tasks.append(asyncio.ensure_future(run_segment(path, start_seconds, end_seconds, executor)))
+                all_arrived = True
+                for key in list(last_grays):
+                    last_gray_of(key / 1000)
+                await asyncio.gather(*tasks)
+            finally:
+                for task in tasks:
+                    task.cancel()
+
+        all_results.sort(key=lambda m: m.frame_number)
+        logger.info(
+            f"KeyframeExtractor: extracted {len(all_results)} keyframes from {len(tasks)} segments -> {keyframes_dir}"
+        )
+        return all_results
+
+    def _resolve_boundary(
+        self,
+        seg_meta: List[FrameMetadata],
+        first_gray: np.ndarray,
+        previous_gray: Optional[np.ndarray],
+        video_id: str,
+        keyframes_dir: str,
+    ) -> List[FrameMetadata]:
+        """Keep a segment's forced first frame only if it moved enough from the previous segment's last frame."""
+        if previous_gray is None or previous_gray.shape != first_gray.shape:
+            return seg_meta
+        motion_score = _motion_score_cpu(previous_gray, first_gray)
+        first = seg_meta[0]
+        if motion_score >= self.config.motion_threshold:
+            return [FrameMetadata(first.frame_number, first.timestamp_seconds, float(motion_score))] + seg_meta[1:]
+        path = os.path.join(keyframes_dir, f"{video_id}_{first.frame_number}.jpg")
+        if os.path.exists(path):
+            os.remove(path)
+        return seg_meta[1:]
+
     def cleanup_frames(
         self,
         keyframes_dir: str,
@@ -7,13 +7,18 @@ into a single, clean interface.
 
 import os
 from pathlib import Path
+from typing import AsyncIterator, List, Optional, Tuple
 from PIL import Image
 from loguru import logger
 
 from mmct.video_pipeline.core.ingestion.key_frames_extractor.keyframe_extractor import (
+    FrameMetadata,
     KeyframeExtractor,
     KeyframeExtractionConfig,
 )
+from mmct.video_pipeline.core.ingestion.key_frames_extractor.keyframe_timeline import (
+    KeyframeTimeline,
+)
 from mmct.video_pipeline.core.ingestion.key_frames_extractor.clip_embeddings import (
     CLIPEmbeddingsGenerator,
 )
@@ -135,6 +140,109 @@ Be specific and factual."""
 
         return vision_descriptions
 
+    async def extract_keyframes(
+        self,
+        video_path: str,
+        video_hash_id: str,
+        timeline: Optional[KeyframeTimeline] = None,
+        segments: Optional[AsyncIterator[Tuple[str, float, float]]] = None,
+    ) -> List[FrameMetadata]:
+        """
+        Extract keyframes for a video part to the local keyframes folder.
+
+        Args:
+            video_path: Path to the video file
+            video_hash_id: Hash ID for this video part
+            timeline: Optional KeyframeTimeline that receives keyframes segment by segment
+            segments: Optional (segment_path, start_seconds, end_seconds) stream of the video's
+                segments; when given, keyframes are extracted from the segments as they arrive
+
+        Returns:
+            List of FrameMetadata for the extracted keyframes, ordered by frame number
+        """
+        logger.info(f"Extracting keyframes for video {video_hash_id}...")
+        keyframe_extractor = KeyframeExtractor(self.keyframe_config)
+        try:
+            on_segment_complete = timeline.add_segment if timeline is not None else None
+            if segments is not None:
+                keyframe_metadata = await keyframe_extractor.extract_keyframes_from_segments(
+                    segments=segments,
+                    video_id=video_hash_id,
+                    on_segment_complete=on_segment_complete,
+                )
+            else:
+                keyframe_metadata = await keyframe_extractor.extract_keyframes(
+                    video_path=video_path,
+                    video_id=video_hash_id,
+                    on_segment_complete=on_segment_complete,
+                )
+        except Exception as e:
+            if timeline is not None:
+                await timeline.mark_failed(e)
+            raise
+
+        if timeline is not None:
+            await timeline.mark_complete(keyframe_metadata)
+        logger.info(f"Successfully extracted {len(keyframe_metadata)} keyframes")
+        return keyframe_metadata
+
+    async def index_keyframes(
+        self,
+        keyframe_metadata: List[FrameMetadata],
+        video_path: str,
+        video_hash_id: str,
+        parent_id: str,
+        parent_duration: float,
+        video_duration: float,
+    ) -> None:
+        """
+        Generate embeddings and vision descriptions for extracted keyframes and store them.
+
+        Args:
+            keyframe_metadata: Keyframes returned by extract_keyframes
+            video_path: Path to the video file
+            video_hash_id: Hash ID for this video part
+            parent_id: Hash ID of the parent/original video
+            parent_duration: Duration of the parent video in seconds
+            video_duration: Duration of this video part in seconds
+        """
+        # Initialize search index if not already done
+        await self._initialize_search_index()
+
+        # Step 2: Generate embeddings
+        logger.info(f"Generating embeddings for {len(keyframe_metadata)} keyframes...")
+        embedding_config = ImageEmbeddingConfig()
+        embeddings_generator = CLIPEmbeddingsGenerator(embedding_config)
+
+        try:
+            frame_embeddings = await embeddings_generator.process_frames(
+                keyframe_metadata, video_hash_id
+            )
+            logger.info(f"Successfully generated {len(frame_embeddings)} frame embeddings")
+        finally:
+            # Clean up embeddings generator resources
+            await embeddings_generator.cleanup()
+
+        # Step 2.5: Generate vision descriptions (if enabled)
+        vision_descriptions = await self._generate_vision_descriptions(keyframe_metadata, video_hash_id)
+
+        # Step 3: Store embeddings to search index
+        logger.info(f"Storing {len(frame_embeddings)} frame embeddings to search index...")
+        success = await self.keyframe_search_index.upload_frame_embeddings(
+            frame_embeddings=frame_embeddings,
+            video_id=video_hash_id,
+            video_path=video_path,
+            parent_id=parent_id,
+            parent_duration=parent_duration,
+            video_duration=video_duration,
+            vision_descriptions=vision_descriptions,  # Pass vision descriptions
+        )
+
+        if success:
+            logger.info("Successfully stored frame embeddings to search index")
+        else:
+            logger.error("Failed to store frame embeddings to search index")
+
     async def process_keyframes(
         self,
         video_path: str,
@@ -158,47 +266,18 @@ Be specific and factual."""
             await self._initialize_search_index()
 
             # Step 1: Extract keyframes
-            logger.info(f"Extracting keyframes for video {video_hash_id}...")
-            keyframe_extractor = KeyframeExtractor(self.keyframe_config)
-            keyframe_metadata = await keyframe_extractor.extract_keyframes(
-                video_path=video_path, video_id=video_hash_id
-            )
-            logger.info(f"Successfully extracted {len(keyframe_metadata)} keyframes")
-
-            # Step 2: Generate embeddings
-            logger.info(f"Generating embeddings for {len(keyframe_metadata)} keyframes...")
-            embedding_config = ImageEmbeddingConfig()
-            embeddings_generator = CLIPEmbeddingsGenerator(embedding_config)
+            keyframe_metadata = await self.extract_keyframes(video_path, video_hash_id)
 
-            try:
-                frame_embeddings = await embeddings_generator.process_frames(
-                    keyframe_metadata, video_hash_id
-                )
-                logger.info(f"Successfully generated {len(frame_embeddings)} frame embeddings")
-            finally:
-                # Clean up embeddings generator resources
-                await embeddings_generator.cleanup()
-
-            # Step 2.5: Generate vision descriptions (if enabled)
-            vision_descriptions = await self._generate_vision_descriptions(keyframe_metadata, video_hash_id)
-
-            # Step 3: Store embeddings to search index
-            logger.info(f"Storing {len(frame_embeddings)} frame embeddings to search index...")
-            success = await self.keyframe_search_index.upload_frame_embeddings(
-                frame_embeddings=frame_embeddings,
-                video_id=video_hash_id,
+            # Steps 2-3: Embeddings, vision descriptions and search index storage
+            await self.index_keyframes(
+                keyframe_metadata=keyframe_metadata,
                 video_path=video_path,
+                video_hash_id=video_hash_id,
                 parent_id=parent_id,
                 parent_duration=parent_duration,
                 video_duration=video_duration,
-                vision_descriptions=vision_descriptions,  # Pass vision descriptions
             )
 
-            if success:
-                logger.info("Successfully stored frame embeddings to search index")
-            else:
-                logger.error("Failed to store frame embeddings to search index")
-
         except Exception as e:
             logger.exception(f"Exception occurred during keyframe processing: {e}")
             raise
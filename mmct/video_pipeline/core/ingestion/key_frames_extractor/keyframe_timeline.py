@@ -0,0 +1,119 @@
+"""
+KeyframeTimeline: in-memory view of keyframes as extraction progresses.
+
+The keyframe extractor processes the video in parallel frame-range segments. Each
+finished segment is published here, so consumers such as chapter generation can
+start on a time range as soon as its keyframes exist, without waiting for the whole
+video or querying the search index for frames that were just written.
+"""
+
+import asyncio
+from typing import List, Optional, Tuple
+from loguru import logger
+
+from mmct.video_pipeline.core.ingestion.key_frames_extractor.keyframe_extractor import (
+    FrameMetadata,
+)
+
+
+class KeyframeTimeline:
+    """Tracks which time ranges of a video have finished keyframe extraction."""
+
+    def __init__(self, video_id: str):
+        """
+        Initialize an empty timeline.
+
+        Args:
+            video_id: Hash ID of the video part the keyframes belong to
+        """
+        self.video_id = video_id
+        self._frames: List[FrameMetadata] = []
+        self._covered: List[Tuple[float, float]] = []
+        self._complete = False
+        self._error: Optional[BaseException] = None
+        self._condition = asyncio.Condition()
+
+    async def add_segment(
+        self, start_seconds: float, end_seconds: float, frames: List[FrameMetadata]
+    ) -> None:
+        """
+        Publish the keyframes of a finished extraction segment.
+
+        Args:
+            start_seconds: Start of the segment's time range
+            end_seconds: End of the segment's time range
+            frames: Keyframes extracted within the segment
+        """
+        async with self._condition:
+            self._frames.extend(frames)
+            self._covered = self._merge_intervals(self._covered + [(start_seconds, end_seconds)])
+            self._condition.notify_all()
+        logger.debug(
+            f"Keyframe timeline {self.video_id}: segment {start_seconds:.1f}-{end_seconds:.1f}s "
+            f"ready with {len(frames)} frames"
+        )
+
+    async def mark_complete(self, frames: Optional[List[FrameMetadata]] = None) -> None:
+        """
+        Mark extraction as finished for the whole video.
+
+        Args:
+            frames: Optional final frame list; replaces the incrementally collected frames
+        """
+        async with self._condition:
+            if frames is not None:
+                self._frames = list(frames)
+            self._complete = True
+            self._condition.notify_all()
+
+    async def mark_failed(self, error: BaseException) -> None:
+        """Wake up all waiters with the extraction error."""
+        async with self._condition:
+            self._error = error
+            self._condition.notify_all()
+
+    async def wait_for_range(self, start_seconds: float, end_seconds: float) -> None:
+        """
+        Wait until keyframes covering [start_seconds, end_seconds] are available.
+
+        Raises:
+            RuntimeError: If keyframe extraction failed
+        """
+        async with self._condition:
+            await self._condition.wait_for(
+                lambda: self._error is not None
+                or self._complete
+                or self._is_covered(start_seconds, end_seconds)
+            )
+            if self._error is not None:
+                raise RuntimeError(f"Keyframe extraction failed: {self._error}")
+
+    def frames_in_range(self, start_seconds: float, end_seconds: float) -> List[FrameMetadata]:
+        """Return keyframes with start_seconds <= timestamp <= end_seconds, ordered by time."""
+        frames = [
+            frame
+            for frame in self._frames
+            if start_seconds <= frame.timestamp_seconds <= end_seconds
+        ]
+        frames.sort(key=lambda frame: frame.timestamp_seconds)
+        return frames
+
+    @property
+    def frames(self) -> List[FrameMetadata]:
+        """All keyframes published so far, ordered by frame number."""
+        return sorted(self._frames, key=lambda frame: frame.frame_number)
+
+    def _is_covered(self, start_seconds: float, end_seconds: float) -> bool:
+        return any(
+            lo <= start_seconds and end_seconds <= hi for lo, hi in self._covered
+        )
+
+    @staticmethod
+    def _merge_intervals(intervals: List[Tuple[float, float]]) -> List[Tuple[float, float]]:
+        merged: List[Tuple[float, float]] = []
+        for lo, hi in sorted(intervals):
+            if merged and lo <= merged[-1][1]:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], hi))
+            else:
+                merged.append((lo, hi))
+        return merged
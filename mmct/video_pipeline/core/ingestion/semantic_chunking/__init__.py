@@ -4,8 +4,12 @@ Semantic Chunking Module
 This module provides semantic clustering functionality for video transcripts.
 """
 
-from mmct.video_pipeline.core.ingestion.semantic_chunking.semantic_chunker import SemanticChunker
+from mmct.video_pipeline.core.ingestion.semantic_chunking.semantic_chunker import (
+    SemanticChunker,
+    SentenceEmbeddingCache,
+)
 
 __all__ = [
     "SemanticChunker",
+    "SentenceEmbeddingCache",
 ]
@@ -10,7 +10,7 @@ import warnings
 import asyncio
 import numpy as np
 import os
-from typing import List
+from typing import Dict, Iterable, List, Optional
 from loguru import logger
 from sklearn.metrics.pairwise import cosine_similarity
 from dotenv import load_dotenv, find_dotenv
@@ -21,6 +21,53 @@ from mmct.video_pipeline.core.ingestion.semantic_chunking.process_transcript imp
 load_dotenv(find_dotenv(), override=True)
 
 
+class SentenceEmbeddingCache:
+    """
+    Embeddings of transcript sentences computed ahead of semantic chunking.
+
+    Windowed transcription hands over finished transcript segments while later windows are
+    still being transcribed; prefetching their embeddings here lets chunking start with most
+    of its embedding work already done.
+    """
+
+    def __init__(self, embedding_provider=None):
+        self.embedding_provider = embedding_provider or provider_factory.create_embedding_provider()
+        self._embeddings: Dict[str, Optional[list]] = {}
+        self._tasks: List[asyncio.Task] = []
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """Normalize text the same way SemanticChunker._parse_transcript does."""
+        return text.replace("\n", " ").strip()
+
+    async def _embed(self, texts: List[str]) -> None:
+        try:
+            embeddings = await self.embedding_provider.batch_embedding(texts)
+            self._embeddings.update(zip(texts, embeddings))
+        except Exception as e:
+            # Chunking embeds whatever is missing, so a failed prefetch only costs time
+            logger.warning(f"Sentence embedding prefetch failed for {len(texts)} texts: {e}")
+
+    async def prefetch(self, texts: Iterable[str]) -> None:
+        """Start embedding the given texts in the background."""
+        pending = {}
+        for text in texts:
+            text = self.normalize(text)
+            if text and text.lower() != "music" and text not in self._embeddings:
+                pending[text] = None
+        if pending:
+            self._tasks.append(asyncio.create_task(self._embed(list(pending))))
+
+    async def wait(self) -> None:
+        """Wait for all prefetches started so far."""
+        if self._tasks:
+            await asyncio.gather(*self._tasks)
+            self._tasks = []
+
+    def get(self, text: str) -> Optional[list]:
+        return self._embeddings.get(text)
+
+
 class SemanticChunker:
     """
     Handles semantic clustering of video transcripts.
@@ -38,15 +85,18 @@ class SemanticChunker:
     LONG_VIDEO_TIME_LIMIT = 120  # seconds for videos > 20 minutes
     VIDEO_DURATION_THRESHOLD = 20  # minutes
 
-    def __init__(self, transcript: str):
+    def __init__(self, transcript: str, embedding_cache: Optional[SentenceEmbeddingCache] = None):
         """
         Initialize SemanticChunker.
 
         Args:
             transcript (str): Raw SRT transcript text to be processed
+            embedding_cache (SentenceEmbeddingCache, optional): Sentence embeddings prefetched
+                while the transcript was being produced
         """
         self.transcript = transcript
         self.chunked_segments = []
+        self.embedding_cache = embedding_cache
         self.embedding_provider = provider_factory.create_embedding_provider()
 
     async def _calculate_transcript_duration(self, srt_text: str) -> float:
@@ -117,7 +167,17 @@ class SemanticChunker:
     async def _create_batch_embeddings(self, texts, batch_size=100):
         """Generates embeddings for multiple texts in batches using Azure Embeddings API."""
         logger.info(f"🔄 Creating batch embeddings for {len(texts)} texts")
-        embeddings = await self.embedding_provider.batch_embedding(texts)
+        if self.embedding_cache is not None:
+            await self.embedding_cache.wait()
+            embeddings = [self.embedding_cache.get(text) for text in texts]
+            missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+            logger.info(f"Reusing {len(texts) - len(missing)} prefetched embeddings")
+            if missing:
+                fresh = await self.embedding_provider.batch_embedding([texts[i] for i in missing])
+                for i, embedding in zip(missing, fresh):
+                    embeddings[i] = embedding
+        else:
+            embeddings = await self.embedding_provider.batch_embedding(texts)
         logger.info(f"✅ Batch embedding complete: {len(embeddings)} embeddings created")
         return embeddings
 
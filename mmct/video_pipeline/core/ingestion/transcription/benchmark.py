@@ -0,0 +1,95 @@
+"""
+Real-time factor (RTF) benchmark for transcription providers.
+
+RTF is wall-clock transcription time divided by audio duration; below 1.0 is faster than real time.
+
+Usage:
+    python -m mmct.video_pipeline.core.ingestion.transcription.benchmark audio.wav local azure
+"""
+
+import argparse
+import asyncio
+import time
+from typing import Dict, List, Optional
+from loguru import logger
+
+from mmct.providers.factory import provider_factory
+from mmct.video_pipeline.core.ingestion.transcription.windowed_transcription import (
+    WindowedTranscriber,
+    parse_srt_entries,
+)
+
+
+async def measure_rtf(
+    audio_path: str, provider_name: str, runs: int = 1, windowed: bool = False
+) -> Dict[str, float]:
+    """
+    Transcribe an audio file with a provider and report its real-time factor.
+
+    Args:
+        audio_path: Path to the audio file
+        provider_name: Transcription provider name registered in the ProviderFactory
+        runs: Number of timed runs; the provider (and any model load) is created once beforehand
+        windowed: Go through WindowedTranscriber the same way ingestion does
+
+    Returns:
+        Dict with audio duration, best and mean wall time and the best RTF
+    """
+    provider = provider_factory.create_transcription_provider(provider_name)
+    duration = await WindowedTranscriber(transcribe_window=None).get_duration(audio_path)
+
+    async def transcribe_window(window_path: str):
+        return parse_srt_entries(
+            await provider.transcribe_file(audio_path=window_path, response_format="srt")
+        )
+
+    timings: List[float] = []
+    try:
+        for _ in range(runs):
+            started = time.perf_counter()
+            if windowed:
+                await WindowedTranscriber.from_config(transcribe_window).transcribe(audio_path)
+            else:
+                await provider.transcribe_file(audio_path=audio_path, response_format="srt")
+            timings.append(time.perf_counter() - started)
+    finally:
+        if hasattr(provider, "close"):
+            await provider.close()
+
+    best = min(timings)
+    return {
+        "audio_seconds": duration,
+        "best_seconds": best,
+        "mean_seconds": sum(timings) / len(timings),
+        "rtf": best / duration if duration else float("nan"),
+    }
+
+
+async def main(audio_path: str, providers: List[str], runs: int, windowed: bool) -> None:
+    results: Dict[str, Optional[Dict[str, float]]] = {}
+    for provider_name in providers:
+        try:
+            results[provider_name] = await measure_rtf(audio_path, provider_name, runs, windowed)
+        except Exception as e:
+            logger.error(f"Benchmark failed for provider '{provider_name}': {e}")
+            results[provider_name] = None
+
+    print(f"{'provider':<16}{'audio (s)':>12}{'best (s)':>12}{'mean (s)':>12}{'RTF':>10}")
+    for provider_name, result in results.items():
+        if result is None:
+            print(f"{provider_name:<16}{'failed':>12}")
+            continue
+        print(
+            f"{provider_name:<16}{result['audio_seconds']:>12.1f}{result['best_seconds']:>12.1f}"
+            f"{result['mean_seconds']:>12.1f}{result['rtf']:>10.3f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure the real-time factor of transcription providers")
+    parser.add_argument("audio_path", help="Audio file to transcribe")
+    parser.add_argument("providers", nargs="+", help="Provider names, e.g. local azure openai")
+    parser.add_argument("--runs", type=int, default=1, help="Timed runs per provider")
+    parser.add_argument("--windowed", action="store_true", help="Use windowed transcription as ingestion does")
+    args = parser.parse_args()
+    asyncio.run(main(args.audio_path, args.providers, args.runs, args.windowed))
@@ -2,12 +2,20 @@ import asyncio
 import os
 import aiofiles
 import json
-from typing import List, Optional, Dict, Any
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, List, Optional, Dict, Any
 from loguru import logger
 from mmct.video_pipeline.core.ingestion.models import TranslationResponse
+from mmct.video_pipeline.core.ingestion.chapter_generator.utils import estimate_tokens
 from mmct.video_pipeline.core.ingestion.transcription.base_transcription import (
     Transcription,
 )
+from mmct.video_pipeline.core.ingestion.transcription.windowed_transcription import (
+    TranscriptEntry,
+    WindowedTranscriber,
+)
 from mmct.video_pipeline.utils.helper import extract_wav_from_video
 from mmct.video_pipeline.core.ingestion.languages import Languages
 from mmct.video_pipeline.utils.helper import get_media_folder
@@ -17,11 +25,52 @@ from dotenv import load_dotenv, find_dotenv
 load_dotenv(find_dotenv(), override=True)
 
 
+class TranslationCache:
+    """
+    Process-wide LRU cache of segment translations.
+
+    Keys combine the source text, the language pair and a hash of the glossary in the prompt,
+    so a glossary change never reuses translations made without it.
+    """
+
+    def __init__(self, max_entries: int = 50000):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+
+    @staticmethod
+    def make_key(text: str, source_language: str, target_language: str, glossary_hash: str) -> str:
+        raw = json.dumps([text, source_language, target_language, glossary_hash], ensure_ascii=False)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        value = self._entries.get(key)
+        if value is not None:
+            self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: str) -> None:
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
 class CloudTranscription(Transcription):
-    def __init__(self, video_path: str, hash_id: str, language: str = None) -> None:
+    # Shared across instances so repeated segments (intros, jingles, re-ingests) are translated once
+    translation_cache = TranslationCache()
+
+    def __init__(
+        self,
+        video_path: str,
+        hash_id: str,
+        language: str = None,
+        on_segments: Optional[Callable[[List[TranscriptEntry]], Awaitable[None]]] = None,
+    ) -> None:
         super().__init__(video_path=video_path, hash_id=hash_id, language=language)
         self.audio_container = os.getenv("AUDIO_CONTAINER_NAME")
         self.local_save = []
+        # Receives stitched segments window by window, already translated to English
+        self.on_segments = on_segments
         # Initialize providers
         self.llm_provider = provider_factory.create_llm_provider()
         self.speech_provider = provider_factory.create_transcription_provider('azure_speech')
@@ -84,12 +133,45 @@ class CloudTranscription(Transcription):
             if self.source_language["lang-code"] == "hi-IN":
                 phrase_list = self.hindi_glossary
 
-            # Use speech provider for transcription
-            result = await self.speech_provider.transcribe_file(
-                audio_path=self.audio_path,
-                language=self.source_language["lang-code"],
-                phrase_list=phrase_list
+            translate = self.source_language["lang-code"] != "en-IN"
+
+            async def transcribe_window(window_path: str) -> List[TranscriptEntry]:
+                segments = await self.speech_provider.transcribe_file(
+                    audio_path=window_path,
+                    language=self.source_language["lang-code"],
+                    phrase_list=phrase_list
+                )
+                segments = [segment for segment in segments if segment.get("text")]
+                texts = [segment["text"] for segment in segments]
+                # Translate per window so on_segments receives English text for every language;
+                # the original text is kept for de-duplicating window overlaps
+                translated = texts if not translate else await self._translate_texts(texts)
+                return [
+                    TranscriptEntry(
+                        start=self._hms_to_seconds(segment["start_time"]),
+                        end=self._hms_to_seconds(segment["end_time"]),
+                        text=text.strip(),
+                        speaker_id=segment.get("speaker_id"),
+                        source_text=segment["text"] if translate else None,
+                    )
+                    for segment, text in zip(segments, translated)
+                ]
+
+            # Use speech provider for transcription; long audio is split into concurrent windows
+            transcriber = WindowedTranscriber.from_config(transcribe_window)
+            entries = await transcriber.transcribe(
+                self.audio_path,
+                on_segments=self.on_segments,
             )
+            result = [
+                {
+                    "text": entry.text,
+                    "start_time": time.strftime("%H:%M:%S", time.gmtime(entry.start)),
+                    "end_time": time.strftime("%H:%M:%S", time.gmtime(entry.end)),
+                    "speaker_id": entry.speaker_id,
+                }
+                for entry in entries
+            ]
 
             logger.info(f"Transcription completed with {len(result)} segments")
             if not result:
@@ -101,6 +183,11 @@ class CloudTranscription(Transcription):
             logger.exception(f"Azure Transcription failed, Error: {e}")
             raise
 
+    @staticmethod
+    def _hms_to_seconds(value: str) -> float:
+        hours, minutes, seconds = value.split(":")
+        return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+
     async def _get_formatted_transcript(self, transcript: List[Dict[str, Any]]) -> Optional[str]:
         try:
             logger.info("Formatting the generated transcript..")
@@ -122,7 +209,7 @@ class CloudTranscription(Transcription):
             logger.exception(f"Formatting failed, Error: {e}")
             raise
 
-    async def _translate_batch(self, batch, max_retries=3, current_retry=0, prompt=None):
+    async def _translate_batch(self, batch, max_retries=3, current_retry=0, prompt=None, semaphore=None):
         """Translate a batch of text with retry logic for handling response mismatches"""
         to_translate = json.dumps([e["text"] for e in batch], ensure_ascii=False)
         logger.info(
@@ -141,12 +228,15 @@ class CloudTranscription(Transcription):
             {"role": "user", "content": f"Text to translate:\n{to_translate}"},
         ]
 
-        result = await self.llm_provider.chat_completion(
-            messages=messages,
-            temperature=0,
-            top_p=0.1,
-            response_format=TranslationResponse,
-        )
+        # Only the LLM call holds a slot, so re-split halves never wait on their parent's slot
+        semaphore = semaphore or asyncio.Semaphore(1)
+        async with semaphore:
+            result = await self.llm_provider.chat_completion(
+                messages=messages,
+                temperature=0,
+                top_p=0.1,
+                response_format=TranslationResponse,
+            )
 
         translation_response: TranslationResponse = result['content']
         translations = translation_response.translations
@@ -161,81 +251,92 @@ class CloudTranscription(Transcription):
             if current_retry >= max_retries or len(batch) <= 1:
                 raise ValueError("Max retries reached for translation, or can't split further.")
 
-            # Split the batch and retry with smaller batches
+            # Split the batch and retry both halves concurrently
             mid = len(batch) // 2
-            first_half = await self._translate_batch(batch[:mid], max_retries, current_retry + 1)
-            second_half = await self._translate_batch(batch[mid:], max_retries, current_retry + 1)
+            first_half, second_half = await asyncio.gather(
+                self._translate_batch(batch[:mid], max_retries, current_retry + 1, prompt, semaphore),
+                self._translate_batch(batch[mid:], max_retries, current_retry + 1, prompt, semaphore),
+            )
             return first_half + second_half
 
         return translations
 
-    async def _get_translated_transcript(
-        self, text: str, max_chars_per_batch: int = 2000
-    ) -> TranslationResponse:
-        try:
-            logger.info("Retrieving the translated transcript")
-            raw_blocks = [b.strip() for b in text.strip().split("\n\n") if b.strip()]
-            entries = []  # type: List[dict]
-            logger.info("Splitting the texts into chunks for translation")
-            for block in raw_blocks:
-                lines = block.splitlines()
-                if len(lines) < 3:
-                    continue
-                seq_no = lines[0]
-                timestamp = lines[1]
-                content = "\n".join(lines[2:])
-                entries.append({"seq": seq_no, "time": timestamp, "text": content})
-
-            # Batch entries by text length
-            batches: List[List[dict]] = []
-            curr_batch, curr_len = [], 0
-            logger.info("Aggregating the text chunks into batches")
-            for entry in entries:
-                length = len(entry["text"])
-                if curr_len + length > max_chars_per_batch and curr_batch:
-                    batches.append(curr_batch)
-                    curr_batch, curr_len = [], 0
-                curr_batch.append(entry)
-                curr_len += length
-            if curr_batch:
-                batches.append(curr_batch)
+    async def _translate_texts(
+        self, texts: List[str], max_tokens_per_batch: int = 600, max_concurrent_batches: int = 4
+    ) -> List[str]:
+        """Translate segment texts to English, through the translation cache, in concurrent batches."""
+        prompt = """You are a highly skilled translator. Your task is to translate the provided JSON array of text from {source_language} to English with utmost accuracy.
+
+        # Instructions:
+        - Translate each line of the input text exactly as it is, without adding, omitting, or altering any information.
+        - The input text may include different dialects of {source_language}; translate them carefully while preserving the original meaning.
+        - Do not hallucinate or introduce any new information that is not present in the input text.
+        - If a term or phrase is unclear, translate it as closely as possible to its original meaning without making assumptions.
+        """
+        prompt = prompt.format(
+            source_language=self.source_language["lang"].split("_")[0].capitalize()
+        )
+        logger.info("Inserting the source language to prompt")
+        glossary_table = ""
+        if self.source_language["lang-code"] == "hi-IN":
+            logger.info("Adding glossary for hindi vocabulary")
+            joined = "\n".join(texts)
+            glossary_table = self.glossary_df[
+                self.glossary_df["hindi_terms"].apply(lambda term: term in joined)
+            ].to_markdown(index=False)
+            prompt += f"\n\n# Glossary:\n{glossary_table}\n"
+        glossary_hash = hashlib.sha256(glossary_table.encode("utf-8")).hexdigest()
+
+        # Look up segments translated before; only the rest goes to the LLM
+        translations: List[Optional[str]] = [None] * len(texts)
+        cache_keys = []
+        pending = []
+        for idx, text in enumerate(texts):
+            key = self.translation_cache.make_key(
+                text, self.source_language["lang-code"], "en", glossary_hash
+            )
+            cache_keys.append(key)
+            cached = self.translation_cache.get(key)
+            if cached is not None:
+                translations[idx] = cached
+            else:
+                pending.append(idx)
+        logger.info(
+            f"Translation cache hits: {len(texts) - len(pending)}/{len(texts)} segments"
+        )
 
-            prompt = """You are a highly skilled translator. Your task is to translate the provided JSON array of text from {source_language} to English with utmost accuracy.
+        # Batch the remaining entries by token budget
+        batches: List[List[int]] = []
+        curr_batch, curr_tokens = [], 0
+        logger.info("Aggregating the text chunks into batches")
+        for idx in pending:
+            tokens = estimate_tokens(texts[idx])
+            if curr_tokens + tokens > max_tokens_per_batch and curr_batch:
+                batches.append(curr_batch)
+                curr_batch, curr_tokens = [], 0
+            curr_batch.append(idx)
+            curr_tokens += tokens
+        if curr_batch:
+            batches.append(curr_batch)
 
-            # Instructions:
-            - Translate each line of the input text exactly as it is, without adding, omitting, or altering any information.
-            - The input text may include different dialects of {source_language}; translate them carefully while preserving the original meaning.
-            - Do not hallucinate or introduce any new information that is not present in the input text.
-            - If a term or phrase is unclear, translate it as closely as possible to its original meaning without making assumptions.
-            """
-            prompt = prompt.format(
-                source_language=self.source_language["lang"].split("_")[0].capitalize()
+        logger.info(
+            f"Translating {len(batches)} batches with up to {max_concurrent_batches} in flight"
+        )
+        semaphore = asyncio.Semaphore(max_concurrent_batches)
+        # gather keeps results in batch order, so reassembly is positional
+        batch_results = await asyncio.gather(
+            *(
+                self._translate_batch(
+                    [{"text": texts[idx]} for idx in batch], prompt=prompt, semaphore=semaphore
+                )
+                for batch in batches
             )
-            logger.info("Inserting the source language to prompt")
-            if self.source_language["lang-code"] == "hi-IN":
-                logger.info("Adding glossary for hindi vocabulary")
-                glossary_table = self.glossary_df[
-                    self.glossary_df["hindi_terms"].apply(lambda term: term in text)
-                ].to_markdown(index=False)
-                prompt += f"\n\n# Glossary:\n{glossary_table}\n"
-
-            all_translations: List[str] = []
-            logger.info("Translating the texts batchwise")
-            # Process each batch with retry logic
-            for batch in batches:
-                batch_translations = await self._translate_batch(batch, prompt=prompt)
-                all_translations.extend(batch_translations)
-
-            # Reassemble into SRT format
-            output_blocks = []
-            for entry, translation in zip(entries, all_translations):
-                block = "\n".join([entry["seq"], entry["time"], translation.strip()])
-                output_blocks.append(block)
-
-            return "\n\n".join(output_blocks)
-        except Exception as e:
-            logger.exception(f"Error translating transcript: {e}")
-            raise
+        )
+        for batch, batch_translations in zip(batches, batch_results):
+            for idx, translation in zip(batch, batch_translations):
+                translations[idx] = translation
+                self.translation_cache.set(cache_keys[idx], translation)
+        return translations
 
     async def __call__(self):
         try:
@@ -246,11 +347,6 @@ class CloudTranscription(Transcription):
                 transcript=transcript
             )  # Formatting the transcript as same as whisper
             logger.info(f"formatted transcript:{transcript}")
-            if self.source_language["lang-code"] != "en-IN":
-                transcript = await self._get_translated_transcript(
-                    transcript
-                )  # translating to english
-                logger.info(f"translated {transcript}")
             transcript_save_path = os.path.join(
                 await get_media_folder(), f"transcript_{self.hash_id}.srt"
             )
@@ -5,4 +5,5 @@ from enum import Enum
 class TranscriptionServices(Enum):
     
     AZURE_STT = "azure-stt"
-    WHISPER = "whisper"
\ No newline at end of file
+    WHISPER = "whisper"
+    LOCAL = "local"
\ No newline at end of file
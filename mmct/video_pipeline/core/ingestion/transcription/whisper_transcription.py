@@ -1,10 +1,17 @@
 import asyncio
 import os
 import aiofiles
+from typing import Awaitable, Callable, List, Optional
 from mmct.video_pipeline.core.ingestion.transcription.base_transcription import (
     Transcription,
 )
 from mmct.video_pipeline.core.ingestion.languages import Languages
+from mmct.video_pipeline.core.ingestion.transcription.windowed_transcription import (
+    TranscriptEntry,
+    WindowedTranscriber,
+    format_srt,
+    parse_srt_entries,
+)
 from mmct.video_pipeline.utils.helper import extract_mp3_from_video, get_media_folder
 from mmct.providers.factory import provider_factory
 from dotenv import load_dotenv, find_dotenv
@@ -14,11 +21,26 @@ load_dotenv(find_dotenv(), override=True)
 
 
 class WhisperTranscription(Transcription):
-    def __init__(self, video_path: str, hash_id: str) -> None:
+    def __init__(
+        self,
+        video_path: str,
+        hash_id: str,
+        on_segments: Optional[Callable[[List[TranscriptEntry]], Awaitable[None]]] = None,
+        provider_name: Optional[str] = None,
+    ) -> None:
         super().__init__(video_path=video_path, hash_id=hash_id)
         self.local_save = []
-        # Initialize transcription provider (Azure or OpenAI Whisper)
-        self.transcription_provider = provider_factory.create_transcription_provider()
+        # Receives stitched segments window by window, before the full transcript is ready
+        self.on_segments = on_segments
+        # Initialize transcription provider (Azure/OpenAI Whisper, or "local" for offline CPU inference)
+        self.transcription_provider = provider_factory.create_transcription_provider(provider_name)
+
+    async def _transcribe_window(self, window_path: str) -> List[TranscriptEntry]:
+        srt = await self.transcription_provider.transcribe_file(
+            audio_path=window_path,
+            response_format="srt"
+        )
+        return parse_srt_entries(srt)
 
     async def load_audio(self):
         try:
@@ -40,10 +62,10 @@ class WhisperTranscription(Transcription):
         """Extracts audio from a video file and transcribes it using Azure OpenAI Whisper."""
         try:
             logger.info("Performing translation using Whisper endpoint")
-            result = await self.transcription_provider.transcribe_file(
-                audio_path=self.audio_path,
-                response_format="srt"
-            )
+            # Long audio is transcribed as concurrent overlapping windows and stitched back together
+            transcriber = WindowedTranscriber.from_config(self._transcribe_window)
+            entries = await transcriber.transcribe(self.audio_path, on_segments=self.on_segments)
+            result = format_srt(entries)
             logger.info("Successfully retrieved the translated transcript using Whisper")
             base_path = self.audio_path.split(".mp3")[0]
             transcript_local_path = os.path.join(base_path, ".srt")
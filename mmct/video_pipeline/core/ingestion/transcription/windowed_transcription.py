@@ -0,0 +1,381 @@
+"""
+Windowed transcription engine.
+
+Cuts an audio file into windows aligned to silences (ffmpeg ``silencedetect`` is used as a
+lightweight voice-activity detector), adds a small overlap on both sides of every window and
+transcribes the windows concurrently under a concurrency and request-rate limit. Window
+results are shifted to absolute timestamps, overlap duplicates are dropped and the stitched
+segments are streamed, in order, to an optional callback as soon as they are final.
+"""
+
+import asyncio
+import os
+import re
+import shutil
+import tempfile
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, List, Optional
+from loguru import logger
+from mmct.config.settings import TranscriptionConfig
+from mmct.video_pipeline.utils.media_tools import probe_media, run_media_tool
+
+_SRT_BLOCK_PATTERN = re.compile(
+    r"(\d+)\s*\n(\d{2}:\d{2}:\d{2}[,.]\d{3})\s*-->\s*(\d{2}:\d{2}:\d{2}[,.]\d{3})\s*\n(.*?)(?=\n\s*\n\d+\s*\n|\Z)",
+    re.DOTALL,
+)
+_SILENCE_START_PATTERN = re.compile(r"silence_start:\s*(-?[\d.]+)")
+_SILENCE_END_PATTERN = re.compile(r"silence_end:\s*(-?[\d.]+)")
+
+
+@dataclass
+class TranscriptEntry:
+    """A single transcribed segment with timestamps in seconds."""
+
+    start: float
+    end: float
+    text: str
+    speaker_id: Optional[str] = None
+    # Text as transcribed, when text holds a translation of it; overlap duplicates are matched on it
+    source_text: Optional[str] = None
+
+
+@dataclass
+class AudioWindow:
+    """A slice of the source audio to transcribe."""
+
+    index: int
+    start: float  # Start of the cut including the leading overlap
+    end: float  # End of the cut including the trailing overlap
+    owned_start: float  # Segments whose midpoint falls in [owned_start, owned_end) belong to this window
+    owned_end: float
+    path: Optional[str] = None
+
+
+def _parse_srt_time(value: str) -> float:
+    hours, minutes, seconds = value.replace(".", ",").split(":")
+    secs, millis = seconds.split(",")
+    return int(hours) * 3600 + int(minutes) * 60 + int(secs) + int(millis) / 1000
+
+
+def _format_srt_time(seconds: float) -> str:
+    total_ms = int(round(max(seconds, 0.0) * 1000))
+    hours, rem = divmod(total_ms, 3_600_000)
+    minutes, rem = divmod(rem, 60_000)
+    secs, millis = divmod(rem, 1000)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d},{millis:03d}"
+
+
+def parse_srt_entries(srt_text: str) -> List[TranscriptEntry]:
+    """
+    Parse SRT text into transcript entries.
+
+    Args:
+        srt_text: Transcript in SRT format
+
+    Returns:
+        List of TranscriptEntry in file order
+    """
+    entries = []
+    normalized = srt_text.replace("\r\n", "\n").strip()
+    for _, start, end, text in _SRT_BLOCK_PATTERN.findall(normalized):
+        text = text.strip()
+        if text:
+            entries.append(
+                TranscriptEntry(start=_parse_srt_time(start), end=_parse_srt_time(end), text=text)
+            )
+    return entries
+
+
+def format_srt(entries: List[TranscriptEntry]) -> str:
+    """
+    Format transcript entries as SRT text, numbering them from 1.
+
+    Args:
+        entries: Transcript entries in chronological order
+
+    Returns:
+        SRT formatted transcript
+    """
+    blocks = []
+    for idx, entry in enumerate(entries, 1):
+        blocks.append(
+            f"{idx}\n{_format_srt_time(entry.start)} --> {_format_srt_time(entry.end)}\n{entry.text}\n"
+        )
+    return "\n".join(blocks)
+
+
+def _normalize_text(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+class _RateLimiter:
+    """Spaces out request starts so that at most `requests_per_minute` begin per minute."""
+
+    def __init__(self, requests_per_minute: Optional[int]):
+        self._interval = 60.0 / requests_per_minute if requests_per_minute else 0.0
+        self._next_slot = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        if not self._interval:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            wait = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + self._interval
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+class WindowedTranscriber:
+    """
+    Transcribes long audio as concurrent, overlapping, silence-aligned windows.
+
+    Example:
+        >>> async def transcribe_window(path: str) -> List[TranscriptEntry]:
+        ...     srt = await provider.transcribe_file(audio_path=path, response_format="srt")
+        ...     return parse_srt_entries(srt)
+        >>> transcriber = WindowedTranscriber(transcribe_window, window_seconds=300, max_concurrency=4)
+        >>> entries = await transcriber.transcribe("audio.mp3")
+    """
+
+    def __init__(
+        self,
+        transcribe_window: Callable[[str], Awaitable[List[TranscriptEntry]]],
+        window_seconds: float = 300.0,
+        overlap_seconds: float = 2.0,
+        max_concurrency: int = 4,
+        requests_per_minute: Optional[int] = None,
+        silence_noise_db: int = -30,
+        min_silence_seconds: float = 0.4,
+    ):
+        """
+        Initialize the windowed transcriber.
+
+        Args:
+            transcribe_window: Async function transcribing one window file into entries with
+                timestamps relative to the start of the window
+            window_seconds: Target window length in seconds
+            overlap_seconds: Audio added on both sides of a cut so words at the boundary are not lost
+            max_concurrency: Maximum number of windows transcribed at the same time
+            requests_per_minute: Optional cap on window requests started per minute
+            silence_noise_db: Noise floor for silence detection in dB
+            min_silence_seconds: Minimum silence duration considered a valid cut point
+        """
+        self.transcribe_window = transcribe_window
+        self.window_seconds = window_seconds
+        self.overlap_seconds = overlap_seconds
+        self.max_concurrency = max(1, max_concurrency)
+        self.requests_per_minute = requests_per_minute
+        self.silence_noise_db = silence_noise_db
+        self.min_silence_seconds = min_silence_seconds
+
+    @classmethod
+    def from_config(
+        cls,
+        transcribe_window: Callable[[str], Awaitable[List[TranscriptEntry]]],
+        config: Optional[TranscriptionConfig] = None,
+    ) -> "WindowedTranscriber":
+        """Create a transcriber using the window settings of a TranscriptionConfig."""
+        config = config or TranscriptionConfig()
+        return cls(
+            transcribe_window,
+            window_seconds=config.window_seconds,
+            overlap_seconds=config.window_overlap_seconds,
+            max_concurrency=config.max_concurrent_windows,
+            requests_per_minute=config.requests_per_minute,
+        )
+
+    async def _run_ffmpeg_tool(self, *args: str) -> tuple:
+        result = await run_media_tool(args, check=False)
+        return result.returncode, result.stdout.decode("utf-8", errors="ignore"), result.stderr.decode(
+            "utf-8", errors="ignore"
+        )
+
+    async def get_duration(self, audio_path: str) -> float:
+        """Return the audio duration in seconds using ffprobe."""
+        return (await probe_media(audio_path)).duration
+
+    async def detect_silences(self, audio_path: str) -> List[tuple]:
+        """
+        Detect silent intervals with ffmpeg's silencedetect filter.
+
+        Returns:
+            List of (silence_start, silence_end) tuples in seconds
+        """
+        returncode, _, stderr = await self._run_ffmpeg_tool(
+            "ffmpeg", "-hide_banner", "-nostats", "-i", audio_path,
+            "-af", f"silencedetect=noise={self.silence_noise_db}dB:d={self.min_silence_seconds}",
+            "-f", "null", "-",
+        )
+        if returncode != 0:
+            logger.warning(f"Silence detection failed, falling back to fixed windows: {stderr[-500:]}")
+            return []
+        starts = [float(value) for value in _SILENCE_START_PATTERN.findall(stderr)]
+        ends = [float(value) for value in _SILENCE_END_PATTERN.findall(stderr)]
+        return list(zip(starts, ends))
+
+    def plan_windows(self, duration: float, silences: List[tuple]) -> List[AudioWindow]:
+        """
+        Choose cut points near every window_seconds boundary, preferring the middle of a silence.
+
+        Args:
+            duration: Audio duration in seconds
+            silences: Silent intervals as returned by detect_silences
+
+        Returns:
+            Ordered list of AudioWindow objects covering the whole audio
+        """
+        search_radius = self.window_seconds * 0.2
+        silence_midpoints = sorted((start + end) / 2 for start, end in silences)
+
+        cuts = [0.0]
+        target = self.window_seconds
+        while target < duration - search_radius:
+            candidates = [
+                point for point in silence_midpoints
+                if abs(point - target) <= search_radius and point > cuts[-1]
+            ]
+            cut = min(candidates, key=lambda point: abs(point - target)) if candidates else target
+            cuts.append(cut)
+            target = cut + self.window_seconds
+        cuts.append(duration)
+
+        windows = []
+        for idx in range(len(cuts) - 1):
+            owned_start, owned_end = cuts[idx], cuts[idx + 1]
+            windows.append(
+                AudioWindow(
+                    index=idx,
+                    start=max(0.0, owned_start - self.overlap_seconds),
+                    end=min(duration, owned_end + self.overlap_seconds),
+                    owned_start=owned_start,
+                    owned_end=owned_end if idx < len(cuts) - 2 else float("inf"),
+                )
+            )
+        return windows
+
+    async def _cut_window(self, audio_path: str, window: AudioWindow, output_dir: str) -> str:
+        _, extension = os.path.splitext(audio_path)
+        output_path = os.path.join(output_dir, f"window_{window.index:05d}{extension}")
+        returncode, _, stderr = await self._run_ffmpeg_tool(
+            "ffmpeg", "-y", "-v", "error",
+            "-ss", f"{window.start:.3f}", "-t", f"{window.end - window.start:.3f}",
+            "-i", audio_path, "-c", "copy", output_path,
+        )
+        if returncode != 0 or not os.path.exists(output_path):
+            raise RuntimeError(f"Failed to cut audio window {window.index}: {stderr}")
+        return output_path
+
+    @staticmethod
+    def _stitch_window(window: AudioWindow, entries: List[TranscriptEntry]) -> List[TranscriptEntry]:
+        """Shift window-relative entries to absolute time and keep only those the window owns."""
+        stitched = []
+        for entry in entries:
+            start = entry.start + window.start
+            end = entry.end + window.start
+            midpoint = (start + end) / 2
+            if window.owned_start <= midpoint < window.owned_end:
+                stitched.append(
+                    TranscriptEntry(
+                        start=start, end=end, text=entry.text,
+                        speaker_id=entry.speaker_id, source_text=entry.source_text,
+                    )
+                )
+        return stitched
+
+    async def transcribe(
+        self,
+        audio_path: str,
+        on_segments: Optional[Callable[[List[TranscriptEntry]], Awaitable[None]]] = None,
+    ) -> List[TranscriptEntry]:
+        """
+        Transcribe an audio file window by window.
+
+        Args:
+            audio_path: Path to the audio file
+            on_segments: Optional async callback receiving the final entries of each window,
+                in chronological order, as soon as all earlier windows are done
+
+        Returns:
+            All transcript entries with absolute timestamps, in chronological order. Speaker ids
+            are only kept for single-window audio: each window is a separate recognition
+            session with its own speaker labels, so labels don't match across windows.
+        """
+        duration = await self.get_duration(audio_path)
+
+        if duration <= self.window_seconds * 1.2:
+            # Short audio: a single request, no cutting needed
+            windows = [AudioWindow(index=0, start=0.0, end=duration, owned_start=0.0,
+                                   owned_end=float("inf"), path=audio_path)]
+        else:
+            silences = await self.detect_silences(audio_path)
+            windows = self.plan_windows(duration, silences)
+
+        logger.info(
+            f"Transcribing {duration:.1f}s of audio in {len(windows)} window(s) "
+            f"with concurrency {self.max_concurrency}"
+        )
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        rate_limiter = _RateLimiter(self.requests_per_minute)
+        work_dir = tempfile.mkdtemp(prefix="mmct_audio_windows_") if len(windows) > 1 else None
+
+        completed: Dict[int, List[TranscriptEntry]] = {}
+        emitted: List[TranscriptEntry] = []
+        next_to_emit = 0
+        emit_lock = asyncio.Lock()
+
+        async def emit_ready() -> None:
+            nonlocal next_to_emit
+            async with emit_lock:
+                while next_to_emit in completed:
+                    batch = []
+                    for entry in completed.pop(next_to_emit):
+                        previous = emitted[-1] if emitted else None
+                        # Same words at overlapping times is the overlap being transcribed twice
+                        if (
+                            previous is not None
+                            and entry.start < previous.end
+                            and _normalize_text(entry.source_text or entry.text)
+                            == _normalize_text(previous.source_text or previous.text)
+                        ):
+                            continue
+                        emitted.append(entry)
+                        batch.append(entry)
+                    next_to_emit += 1
+                    if on_segments is not None and batch:
+                        await on_segments(batch)
+
+        async def run_window(window: AudioWindow) -> None:
+            async with semaphore:
+                if window.path is None:
+                    window.path = await self._cut_window(audio_path, window, work_dir)
+                await rate_limiter.acquire()
+                started = time.perf_counter()
+                entries = await self.transcribe_window(window.path)
+                logger.info(
+                    f"Window {window.index + 1}/{len(windows)} "
+                    f"({window.start:.1f}-{window.end:.1f}s) transcribed in {time.perf_counter() - started:.1f}s"
+                )
+            stitched = self._stitch_window(window, entries)
+            if len(windows) > 1:
+                for entry in stitched:
+                    entry.speaker_id = None
+            completed[window.index] = stitched
+            await emit_ready()
+
+        tasks = [asyncio.ensure_future(run_window(window)) for window in windows]
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            # A failed window leaves its siblings running; stop them before their files are removed
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            if work_dir:
+                shutil.rmtree(work_dir, ignore_errors=True)
+
+        logger.info(f"Windowed transcription produced {len(emitted)} segments")
+        return emitted
@@ -2,16 +2,17 @@
 Helper functions specific to video ingestion pipeline.
 """
 
+import asyncio
 import os
-import subprocess
 import aiofiles
 from loguru import logger
 from mmct.providers.factory import provider_factory
+from mmct.video_pipeline.utils.media_tools import MediaToolError, probe_media, run_media_tool
 
 
 async def get_video_duration(video_path: str) -> float:
     """
-    Get video duration in seconds using ffprobe.
+    Get video duration in seconds using ffprobe (cached per file version).
 
     Args:
         video_path: Path to the video file
@@ -20,24 +21,15 @@ async def get_video_duration(video_path: str) -> float:
         float: Video duration in seconds
 
     Raises:
-        subprocess.CalledProcessError: If ffprobe command fails
-        ValueError: If duration cannot be parsed
+        MediaToolError: If ffprobe fails
     """
     try:
-        cmd = [
-            'ffprobe', '-v', 'quiet', '-show_entries', 'format=duration',
-            '-of', 'default=noprint_wrappers=1:nokey=1', video_path
-        ]
-        result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-        duration = float(result.stdout.strip())
+        duration = (await probe_media(video_path)).duration
         logger.info(f"Video duration: {duration:.2f} seconds ({duration/60:.2f} minutes)")
         return duration
-    except subprocess.CalledProcessError as e:
+    except MediaToolError as e:
         logger.error(f"Error getting video duration: {e}")
         raise
-    except ValueError as e:
-        logger.error(f"Error parsing video duration: {e}")
-        raise
 
 
 async def split_video_if_needed(video_path: str) -> tuple[list[str], list[str]]:
@@ -53,7 +45,7 @@ async def split_video_if_needed(video_path: str) -> tuple[list[str], list[str]]:
                - If not split: ([original_path], [''])
 
     Raises:
-        subprocess.CalledProcessError: If ffmpeg command fails
+        MediaToolError: If ffmpeg command fails
         RuntimeError: If video splitting fails or output files not found
     """
     try:
@@ -93,13 +85,9 @@ async def split_video_if_needed(video_path: str) -> tuple[list[str], list[str]]:
             '-c', 'copy', '-avoid_negative_ts', 'make_zero', part_b_path, '-y'
         ]
 
-        logger.info("Splitting video into Part A...")
-        subprocess.run(cmd_a, capture_output=True, text=True, check=True)
-        logger.info(f"Part A created successfully: {part_a_path}")
-
-        logger.info("Splitting video into Part B...")
-        subprocess.run(cmd_b, capture_output=True, text=True, check=True)
-        logger.info(f"Part B created successfully: {part_b_path}")
+        logger.info("Splitting video into Part A and Part B...")
+        await asyncio.gather(run_media_tool(cmd_a), run_media_tool(cmd_b))
+        logger.info(f"Parts created successfully: {part_a_path}, {part_b_path}")
 
         # Verify both parts were created
         if not os.path.exists(part_a_path) or not os.path.exists(part_b_path):
@@ -108,9 +96,8 @@ async def split_video_if_needed(video_path: str) -> tuple[list[str], list[str]]:
         logger.info(f"Video successfully split into:\n  Part A: {part_a_path}\n  Part B: {part_b_path}")
         return [part_a_path, part_b_path], ['', 'B']
 
-    except subprocess.CalledProcessError as e:
+    except MediaToolError as e:
         logger.error(f"Error splitting video: {e}")
-        logger.error(f"ffmpeg stderr: {e.stderr}")
         raise
     except Exception as e:
         logger.error(f"Unexpected error during video splitting: {e}")
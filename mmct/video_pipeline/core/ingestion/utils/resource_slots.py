@@ -0,0 +1,55 @@
+"""
+Shared concurrency limits for ingestion stages.
+
+When several ingestions run in one process, each stage competes for a different resource:
+keyframe extraction and CLIP embedding saturate the CPU, while transcription and chapter
+generation wait on rate-limited model APIs. ResourceSlots holds one semaphore per resource
+so that, for example, at most 2 extractions and 8 LLM-bound stages run at any time across
+all ingestions, instead of N ingestions each starting everything at once.
+"""
+
+import asyncio
+import os
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional
+
+CPU = "cpu"
+API = "api"
+
+
+class ResourceSlots:
+    """
+    Named semaphores shared by the stage graphs of concurrent ingestions.
+
+    Args:
+        limits: Resource name to number of stages allowed to hold it at once
+
+    Example:
+        >>> slots = ResourceSlots({"cpu": 2, "api": 8})
+        >>> async with slots.slot("cpu"):
+        ...     await extract_keyframes()
+    """
+
+    def __init__(self, limits: Dict[str, int]):
+        self.limits = dict(limits)
+        self._semaphores = {name: asyncio.Semaphore(limit) for name, limit in self.limits.items()}
+
+    @classmethod
+    def from_env(cls) -> "ResourceSlots":
+        """Create slots from INGESTION_CPU_SLOTS (default: CPU count) and INGESTION_API_SLOTS (default 8)."""
+        return cls(
+            {
+                CPU: int(os.getenv("INGESTION_CPU_SLOTS", str(os.cpu_count() or 2))),
+                API: int(os.getenv("INGESTION_API_SLOTS", "8")),
+            }
+        )
+
+    @asynccontextmanager
+    async def slot(self, resource: Optional[str]) -> AsyncIterator[None]:
+        """Hold one slot of a resource; unknown or None resources are not limited."""
+        semaphore = self._semaphores.get(resource) if resource else None
+        if semaphore is None:
+            yield
+            return
+        async with semaphore:
+            yield
@@ -0,0 +1,187 @@
+"""
+Dataflow executor for ingestion stages.
+
+Each stage is an async callable that starts as soon as all of the stages it depends on
+have finished, so independent stages (e.g. transcription and keyframe extraction) run
+concurrently and the end-to-end latency approaches the longest dependency chain rather
+than the sum of all stages.
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from loguru import logger
+
+from mmct.video_pipeline.core.ingestion.utils.resource_slots import ResourceSlots
+
+_UNLIMITED = ResourceSlots({})
+
+
+@dataclass
+class Stage:
+    """A single node of the stage graph."""
+
+    name: str
+    func: Callable[..., Awaitable[Any]]
+    depends_on: Tuple[str, ...] = ()
+    resource: Optional[str] = None
+
+
+@dataclass
+class StageTiming:
+    """Wall-clock timing of a stage run."""
+
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    status: str = "pending"
+
+    @property
+    def duration(self) -> Optional[float]:
+        if self.started_at is None or self.finished_at is None:
+            return None
+        return self.finished_at - self.started_at
+
+
+@dataclass
+class StageGraph:
+    """
+    Runs async stages as a DAG.
+
+    A stage function receives the results of its dependencies as keyword arguments
+    named after the dependency stages. If any stage fails, all stages still pending
+    or running are cancelled and the first error is raised.
+
+    When resource_slots is set, a stage tagged with a resource waits for a free slot of that
+    resource (status "waiting") before it starts; its duration excludes the wait.
+
+    Example:
+        >>> graph = StageGraph(name="video-part")
+        >>> graph.add_stage("keyframes", extract_keyframes)
+        >>> graph.add_stage("transcript", transcribe)
+        >>> graph.add_stage("chapters", make_chapters, depends_on=("keyframes", "transcript"))
+        >>> results = await graph.run()
+    """
+
+    name: str = "stage-graph"
+    on_stage_event: Optional[Callable[[str, str], None]] = None
+    resource_slots: Optional[ResourceSlots] = None
+    stages: Dict[str, Stage] = field(default_factory=dict)
+    timings: Dict[str, StageTiming] = field(default_factory=dict)
+
+    def add_stage(
+        self,
+        name: str,
+        func: Callable[..., Awaitable[Any]],
+        depends_on: Tuple[str, ...] = (),
+        resource: Optional[str] = None,
+    ) -> None:
+        """
+        Register a stage.
+
+        Args:
+            name: Unique stage name
+            func: Async callable invoked with dependency results as keyword arguments
+            depends_on: Names of stages that must finish before this one starts
+            resource: Resource the stage is limited by in resource_slots (e.g. "cpu", "api")
+        """
+        if name in self.stages:
+            raise ValueError(f"Stage '{name}' is already registered in {self.name}")
+        self.stages[name] = Stage(
+            name=name, func=func, depends_on=tuple(depends_on), resource=resource
+        )
+        self.timings[name] = StageTiming()
+
+    def _topological_order(self) -> List[str]:
+        """Return stage names in dependency order, validating the graph."""
+        order: List[str] = []
+        state: Dict[str, str] = {}
+
+        def visit(name: str) -> None:
+            if state.get(name) == "done":
+                return
+            if state.get(name) == "visiting":
+                raise ValueError(f"Cycle detected in {self.name} at stage '{name}'")
+            if name not in self.stages:
+                raise ValueError(f"Unknown stage dependency '{name}' in {self.name}")
+            state[name] = "visiting"
+            for dependency in self.stages[name].depends_on:
+                visit(dependency)
+            state[name] = "done"
+            order.append(name)
+
+        for stage_name in self.stages:
+            visit(stage_name)
+        return order
+
+    def _emit(self, stage_name: str, status: str) -> None:
+        self.timings[stage_name].status = status
+        if self.on_stage_event is None:
+            return
+        try:
+            self.on_stage_event(stage_name, status)
+        except Exception as e:
+            logger.warning(f"[{self.name}] stage event callback failed for '{stage_name}': {e}")
+
+    async def _run_stage(self, stage: Stage, tasks: Dict[str, "asyncio.Task"]) -> Any:
+        dependency_results = {}
+        for dependency in stage.depends_on:
+            dependency_results[dependency] = await tasks[dependency]
+
+        timing = self.timings[stage.name]
+        try:
+            if self.resource_slots is not None and stage.resource:
+                self._emit(stage.name, "waiting")
+            async with (self.resource_slots or _UNLIMITED).slot(stage.resource):
+                timing.started_at = time.perf_counter()
+                self._emit(stage.name, "running")
+                result = await stage.func(**dependency_results)
+        except asyncio.CancelledError:
+            timing.finished_at = time.perf_counter()
+            self._emit(stage.name, "cancelled")
+            raise
+        except Exception:
+            timing.finished_at = time.perf_counter()
+            self._emit(stage.name, "failed")
+            raise
+        timing.finished_at = time.perf_counter()
+        self._emit(stage.name, "completed")
+        logger.info(f"[{self.name}] stage '{stage.name}' completed in {timing.duration:.2f}s")
+        return result
+
+    async def run(self) -> Dict[str, Any]:
+        """
+        Execute all stages.
+
+        Returns:
+            Dict mapping stage name to the stage's result
+        """
+        order = self._topological_order()
+        started = time.perf_counter()
+        tasks: Dict[str, asyncio.Task] = {}
+        for stage_name in order:
+            tasks[stage_name] = asyncio.create_task(
+                self._run_stage(self.stages[stage_name], tasks), name=f"{self.name}:{stage_name}"
+            )
+
+        try:
+            await asyncio.gather(*tasks.values())
+        except BaseException:
+            for task in tasks.values():
+                if not task.done():
+                    task.cancel()
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+            raise
+
+        logger.info(
+            f"[{self.name}] all {len(order)} stages completed in {time.perf_counter() - started:.2f}s "
+            f"(sum of stages: {sum(t.duration or 0.0 for t in self.timings.values()):.2f}s)"
+        )
+        return {stage_name: task.result() for stage_name, task in tasks.items()}
+
+    def get_timings(self) -> Dict[str, Dict[str, Any]]:
+        """Return per-stage status and duration in seconds."""
+        return {
+            stage_name: {"status": timing.status, "duration": timing.duration}
+            for stage_name, timing in self.timings.items()
+        }
@@ -0,0 +1,138 @@
+"""
+Decide whether a video needs an analysis proxy, and what the proxy looks like.
+
+Compressing every file above 500 MB to a 500 MB target tracked the wrong quantity: analysis
+time (decoding every frame for keyframe extraction) depends on the pixels decoded per second
+and the codec, not on the file size. A 499 MB 4K 60fps file is expensive to analyse, while a
+600 MB efficient 480p file gains nothing from another transcode.
+
+The policy takes the source's cached ffprobe (media_tools.probe_media) and measures its decode work, width * height *
+fps * codec decode cost (h264 = 1), against a reference stream the extractor decodes comfortably:
+h264 at the proxy width and reference_fps. A proxy is built when the source is at least
+min_gain times that work and long enough for the transcode to pay off. The proxy itself has:
+
+- width: max_width (at least the keyframe extractor's max_frame_width), never above the source
+- fps: enough frames for keyframe sampling, max(min_fps, sample_fps * fps_factor), never above
+  the source fps
+
+Building a proxy decodes the source once anyway, so an efficient stream (480p h264 at 30fps)
+is analysed directly even if it is large on disk. Proxies are named by content hash and proxy
+shape, so a re-ingest of the same content reuses the proxy already on disk.
+"""
+
+import os
+import time
+from dataclasses import dataclass
+
+from loguru import logger
+
+from mmct.video_pipeline.utils.media_tools import MediaProbe
+
+# Relative software decode cost per pixel, h264 = 1
+CODEC_DECODE_COST = {
+    "h264": 1.0,
+    "mpeg4": 0.8,
+    "mpeg2video": 0.7,
+    "mjpeg": 1.2,
+    "vp8": 1.2,
+    "hevc": 1.6,
+    "vp9": 1.6,
+    "av1": 2.5,
+    "prores": 1.5,
+    "dnxhd": 1.5,
+}
+
+
+@dataclass
+class ProxyDecision:
+    """Outcome of ProxyPolicy.decide; width and fps describe the proxy when build is True."""
+
+    build: bool
+    reason: str
+    width: int = 0
+    fps: float = 0.0
+    gain: float = 1.0
+
+    def proxy_name(self, content_hash: str) -> str:
+        """File name of the proxy of some content, distinct per proxy shape."""
+        return f"{content_hash}_{self.width}w_{self.fps:g}fps.mp4"
+
+
+@dataclass
+class ProxyPolicy:
+    """
+    Thresholds of the proxy decision.
+
+    Args:
+        sample_fps: Frames per second the keyframe extractor analyses
+        max_width: Proxy width cap; keyframes are saved from the proxy, so it stays readable
+        fps_factor: Proxy fps as a multiple of sample_fps
+        min_fps: Lowest proxy fps
+        reference_fps: Frame rate of the reference stream the source's decode work is measured against
+        min_gain: Minimum source/reference decode work ratio for a proxy to be built
+        min_duration: Sources shorter than this many seconds are analysed directly
+    """
+
+    sample_fps: float = 1.0
+    max_width: int = 1280
+    fps_factor: float = 4.0
+    min_fps: float = 5.0
+    reference_fps: float = 30.0
+    min_gain: float = 2.0
+    min_duration: float = 60.0
+
+    @classmethod
+    def from_env(cls, sample_fps: float, max_frame_width: int) -> "ProxyPolicy":
+        """Policy for a keyframe configuration, with thresholds from VIDEO_PROXY_* variables."""
+        return cls(
+            sample_fps=sample_fps,
+            max_width=max(max_frame_width, int(os.getenv("VIDEO_PROXY_MAX_WIDTH", "1280"))),
+            fps_factor=float(os.getenv("VIDEO_PROXY_FPS_FACTOR", "4")),
+            min_fps=float(os.getenv("VIDEO_PROXY_MIN_FPS", "5")),
+            reference_fps=float(os.getenv("VIDEO_PROXY_REFERENCE_FPS", "30")),
+            min_gain=float(os.getenv("VIDEO_PROXY_MIN_GAIN", "2")),
+            min_duration=float(os.getenv("VIDEO_PROXY_MIN_DURATION", "60")),
+        )
+
+    def decide(self, probe: MediaProbe) -> ProxyDecision:
+        if probe.width <= 0 or probe.height <= 0 or probe.fps <= 0:
+            return ProxyDecision(False, "no measurable video stream")
+        if probe.duration < self.min_duration:
+            return ProxyDecision(False, f"short video ({probe.duration:.0f}s)")
+
+        fps = min(probe.fps, max(self.min_fps, self.sample_fps * self.fps_factor))
+        width = min(probe.width, self.max_width) // 2 * 2
+        height = probe.height * width / probe.width
+        source_work = probe.width * probe.height * probe.fps * CODEC_DECODE_COST.get(probe.codec, 1.0)
+        gain = source_work / (width * height * self.reference_fps)
+
+        shape = f"{probe.width}x{probe.height} {probe.codec} @ {probe.fps:.3g}fps, {probe.bitrate_kbps:.0f} kbps"
+        if gain < self.min_gain:
+            return ProxyDecision(False, f"{shape} is already cheap to analyse (gain {gain:.1f}x)", gain=gain)
+        return ProxyDecision(
+            True, f"{shape} -> {width}w @ {fps:g}fps (gain {gain:.1f}x)", width=width, fps=fps, gain=gain
+        )
+
+
+def evict_proxies(proxy_dir: str, max_bytes: int, min_age_seconds: float = 3600.0) -> None:
+    """
+    Delete least recently used proxies until the directory fits max_bytes.
+
+    Proxies used within min_age_seconds are kept, as an ingestion may still be reading them.
+    """
+    cutoff = time.time() - min_age_seconds
+    entries = sorted(
+        (entry for entry in os.scandir(proxy_dir) if entry.is_file() and entry.stat().st_mtime < cutoff),
+        key=lambda entry: entry.stat().st_mtime,
+    )
+    total = sum(entry.stat().st_size for entry in os.scandir(proxy_dir) if entry.is_file())
+    for entry in entries:
+        if total <= max_bytes:
+            break
+        try:
+            size = entry.stat().st_size
+            os.remove(entry.path)
+            total -= size
+            logger.info(f"Evicted cached proxy {entry.name}")
+        except OSError:
+            continue
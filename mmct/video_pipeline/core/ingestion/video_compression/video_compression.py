@@ -1,11 +1,17 @@
+import asyncio
+import csv
 import subprocess
 import os
 import math
+import shutil
+import tempfile
 import ffmpeg
 import platform
 from pathlib import Path
 from loguru import logger
 
+from mmct.video_pipeline.utils.media_tools import run_media_tool
+
 
 class VideoCompressor:
     def __init__(
@@ -25,6 +31,12 @@ class VideoCompressor:
         max_fps: float = 10.0,                 # cap FPS
         crf: int = 28,                         # CRF for x264 (lower=better quality)
         nvenc_cq: int = 28,                    # CQ for NVENC (lower=better quality)
+        output_name: str = None,               # output file name (default: input file name)
+
+        # Segment-parallel fast mode
+        segment_seconds: float = 0,            # >0: transcode ~this long segments in parallel
+        segment_workers: int = None,           # concurrent segment transcodes (default: cores / num_threads)
+        segment_dir: str = None,               # keep segments here for the caller (default: temp dir, removed)
     ):
         self.audio_codec = audio_codec
         self.preset = preset
@@ -32,7 +44,7 @@ class VideoCompressor:
         self.input_filename = os.path.basename(self.input_path)
         self.threads = str(num_threads)
         os.makedirs(output_dir, exist_ok=True)
-        self.output_path = os.path.join(output_dir, self.input_filename)
+        self.output_path = os.path.join(output_dir, output_name or self.input_filename)
         self.temp_null = "NUL" if os.name == "nt" else "/dev/null"
         self.target_size_kbits = target_size_mb * 1024 * 8
         self.audio_bitrate = audio_bitrate_kbps
@@ -44,7 +56,13 @@ class VideoCompressor:
         self.crf = crf
         self.nvenc_cq = nvenc_cq
 
+        self.segment_seconds = segment_seconds
+        self.segment_dir = segment_dir
+
         self.video_codec, self.use_gpu = self._detect_gpu_codec(video_codec)
+        # Hardware encoders allow only a few concurrent sessions
+        default_workers = 2 if self.use_gpu else max(1, (os.cpu_count() or 1) // max(1, num_threads))
+        self.segment_workers = segment_workers or default_workers
         self.duration = self._get_duration()
         self.video_bitrate = self._calculate_video_bitrate()
         print(self.input_path, self.output_path)
@@ -110,6 +128,7 @@ class VideoCompressor:
     def _get_duration(self):
         try:
             probe = ffmpeg.probe(self.input_path)
+            self.has_audio = any(s["codec_type"] == "audio" for s in probe["streams"])
             duration = float(probe["format"]["duration"])
             self.logger.info(f"Video duration: {duration:.2f} seconds")
             return duration
@@ -136,8 +155,11 @@ class VideoCompressor:
         self.logger.debug(f"--- {description} stderr ---\n{err.strip()}")
         if process.returncode != 0:
             self.logger.error(f"{description} failed. See log for details.")
-        else:
-            self.logger.info(f"{description} completed successfully.")
+            raise RuntimeError(
+                f"{description} failed with return code {process.returncode}: "
+                f"{err.decode(errors='replace')[-2000:]}"
+            )
+        self.logger.info(f"{description} completed successfully.")
 
     def _cleanup_temp_files(self):
         temp_files = ["ffmpeg2pass-0.log", "ffmpeg2pass-0.log.mbtree"]
@@ -167,6 +189,15 @@ class VideoCompressor:
             "auto",
             "-i",
             self.input_path,
+        ]
+        audio_opts = ["-c:a", self.audio_codec, "-b:a", f"{self.audio_bitrate}k"]
+
+        cmd = base_cmd + self._fast_video_opts() + audio_opts + [self.output_path]
+        self._run_and_log(cmd, "Fast Compression (single pass)")
+
+    def _fast_video_opts(self):
+        """Downscale, frame rate cap and encoder options of the fast proxy."""
+        scale_opts = [
             "-r",
             str(self.max_fps),
             "-vf",
@@ -208,11 +239,105 @@ class VideoCompressor:
                 "-threads",
                 self.threads,
             ]
+        return scale_opts + video_opts
 
-        audio_opts = ["-c:a", self.audio_codec, "-b:a", f"{self.audio_bitrate}k"]
+    # ------------------------------------------------------------------
+    # Segment-parallel fast compression
+    # ------------------------------------------------------------------
+    async def compress_segmented(self, on_segment=None):
+        """
+        Fast proxy compression with segments transcoded in parallel.
 
-        cmd = base_cmd + video_opts + audio_opts + [self.output_path]
-        self._run_and_log(cmd, "Fast Compression (single pass)")
+        One libx264 process only keeps a few cores busy, so a long video is:
+        - split at keyframes into ~segment_seconds pieces without re-encoding (-c copy, -f segment)
+        - transcoded segment by segment, segment_workers ffmpeg processes at a time
+        - joined with the concat demuxer, each piece placed at its exact source start time
+
+        Audio is encoded once from the whole input and muxed in at the end, so per-segment
+        encoder delay cannot accumulate into audio drift.
+
+        Args:
+            on_segment: Optional async callback awaited with (segment_path, start_seconds,
+                end_seconds) as each transcoded segment is ready, before the whole proxy is
+                joined. Segment files live in segment_dir until the caller removes it.
+        """
+        work_dir = self.segment_dir or tempfile.mkdtemp(prefix="proxy_segments_")
+        os.makedirs(work_dir, exist_ok=True)
+        try:
+            split_list = os.path.join(work_dir, "source.csv")
+            await self._run_async(
+                [
+                    "ffmpeg", "-y", "-i", self.input_path,
+                    "-map", "0:v:0", "-c", "copy",
+                    "-f", "segment", "-segment_time", str(self.segment_seconds),
+                    "-segment_list", split_list, "-segment_list_type", "csv",
+                    "-reset_timestamps", "1",
+                    os.path.join(work_dir, "source_%05d.mkv"),
+                ],
+                "Segment split",
+            )
+            with open(split_list, newline="") as f:
+                pieces = [(row[0], float(row[1]), float(row[2])) for row in csv.reader(f) if row]
+            self.logger.info(f"Transcoding {len(pieces)} segments with {self.segment_workers} workers")
+
+            slots = asyncio.Semaphore(self.segment_workers)
+
+            async def transcode(index, name, start, end):
+                source = os.path.join(work_dir, os.path.basename(name))
+                target = os.path.join(work_dir, f"proxy_{index:05d}.mp4")
+                async with slots:
+                    await self._run_async(
+                        ["ffmpeg", "-y", "-i", source] + self._fast_video_opts() + ["-an", target],
+                        f"Segment {index} transcode",
+                    )
+                os.remove(source)
+                if on_segment is not None:
+                    await on_segment(target, start, end)
+                return target
+
+            async def encode_audio():
+                if not self.has_audio:
+                    return None
+                target = os.path.join(work_dir, "audio.m4a")
+                await self._run_async(
+                    ["ffmpeg", "-y", "-i", self.input_path, "-map", "0:a:0", "-vn",
+                     "-c:a", self.audio_codec, "-b:a", f"{self.audio_bitrate}k", target],
+                    "Audio encode",
+                )
+                return target
+
+            audio_task = asyncio.ensure_future(encode_audio())
+            tasks = [
+                asyncio.ensure_future(transcode(i, name, start, end))
+                for i, (name, start, end) in enumerate(pieces)
+            ]
+            try:
+                targets = await asyncio.gather(*tasks)
+                audio = await audio_task
+            finally:
+                # On failure, stop the sibling ffmpeg processes (and their on_segment calls)
+                # before work_dir is removed or the caller moves on
+                for task in tasks + [audio_task]:
+                    task.cancel()
+                await asyncio.gather(*tasks, audio_task, return_exceptions=True)
+
+            concat_list = os.path.join(work_dir, "proxy.txt")
+            with open(concat_list, "w") as f:
+                for target, (_, start, end) in zip(targets, pieces):
+                    f.write(f"file '{os.path.basename(target)}'\nduration {end - start:.6f}\n")
+            cmd = ["ffmpeg", "-y", "-f", "concat", "-safe", "0", "-i", concat_list]
+            if audio:
+                cmd += ["-i", audio, "-map", "0:v", "-map", "1:a"]
+            await self._run_async(cmd + ["-c", "copy", self.output_path], "Segment concat")
+            await asyncio.to_thread(self.validate_output)
+        finally:
+            if self.segment_dir is None:
+                shutil.rmtree(work_dir, ignore_errors=True)
+
+    async def _run_async(self, command, description):
+        """Run an ffmpeg command through the shared media tool runner (raises MediaToolError)."""
+        self.logger.debug(f"Starting: {description} of {self.input_path}")
+        await run_media_tool(command[:1] + ["-nostats", "-v", "error"] + command[1:])
 
     # ------------------------------------------------------------------
     # Original two-pass compression
@@ -284,29 +409,47 @@ class VideoCompressor:
     # ------------------------------------------------------------------
     def compress(self):
         """
-        fast_mode=True  -> single-pass proxy compression (recommended for analytics)
+        fast_mode=True  -> single-pass proxy compression (recommended for analytics);
+                           segment-parallel when segment_seconds > 0. In an event loop,
+                           await compress_segmented() instead
         fast_mode=False -> 2-pass size-constrained compression
         """
-        if self.fast_mode:
-            self._compress_fast()
+        if self.fast_mode and self.segment_seconds > 0:
+            asyncio.run(self.compress_segmented())
         else:
-            self._compress_twopass()
+            if self.fast_mode:
+                self._compress_fast()
+            else:
+                self._compress_twopass()
+            self.validate_output()
+
+        self.logger.info(f"Compression complete. Output saved to: {self.output_path}")
 
-        # Validate output
+    def validate_output(self):
+        """
+        Check that the output is a complete video of the input.
+
+        Raises:
+            RuntimeError: If the output can't be probed, has no video stream, or is shorter than
+                the input (a truncated transcode)
+        """
         try:
             probe = ffmpeg.probe(self.output_path)
-            has_video = any(s["codec_type"] == "video" for s in probe["streams"])
-            has_audio = any(s["codec_type"] == "audio" for s in probe["streams"])
-            if not has_video:
-                raise RuntimeError("Compressed video has no video stream!")
-            if not has_audio:
-                self.logger.warning("Compressed video has no audio stream (may not exist originally)")
-            else:
-                self.logger.info("Compressed video has both video and audio streams")
         except Exception as e:
-            self.logger.warning(f"Could not verify compressed video streams: {e}")
-
-        self.logger.info(f"Compression complete. Output saved to: {self.output_path}")
+            raise RuntimeError(f"Could not probe compressed video {self.output_path}: {e}")
+        has_video = any(s["codec_type"] == "video" for s in probe["streams"])
+        has_audio = any(s["codec_type"] == "audio" for s in probe["streams"])
+        if not has_video:
+            raise RuntimeError("Compressed video has no video stream!")
+        duration = float(probe["format"].get("duration") or 0)
+        if duration < self.duration - max(2.0, 0.02 * self.duration):
+            raise RuntimeError(
+                f"Compressed video is truncated: {duration:.2f}s of {self.duration:.2f}s"
+            )
+        if not has_audio:
+            self.logger.warning("Compressed video has no audio stream (may not exist originally)")
+        else:
+            self.logger.info("Compressed video has both video and audio streams")
 
 
 # ----------------------------------------------------------------------
@@ -329,6 +472,8 @@ if __name__ == "__main__":
     parser.add_argument("--max-fps", type=float, default=10.0, help="Max fps in fast mode (default: 10)")
     parser.add_argument("--crf", type=int, default=28, help="CRF for x264 in fast mode (default: 28)")
     parser.add_argument("--nvenc-cq", type=int, default=28, help="CQ for NVENC in fast mode (default: 28)")
+    parser.add_argument("--segment-seconds", type=float, default=0, help="Transcode segments of this length in parallel in fast mode (default: 0, off)")
+    parser.add_argument("--segment-workers", type=int, default=None, help="Concurrent segment transcodes (default: cores / threads)")
 
     args = parser.parse_args()
 
@@ -346,5 +491,7 @@ if __name__ == "__main__":
         max_fps=args.max_fps,
         crf=args.crf,
         nvenc_cq=args.nvenc_cq,
+        segment_seconds=args.segment_seconds,
+        segment_workers=args.segment_workers,
     )
     compressor.compress()
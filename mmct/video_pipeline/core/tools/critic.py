@@ -8,17 +8,13 @@ import json
 import asyncio
 from typing_extensions import Annotated
 from mmct.video_pipeline.prompts_and_description import get_critic_tool_system_prompt
-from mmct.providers.factory import provider_factory
+from mmct.video_pipeline.utils.resource_pool import get_resource_pool
 
 from dotenv import load_dotenv, find_dotenv
 
 # Load environment variables
 load_dotenv(find_dotenv(), override=True)
 
-llm_provider = provider_factory.create_llm_provider()
-
-
-
 
 async def critic_tool(
     user_query: Annotated[str, "The original user question or query that needs to be answered"],
@@ -76,7 +72,7 @@ async def critic_tool(
         retry_intervals = [10, 15]
         for attempt, wait_time in enumerate(retry_intervals, start=1):
             try:
-                result = await llm_provider.chat_completion(
+                result = await get_resource_pool().llm_provider().chat_completion(
                     messages=payload["messages"],
                     temperature=payload["temperature"],
                     top_p=payload["top_p"]
@@ -7,17 +7,11 @@ import os
 from typing_extensions import Annotated, Optional
 from mmct.video_pipeline.utils.helper import get_media_folder
 from azure.search.documents.models import VectorizedQuery, VectorFilterMode
-from mmct.providers.factory import provider_factory
+from mmct.video_pipeline.utils.resource_pool import get_resource_pool
+from mmct.video_pipeline.core.tools.utils.tool_prefetch import MISS, get_prefetched
+from mmct.video_pipeline.core.tools.utils.context_packer import context_packing_enabled
 from loguru import logger
 
-try:
-    logger.info("Instantiating the embedding and search providers")
-    search_provider = provider_factory.create_search_provider()
-    embed_provider = provider_factory.create_embedding_provider()
-    logger.info("Successfully instantiated the search and embedding providers")
-except Exception as e:
-    logger.exception(f"Exception occurred while instantiating providers: {e}")
-
 
 async def get_context(
     query: Annotated[str, "query for which documents needs to fetch"],
@@ -67,9 +61,40 @@ async def get_context(
         - hash_video_id (str): Video identifier
         - youtube_url (str): Video URL
     """
-    global search_provider, embed_provider
-    # embedding the query
-    embedding = await embed_provider.embedding(query)
+    # Served from the session's speculative prefetch when the planner repeats the same call
+    prefetched = await get_prefetched(
+        "get_context", query=query, index_name=index_name, video_id=video_id, url=url,
+        start_time=start_time, end_time=end_time, fields_to_retrieve=fields_to_retrieve, top=top,
+    )
+    if prefetched is not MISS:
+        return prefetched
+
+    return await search_context(
+        query=query, index_name=index_name, video_id=video_id, url=url,
+        start_time=start_time, end_time=end_time, fields_to_retrieve=fields_to_retrieve, top=top,
+    )
+
+
+async def search_context(
+    query: str,
+    index_name: str,
+    video_id: Optional[str] = None,
+    url: Optional[str] = None,
+    start_time: Optional[float] = None,
+    end_time: Optional[float] = None,
+    fields_to_retrieve: Optional[list] = None,
+    top: Optional[int] = 3,
+    embedding: Optional[list] = None,
+):
+    """
+    Chapter search behind get_context; pass a precomputed query embedding to skip embedding the query
+    (e.g. when many queries were embedded in one batch).
+    """
+    resource_pool = get_resource_pool()
+    search_provider = resource_pool.search_provider()
+    if embedding is None:
+        # embedding the query
+        embedding = await resource_pool.embedding_provider().embedding(query)
 
     # Build filter query with multiple conditions
     filter_conditions = []
@@ -100,6 +125,9 @@ async def get_context(
         select=fields_to_retrieve,
         embedding=embedding
     )
+    if context_packing_enabled() and isinstance(search_results, list):
+        # Dedupe overlapping chapters and fit the fields into the planner's token budget
+        search_results = resource_pool.context_packer().pack_chapters(search_results, query=query)
     return search_results
 
 
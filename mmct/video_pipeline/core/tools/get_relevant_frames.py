@@ -5,7 +5,8 @@ import os
 import shutil
 from typing_extensions import Annotated
 from typing import List, Dict, Any, Optional
-from mmct.video_pipeline.core.tools.utils.search_keyframes import KeyframeSearcher
+from mmct.video_pipeline.utils.resource_pool import get_resource_pool
+from mmct.video_pipeline.core.tools.utils.tool_prefetch import MISS, get_prefetched
 
 
 
@@ -39,25 +40,20 @@ async def get_relevant_frames(
         3. Pass these frame IDs to query_frame for actual visual analysis
     """
     try:
-        
-        # Get search endpoint from environment
-        search_endpoint = os.getenv('SEARCH_ENDPOINT')
-        # If there is a FAISS index directory in examples/ (e.g. from exported indices), prefer it
-        provider_config = None
-        alt_faiss_dir = os.path.join(os.getcwd(), "examples", "mmct_faiss_indices")
-        default_faiss_dir = os.path.join(os.getcwd(), "mmct_faiss_indices")
-        if os.path.isdir(alt_faiss_dir) and any(os.scandir(alt_faiss_dir)):
-            provider_config = {"index_path": alt_faiss_dir}
-        elif os.path.isdir(default_faiss_dir) and any(os.scandir(default_faiss_dir)):
-            provider_config = {"index_path": default_faiss_dir}
-        
-        searcher = KeyframeSearcher(
-            search_endpoint=search_endpoint,
+        # Served from the session's speculative prefetch when the planner repeats the same call
+        prefetched = await get_prefetched(
+            "get_relevant_frames", query=query, video_id=video_id, index_name=index_name,
+            top_k=top_k, provider_name=provider_name,
+        )
+        if prefetched is not MISS:
+            return prefetched
+
+        # Shared searcher (search client + CLIP model) from the process resource pool
+        searcher = get_resource_pool().keyframe_searcher(
             index_name=f"keyframes-{index_name}",
             provider_name=provider_name,
-            provider_config=provider_config,
         )
-        
+
         video_filter = f"video_id eq '{video_id}'"
         # Search for relevant frames
         results = await searcher.search_keyframes(
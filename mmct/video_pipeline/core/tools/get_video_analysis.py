@@ -1,4 +1,6 @@
-from mmct.providers.factory import provider_factory
+from mmct.video_pipeline.utils.resource_pool import get_resource_pool
+from mmct.video_pipeline.core.tools.utils.tool_prefetch import MISS, get_prefetched
+from mmct.video_pipeline.core.tools.utils.context_packer import context_packing_enabled
 from typing import Annotated, List, Dict, Any, Optional
 import os
 from dotenv import load_dotenv, find_dotenv
@@ -44,6 +46,14 @@ async def get_video_analysis(
     """
 
     print("in get_video_analysis function")
+    # Served from the session's speculative prefetch when the planner repeats the same call
+    prefetched = await get_prefetched(
+        "get_video_analysis", query=query, index_name=index_name, video_id=video_id,
+        url=url, top=top, fields_to_retrieve=fields_to_retrieve,
+    )
+    if prefetched is not MISS:
+        return prefetched
+
     # Construct the full index name
     full_index_name = f"object-collection-{index_name}"
 
@@ -52,8 +62,8 @@ async def get_video_analysis(
     if not search_endpoint:
         raise ValueError("SEARCH_ENDPOINT environment variable not set")
 
-    # Initialize search provider
-    search_provider = provider_factory.create_search_provider()
+    # Shared search provider from the process resource pool
+    search_provider = get_resource_pool().search_provider()
 
     try:
         # Build filter query
@@ -73,14 +83,16 @@ async def get_video_analysis(
             top=top,
             select=fields_to_retrieve,
         )
-        return list(results)
+        results = list(results)
+        if context_packing_enabled():
+            # Keep object collections to the objects and attributes the query needs
+            results = get_resource_pool().context_packer().pack_analysis(results, query=query)
+        return results
 
     except Exception as e:
         print(f"Error fetching video analysis for video_id={video_id} or url={url}: {e}")
         return []
-    finally:
-        await search_provider.close()
-        
+
 
 if __name__ == "__main__":
     import asyncio
@@ -9,18 +9,25 @@ import base64
 from datetime import time
 from typing import Annotated, Optional
 from loguru import logger
-from mmct.providers.factory import provider_factory
-from mmct.video_pipeline.core.tools.utils.search_keyframes import KeyframeSearcher
+from mmct.video_pipeline.utils.resource_pool import get_resource_pool
 
-# Initialize providers
-llm_provider = provider_factory.create_llm_provider()
+# Above this many frames the low-detail variant is sent; the model tiles each high-detail
+# frame, so large frame sets cost far more tokens than the extra detail is worth
+LOW_DETAIL_FRAME_COUNT = int(os.getenv("QUERY_FRAME_LOW_DETAIL_FRAME_COUNT", "8"))
 
-storage_provider = provider_factory.create_storage_provider()
+async def download_and_encode_blob(file_name: str, folder_name: str, save_locally: bool = False, local_dir: str = "./debug_frames", detail: str = "high") -> Optional[str]:
+    """Download JPG blob using storage_provider and encode to base64.
+
+    Keyframes ("<video_id>/<frame>" in the keyframes folder) are served from the shared
+    frame cache at the requested detail; other blobs and debug saves go to storage directly.
+    """
+    video_id, _, frame = file_name.partition("/")
+    if folder_name == "keyframes" and frame and not save_locally:
+        return await get_resource_pool().frame_cache().get(video_id, frame, variant=detail)
 
-async def download_and_encode_blob(file_name: str, folder_name: str, save_locally: bool = False, local_dir: str = "./debug_frames") -> Optional[str]:
-    """Download JPG blob using storage_provider and encode to base64."""
     try:
-        # Load blob data using storage provider
+        # Load blob data using the shared storage provider
+        storage_provider = get_resource_pool().storage_provider()
         image_data = await storage_provider.load_file_to_memory(folder=folder_name, file_name=file_name)
 
         # Optionally save to local disk for debugging
@@ -75,24 +82,11 @@ async def query_frame(
     """
     provider_name = None
     save_frames_locally  = False
-    # Get search endpoint from environment
-    search_endpoint = os.getenv('SEARCH_ENDPOINT')
-
-    # If there is a FAISS index directory in examples/ (e.g. from exported indices), prefer it
-    provider_config = None
-    alt_faiss_dir = os.path.join(os.getcwd(), "examples", "mmct_faiss_indices")
-    default_faiss_dir = os.path.join(os.getcwd(), "mmct_faiss_indices")
-    if os.path.isdir(alt_faiss_dir) and any(os.scandir(alt_faiss_dir)):
-        provider_config = {"index_path": alt_faiss_dir}
-    elif os.path.isdir(default_faiss_dir) and any(os.scandir(default_faiss_dir)):
-        provider_config = {"index_path": default_faiss_dir}
-
-    # Initialize searcher
-    searcher = KeyframeSearcher(
-        search_endpoint=search_endpoint,
+
+    # Shared searcher (search client + CLIP model) from the process resource pool
+    searcher = get_resource_pool().keyframe_searcher(
         index_name=f"keyframes-{index_name}",
         provider_name=provider_name,
-        provider_config=provider_config,
     )
 
     # Determine which frames to use
@@ -136,7 +130,8 @@ async def query_frame(
     logger.info(f"Downloading and encoding {len(file_paths)} images from storage provider...")
 
     # Process blobs concurrently - direct blob to base64
-    tasks = [download_and_encode_blob(file_name=file_name,folder_name=folder_name, save_locally=save_frames_locally) for file_name in file_paths]
+    detail = "low" if len(file_paths) > LOW_DETAIL_FRAME_COUNT else "high"
+    tasks = [download_and_encode_blob(file_name=file_name,folder_name=folder_name, save_locally=save_frames_locally, detail=detail) for file_name in file_paths]
     encoded_results = await asyncio.gather(*tasks, return_exceptions=True)
 
     # Filter successful results
@@ -155,7 +150,7 @@ async def query_frame(
             "type": "image_url",
             "image_url": {
                 "url": f"data:image/jpeg;base64,{encoded_image}",
-                "detail": "high"
+                "detail": detail
             }
         })
 
@@ -208,7 +203,7 @@ async def query_frame(
     }
 
 
-    response = await llm_provider.chat_completion(
+    response = await get_resource_pool().llm_provider().chat_completion(
         messages=payload['messages'],
         temperature=payload["temperature"],
         #top_p=payload['top_p'],
@@ -0,0 +1,263 @@
+"""
+Token-budgeted packing of retrieval results for the planner.
+
+get_context returns whole chapter documents and get_video_analysis whole object collections,
+and the planner pastes every byte into its next model turn. ContextPacker sits between the
+search results and the agent:
+
+- chapters overlapping in time on the same video are deduplicated (the higher-ranked one wins)
+- embedding/vector fields are dropped
+- text fields share a token budget by priority (summaries before transcripts before scene text)
+- object collections keep every object's name and first appearance, but full attributes only
+  for the objects matching the query, within the budget
+
+Packed documents keep their original structure and field names, so the tools' outputs and the
+planner prompts are unchanged apart from being shorter. Packing is cached per (document, budget,
+query terms) in a small LRU, since the planner often re-fetches the same chapters.
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, FrozenSet, List, Optional, Sequence, Tuple
+
+from mmct.video_pipeline.core.ingestion.chapter_generator.utils import estimate_tokens, truncate_to_tokens
+
+TRUNCATION_MARKER = " ...[truncated]"
+
+# Relative share of a document's budget; fields not listed get weight 1
+CHAPTER_FIELD_WEIGHTS = {
+    "detailed_summary": 5,
+    "chapter_transcript": 5,
+    "action_taken": 3,
+    "text_from_scene": 2,
+    "object_collection": 2,
+    "topic_of_video": 1,
+}
+ANALYSIS_FIELD_WEIGHTS = {
+    "video_summary": 4,
+    "object_collection": 6,
+}
+# Object attributes kept for objects that match the query, in order of usefulness
+OBJECT_DETAIL_FIELDS = ("appearance", "identity", "additional_details")
+
+_STOPWORDS = frozenset(
+    "a an and are at be by did do does for from how in is it of on or the this that to was were what when "
+    "where which who why with video show shown".split()
+)
+
+
+def _query_terms(query: Optional[str]) -> FrozenSet[str]:
+    words = re.findall(r"[a-z0-9]+", (query or "").lower())
+    return frozenset(w for w in words if len(w) > 2 and w not in _STOPWORDS)
+
+
+def _is_vector_field(name: str) -> bool:
+    lowered = name.lower()
+    return "embedding" in lowered or "vector" in lowered
+
+
+def _overlap_ratio(a: Dict[str, Any], b: Dict[str, Any]) -> float:
+    try:
+        a_start, a_end = float(a["start_time"]), float(a["end_time"])
+        b_start, b_end = float(b["start_time"]), float(b["end_time"])
+    except (KeyError, TypeError, ValueError):
+        return 0.0
+    shorter = min(a_end - a_start, b_end - b_start)
+    if shorter <= 0:
+        return 0.0
+    return max(0.0, min(a_end, b_end) - max(a_start, b_start)) / shorter
+
+
+def _video_of(doc: Dict[str, Any]) -> Optional[str]:
+    return doc.get("hash_video_id") or doc.get("video_id") or doc.get("youtube_url") or doc.get("url")
+
+
+class ContextPacker:
+    """
+    Packs search result documents into a token budget.
+
+    Args:
+        context_budget: Total tokens for one get_context result
+        analysis_budget: Total tokens for one get_video_analysis result
+        overlap_threshold: Fraction of the shorter chapter that must overlap for two chapters
+            of the same video to count as duplicates
+        cache_size: Packed documents kept in the LRU cache
+    """
+
+    def __init__(
+        self,
+        context_budget: int = 3000,
+        analysis_budget: int = 2500,
+        overlap_threshold: float = 0.5,
+        cache_size: int = 2048,
+    ):
+        self.context_budget = context_budget
+        self.analysis_budget = analysis_budget
+        self.overlap_threshold = overlap_threshold
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[Tuple, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "ContextPacker":
+        """Create a packer from CONTEXT_PACK_TOKEN_BUDGET (3000) and ANALYSIS_PACK_TOKEN_BUDGET (2500)."""
+        return cls(
+            context_budget=int(os.getenv("CONTEXT_PACK_TOKEN_BUDGET", "3000")),
+            analysis_budget=int(os.getenv("ANALYSIS_PACK_TOKEN_BUDGET", "2500")),
+        )
+
+    def dedupe_chapters(self, docs: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Drop repeated documents and chapters overlapping a higher-ranked chapter of the same video."""
+        kept: List[Dict[str, Any]] = []
+        for doc in docs:
+            duplicate = False
+            for other in kept:
+                if doc.get("id") is not None and doc.get("id") == other.get("id"):
+                    duplicate = True
+                elif _video_of(doc) == _video_of(other) and _overlap_ratio(doc, other) >= self.overlap_threshold:
+                    duplicate = True
+                if duplicate:
+                    break
+            if not duplicate:
+                kept.append(doc)
+        return kept
+
+    def pack_chapters(self, docs: Sequence[Dict[str, Any]], query: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Pack get_context results into the context budget."""
+        return self._pack(self.dedupe_chapters(docs), self.context_budget, CHAPTER_FIELD_WEIGHTS, query)
+
+    def pack_analysis(self, docs: Sequence[Dict[str, Any]], query: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Pack get_video_analysis results into the analysis budget."""
+        return self._pack(list(docs), self.analysis_budget, ANALYSIS_FIELD_WEIGHTS, query)
+
+    def _pack(
+        self, docs: List[Dict[str, Any]], budget: int, weights: Dict[str, int], query: Optional[str]
+    ) -> List[Dict[str, Any]]:
+        terms = _query_terms(query)
+        packed = []
+        remaining = budget
+        for position, doc in enumerate(docs):
+            if not isinstance(doc, dict):
+                packed.append(doc)
+                continue
+            # Equal share of what is left, so budget unused by short documents rolls over
+            doc_budget = remaining // (len(docs) - position)
+            packed_doc = self._pack_document_cached(doc, doc_budget, weights, terms)
+            remaining -= min(doc_budget, self._document_tokens(packed_doc))
+            packed.append(packed_doc)
+        return packed
+
+    @staticmethod
+    def _document_tokens(doc: Dict[str, Any]) -> int:
+        return sum(estimate_tokens(v) if isinstance(v, str) else 4 for v in doc.values())
+
+    def _pack_document_cached(
+        self, doc: Dict[str, Any], budget: int, weights: Dict[str, int], terms: FrozenSet[str]
+    ) -> Dict[str, Any]:
+        content = {k: v for k, v in doc.items() if not _is_vector_field(k)}
+        digest = hashlib.sha1(json.dumps(content, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+        # Query terms only change how object collections are packed
+        key = (digest, budget, tuple(sorted(weights.items())), terms if "object_collection" in doc else None)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                return dict(cached)
+
+        packed = self._pack_document(doc, budget, weights, terms)
+
+        with self._lock:
+            self._cache[key] = packed
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return dict(packed)
+
+    def _pack_document(
+        self, doc: Dict[str, Any], budget: int, weights: Dict[str, int], terms: FrozenSet[str]
+    ) -> Dict[str, Any]:
+        packed: Dict[str, Any] = {}
+        text_fields = []
+        for name, value in doc.items():
+            if _is_vector_field(name) or name.startswith("@search."):
+                continue
+            if isinstance(value, str) and (name in weights or estimate_tokens(value) > 32):
+                text_fields.append(name)
+            else:
+                # Ids, times, counts and short labels are always kept
+                packed[name] = value
+                budget -= estimate_tokens(str(value)) if value is not None else 0
+
+        # Highest weight first; each field gets its weighted share of what is left
+        text_fields.sort(key=lambda name: -weights.get(name, 1))
+        remaining_weight = sum(weights.get(name, 1) for name in text_fields)
+        for name in text_fields:
+            weight = weights.get(name, 1)
+            share = max(0, budget * weight // remaining_weight) if remaining_weight else 0
+            remaining_weight -= weight
+            if name == "object_collection":
+                value = self._compress_objects(doc[name], share, terms)
+            else:
+                value = self._truncate(doc[name], share)
+            if value:
+                packed[name] = value
+            budget -= estimate_tokens(value)
+        return packed
+
+    @staticmethod
+    def _truncate(text: str, max_tokens: int) -> str:
+        if estimate_tokens(text) <= max_tokens:
+            return text
+        marker_tokens = estimate_tokens(TRUNCATION_MARKER)
+        if max_tokens <= marker_tokens:
+            return ""
+        return truncate_to_tokens(text, max_tokens - marker_tokens) + TRUNCATION_MARKER
+
+    def _compress_objects(self, collection: str, max_tokens: int, terms: FrozenSet[str]) -> str:
+        """Keep name and first_seen of every object, and details of query-relevant objects, within max_tokens."""
+        try:
+            objects = json.loads(collection) if isinstance(collection, str) else collection
+        except ValueError:
+            return self._truncate(collection, max_tokens)
+        if not isinstance(objects, list):
+            return self._truncate(collection, max_tokens)
+        if estimate_tokens(collection) <= max_tokens:
+            return collection
+
+        def relevance(obj: Any) -> int:
+            text = json.dumps(obj, ensure_ascii=False, default=str).lower()
+            return sum(1 for term in terms if term in text)
+
+        ranked = sorted(
+            ((relevance(obj), index, obj) for index, obj in enumerate(objects) if isinstance(obj, dict)),
+            key=lambda entry: (-entry[0], entry[1]),
+        )
+
+        compact: List[Dict[str, Any]] = []
+        used = 2
+        for score, _, obj in ranked:
+            entry = {k: obj[k] for k in ("name", "first_seen") if k in obj}
+            if score > 0:
+                entry.update({k: obj[k] for k in OBJECT_DETAIL_FIELDS if k in obj})
+            cost = estimate_tokens(json.dumps(entry, ensure_ascii=False, default=str)) + 1
+            if used + cost > max_tokens and score > 0 and len(entry) > 2:
+                # Fall back to the bare entry before giving up on this object
+                entry = {k: obj[k] for k in ("name", "first_seen") if k in obj}
+                cost = estimate_tokens(json.dumps(entry, ensure_ascii=False, default=str)) + 1
+            if used + cost > max_tokens:
+                break
+            compact.append(entry)
+            used += cost
+
+        omitted = len(objects) - len(compact)
+        if omitted:
+            compact.append({"omitted_objects": omitted})
+        return json.dumps(compact, ensure_ascii=False, default=str)
+
+
+def context_packing_enabled() -> bool:
+    """Packing is on unless CONTEXT_PACKING_ENABLED=false."""
+    return os.getenv("CONTEXT_PACKING_ENABLED", "true").lower() != "false"
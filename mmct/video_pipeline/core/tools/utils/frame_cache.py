@@ -0,0 +1,251 @@
+"""
+Two-tier cache of encoded keyframes for query_frame.
+
+query_frame used to download every keyframe from storage and base64-encode it on each call,
+so popular frames were fetched again by every user and every planner iteration. FrameCache
+keeps the base64 strings of each frame, pre-resized to the resolutions the vision model
+actually uses, in an in-memory LRU bounded by bytes with a larger LRU directory on local
+disk behind it. Concurrent requests for the same frame share a single storage download.
+
+Variants:
+    high: fits the vision model's high-detail input (2048px box, 768px short side)
+    low:  fits the 512px low-detail input
+"""
+
+import asyncio
+import base64
+import hashlib
+import io
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+from loguru import logger
+
+# Variant name -> (max long side, max short side); None keeps the original bytes
+FRAME_VARIANTS: Dict[str, Optional[Tuple[int, int]]] = {
+    "high": (2048, 768),
+    "low": (512, 512),
+}
+
+
+def _resize_variants(image_data: bytes, jpeg_quality: int) -> Dict[str, str]:
+    """Build the base64 string of every variant from the original JPEG bytes."""
+    from PIL import Image
+
+    variants = {}
+    with Image.open(io.BytesIO(image_data)) as image:
+        width, height = image.size
+        for name, limits in FRAME_VARIANTS.items():
+            long_side, short_side = limits
+            scale = min(
+                1.0,
+                long_side / max(width, height),
+                short_side / max(1, min(width, height)),
+            )
+            if scale >= 1.0:
+                # Already small enough; re-encoding would only lose quality
+                variants[name] = base64.b64encode(image_data).decode("utf-8")
+                continue
+            size = (max(1, round(width * scale)), max(1, round(height * scale)))
+            resized = image.convert("RGB").resize(size, Image.LANCZOS)
+            buffer = io.BytesIO()
+            resized.save(buffer, format="JPEG", quality=jpeg_quality, optimize=True)
+            variants[name] = base64.b64encode(buffer.getvalue()).decode("utf-8")
+    return variants
+
+
+class FrameCache:
+    """
+    Memory + disk LRU of base64-encoded keyframe variants keyed by (video_id, frame).
+
+    Args:
+        storage_provider: Storage provider the keyframes are loaded from
+        folder_name: Storage folder holding keyframes as "<video_id>/<frame>"
+        memory_bytes: Budget for base64 strings held in memory
+        disk_dir: Directory of the disk tier; None disables it
+        disk_bytes: Budget for the disk tier
+        jpeg_quality: JPEG quality used for resized variants
+
+    Example:
+        >>> cache = FrameCache(storage_provider)
+        >>> encoded = await cache.get("abc123", "abc123_42.jpg", variant="low")
+    """
+
+    def __init__(
+        self,
+        storage_provider,
+        folder_name: str = "keyframes",
+        memory_bytes: int = 256 * 1024 * 1024,
+        disk_dir: Optional[str] = None,
+        disk_bytes: int = 2 * 1024 * 1024 * 1024,
+        jpeg_quality: int = 85,
+    ):
+        self.storage_provider = storage_provider
+        self.folder_name = folder_name
+        self.memory_bytes = memory_bytes
+        self.disk_dir = disk_dir
+        self.disk_bytes = disk_bytes
+        self.jpeg_quality = jpeg_quality
+
+        self._memory: "OrderedDict[Tuple[str, str, str], str]" = OrderedDict()
+        self._memory_size = 0
+        self._disk_size: Optional[int] = None  # measured on first write
+        # Disk writes run in worker threads; the size counter and eviction are shared between them
+        self._disk_lock = threading.Lock()
+        self._in_flight: Dict[Tuple[str, str], asyncio.Task] = {}
+        self.hits = 0
+        self.misses = 0
+
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+
+    @classmethod
+    def from_env(cls, storage_provider) -> "FrameCache":
+        """
+        Create a cache sized from FRAME_CACHE_MEMORY_MB, FRAME_CACHE_DISK_MB and FRAME_CACHE_DIR.
+
+        Setting FRAME_CACHE_DISK_MB=0 keeps the cache in memory only.
+        """
+        disk_mb = int(os.getenv("FRAME_CACHE_DISK_MB", "2048"))
+        return cls(
+            storage_provider=storage_provider,
+            memory_bytes=int(os.getenv("FRAME_CACHE_MEMORY_MB", "256")) * 1024 * 1024,
+            disk_dir=(
+                os.getenv("FRAME_CACHE_DIR", os.path.join(tempfile.gettempdir(), "mmct_frame_cache"))
+                if disk_mb > 0
+                else None
+            ),
+            disk_bytes=disk_mb * 1024 * 1024,
+        )
+
+    async def get(self, video_id: str, frame: str, variant: str = "high") -> Optional[str]:
+        """
+        Return the base64-encoded frame at the requested variant.
+
+        Args:
+            video_id: Video hash id (the keyframe folder)
+            frame: Keyframe filename
+            variant: One of FRAME_VARIANTS
+
+        Returns:
+            Base64 JPEG string, or None when the frame cannot be loaded
+        """
+        if variant not in FRAME_VARIANTS:
+            raise ValueError(f"Unknown frame variant '{variant}', expected one of {list(FRAME_VARIANTS)}")
+
+        encoded = self._memory_get((video_id, frame, variant))
+        if encoded is not None:
+            self.hits += 1
+            return encoded
+
+        frame_key = (video_id, frame)
+        task = self._in_flight.get(frame_key)
+        if task is None:
+            self.misses += 1
+            task = asyncio.create_task(self._load(video_id, frame))
+            self._in_flight[frame_key] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(frame_key, None))
+        else:
+            self.hits += 1
+
+        try:
+            variants = await asyncio.shield(task)
+        except Exception as e:
+            logger.warning(f"Failed to load frame {video_id}/{frame}: {e}")
+            return None
+        return variants.get(variant)
+
+    async def _load(self, video_id: str, frame: str) -> Dict[str, str]:
+        variants = await asyncio.to_thread(self._disk_read, video_id, frame)
+        if variants is None:
+            image_data = await self.storage_provider.load_file_to_memory(
+                folder=self.folder_name, file_name=f"{video_id}/{frame}"
+            )
+            variants = await asyncio.to_thread(_resize_variants, image_data, self.jpeg_quality)
+            if self.disk_dir:
+                await asyncio.to_thread(self._disk_write, video_id, frame, variants)
+        for name, encoded in variants.items():
+            self._memory_put((video_id, frame, name), encoded)
+        return variants
+
+    # Memory tier
+
+    def _memory_get(self, key: Tuple[str, str, str]) -> Optional[str]:
+        encoded = self._memory.get(key)
+        if encoded is not None:
+            self._memory.move_to_end(key)
+        return encoded
+
+    def _memory_put(self, key: Tuple[str, str, str], encoded: str) -> None:
+        previous = self._memory.pop(key, None)
+        if previous is not None:
+            self._memory_size -= len(previous)
+        if len(encoded) > self.memory_bytes:
+            return
+        self._memory[key] = encoded
+        self._memory_size += len(encoded)
+        while self._memory_size > self.memory_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_size -= len(evicted)
+
+    # Disk tier; recency is tracked through file mtimes
+
+    def _disk_path(self, video_id: str, frame: str, variant: str) -> str:
+        digest = hashlib.sha1(f"{video_id}/{frame}".encode("utf-8")).hexdigest()
+        return os.path.join(self.disk_dir, f"{digest}_{variant}.b64")
+
+    def _disk_read(self, video_id: str, frame: str) -> Optional[Dict[str, str]]:
+        if not self.disk_dir:
+            return None
+        variants = {}
+        for name in FRAME_VARIANTS:
+            path = self._disk_path(video_id, frame, name)
+            try:
+                with open(path, "r", encoding="ascii") as f:
+                    variants[name] = f.read()
+                os.utime(path)
+            except OSError:
+                return None
+        return variants
+
+    def _disk_write(self, video_id: str, frame: str, variants: Dict[str, str]) -> None:
+        written = 0
+        try:
+            for name, encoded in variants.items():
+                path = self._disk_path(video_id, frame, name)
+                tmp_path = f"{path}.{os.getpid()}.tmp"
+                with open(tmp_path, "w", encoding="ascii") as f:
+                    f.write(encoded)
+                os.replace(tmp_path, path)
+                written += len(encoded)
+        except OSError as e:
+            logger.warning(f"Frame cache: could not write {video_id}/{frame} to disk: {e}")
+            return
+        with self._disk_lock:
+            if self._disk_size is None:
+                self._disk_size = sum(entry.stat().st_size for entry in os.scandir(self.disk_dir) if entry.is_file())
+            else:
+                self._disk_size += written
+            if self._disk_size > self.disk_bytes:
+                self._disk_evict()
+
+    def _disk_evict(self) -> None:
+        # Called with _disk_lock held
+        entries = sorted(
+            (entry for entry in os.scandir(self.disk_dir) if entry.is_file()),
+            key=lambda entry: entry.stat().st_mtime,
+        )
+        self._disk_size = sum(entry.stat().st_size for entry in entries)
+        # Evict down to 90% so every write past the budget does not rescan the directory
+        target = int(self.disk_bytes * 0.9)
+        for entry in entries:
+            if self._disk_size <= target:
+                break
+            try:
+                size = entry.stat().st_size
+                os.remove(entry.path)
+                self._disk_size -= size
+            except OSError:
+                continue
@@ -26,7 +26,8 @@ class KeyframeSearcher:
                  clip_model: str = "openai/clip-vit-base-patch32",
                  provider: Optional[object] = None,
                  provider_name: Optional[str] = None,
-                 provider_config: Optional[dict] = None):
+                 provider_config: Optional[dict] = None,
+                 embeddings_generator: Optional[EmbeddingsGenerator] = None):
         """
         Initialize the keyframe searcher.
 
@@ -35,6 +36,8 @@ class KeyframeSearcher:
             search_key: Azure AI Search API key (optional)
             index_name: Search index name
             clip_model: CLIP model name for query embeddings
+            embeddings_generator: Optional shared CLIP embeddings generator; avoids loading
+                another copy of the model
         """
         # Initialize search client; allow injecting a provider instance or provider_name.
         self.search_client = VideoFrameSearchClient(
@@ -47,11 +50,14 @@ class KeyframeSearcher:
         )
 
         # Initialize embeddings generator for query encoding
-        embeddings_config = ImageEmbeddingConfig(
-            model_name=clip_model,
-            batch_size=1
-        )
-        self.embeddings_generator = EmbeddingsGenerator(embeddings_config)
+        if embeddings_generator is not None:
+            self.embeddings_generator = embeddings_generator
+        else:
+            embeddings_config = ImageEmbeddingConfig(
+                model_name=clip_model,
+                batch_size=1
+            )
+            self.embeddings_generator = EmbeddingsGenerator(embeddings_config)
 
 
     async def search_keyframes(self,
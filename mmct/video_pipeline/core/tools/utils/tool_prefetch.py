@@ -0,0 +1,150 @@
+"""
+Speculative prefetch of planner tool results.
+
+The planner almost always starts with get_video_analysis, then get_context, then a keyframe
+search, and each call waits for a model round trip before its retrieval even begins. A
+ToolPrefetchCache fires these retrievals for the user query as soon as the task arrives
+and keeps the results for the session: the planner sees them in its task, and a later
+tool call with the same arguments returns the prefetched result instead of searching again.
+"""
+
+import asyncio
+import json
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from loguru import logger
+
+# Returned by lookup() when nothing was prefetched for the call
+MISS = object()
+
+_active_cache: ContextVar[Optional["ToolPrefetchCache"]] = ContextVar(
+    "mmct_tool_prefetch_cache", default=None
+)
+
+
+def _make_key(tool_name: str, arguments: Dict[str, Any]) -> Tuple[str, str]:
+    normalized = {}
+    for name, value in arguments.items():
+        if value is None:
+            continue
+        if name == "query" and isinstance(value, str):
+            value = " ".join(value.lower().split())
+        normalized[name] = value
+    return tool_name, json.dumps(normalized, sort_keys=True, default=str)
+
+
+class ToolPrefetchCache:
+    """Per-session store of tool results that were started ahead of the planner."""
+
+    def __init__(self):
+        self._tasks: Dict[Tuple[str, str], asyncio.Task] = {}
+        # Seeded results not started yet, by key: started on first lookup() or gather()
+        self._seeds: Dict[Tuple[str, str], Callable[[], Awaitable[Any]]] = {}
+
+    def prefetch(
+        self,
+        tool_name: str,
+        tool: Callable[..., Awaitable[Any]],
+        **arguments: Any,
+    ) -> asyncio.Task:
+        """
+        Start a tool call in the background and remember it under its arguments.
+
+        Args:
+            tool_name: Name of the tool, used in the cache key
+            tool: Async tool function
+            **arguments: Arguments the tool is called with; pass every argument the tool
+                passes to lookup(), including defaults, so planner calls can match
+
+        Returns:
+            The background task
+        """
+        key = _make_key(tool_name, arguments)
+        if key not in self._tasks:
+
+            async def run_uncached():
+                # The task runs in a copy of the current context; hide the cache there so the
+                # tool does not look itself up and wait on its own task
+                _active_cache.set(None)
+                return await tool(**arguments)
+
+            self._tasks[key] = asyncio.create_task(run_uncached(), name=f"prefetch:{tool_name}")
+        return self._tasks[key]
+
+    def seed(self, tool_name: str, start: Callable[[], Awaitable[Any]], **arguments: Any) -> None:
+        """
+        Register a result computed elsewhere (e.g. shared by a batch of sessions) for a tool call.
+
+        start is only called when the session first needs the result (lookup() or gather()), so
+        a session that never runs never starts it. The awaitable it returns is shielded, so
+        cancel() on this session does not cancel it for others.
+        """
+        key = _make_key(tool_name, arguments)
+        if key not in self._tasks:
+            self._seeds[key] = start
+
+    def _start_seed(self, key: Tuple[str, str]) -> None:
+        start = self._seeds.pop(key, None)
+        if start is not None and key not in self._tasks:
+            self._tasks[key] = asyncio.ensure_future(asyncio.shield(start()))
+
+    async def lookup(self, tool_name: str, **arguments: Any) -> Any:
+        """Return the prefetched result for this exact call, or MISS."""
+        key = _make_key(tool_name, arguments)
+        self._start_seed(key)
+        task = self._tasks.get(key)
+        if task is None:
+            return MISS
+        try:
+            result = await task
+        except Exception as e:
+            logger.warning(f"Prefetched {tool_name} failed, running it again: {e}")
+            return MISS
+        logger.info(f"Serving {tool_name} from the prefetch cache")
+        return result
+
+    async def gather(self, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Wait for all prefetches, bounded by timeout.
+
+        Returns:
+            Dict of tool name to result for prefetches that finished successfully in time
+        """
+        for key in list(self._seeds):
+            self._start_seed(key)
+        if not self._tasks:
+            return {}
+        done, _ = await asyncio.wait(self._tasks.values(), timeout=timeout)
+        results = {}
+        for (tool_name, _), task in self._tasks.items():
+            if task in done and not task.cancelled() and task.exception() is None:
+                results[tool_name] = task.result()
+            elif task in done and not task.cancelled():
+                logger.warning(f"Prefetch of {tool_name} failed: {task.exception()}")
+        return results
+
+    def activate(self):
+        """Make this cache visible to tool calls in the current context; returns a reset token."""
+        return _active_cache.set(self)
+
+    @staticmethod
+    def deactivate(token) -> None:
+        _active_cache.reset(token)
+
+    def cancel(self) -> None:
+        """Cancel prefetches still running, e.g. when the session ends early."""
+        for task in self._tasks.values():
+            if not task.done():
+                task.cancel()
+
+
+async def get_prefetched(tool_name: str, **arguments: Any) -> Any:
+    """
+    Look up a prefetched result in the session cache active for the current context.
+
+    Tools call this first and fall back to their normal retrieval when it returns MISS.
+    """
+    cache = _active_cache.get()
+    if cache is None:
+        return MISS
+    return await cache.lookup(tool_name, **arguments)
@@ -1,5 +1,6 @@
 # Importing modules
 import asyncio
+import json
 import os
 import logging
 from dotenv import load_dotenv
@@ -16,11 +17,13 @@ from autogen_agentchat.ui import Console
 from autogen_agentchat.teams import Swarm, RoundRobinGroupChat
 from autogen_agentchat.conditions import MaxMessageTermination, TextMentionTermination
 from autogen_agentchat.base import TaskResult
+from autogen_core.tools import FunctionTool
 from mmct.video_pipeline.core.tools.get_context import get_context
 from mmct.video_pipeline.core.tools.get_relevant_frames import get_relevant_frames
 from mmct.video_pipeline.core.tools.query_frame import query_frame
 from mmct.video_pipeline.core.tools.get_video_analysis import get_video_analysis
 from mmct.video_pipeline.core.tools.critic import critic_tool
+from mmct.video_pipeline.core.tools.utils.tool_prefetch import ToolPrefetchCache
 from mmct.video_pipeline.prompts_and_description import (
     get_planner_system_prompt,
     CRITIC_AGENT_SYSTEM_PROMPT,
@@ -31,7 +34,7 @@ from mmct.video_pipeline.prompts_and_description import (
 from autogen_ext.models.cache import ChatCompletionCache, CHAT_CACHE_VALUE_TYPE
 from autogen_ext.cache_store.diskcache import DiskCacheStore
 from diskcache import Cache as DiskCache
-from mmct.providers.factory import provider_factory
+from mmct.video_pipeline.utils.resource_pool import ResourcePool, get_resource_pool
 
 load_dotenv(override=True)
 
@@ -62,8 +65,19 @@ class VideoQnA:
         video_id (str): The unique identifier of the video.
         use_critic_agent (bool, optional): Whether to use the critic agent for answer refinement. Defaults to True.
         index_name (str, optional): Vector index name for context retrieval.
+        resource_pool (ResourcePool, optional): Pool of shared clients and agent templates.
+            Defaults to the process-wide pool.
+        prefetch (bool, optional): Speculatively run the planner's usual first retrievals for the
+            query while the agents are set up, and hand their results to the planner. Defaults to True.
+        prefetch_cache (ToolPrefetchCache, optional): Session cache to use, possibly already seeded
+            with retrievals shared across a batch of queries. Defaults to a new empty cache.
     """
 
+    # Upper bound on how long the planner waits for prefetched evidence before starting
+    PREFETCH_TIMEOUT_SECONDS = 20
+    # Per-tool cap on prefetched evidence added to the planner task
+    PREFETCH_MAX_CHARS = 6000
+
     def __init__(
         self,
         query: str,
@@ -72,7 +86,10 @@ class VideoQnA:
         use_critic_agent: bool = True,
         index_name: str = None,
         llm_provider: Optional[object] = None,
-        cache: bool = True
+        cache: bool = True,
+        resource_pool: Optional[ResourcePool] = None,
+        prefetch: bool = True,
+        prefetch_cache: Optional[ToolPrefetchCache] = None,
     ):
         self.query = query
         self.video_id = video_id
@@ -80,32 +97,46 @@ class VideoQnA:
         self.index_name = index_name
         self.url = url
         self.cache = cache
+        self.resource_pool = resource_pool or get_resource_pool()
+        self.prefetch = prefetch
+        self.prefetch_cache = prefetch_cache or ToolPrefetchCache()
 
-        # Initialize providers if not provided
         if llm_provider is None:
-            llm_provider = provider_factory.create_llm_provider()
-
-        self.model_client = llm_provider.get_autogen_client()
-
-        # Only enable caching if cache parameter is True
-        if self.cache:
-            use_cache_backend = os.getenv("AUTOGEN_CACHE_BACKEND", "disk")  # "disk" or "redis"
-            if use_cache_backend.lower() == "redis":
-                # Shared cache across processes
-                from autogen_ext.cache_store.redis import RedisStore
-                import redis
-                redis_url = os.getenv("REDIS_URL", "redis://localhost:6379/0")
-                redis_client = redis.from_url(redis_url)
-                store = RedisStore[CHAT_CACHE_VALUE_TYPE](redis_client)  # type: ignore
-            else:
-                # Local persistent cache
-                cache_dir = os.getenv("AUTOGEN_DISK_CACHE_DIR", "./.autogen_ext_cache")
-                store = DiskCacheStore[CHAT_CACHE_VALUE_TYPE](DiskCache(cache_dir))  # type: ignore
-
-            # Wrap the base model client so AgentChat uses the cached client everywhere
-            self.model_client = ChatCompletionCache(self.model_client, store)
-
-        self.tools = [get_video_analysis, get_context, get_relevant_frames, query_frame]
+            # Warm autogen client (and cache store) shared across requests
+            self.model_client = self.resource_pool.autogen_client(cache=self.cache)
+        else:
+            self.model_client = llm_provider.get_autogen_client()
+
+            # Only enable caching if cache parameter is True
+            if self.cache:
+                use_cache_backend = os.getenv("AUTOGEN_CACHE_BACKEND", "disk")  # "disk" or "redis"
+                if use_cache_backend.lower() == "redis":
+                    # Shared cache across processes
+                    from autogen_ext.cache_store.redis import RedisStore
+                    import redis
+                    redis_url = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+                    redis_client = redis.from_url(redis_url)
+                    store = RedisStore[CHAT_CACHE_VALUE_TYPE](redis_client)  # type: ignore
+                else:
+                    # Local persistent cache
+                    cache_dir = os.getenv("AUTOGEN_DISK_CACHE_DIR", "./.autogen_ext_cache")
+                    store = DiskCacheStore[CHAT_CACHE_VALUE_TYPE](DiskCache(cache_dir))  # type: ignore
+
+                # Wrap the base model client so AgentChat uses the cached client everywhere
+                self.model_client = ChatCompletionCache(self.model_client, store)
+
+        # Tool schemas are built once per process and reused by every planner/critic
+        self.tools = self.resource_pool.agent_template(
+            "video_qna_planner_tools",
+            lambda: [
+                FunctionTool(tool, description=tool.__doc__ or "")
+                for tool in (get_video_analysis, get_context, get_relevant_frames, query_frame)
+            ],
+        )
+        self.critic_tools = self.resource_pool.agent_template(
+            "video_qna_critic_tools",
+            lambda: [FunctionTool(critic_tool, description=critic_tool.__doc__ or "")],
+        )
         self.planner_agent = None
         self.critic_agent = None
         self.team = None
@@ -147,7 +178,7 @@ class VideoQnA:
                 model_client_stream=False,
                 description=CRITIC_DESCRIPTION,
                 system_message=(f"{CRITIC_AGENT_SYSTEM_PROMPT}"),
-                tools=[critic_tool],
+                tools=self.critic_tools,
                 reflect_on_tool_use=False,
                 handoffs=["planner"]
             )
@@ -162,8 +193,68 @@ class VideoQnA:
                 termination_condition=termination
             )
 
+    def _start_prefetch(self) -> None:
+        """Fire the planner's usual first retrievals for the user query in the background."""
+        self.prefetch_cache.prefetch(
+            "get_video_analysis", get_video_analysis,
+            query=self.query, index_name=self.index_name, video_id=self.video_id, url=self.url,
+            top=3, fields_to_retrieve=None,
+        )
+        self.prefetch_cache.prefetch(
+            "get_context", get_context,
+            query=self.query, index_name=self.index_name, video_id=self.video_id, url=self.url,
+            start_time=None, end_time=None, fields_to_retrieve=None, top=3,
+        )
+        # Keyframe search is scoped to one video
+        if self.video_id is not None:
+            self.prefetch_cache.prefetch(
+                "get_relevant_frames", get_relevant_frames,
+                query=self.query, video_id=self.video_id, index_name=self.index_name,
+                top_k=5, provider_name=None,
+            )
+
+    def _format_prefetched_evidence(self, results: dict) -> str:
+        """Render prefetched tool results for the planner task, without embedding vectors."""
+
+        def strip_vectors(value):
+            if isinstance(value, dict):
+                return {
+                    k: strip_vectors(v) for k, v in value.items()
+                    if "embedding" not in k.lower() and "vector" not in k.lower()
+                }
+            if isinstance(value, (list, tuple)):
+                return [strip_vectors(v) for v in value]
+            return value
+
+        sections = []
+        for tool_name, result in results.items():
+            if not result:
+                continue
+            text = json.dumps(strip_vectors(result), ensure_ascii=False, default=str)
+            if len(text) > self.PREFETCH_MAX_CHARS:
+                text = text[: self.PREFETCH_MAX_CHARS] + "...(truncated)"
+            sections.append(f"{tool_name}(query=<user query>):\n{text}")
+        if not sections:
+            return ""
+        return (
+            "\n\nPrefetched evidence (tool results already retrieved for the user query; "
+            "call the tools again only for different queries, time ranges or frames):\n"
+            + "\n\n".join(sections)
+        )
+
     async def setup(self):
+        if not self.prefetch:
+            await self._initialize_agents()
+            return
+
+        # Retrieval runs while the agents are built; the planner starts with its results
+        self._start_prefetch()
         await self._initialize_agents()
+        results = await self.prefetch_cache.gather(timeout=self.PREFETCH_TIMEOUT_SECONDS)
+        evidence = self._format_prefetched_evidence(results)
+        if evidence:
+            logger.info(f"Planner starts with prefetched evidence from {list(results)}")
+            self.task += evidence
 
     async def calculate_total_tokens(self, messages) -> dict:
         """
@@ -191,15 +282,36 @@ class VideoQnA:
         """
         return TaskResult.messages
         """
-        await self.setup()
-
-        result = await self.team.run(task=self.task)
-        tokens = await self.calculate_total_tokens(result.messages)
-        return {"result": result.messages[-1].content, "tokens": tokens}
+        # Tool calls made during this run check the session's prefetch cache first
+        token = self.prefetch_cache.activate()
+        try:
+            await self.setup()
+
+            result = await self.team.run(task=self.task)
+            tokens = await self.calculate_total_tokens(result.messages)
+            return {"result": result.messages[-1].content, "tokens": tokens}
+        finally:
+            self.prefetch_cache.cancel()
+            self.prefetch_cache.deactivate(token)
 
     async def run_stream(self):
         await self.setup()
-        return self.team.run_stream(task=self.task)
+        return self._stream_with_prefetch()
+
+    async def _stream_with_prefetch(self):
+        # The body runs in the context of the task consuming the stream, so the cache is active
+        # for the tool calls made while iterating, and is reset when the stream ends or is closed
+        token = self.prefetch_cache.activate()
+        try:
+            async for message in self.team.run_stream(task=self.task):
+                yield message
+        finally:
+            self.prefetch_cache.cancel()
+            try:
+                self.prefetch_cache.deactivate(token)
+            except ValueError:
+                # Closed from another context (e.g. garbage collected); nothing to reset there
+                pass
 
 
 async def video_qna(
@@ -214,7 +326,10 @@ async def video_qna(
     ] = "education-video-index-v2",
     stream: Annotated[bool, "Set to True to return the response as a stream."] = False,
     llm_provider: Optional[object] = None,
-    cache: Annotated[bool, "Set to True to enable cache for model responses."] = True
+    cache: Annotated[bool, "Set to True to enable cache for model responses."] = True,
+    resource_pool: Optional[ResourcePool] = None,
+    prefetch: Annotated[bool, "Set to True to prefetch the usual first tool results for the query."] = True,
+    prefetch_cache: Optional[ToolPrefetchCache] = None,
 ):
     """
     Video QnA with comprehensive multi-tool support for video analysis using Swarm orchestration.
@@ -238,6 +353,9 @@ async def video_qna(
         index_name=index_name,
         llm_provider=llm_provider,
         cache=cache,
+        resource_pool=resource_pool,
+        prefetch=prefetch,
+        prefetch_cache=prefetch_cache,
     )
     if stream:
         response_generator = await video_qna_instance.run_stream()
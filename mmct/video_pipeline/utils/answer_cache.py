@@ -0,0 +1,317 @@
+"""
+Semantic cache of VideoAgent answers.
+
+The autogen ChatCompletionCache only hits on byte-identical message histories, so the same
+question asked in different words reruns the whole multi-agent loop. SemanticAnswerCache
+sits in front of VideoAgent: answers are stored under (index_name, video_id or url) with the
+embedding of the query, and a later query whose embedding is close enough to a stored one
+returns the stored VideoAgentResponse without any agent calls.
+
+Each scope carries a generation number kept in a small JSON file next to the store. Ingesting
+a video bumps the generation of that video's scopes and of the index-wide scope, so answers
+computed against the old documents are never served again, including by other processes
+sharing the cache directory.
+
+Backends:
+    disk:  one JSON file of embeddings and answers per scope (default)
+    faiss: one LocalFaissSearchProvider index per scope
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import threading
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from loguru import logger
+
+from mmct.utils.error_handler import ConfigurationException
+
+INDEX_WIDE_SCOPE = "*"
+
+
+def _normalize(embedding: List[float]) -> np.ndarray:
+    vector = np.asarray(embedding, dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm > 0 else vector
+
+
+def _scope_digest(scope: str) -> str:
+    return hashlib.sha1(scope.encode("utf-8")).hexdigest()[:20]
+
+
+class AnswerStore(ABC):
+    """Storage backend for cached answers; embeddings passed in are unit-normalised."""
+
+    @abstractmethod
+    async def search(self, scope: str, embedding: np.ndarray) -> Optional[Tuple[float, Dict[str, Any]]]:
+        """Return (cosine similarity, payload) of the closest stored answer in scope, or None."""
+
+    @abstractmethod
+    async def add(self, scope: str, embedding: np.ndarray, payload: Dict[str, Any]) -> None:
+        """Store an answer in scope."""
+
+    @abstractmethod
+    async def drop(self, scope: str) -> None:
+        """Remove every answer stored in scope."""
+
+
+class DiskAnswerStore(AnswerStore):
+    """
+    Answers kept as one JSON file per scope and searched with a NumPy dot product.
+
+    Scopes hold at most max_entries_per_scope answers; the oldest are dropped first.
+    """
+
+    def __init__(self, cache_dir: str, max_entries_per_scope: int = 500):
+        self.cache_dir = cache_dir
+        self.max_entries_per_scope = max_entries_per_scope
+        os.makedirs(self.cache_dir, exist_ok=True)
+        # scope -> (file mtime, embedding matrix, payloads)
+        self._loaded: Dict[str, Tuple[float, np.ndarray, List[Dict[str, Any]]]] = {}
+        self._lock = threading.Lock()
+
+    def _path(self, scope: str) -> str:
+        return os.path.join(self.cache_dir, f"{_scope_digest(scope)}.json")
+
+    def _load_sync(self, scope: str) -> Tuple[np.ndarray, List[Dict[str, Any]]]:
+        path = self._path(scope)
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            return np.zeros((0, 0), dtype=np.float32), []
+        cached = self._loaded.get(scope)
+        if cached is not None and cached[0] == mtime:
+            return cached[1], cached[2]
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entries = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Answer cache: ignoring unreadable scope file {path}: {e}")
+            return np.zeros((0, 0), dtype=np.float32), []
+        matrix = np.asarray([entry["embedding"] for entry in entries], dtype=np.float32)
+        payloads = [entry["payload"] for entry in entries]
+        self._loaded[scope] = (mtime, matrix, payloads)
+        return matrix, payloads
+
+    def _search_sync(self, scope: str, embedding: np.ndarray):
+        with self._lock:
+            matrix, payloads = self._load_sync(scope)
+        if not payloads:
+            return None
+        similarities = matrix @ embedding
+        best = int(np.argmax(similarities))
+        return float(similarities[best]), payloads[best]
+
+    def _add_sync(self, scope: str, embedding: np.ndarray, payload: Dict[str, Any]) -> None:
+        with self._lock:
+            matrix, payloads = self._load_sync(scope)
+            entries = [
+                {"embedding": row.tolist(), "payload": existing}
+                for row, existing in zip(matrix, payloads)
+            ]
+            entries.append({"embedding": embedding.tolist(), "payload": payload})
+            entries = entries[-self.max_entries_per_scope:]
+
+            path = self._path(scope)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(entries, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+            self._loaded.pop(scope, None)
+
+    def _drop_sync(self, scope: str) -> None:
+        with self._lock:
+            self._loaded.pop(scope, None)
+            try:
+                os.remove(self._path(scope))
+            except FileNotFoundError:
+                pass
+
+    async def search(self, scope, embedding):
+        return await asyncio.to_thread(self._search_sync, scope, embedding)
+
+    async def add(self, scope, embedding, payload):
+        await asyncio.to_thread(self._add_sync, scope, embedding, payload)
+
+    async def drop(self, scope):
+        await asyncio.to_thread(self._drop_sync, scope)
+
+
+class FaissAnswerStore(AnswerStore):
+    """Answers kept in the local FAISS search provider, one index per scope."""
+
+    def __init__(self, cache_dir: str):
+        from mmct.providers.custom_providers.local_faiss_search_provider import (
+            LocalFaissSearchProvider,
+        )
+
+        self.provider = LocalFaissSearchProvider({"index_path": cache_dir})
+
+    @staticmethod
+    def _index_name(scope: str) -> str:
+        return f"answers-{_scope_digest(scope)}"
+
+    async def search(self, scope, embedding):
+        results = await self.provider.search(
+            query="", index_name=self._index_name(scope), embedding=embedding.tolist(), top=1
+        )
+        if not results:
+            return None
+        # IndexFlatL2 returns squared L2 distance; for unit vectors cos = 1 - d / 2
+        best = results[0]
+        return 1.0 - best["score"] / 2.0, best["document"]["payload"]
+
+    async def add(self, scope, embedding, payload):
+        document_id = hashlib.sha1(embedding.tobytes()).hexdigest()
+        await self.provider.index_document(
+            {"id": document_id, "embeddings": embedding.tolist(), "payload": payload},
+            index_name=self._index_name(scope),
+        )
+
+    async def drop(self, scope):
+        await self.provider.delete_index(self._index_name(scope))
+
+
+class SemanticAnswerCache:
+    """
+    Embedding-keyed answer cache scoped by index and video.
+
+    Args:
+        backend: Store holding embeddings and answers
+        embedding_provider: Text embedding provider used for queries
+        cache_dir: Directory holding the generation file (and the store's files)
+        threshold: Minimum cosine similarity for a cached answer to be served
+
+    Example:
+        >>> cache = SemanticAnswerCache.from_env(embedding_provider)
+        >>> embedding = await cache.embed(query)
+        >>> payload = await cache.lookup(embedding, index_name, video_id=video_id)
+        >>> if payload is None:
+        ...     await cache.store(embedding, answer.model_dump(), index_name, video_id=video_id)
+    """
+
+    def __init__(self, backend: AnswerStore, embedding_provider, cache_dir: str, threshold: float = 0.95):
+        self.backend = backend
+        self.embedding_provider = embedding_provider
+        self.threshold = threshold
+        self._generations_path = os.path.join(cache_dir, "generations.json")
+        self._generations_lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @classmethod
+    def from_env(cls, embedding_provider) -> "SemanticAnswerCache":
+        """
+        Create a cache from ANSWER_CACHE_BACKEND ("disk" or "faiss"), ANSWER_CACHE_DIR and
+        ANSWER_CACHE_THRESHOLD.
+        """
+        backend = os.getenv("ANSWER_CACHE_BACKEND", "disk").lower()
+        cache_dir = os.getenv("ANSWER_CACHE_DIR", "./.mmct_answer_cache")
+        if backend == "disk":
+            store = DiskAnswerStore(cache_dir)
+        elif backend == "faiss":
+            store = FaissAnswerStore(cache_dir)
+        else:
+            raise ConfigurationException(
+                f"Unsupported ANSWER_CACHE_BACKEND '{backend}', expected 'disk' or 'faiss'"
+            )
+        return cls(
+            backend=store,
+            embedding_provider=embedding_provider,
+            cache_dir=cache_dir,
+            threshold=float(os.getenv("ANSWER_CACHE_THRESHOLD", "0.95")),
+        )
+
+    # Generations
+
+    def _read_generations(self) -> Dict[str, int]:
+        try:
+            with open(self._generations_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _bump_generations_sync(self, base_scopes: Iterable[str]) -> List[str]:
+        """Advance the generation of each scope; returns the scope keys that went stale."""
+        with self._generations_lock:
+            generations = self._read_generations()
+            stale = []
+            for base_scope in base_scopes:
+                generation = generations.get(base_scope, 0)
+                stale.append(f"{base_scope}#{generation}")
+                generations[base_scope] = generation + 1
+            tmp_path = f"{self._generations_path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(generations, f)
+            os.replace(tmp_path, self._generations_path)
+            return stale
+
+    async def _scope(self, index_name: str, video_id: Optional[str], url: Optional[str]) -> str:
+        base_scope = f"{index_name}|{video_id or url or INDEX_WIDE_SCOPE}"
+        generations = await asyncio.to_thread(self._read_generations)
+        return f"{base_scope}#{generations.get(base_scope, 0)}"
+
+    # Public API
+
+    async def embed(self, query: str) -> np.ndarray:
+        """Embed a query for lookup() and store(); whitespace and case are normalised first."""
+        text = " ".join(query.lower().split())
+        return _normalize(await self.embedding_provider.embedding(text))
+
+    async def lookup(
+        self,
+        embedding: np.ndarray,
+        index_name: str,
+        video_id: Optional[str] = None,
+        url: Optional[str] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Find a stored answer for a similar query in the same scope.
+
+        Returns:
+            The stored payload when the best match reaches the threshold, otherwise None
+        """
+        scope = await self._scope(index_name, video_id, url)
+        match = await self.backend.search(scope, embedding)
+        if match is None:
+            return None
+        similarity, payload = match
+        if similarity < self.threshold:
+            logger.debug(f"Answer cache: closest answer in {scope} has similarity {similarity:.3f}")
+            return None
+        logger.info(f"Answer cache hit in {scope} (similarity {similarity:.3f})")
+        return payload
+
+    async def store(
+        self,
+        embedding: np.ndarray,
+        payload: Dict[str, Any],
+        index_name: str,
+        video_id: Optional[str] = None,
+        url: Optional[str] = None,
+    ) -> None:
+        """Store an answer for the query embedding in its scope."""
+        scope = await self._scope(index_name, video_id, url)
+        await self.backend.add(scope, embedding, payload)
+
+    async def invalidate(self, index_name: str, video_ids: Iterable[Optional[str]]) -> None:
+        """
+        Invalidate answers for videos whose documents were (re-)ingested into an index.
+
+        Args:
+            index_name: Index the documents were written to
+            video_ids: Hash ids and/or URLs identifying the video; the index-wide scope is
+                always invalidated as well
+        """
+        base_scopes = [f"{index_name}|{INDEX_WIDE_SCOPE}"]
+        base_scopes += [f"{index_name}|{video_id}" for video_id in dict.fromkeys(video_ids) if video_id]
+        stale_scopes = await asyncio.to_thread(self._bump_generations_sync, base_scopes)
+        for scope in stale_scopes:
+            try:
+                await self.backend.drop(scope)
+            except Exception as e:
+                logger.warning(f"Answer cache: failed to drop stale scope {scope}: {e}")
+        logger.info(f"Answer cache: invalidated {len(base_scopes)} scope(s) of index {index_name}")
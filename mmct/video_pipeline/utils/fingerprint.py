@@ -0,0 +1,206 @@
+"""
+Video fingerprints for fast ingestion dedup.
+
+Video ids are the SHA-256 of the whole file, which for a multi-gigabyte video takes tens of
+seconds to compute. The dedup check does not need it up front:
+
+- sampled_fingerprint() hashes the file size plus a head block, a tail block and evenly spaced
+  blocks in between (a few MB whatever the file size) with BLAKE3 or xxHash when installed,
+  BLAKE2b otherwise. It is used to look up videos seen before.
+- full_file_hash() computes the SHA-256 once in a worker thread with large reads, shares the
+  work between concurrent callers and caches the result in memory and in a sidecar file next
+  to the video, both keyed by (path, size, mtime).
+- FingerprintRegistry maps fingerprints to the video ids they were ingested under, so a
+  repeated ingestion is recognised from the fingerprint alone.
+
+Set VIDEO_FINGERPRINT_MODE=full to disable the sampled lookup and always check by full hash.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import threading
+from typing import Dict, Optional, Tuple
+
+from loguru import logger
+
+from mmct.utils.streaming_download import lookup_file_hash, remember_file_hash
+
+SAMPLE_BLOCK_SIZE = 1024 * 1024
+STRIDED_BLOCK_SIZE = 256 * 1024
+STRIDED_BLOCK_COUNT = 16
+HASH_READ_SIZE = 4 * 1024 * 1024
+
+_inflight: Dict[Tuple[str, int, int, str], "asyncio.Future[str]"] = {}
+
+
+def _sampling_hasher():
+    """Return (name, hasher) for the fastest installed hash: BLAKE3, xxHash, then BLAKE2b."""
+    try:
+        import blake3
+
+        return "blake3", blake3.blake3()
+    except ImportError:
+        pass
+    try:
+        import xxhash
+
+        return "xxh3", xxhash.xxh3_128()
+    except ImportError:
+        return "blake2b", hashlib.blake2b(digest_size=16)
+
+
+def _sample_offsets(size: int) -> list:
+    if size <= 2 * SAMPLE_BLOCK_SIZE + STRIDED_BLOCK_COUNT * STRIDED_BLOCK_SIZE:
+        return [(0, size)]
+    offsets = [(0, SAMPLE_BLOCK_SIZE)]
+    span = size - 2 * SAMPLE_BLOCK_SIZE - STRIDED_BLOCK_SIZE
+    for i in range(STRIDED_BLOCK_COUNT):
+        offsets.append((SAMPLE_BLOCK_SIZE + span * (i + 1) // (STRIDED_BLOCK_COUNT + 1), STRIDED_BLOCK_SIZE))
+    offsets.append((size - SAMPLE_BLOCK_SIZE, SAMPLE_BLOCK_SIZE))
+    return offsets
+
+
+def _sampled_fingerprint_sync(path: str) -> str:
+    size = os.path.getsize(path)
+    name, hasher = _sampling_hasher()
+    hasher.update(str(size).encode("ascii"))
+    with open(path, "rb") as f:
+        for offset, length in _sample_offsets(size):
+            f.seek(offset)
+            remaining = length
+            while remaining > 0:
+                data = f.read(min(HASH_READ_SIZE, remaining))
+                if not data:
+                    break
+                hasher.update(data)
+                remaining -= len(data)
+    return f"{name}:{size}:{hasher.hexdigest()}"
+
+
+async def sampled_fingerprint(path: str) -> str:
+    """Fingerprint a file from its size and a few MB of sampled blocks."""
+    return await asyncio.to_thread(_sampled_fingerprint_sync, path)
+
+
+def _sidecar_path(path: str, hash_algorithm: str) -> str:
+    directory, name = os.path.split(os.path.abspath(path))
+    return os.path.join(directory, f".{name}.{hash_algorithm}.json")
+
+
+def _read_sidecar(path: str, hash_algorithm: str) -> Optional[str]:
+    try:
+        with open(_sidecar_path(path, hash_algorithm), "r", encoding="utf-8") as f:
+            cached = json.load(f)
+        stat = os.stat(path)
+        if cached.get("size") == stat.st_size and cached.get("mtime_ns") == stat.st_mtime_ns:
+            return cached.get("digest")
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def _write_sidecar(path: str, hash_algorithm: str, digest: str) -> None:
+    try:
+        stat = os.stat(path)
+        with open(_sidecar_path(path, hash_algorithm), "w", encoding="utf-8") as f:
+            json.dump({"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "digest": digest}, f)
+    except OSError as e:
+        # Read-only media folders only lose the cross-process cache
+        logger.debug(f"Could not write hash sidecar for {path}: {e}")
+
+
+def _full_file_hash_sync(path: str, hash_algorithm: str) -> str:
+    digest = _read_sidecar(path, hash_algorithm)
+    if digest is None:
+        hasher = hashlib.new(hash_algorithm)
+        with open(path, "rb") as f:
+            while True:
+                data = f.read(HASH_READ_SIZE)
+                if not data:
+                    break
+                hasher.update(data)
+        digest = hasher.hexdigest()
+        _write_sidecar(path, hash_algorithm, digest)
+    remember_file_hash(path, digest, hash_algorithm)
+    return digest
+
+
+async def full_file_hash(path: str, hash_algorithm: str = "sha256") -> str:
+    """
+    Hash a whole file, reusing cached results for unchanged files.
+
+    Concurrent calls for the same file share one computation, so starting the hash in the
+    background (e.g. with asyncio.create_task) and awaiting it later costs a single read.
+    """
+    known = lookup_file_hash(path, hash_algorithm)
+    if known:
+        return known
+
+    stat = os.stat(path)
+    key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns, hash_algorithm)
+    future = _inflight.get(key)
+    if future is None:
+        future = asyncio.ensure_future(asyncio.to_thread(_full_file_hash_sync, path, hash_algorithm))
+        _inflight[key] = future
+        future.add_done_callback(lambda _: _inflight.pop(key, None))
+    return await asyncio.shield(future)
+
+
+class FingerprintRegistry:
+    """
+    Persistent map from sampled fingerprints to the video ids they were ingested under.
+
+    Args:
+        path: JSON file holding the map; shared by processes on the same host
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._entries: Dict[str, str] = {}
+        self._mtime: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "FingerprintRegistry":
+        """Create the registry at VIDEO_FINGERPRINT_DB (default: ./.mmct_fingerprints.json)."""
+        return cls(os.getenv("VIDEO_FINGERPRINT_DB", "./.mmct_fingerprints.json"))
+
+    def _reload(self) -> None:
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            return
+        if mtime == self._mtime:
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self._entries = json.load(f)
+            self._mtime = mtime
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable fingerprint registry {self.path}: {e}")
+
+    def _lookup_sync(self, fingerprint: str) -> Optional[str]:
+        with self._lock:
+            self._reload()
+            return self._entries.get(fingerprint)
+
+    def _record_sync(self, fingerprint: str, video_id: str) -> None:
+        with self._lock:
+            self._reload()
+            self._entries[fingerprint] = video_id
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._entries, f)
+            os.replace(tmp_path, self.path)
+            self._mtime = os.path.getmtime(self.path)
+
+    async def lookup(self, fingerprint: str) -> Optional[str]:
+        """Return the video id recorded for a fingerprint, if any."""
+        return await asyncio.to_thread(self._lookup_sync, fingerprint)
+
+    async def record(self, fingerprint: str, video_id: str) -> None:
+        """Remember that a fingerprint was ingested as video_id."""
+        await asyncio.to_thread(self._record_sync, fingerprint, video_id)
@@ -1,13 +1,11 @@
 import asyncio
 from PIL import Image
 import base64
-import hashlib
 import aiofiles
 import shutil
 from loguru import logger
 import os
 import cv2
-import subprocess
 import math
 from io import BytesIO
 from datetime import timedelta
@@ -16,6 +14,8 @@ from azure.storage.blob import BlobServiceClient
 from azure.storage.blob.aio import BlobServiceClient as AsyncBlobServiceClient
 from azure.identity import get_bearer_token_provider, DefaultAzureCredential
 from mmct.providers.factory import provider_factory
+from mmct.video_pipeline.utils.fingerprint import full_file_hash
+from mmct.video_pipeline.utils.media_tools import MediaToolError, probe_media, run_media_tool
 from dotenv import load_dotenv, find_dotenv
 
 
@@ -345,19 +345,8 @@ async def load_required_files(session_id):
 
 async def get_file_hash(file_path, hash_algorithm="sha256", suffix=""):
     try:
-        """Generate a hash for a file asynchronously."""
-        hash_func = hashlib.new(hash_algorithm)
-
-        async with aiofiles.open(
-            file_path, "rb"
-        ) as file:  # Open the file asynchronously
-            while True:
-                chunk = await file.read(8192)  # Read chunks asynchronously
-                if not chunk:
-                    break
-                hash_func.update(chunk)
-
-        hash_id = hash_func.hexdigest() + suffix
+        """Generate a hash for a file asynchronously, reusing the cached hash of unchanged files."""
+        hash_id = await full_file_hash(file_path, hash_algorithm) + suffix
         logger.info(f"Hash Id Generated: {hash_id}")
         return hash_id
     except Exception as e:
@@ -400,51 +389,32 @@ async def extract_wav_from_video(video_path: str, output_path: str):
         if not output_path.endswith(".wav"):
             output_path = os.path.splitext(output_path)[0] + ".wav"
 
-        # First check if video has an audio stream using ffprobe
-        probe_process = await asyncio.create_subprocess_exec(
-            "ffprobe",
-            "-v", "error",
-            "-select_streams", "a:0",
-            "-show_entries", "stream=codec_type",
-            "-of", "default=noprint_wrappers=1:nokey=1",
-            video_path,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
-        )
-
-        probe_stdout, probe_stderr = await probe_process.communicate()
+        # First check if video has an audio stream (cached probe)
+        probe = await probe_media(video_path)
 
         # If no audio stream found, raise informative error
-        if not probe_stdout or probe_stdout.strip() != b"audio":
+        if not probe.has_audio:
             raise Exception(f"Video file has no audio stream: {video_path}")
 
-        # Use asyncio.create_subprocess_exec for truly async execution
         # Add -map 0:a to explicitly select audio stream
-        process = await asyncio.create_subprocess_exec(
-            "ffmpeg",
-            "-y",
-            "-i",
-            video_path,
-            "-map", "0:a",  # Explicitly map audio stream
-            "-ac",
-            "1",
-            "-ar",
-            "16000",
-            "-f",
-            "wav",
-            output_path,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
+        await run_media_tool(
+            [
+                "ffmpeg",
+                "-y",
+                "-v", "error",
+                "-i",
+                video_path,
+                "-map", "0:a",  # Explicitly map audio stream
+                "-ac",
+                "1",
+                "-ar",
+                "16000",
+                "-f",
+                "wav",
+                output_path,
+            ]
         )
 
-        # Wait for ffmpeg to complete and capture output
-        stdout, stderr = await process.communicate()
-
-        # Check if the process completed successfully
-        if process.returncode != 0:
-            stderr_output = stderr.decode('utf-8', errors='ignore') if stderr else "No error output"
-            raise Exception(f"FFmpeg failed with return code {process.returncode}. Error: {stderr_output}")
-
         return output_path
     except Exception as e:
         raise Exception(f"Error getting audio from video, error:{e}")
@@ -452,49 +422,39 @@ async def extract_wav_from_video(video_path: str, output_path: str):
 async def extract_mp3_from_video(video_path: str, output_path: str):
     """Extracts audio from a video file using FFmpeg."""
     try:
-        with open(os.devnull, "wb") as devnull:
-                subprocess.call(
-                [
-                    "ffmpeg",
-                    "-y",
-                    "-i",
-                    video_path,
-                    "-q:a",
-                    "0",
-                    "-map",
-                    "a",
-                    output_path,
-                ],
-                stdout=devnull,
-                stderr=devnull,
-            )
+        await run_media_tool(
+            [
+                "ffmpeg",
+                "-y",
+                "-v", "error",
+                "-i",
+                video_path,
+                "-q:a",
+                "0",
+                "-map",
+                "a",
+                output_path,
+            ]
+        )
     except Exception as e:
         raise Exception(f"Error extracting audio from {video_path}: {e}")
 
 
 async def get_video_duration(video_path: str) -> float:
     """
-    Get video duration in seconds using ffprobe.
+    Get video duration in seconds using ffprobe (cached per file version).
     Args:
         video_path (str): Path to the video file.
     Returns:
         float: Video duration in seconds.
     """
     try:
-        cmd = [
-            'ffprobe', '-v', 'quiet', '-show_entries', 'format=duration',
-            '-of', 'default=noprint_wrappers=1:nokey=1', video_path
-        ]
-        result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-        duration = float(result.stdout.strip())
+        duration = (await probe_media(video_path)).duration
         logger.info(f"Video duration: {duration:.2f} seconds ({duration/60:.2f} minutes)")
         return duration
-    except subprocess.CalledProcessError as e:
+    except MediaToolError as e:
         logger.error(f"Error getting video duration: {e}")
         raise
-    except ValueError as e:
-        logger.error(f"Error parsing video duration: {e}")
-        raise
 
 
 async def split_video_if_needed(video_path: str) -> tuple[list[str], list[str]]:
@@ -543,13 +503,9 @@ async def split_video_if_needed(video_path: str) -> tuple[list[str], list[str]]:
             '-c', 'copy', '-avoid_negative_ts', 'make_zero', part_b_path, '-y'
         ]
         
-        logger.info("Splitting video into Part A...")
-        result_a = subprocess.run(cmd_a, capture_output=True, text=True, check=True)
-        logger.info(f"Part A created successfully: {part_a_path}")
-        
-        logger.info("Splitting video into Part B...")
-        result_b = subprocess.run(cmd_b, capture_output=True, text=True, check=True)
-        logger.info(f"Part B created successfully: {part_b_path}")
+        logger.info("Splitting video into Part A and Part B...")
+        await asyncio.gather(run_media_tool(cmd_a), run_media_tool(cmd_b))
+        logger.info(f"Parts created successfully: {part_a_path}, {part_b_path}")
         
         # Verify both parts were created
         if not os.path.exists(part_a_path) or not os.path.exists(part_b_path):
@@ -558,9 +514,8 @@ async def split_video_if_needed(video_path: str) -> tuple[list[str], list[str]]:
         logger.info(f"Video successfully split into:\n  Part A: {part_a_path}\n  Part B: {part_b_path}")
         return [part_a_path, part_b_path], ['', 'B']
         
-    except subprocess.CalledProcessError as e:
+    except MediaToolError as e:
         logger.error(f"Error splitting video: {e}")
-        logger.error(f"ffmpeg stderr: {e.stderr}")
         raise
     except Exception as e:
         logger.error(f"Unexpected error during video splitting: {e}")
@@ -884,10 +839,10 @@ async def chunk_video_by_timestamps(video_path: str, timestamps: list, output_di
         ]
         
         try:
-            subprocess.run(cmd, capture_output=True, text=True, check=True)
+            await run_media_tool(cmd)
             chunk_paths.append(output_path)
             logger.info(f"Created video chunk: {output_path}")
-        except subprocess.CalledProcessError as e:
+        except MediaToolError as e:
             logger.error(f"Failed to create video chunk {output_path}: {e.stderr}")
             raise
     
@@ -0,0 +1,195 @@
+"""
+Async runner for ffmpeg/ffprobe, shared by the video helpers.
+
+Several helpers were `async def` but ran ffmpeg through blocking subprocess.run/call, freezing
+the event loop (and every ingestion and agent query in the process) for the length of the job.
+run_media_tool() runs the tools as asyncio subprocesses instead:
+
+- at most MEDIA_TOOL_CONCURRENCY (default: CPU count) tools run at once per event loop
+- each run has a timeout (MEDIA_TOOL_TIMEOUT seconds, default 3600; probes MEDIA_PROBE_TIMEOUT,
+  default 60) after which the child process is killed
+- cancelling the awaiting task kills the child process too, so no ffmpeg outlives its caller
+
+probe_media() runs ffprobe once per file version: results are cached by (path, mtime, size), and
+a single probe serves duration, fps, dimensions, codec and audio presence.
+"""
+
+import asyncio
+import json
+import os
+import weakref
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Optional, Sequence, Tuple
+
+from loguru import logger
+
+_PROBE_CACHE_SIZE = 512
+
+_slots: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+_probe_cache: "OrderedDict[Tuple[str, int, int], MediaProbe]" = OrderedDict()
+_probes_in_flight: Dict[Tuple[asyncio.AbstractEventLoop, Tuple[str, int, int]], "asyncio.Future"] = {}
+
+
+class MediaToolError(RuntimeError):
+    """An ffmpeg/ffprobe run failed or timed out."""
+
+    def __init__(self, message: str, returncode: Optional[int] = None, stderr: str = ""):
+        super().__init__(message)
+        self.returncode = returncode
+        self.stderr = stderr
+
+
+@dataclass
+class MediaToolResult:
+    """Exit status and captured output of a media tool run."""
+
+    returncode: int
+    stdout: bytes
+    stderr: bytes
+
+
+@dataclass
+class MediaProbe:
+    """Stream properties of a media file, from one ffprobe."""
+
+    width: int
+    height: int
+    fps: float
+    codec: str
+    bitrate_kbps: float
+    duration: float
+    has_audio: bool
+
+    @classmethod
+    def from_ffprobe(cls, probe: dict) -> "MediaProbe":
+        """Build from the JSON ffprobe returns for -show_format -show_streams."""
+        streams = probe.get("streams", [])
+        video = next((s for s in streams if s.get("codec_type") == "video"), {})
+        fps = 0.0
+        for key in ("avg_frame_rate", "r_frame_rate"):
+            num, _, den = str(video.get(key, "0/0")).partition("/")
+            try:
+                fps = float(num) / float(den or 1)
+            except (ValueError, ZeroDivisionError):
+                continue
+            if fps > 0:
+                break
+        fmt = probe.get("format", {})
+        bitrate = video.get("bit_rate") or fmt.get("bit_rate") or 0
+        return cls(
+            width=int(video.get("width") or 0),
+            height=int(video.get("height") or 0),
+            fps=fps,
+            codec=str(video.get("codec_name", "")),
+            bitrate_kbps=float(bitrate) / 1000,
+            duration=float(fmt.get("duration") or video.get("duration") or 0),
+            has_audio=any(s.get("codec_type") == "audio" for s in streams),
+        )
+
+
+def _loop_slots() -> asyncio.Semaphore:
+    # One semaphore per event loop: asyncio primitives can't be shared between loops
+    loop = asyncio.get_running_loop()
+    slots = _slots.get(loop)
+    if slots is None:
+        slots = asyncio.Semaphore(int(os.getenv("MEDIA_TOOL_CONCURRENCY", str(os.cpu_count() or 4))))
+        _slots[loop] = slots
+    return slots
+
+
+async def run_media_tool(
+    command: Sequence[str],
+    timeout: Optional[float] = None,
+    check: bool = True,
+) -> MediaToolResult:
+    """
+    Run an ffmpeg/ffprobe command without blocking the event loop.
+
+    Args:
+        command: Program and arguments
+        timeout: Seconds before the process is killed (default: MEDIA_TOOL_TIMEOUT, 3600)
+        check: Raise MediaToolError on a non-zero exit status
+
+    Returns:
+        MediaToolResult with the exit status, stdout and stderr
+
+    Raises:
+        MediaToolError: If the tool times out, or exits non-zero with check=True
+    """
+    if timeout is None:
+        timeout = float(os.getenv("MEDIA_TOOL_TIMEOUT", "3600"))
+
+    async with _loop_slots():
+        process = await asyncio.create_subprocess_exec(
+            *command,
+            stdin=asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        try:
+            stdout, stderr = await asyncio.wait_for(process.communicate(), timeout)
+        except asyncio.TimeoutError:
+            await _kill(process)
+            raise MediaToolError(f"{command[0]} timed out after {timeout:.0f}s: {' '.join(command)}")
+        except asyncio.CancelledError:
+            await _kill(process)
+            raise
+
+    if check and process.returncode != 0:
+        error = stderr.decode("utf-8", errors="replace").strip()
+        raise MediaToolError(
+            f"{command[0]} failed with return code {process.returncode}: {error[-2000:]}",
+            returncode=process.returncode,
+            stderr=error,
+        )
+    return MediaToolResult(returncode=process.returncode, stdout=stdout, stderr=stderr)
+
+
+async def _kill(process: "asyncio.subprocess.Process") -> None:
+    if process.returncode is None:
+        try:
+            process.kill()
+        except ProcessLookupError:
+            pass
+        await process.wait()
+
+
+async def probe_media(path: str) -> MediaProbe:
+    """
+    ffprobe a media file, once per file version.
+
+    Raises:
+        FileNotFoundError: If the file does not exist
+        MediaToolError: If ffprobe fails
+    """
+    stat = os.stat(path)
+    key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+    cached = _probe_cache.get(key)
+    if cached is not None:
+        _probe_cache.move_to_end(key)
+        return cached
+
+    # Concurrent probes of the same file (on the same loop) share one ffprobe
+    flight_key = (asyncio.get_running_loop(), key)
+    future = _probes_in_flight.get(flight_key)
+    if future is None:
+        future = asyncio.ensure_future(_run_probe(path))
+        _probes_in_flight[flight_key] = future
+        future.add_done_callback(lambda _: _probes_in_flight.pop(flight_key, None))
+    probe = await asyncio.shield(future)
+
+    _probe_cache[key] = probe
+    while len(_probe_cache) > _PROBE_CACHE_SIZE:
+        _probe_cache.popitem(last=False)
+    return probe
+
+
+async def _run_probe(path: str) -> MediaProbe:
+    result = await run_media_tool(
+        ["ffprobe", "-v", "error", "-print_format", "json", "-show_format", "-show_streams", path],
+        timeout=float(os.getenv("MEDIA_PROBE_TIMEOUT", "60")),
+    )
+    probe = MediaProbe.from_ffprobe(json.loads(result.stdout or b"{}"))
+    logger.debug(f"Probed {path}: {probe}")
+    return probe
@@ -0,0 +1,273 @@
+"""
+Process-scoped pool of long-lived resources for video question answering.
+
+Creating providers, HTTP clients, the CLIP model and agent prompts on every request adds
+latency and, under concurrency, multiplies connections and model copies. The pool creates
+each resource once per process and hands out the same instance to VideoAgent, VideoQnA,
+the planner tools and the FastAPI/MCP entry points. Pooled resources are closed only by
+ResourcePool.close(), normally at application shutdown.
+
+Providers and clients hold connections bound to the event loop they were first used on, so
+they are pooled per running loop: a process that calls asyncio.run() more than once (scripts,
+tests, the compressor's own loop) gets fresh clients on each loop instead of ones attached to
+a closed loop. Loop-independent resources (the CLIP model, agent templates, the context
+packer, the fingerprint registry) are shared by all loops.
+"""
+
+import asyncio
+import os
+import threading
+import weakref
+from typing import Any, Dict, Optional, Tuple
+from loguru import logger
+
+from mmct.providers.factory import provider_factory
+from mmct.config.settings import ImageEmbeddingConfig
+
+
+def resolve_keyframe_provider_config() -> Optional[dict]:
+    """
+    Prefer exported local FAISS indices when present.
+
+    Returns:
+        Provider config pointing at examples/mmct_faiss_indices or ./mmct_faiss_indices, or None
+    """
+    alt_faiss_dir = os.path.join(os.getcwd(), "examples", "mmct_faiss_indices")
+    default_faiss_dir = os.path.join(os.getcwd(), "mmct_faiss_indices")
+    if os.path.isdir(alt_faiss_dir) and any(os.scandir(alt_faiss_dir)):
+        return {"index_path": alt_faiss_dir}
+    if os.path.isdir(default_faiss_dir) and any(os.scandir(default_faiss_dir)):
+        return {"index_path": default_faiss_dir}
+    return None
+
+
+class ResourcePool:
+    """
+    Lazily created, shared provider and agent resources.
+
+    Example:
+        >>> pool = get_resource_pool()
+        >>> llm = pool.llm_provider()
+        >>> searcher = pool.keyframe_searcher("my-index")
+        >>> await pool.close()  # at shutdown
+    """
+
+    def __init__(self):
+        self._resources: Dict[Tuple, Any] = {}
+        # Loop-bound resources, per event loop; dropped with the loop once it is garbage collected
+        self._loop_resources: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Tuple, Any]]" = (
+            weakref.WeakKeyDictionary()
+        )
+        # Creation is synchronous (model loads, client construction) and may happen from worker threads
+        self._lock = threading.RLock()
+
+    def _resources_for(self, loop_bound: bool) -> Dict[Tuple, Any]:
+        if not loop_bound:
+            return self._resources
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # Created outside any loop (e.g. a worker thread); shared like loop-independent resources
+            return self._resources
+        with self._lock:
+            resources = self._loop_resources.get(loop)
+            if resources is None:
+                resources = self._loop_resources[loop] = {}
+            return resources
+
+    def _get_or_create(self, key: Tuple, factory, loop_bound: bool = False) -> Any:
+        resources = self._resources_for(loop_bound)
+        resource = resources.get(key)
+        if resource is not None:
+            return resource
+        with self._lock:
+            resource = resources.get(key)
+            if resource is None:
+                logger.info(f"Resource pool: creating {key[0]} {key[1:] if len(key) > 1 else ''}")
+                resource = factory()
+                resources[key] = resource
+            return resource
+
+    def llm_provider(self, provider_name: Optional[str] = None):
+        """Shared LLM provider (and its HTTP client)."""
+        return self._get_or_create(
+            ("llm", provider_name),
+            lambda: provider_factory.create_llm_provider(provider_name),
+            loop_bound=True,
+        )
+
+    def embedding_provider(self, provider_name: Optional[str] = None):
+        """Shared text embedding provider."""
+        return self._get_or_create(
+            ("embedding", provider_name),
+            lambda: provider_factory.create_embedding_provider(provider_name),
+            loop_bound=True,
+        )
+
+    def search_provider(self, provider_name: Optional[str] = None):
+        """Shared search provider for callers that pass the index name per request."""
+        return self._get_or_create(
+            ("search", provider_name),
+            lambda: provider_factory.create_search_provider(provider_name),
+            loop_bound=True,
+        )
+
+    def storage_provider(self, provider_name: Optional[str] = None):
+        """Shared storage provider."""
+        return self._get_or_create(
+            ("storage", provider_name),
+            lambda: provider_factory.create_storage_provider(provider_name),
+            loop_bound=True,
+        )
+
+    def frame_cache(self, provider_name: Optional[str] = None):
+        """Shared memory + disk cache of encoded keyframes, backed by the shared storage provider."""
+        from mmct.video_pipeline.core.tools.utils.frame_cache import FrameCache
+
+        return self._get_or_create(
+            ("frame_cache", provider_name),
+            lambda: FrameCache.from_env(self.storage_provider(provider_name)),
+            loop_bound=True,
+        )
+
+    def answer_cache(self):
+        """Shared semantic answer cache for VideoAgent, configured from ANSWER_CACHE_* variables."""
+        from mmct.video_pipeline.utils.answer_cache import SemanticAnswerCache
+
+        return self._get_or_create(
+            ("answer_cache",),
+            lambda: SemanticAnswerCache.from_env(self.embedding_provider()),
+            loop_bound=True,
+        )
+
+    def fingerprint_registry(self):
+        """Shared map from sampled video fingerprints to ingested video ids."""
+        from mmct.video_pipeline.utils.fingerprint import FingerprintRegistry
+
+        return self._get_or_create(("fingerprint_registry",), FingerprintRegistry.from_env)
+
+    def context_packer(self):
+        """Shared token-budget packer for retrieval results, configured from *_PACK_TOKEN_BUDGET variables."""
+        from mmct.video_pipeline.core.tools.utils.context_packer import ContextPacker
+
+        return self._get_or_create(("context_packer",), ContextPacker.from_env)
+
+    def clip_embeddings_generator(self, clip_model: str = "openai/clip-vit-base-patch32"):
+        """Shared CLIP text encoder used for keyframe queries; the model is loaded once."""
+        from mmct.video_pipeline.utils.embedding_utils import EmbeddingsGenerator
+
+        return self._get_or_create(
+            ("clip", clip_model),
+            lambda: EmbeddingsGenerator(ImageEmbeddingConfig(model_name=clip_model, batch_size=1)),
+        )
+
+    def keyframe_searcher(
+        self,
+        index_name: str,
+        provider_name: Optional[str] = None,
+        provider_config: Optional[dict] = None,
+    ):
+        """
+        Shared KeyframeSearcher for a keyframe index.
+
+        Searchers bind their search provider to one index, so there is one per index; all of
+        them reuse the same CLIP model.
+
+        Args:
+            index_name: Full keyframe index name (e.g. "keyframes-<index>")
+            provider_name: Optional search provider name
+            provider_config: Optional provider config; defaults to local FAISS indices when present
+        """
+        from mmct.video_pipeline.core.tools.utils.search_keyframes import KeyframeSearcher
+
+        if provider_config is None:
+            provider_config = resolve_keyframe_provider_config()
+        config_key = tuple(sorted(provider_config.items())) if provider_config else None
+        return self._get_or_create(
+            ("keyframe_searcher", index_name, provider_name, config_key),
+            lambda: KeyframeSearcher(
+                search_endpoint=os.getenv("SEARCH_ENDPOINT"),
+                index_name=index_name,
+                provider_name=provider_name,
+                provider_config=provider_config,
+                embeddings_generator=self.clip_embeddings_generator(),
+            ),
+            loop_bound=True,
+        )
+
+    def autogen_client(self, provider_name: Optional[str] = None, cache: bool = False):
+        """
+        Shared autogen model client, optionally wrapped in the response cache.
+
+        The cache store (disk or Redis, chosen by AUTOGEN_CACHE_BACKEND) is opened once.
+        """
+
+        def create_client():
+            client = self.llm_provider(provider_name).get_autogen_client()
+            if not cache:
+                return client
+
+            from autogen_ext.models.cache import ChatCompletionCache, CHAT_CACHE_VALUE_TYPE
+
+            use_cache_backend = os.getenv("AUTOGEN_CACHE_BACKEND", "disk")  # "disk" or "redis"
+            if use_cache_backend.lower() == "redis":
+                # Shared cache across processes
+                from autogen_ext.cache_store.redis import RedisStore
+                import redis
+
+                redis_url = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+                store = RedisStore[CHAT_CACHE_VALUE_TYPE](redis.from_url(redis_url))  # type: ignore
+            else:
+                # Local persistent cache
+                from autogen_ext.cache_store.diskcache import DiskCacheStore
+                from diskcache import Cache as DiskCache
+
+                cache_dir = os.getenv("AUTOGEN_DISK_CACHE_DIR", "./.autogen_ext_cache")
+                store = DiskCacheStore[CHAT_CACHE_VALUE_TYPE](DiskCache(cache_dir))  # type: ignore
+            return ChatCompletionCache(client, store)
+
+        return self._get_or_create(("autogen_client", provider_name, cache), create_client, loop_bound=True)
+
+    def agent_template(self, name: str, factory) -> Any:
+        """
+        Cache an immutable agent template (system prompt, tool list, descriptions).
+
+        Agents themselves hold conversation state and are created per request from the template.
+        """
+        return self._get_or_create(("agent_template", name), factory)
+
+    async def close(self) -> None:
+        """
+        Close every pooled resource of the running loop, and the loop-independent ones, that
+        exposes close(). Resources bound to other loops can't be closed from this one.
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            resources = list(self._resources.items())
+            self._resources.clear()
+            resources += list(self._loop_resources.pop(loop, {}).items())
+        for key, resource in resources:
+            close = getattr(resource, "close", None)
+            if close is None:
+                continue
+            try:
+                result = close()
+                if hasattr(result, "__await__"):
+                    await result
+            except Exception as e:
+                logger.warning(f"Resource pool: failed to close {key[0]}: {e}")
+        logger.info(f"Resource pool closed {len(resources)} resources")
+
+
+_resource_pool: Optional[ResourcePool] = None
+_resource_pool_lock = threading.Lock()
+
+
+def get_resource_pool() -> ResourcePool:
+    """Return the process-wide resource pool, creating it on first use."""
+    global _resource_pool
+    if _resource_pool is None:
+        with _resource_pool_lock:
+            if _resource_pool is None:
+                _resource_pool = ResourcePool()
+    return _resource_pool